@@ -7,6 +7,7 @@ from fastapi.responses import PlainTextResponse
 from ffun.api.root.settings import settings as root_settings
 from ffun.application.settings import settings as app_settings
 from ffun.core import logging
+from ffun.core.metrics_registry import registry as metrics_registry
 
 logger = logging.get_module_logger()
 
@@ -34,6 +35,14 @@ async def robots_txt() -> PlainTextResponse:
     return PlainTextResponse(content)
 
 
+@api_root.get("/metrics")  # type: ignore
+async def metrics() -> PlainTextResponse:
+    if not root_settings.metrics:
+        raise fastapi.HTTPException(status_code=404)
+
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # Sitemap: https://feeds.fun/blog/sitemap.xml
 # Disallow: /blog/en/tags/
 
@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     robots_extra_disallowed_paths: list[str] = pydantic.Field(
         default_factory=lambda: list(_default_robots_extra_disallowed_paths)
     )
+    # expose the in-process metrics registry in the Prometheus text format
+    metrics: bool = False
 
     model_config = pydantic_settings.SettingsConfigDict(env_prefix="FFUN_API_ROOT_")
 
@@ -1,7 +1,10 @@
+import fastapi
 import pytest
 from fastapi.responses import PlainTextResponse
+from pytest_mock import MockerFixture
 
 from ffun.api.root import http_handlers
+from ffun.core.metrics_registry import Registry
 
 
 def _response_text(response: PlainTextResponse) -> str:
@@ -68,3 +71,26 @@ class TestSitemapsPagesXml:
 </urlset>
         """.strip()
         )
+
+
+class TestMetrics:
+
+    @pytest.mark.asyncio
+    async def test_disabled(self) -> None:
+        with pytest.raises(fastapi.HTTPException) as error:  # type: ignore
+            await http_handlers.metrics()
+
+        assert error.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_success(self, mocker: MockerFixture) -> None:
+        registry = Registry()
+        registry.counter("requests").counter(path="/x").inc(3)
+
+        mocker.patch("ffun.api.root.settings.settings.metrics", True)
+        mocker.patch("ffun.api.root.http_handlers.metrics_registry", registry)
+
+        response: PlainTextResponse = await http_handlers.metrics()
+
+        assert response.media_type == "text/plain; version=0.0.4; charset=utf-8"
+        assert _response_text(response) == '# TYPE requests counter\nrequests{path="/x"} 3\n'
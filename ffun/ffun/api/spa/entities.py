@@ -29,6 +29,7 @@ from ffun.library import entities as l_entities
 from ffun.llms_framework import domain as llms_domain
 from ffun.llms_framework.entities import LLMCostPoints
 from ffun.markers import entities as m_entities
+from ffun.meta import entities as meta_entities
 from ffun.ontology import entities as o_entities
 from ffun.parsers import entities as p_entities
 from ffun.product import entities as product_entities
@@ -526,8 +527,35 @@ class AddOpmlRequest(api.APIRequest):
     content: str
 
 
+class FeedsImport(pydantic.BaseModel):
+    id: meta_entities.FeedsImportId
+    total: int
+    processed: int
+    failed: int
+    finished: bool
+
+    @classmethod
+    def from_internal(cls, feeds_import: meta_entities.FeedsImport) -> "FeedsImport":
+        return cls(
+            id=feeds_import.id,
+            total=feeds_import.total,
+            processed=feeds_import.processed,
+            failed=feeds_import.failed,
+            finished=feeds_import.finished,
+        )
+
+
 class AddOpmlResponse(api.APISuccess):
-    pass
+    # big OPML files are imported in the background
+    feedsImport: FeedsImport | None = None
+
+
+class GetFeedsImportRequest(api.APIRequest):
+    importId: meta_entities.FeedsImportId
+
+
+class GetFeedsImportResponse(api.APISuccess):
+    feedsImport: FeedsImport
 
 
 class UnsubscribeRequest(api.APIRequest):
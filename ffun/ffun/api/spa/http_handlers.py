@@ -30,6 +30,7 @@ from ffun.library import entities as l_entities
 from ffun.markers import domain as m_domain
 from ffun.markers import entities as m_entities
 from ffun.meta import domain as meta_domain
+from ffun.meta.settings import settings as meta_settings
 from ffun.ontology import domain as o_domain
 from ffun.parsers import domain as p_domain
 from ffun.parsers import entities as p_entities
@@ -568,11 +569,25 @@ async def api_add_opml(request: entities.AddOpmlRequest, user: User) -> entities
             code="malformed_opml", message="The provided OPML file is malformed. Please check the file and try again."
         )
 
-    await meta_domain.add_feeds(feed_infos, user.id)
-
     logger.business_event("opml_import", user_id=user.id, feeds_count=len(feed_infos))
 
-    return entities.AddOpmlResponse()
+    if len(feed_infos) <= meta_settings.max_feeds_in_sync_import:
+        await meta_domain.add_feeds(feed_infos, user.id)
+        return entities.AddOpmlResponse()
+
+    feeds_import = await meta_domain.start_feeds_import(feed_infos, user.id)
+
+    return entities.AddOpmlResponse(feedsImport=entities.FeedsImport.from_internal(feeds_import))
+
+
+@api_private.post("/get-feeds-import")  # type: ignore
+async def api_get_feeds_import(request: entities.GetFeedsImportRequest, user: User) -> entities.GetFeedsImportResponse:
+    feeds_import = await meta_domain.get_feeds_import(request.importId)
+
+    if feeds_import is None or feeds_import.user_id != user.id:
+        raise APIError(code="feeds_import_not_found", message="Feeds import not found")
+
+    return entities.GetFeedsImportResponse(feedsImport=entities.FeedsImport.from_internal(feeds_import))
 
 
 @api_private.get("/get-opml")  # type: ignore
@@ -1,13 +1,28 @@
+import uuid
+
 import pytest
+from pytest_mock import MockerFixture
 
 from ffun.api.spa import entities
-from ffun.api.spa.http_handlers import _external_feeds, api_get_feeds, api_get_feeds_by_ids
+from ffun.api.spa.http_handlers import (
+    _external_feeds,
+    api_add_opml,
+    api_get_feeds,
+    api_get_feeds_by_ids,
+    api_get_feeds_import,
+)
 from ffun.core import utils
+from ffun.core.errors import APIError
 from ffun.domain.entities import UserId
+from ffun.domain.urls import str_to_feed_url, url_to_uid
 from ffun.feeds.entities import Feed
 from ffun.feeds_links import domain as fl_domain
 from ffun.library import domain as l_domain
 from ffun.library.entities import CollectedEntry
+from ffun.meta import domain as meta_domain
+from ffun.meta.entities import FeedsImportId
+from ffun.meta.settings import settings as meta_settings
+from ffun.parsers import entities as p_entities
 from ffun.users.entities import User
 
 
@@ -99,3 +114,74 @@ class TestApiGetFeedsByIds:
         )
 
         assert response.feeds == []
+
+
+def _feed_infos(number: int) -> list[p_entities.FeedInfo]:
+    urls = [str_to_feed_url(f"{uuid.uuid4().hex}.com") for _ in range(number)]
+    return [
+        p_entities.FeedInfo(url=url, title="title", description="description", entries=[], uid=url_to_uid(url))
+        for url in urls
+    ]
+
+
+class TestApiAddOpml:
+
+    @pytest.mark.asyncio
+    async def test_sync_import(self, internal_user_id: UserId, mocker: MockerFixture) -> None:
+        feed_infos = _feed_infos(3)
+
+        mocker.patch("ffun.parsers.domain.parse_opml", return_value=feed_infos)
+        mocker.patch.object(meta_settings, "max_feeds_in_sync_import", 3)
+
+        response = await api_add_opml(entities.AddOpmlRequest(content="opml"), User(id=internal_user_id))
+
+        assert response.feedsImport is None
+
+        links = await fl_domain.get_linked_feeds(internal_user_id)
+
+        assert len(links) == 3
+
+    @pytest.mark.asyncio
+    async def test_background_import(self, internal_user_id: UserId, mocker: MockerFixture) -> None:
+        feed_infos = _feed_infos(3)
+
+        mocker.patch("ffun.parsers.domain.parse_opml", return_value=feed_infos)
+        mocker.patch.object(meta_settings, "max_feeds_in_sync_import", 2)
+
+        response = await api_add_opml(entities.AddOpmlRequest(content="opml"), User(id=internal_user_id))
+
+        assert response.feedsImport is not None
+        assert response.feedsImport.total == 3
+        assert response.feedsImport.processed == 0
+        assert not response.feedsImport.finished
+
+        assert await fl_domain.get_linked_feeds(internal_user_id) == []
+
+
+class TestApiGetFeedsImport:
+
+    @pytest.mark.asyncio
+    async def test_get(self, internal_user_id: UserId) -> None:
+        feeds_import = await meta_domain.start_feeds_import(_feed_infos(2), internal_user_id)
+
+        response = await api_get_feeds_import(
+            entities.GetFeedsImportRequest(importId=feeds_import.id), User(id=internal_user_id)
+        )
+
+        assert response.feedsImport == entities.FeedsImport.from_internal(feeds_import)
+
+    @pytest.mark.asyncio
+    async def test_not_found(self, internal_user_id: UserId) -> None:
+        with pytest.raises(APIError):
+            await api_get_feeds_import(
+                entities.GetFeedsImportRequest(importId=FeedsImportId(uuid.uuid4())), User(id=internal_user_id)
+            )
+
+    @pytest.mark.asyncio
+    async def test_import_of_another_user(self, internal_user_id: UserId, another_internal_user_id: UserId) -> None:
+        feeds_import = await meta_domain.start_feeds_import(_feed_infos(2), another_internal_user_id)
+
+        with pytest.raises(APIError):
+            await api_get_feeds_import(
+                entities.GetFeedsImportRequest(importId=feeds_import.id), User(id=internal_user_id)
+            )
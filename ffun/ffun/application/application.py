@@ -1,5 +1,6 @@
 import asyncio
 import contextlib
+import pathlib
 from typing import AsyncGenerator
 
 import fastapi
@@ -7,6 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 
 from ffun.api.root import http_handlers as root_http_handlers
+from ffun.api.root.settings import settings as root_settings
 from ffun.api.spa import http_handlers as spa_http_handlers
 from ffun.application import errors
 from ffun.application import utils as app_utils
@@ -15,6 +17,9 @@ from ffun.core import logging, middlewares, postgresql, sentry
 from ffun.domain.http import set_user_agent
 from ffun.domain.urls import initialize_tld_cache
 from ffun.feeds_collections.collections import collections
+from ffun.llms_framework.providers import close_providers
+from ffun.tags.chains_cache import chains_cache
+from ffun.tags.settings import settings as tags_settings
 
 logger = logging.get_module_logger()
 
@@ -24,6 +29,19 @@ def initialize_user_settings() -> None:
     import ffun.product.user_settings  # noqa: F401
 
 
+def _pool_resize_policy() -> postgresql.PoolResizePolicy | None:
+    if not settings.postgresql.pool_adaptive:
+        return None
+
+    return postgresql.PoolResizePolicy(
+        min_size=settings.postgresql.pool_min_size,
+        max_size=settings.postgresql.pool_adaptive_max_size,
+        step=settings.postgresql.pool_adaptive_step,
+        wait_threshold=settings.postgresql.pool_adaptive_wait_threshold,
+        pool_max_size=settings.postgresql.pool_max_size,
+    )
+
+
 @contextlib.asynccontextmanager
 async def use_postgresql() -> AsyncGenerator[None, None]:
     logger.info("initialize_postgresql")
@@ -35,6 +53,11 @@ async def use_postgresql() -> AsyncGenerator[None, None]:
         timeout=settings.postgresql.pool_timeout,
         num_workers=settings.postgresql.pool_num_workers,
         max_lifetime=settings.postgresql.pool_max_lifetime,
+        prepare_threshold=settings.postgresql.prepare_threshold,
+        pipeline_mode=settings.postgresql.pipeline_mode,
+        instrumentation=settings.postgresql.instrumentation,
+        slow_query_threshold=settings.postgresql.slow_query_threshold,
+        background_pool_size=settings.postgresql.background_pool_size,
     )
     logger.info("postgresql_initialized")
 
@@ -42,6 +65,10 @@ async def use_postgresql() -> AsyncGenerator[None, None]:
         postgresql.pool_refresher(settings.postgresql.pool_check_period), name="poll_refresher"
     )
 
+    monitor = asyncio.create_task(
+        postgresql.pool_monitor(settings.postgresql.pool_stats_period, _pool_resize_policy()), name="pool_monitor"
+    )
+
     try:
         await postgresql.execute("""SELECT 1""")
     except Exception as e:
@@ -53,12 +80,41 @@ async def use_postgresql() -> AsyncGenerator[None, None]:
         logger.info("deinitialize_postgresql")
 
         refresher.cancel()
+        monitor.cancel()
 
         await postgresql.destroy_pool()
 
         logger.info("postgresql_deinitialized")
 
 
+@contextlib.asynccontextmanager
+async def use_llm_providers() -> AsyncGenerator[None, None]:
+    try:
+        yield
+    finally:
+        logger.info("deinitialize_llm_providers")
+
+        await close_providers()
+
+        logger.info("llm_providers_deinitialized")
+
+
+@contextlib.asynccontextmanager
+async def use_tags_chains_cache(path: pathlib.Path) -> AsyncGenerator[None, None]:
+    logger.info("initialize_tags_chains_cache")
+
+    chains_cache.load(path)
+
+    try:
+        yield
+    finally:
+        logger.info("deinitialize_tags_chains_cache")
+
+        chains_cache.dump(path)
+
+        logger.info("tags_chains_cache_deinitialized")
+
+
 @contextlib.asynccontextmanager
 async def use_api_spa(app: fastapi.FastAPI) -> AsyncGenerator[None, None]:
     logger.info("api_spa_enabled")
@@ -103,17 +159,27 @@ async def use_sentry() -> AsyncGenerator[None, None]:
 
 
 def create_app() -> fastapi.FastAPI:  # noqa: CCR001
-    logging.initialize(use_sentry=settings.enable_sentry)
-
-    initialize_tld_cache()
+    # the metrics registry is available only in processes that serve the /metrics endpoint, i.e. not in workers
+    logging.initialize(
+        use_sentry=settings.enable_sentry,
+        metrics_registry_is_exposed=settings.enable_api_root and root_settings.metrics,
+    )
 
     logger.info("create_app")
 
     @contextlib.asynccontextmanager
     async def lifespan(app: fastapi.FastAPI) -> AsyncGenerator[None, None]:
+        # on the start of the application, not on the import, since the import should be fast
+        initialize_tld_cache()
+
         async with contextlib.AsyncExitStack() as stack:
             await stack.enter_async_context(use_postgresql())
 
+            await stack.enter_async_context(use_llm_providers())
+
+            if tags_settings.chains_cache_file is not None:
+                await stack.enter_async_context(use_tags_chains_cache(tags_settings.chains_cache_file))
+
             if settings.enable_sentry:
                 await stack.enter_async_context(use_sentry())
 
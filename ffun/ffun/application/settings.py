@@ -18,6 +18,32 @@ class PostgreSQL(pydantic.BaseModel):
     pool_max_lifetime: int = 9 * 60
     pool_check_period: int = 60
 
+    # pool stats are reported as metrics with this period (seconds)
+    pool_stats_period: int = 60
+
+    # resize the main pool between `pool_min_size` and `pool_adaptive_max_size`
+    # by the time requests wait for connections
+    pool_adaptive: bool = False
+    pool_adaptive_max_size: int = 50
+    pool_adaptive_step: int = 5
+    pool_adaptive_wait_threshold: float = 0.05
+
+    # separate pool for long background tasks of workers (cleaner, importer)
+    # None means that background tasks use the main pool
+    background_pool_size: int | None = None
+
+    # None disables server-side prepared statements, that is required for connection poolers (pgbouncer/RDSProxy)
+    # set it to a number of executions after which a query is prepared, when connecting directly to PostgreSQL
+    prepare_threshold: int | None = None
+
+    # send statements of multi-statement operations without waiting for each reply
+    # saves network round trips, but costs some CPU => enable it if PostgreSQL is not on the same host
+    pipeline_mode: bool = False
+
+    # report time, rows and pool waiting of each query via metrics, log queries slower than the threshold (seconds)
+    instrumentation: bool = False
+    slow_query_threshold: float = 1.0
+
     @property
     def dsn(self) -> str:
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
@@ -3,8 +3,12 @@ import contextlib
 from typing import AsyncGenerator
 
 from ffun.core import logging
+from ffun.core.postgresql import PoolLane, pool_lane
 from ffun.librarian.background_processors import create_background_processors
 from ffun.loader.background_loader import FeedsLoader
+from ffun.meta.background_cleaner import OrphansCleaner
+from ffun.meta.background_importer import FeedsImporter
+from ffun.meta.settings import settings as m_settings
 
 logger = logging.get_module_logger()
 
@@ -44,3 +48,43 @@ async def use_librarian() -> AsyncGenerator[None, None]:
         logger.info("deinitialize_librarian")
         await asyncio.gather(*[processor.stop() for processor in entries_processors], return_exceptions=True)
         logger.info("librarian_deinitialized")
+
+
+@contextlib.asynccontextmanager
+async def use_cleaner() -> AsyncGenerator[None, None]:
+    logger.info("orphans_cleaner_enabled")
+
+    cleaner = OrphansCleaner(name="ffun_orphans_cleaner", delay_between_runs=m_settings.cleaner_delay_between_runs)
+
+    # long queries of the cleaner must not take connections of the other workers
+    with pool_lane(PoolLane.background):
+        cleaner.start()
+
+    logger.info("orphans_cleaner_initialized")
+
+    try:
+        yield
+    finally:
+        logger.info("deinitialize_orphans_cleaner")
+        await cleaner.stop()
+        logger.info("orphans_cleaner_deinitialized")
+
+
+@contextlib.asynccontextmanager
+async def use_importer() -> AsyncGenerator[None, None]:
+    logger.info("feeds_importer_enabled")
+
+    importer = FeedsImporter(name="ffun_feeds_importer", delay_between_runs=m_settings.importer_delay_between_runs)
+
+    # bulk inserts of big imports must not take connections of the other workers
+    with pool_lane(PoolLane.background):
+        importer.start()
+
+    logger.info("feeds_importer_initialized")
+
+    try:
+        yield
+    finally:
+        logger.info("deinitialize_feeds_importer")
+        await importer.stop()
+        logger.info("feeds_importer_deinitialized")
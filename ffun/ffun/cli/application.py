@@ -1,5 +1,6 @@
 import typer
 
+from ffun.cli.commands import benchmarks  # noqa: F401
 from ffun.cli.commands import cleaner  # noqa: F401
 from ffun.cli.commands import debug  # noqa: F401
 from ffun.cli.commands import estimates  # noqa: F401
@@ -10,6 +11,7 @@ from ffun.cli.commands import metrics  # noqa: F401
 from ffun.cli.commands import processors_quality  # noqa: F401
 from ffun.cli.commands import profile  # noqa: F401
 from ffun.cli.commands import queues  # noqa: F401
+from ffun.cli.commands import tags  # noqa: F401
 from ffun.cli.commands import user_settings  # noqa: F401
 from ffun.cli.commands import users  # noqa: F401
 from ffun.core import logging
@@ -31,6 +33,8 @@ app.add_typer(feeds.cli_app, name="feeds")
 app.add_typer(users.cli_app, name="users")
 app.add_typer(queues.cli_app, name="queues")
 app.add_typer(debug.cli_app, name="debug")
+app.add_typer(benchmarks.cli_app, name="benchmarks")
+app.add_typer(tags.cli_app, name="tags")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,566 @@
+import asyncio
+import contextlib
+import datetime
+import os
+import pathlib
+import sys
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterator, cast
+
+import tabulate
+import toml
+import typer
+
+from ffun.application.settings import settings as app_settings
+from ffun.core import logging, postgresql
+from ffun.core.postgresql import pipeline, transaction
+from ffun.domain import urls
+from ffun.domain.domain import new_entry_id, new_feed_id
+from ffun.domain.entities import AbsoluteUrl, LLMTokens, TagUid, UnknownUrl
+from ffun.feeds.entities import FeedState
+from ffun.llms_framework.entities import LLMConfiguration
+from ffun.llms_framework.provider_interface import ProviderInterface
+from ffun.tags import converters
+from ffun.tags import utils as t_utils
+from ffun.tags.entities import NormalizationMode, TagCategory, TagInNormalization
+
+# the application, the suite and LLM providers are imported by commands which use them,
+# since all CLI commands are imported on the start of every `ffun` call
+if TYPE_CHECKING:
+    from ffun.cli.commands import benchmarks_suite
+
+cli_app = typer.Typer()
+
+
+_knowlege_root = pathlib.Path("./tags_quality_base/")
+_collections_root = pathlib.Path("../feeds_collections/collections/")
+
+# sizes of texts in characters: from a short news to a long article or a book chapter
+_article_sizes = (1_000, 5_000, 20_000, 100_000, 500_000)
+
+
+def _measure(callback: Callable[[], object], repeats: int) -> float:
+    # warm up caches (tokenizers, prompt sizes, etc.)
+    callback()
+
+    started_at = time.perf_counter()
+
+    for _ in range(repeats):
+        callback()
+
+    return (time.perf_counter() - started_at) / repeats
+
+
+async def _measure_async(callback: Callable[[], Awaitable[object]], repeats: int) -> float:
+    await callback()
+
+    started_at = time.perf_counter()
+
+    for _ in range(repeats):
+        await callback()
+
+    return (time.perf_counter() - started_at) / repeats
+
+
+def _knowlege_base_corpus(knowlege_root: pathlib.Path) -> str:
+    from ffun.processors_quality.knowlege_base import KnowlegeBase
+
+    kb = KnowlegeBase(knowlege_root)
+
+    return "\n\n".join(kb.get_news_entry(entry_id).body for entry_id in kb.entry_ids())
+
+
+def _text_of_size(corpus: str, size: int) -> str:
+    repeats = size // len(corpus) + 1
+    return (corpus * repeats)[:size]
+
+
+@cli_app.command()  # type: ignore
+def cut_text_to_max_tokens(
+    knowlege_root: pathlib.Path = _knowlege_root,
+    model: str = "gpt-4o-mini-2024-07-18",
+    max_tokens: int = 4096,
+    repeats: int = 10,
+) -> None:
+    """Compare the generic truncation (binary search over `estimate_tokens`) with the OpenAI one."""
+    from ffun.openai.provider_interface import provider as openai_provider
+
+    corpus = _knowlege_base_corpus(knowlege_root)
+
+    llm_config = LLMConfiguration(model=model, system="You are a helpful assistant.", max_return_tokens=LLMTokens(1))
+
+    table = []
+
+    for size in _article_sizes:
+        text = _text_of_size(corpus, size)
+
+        def generic() -> str:
+            return ProviderInterface.cut_text_to_max_tokens(
+                openai_provider, llm_config, text=text, max_tokens=LLMTokens(max_tokens)
+            )
+
+        def optimized() -> str:
+            return openai_provider.cut_text_to_max_tokens(llm_config, text=text, max_tokens=LLMTokens(max_tokens))
+
+        generic_time = _measure(generic, repeats)
+        optimized_time = _measure(optimized, repeats)
+
+        table.append(
+            [
+                size,
+                len(optimized()),
+                f"{generic_time * 1000:.2f}",
+                f"{optimized_time * 1000:.2f}",
+                f"{generic_time / optimized_time:.1f}x",
+            ]
+        )
+
+    headers = ["text size", "cut size", "generic, ms", "optimized, ms", "speedup"]
+
+    sys.stdout.write(tabulate.tabulate(table, headers=headers, tablefmt="grid"))
+    sys.stdout.write("\n")
+
+
+def _knowlege_base_tags(knowlege_root: pathlib.Path, processor: str) -> list[list[TagInNormalization]]:
+    from ffun.processors_quality.knowlege_base import KnowlegeBase
+
+    kb = KnowlegeBase(knowlege_root)
+
+    entries_tags = []
+
+    for entry_id in kb.entry_ids():
+        expected_tags = kb.get_expected_tags(processor, entry_id)
+
+        uids = [
+            TagUid(converters.normalize(raw_uid, allow_unicode=False))
+            for raw_uid in sorted(expected_tags.must_have | expected_tags.should_have)
+        ]
+
+        entries_tags.append(
+            [
+                TagInNormalization(
+                    uid=uid,
+                    parts=t_utils.uid_to_parts(uid),
+                    link=None,
+                    categories={TagCategory.free_form},
+                    mode=NormalizationMode.raw,
+                )
+                for uid in uids
+                if uid
+            ]
+        )
+
+    return entries_tags
+
+
+@cli_app.command()  # type: ignore
+def form_normalizer_batch(
+    knowlege_root: pathlib.Path = _knowlege_root,
+    processor: str = "openai_llm_general",
+    repeats: int = 10,
+) -> None:
+    """Compare the per-tag form normalization with the warmed up one (cosines of all tags of an entry at once)."""
+    # SpaCy is heavy to import => do not slow down other CLI commands
+    from ffun.tags.normalizers import form_normalizer
+
+    entries_tags = _knowlege_base_tags(knowlege_root, processor)
+
+    # the same normalizer for both paths => the model is loaded only once
+    normalizer = form_normalizer.Normalizer()
+
+    async def per_tag(tags: list[TagInNormalization]) -> None:
+        normalizer.clear_cos_table()
+
+        for tag in tags:
+            await normalizer.normalize(tag)
+
+    async def batch(tags: list[TagInNormalization]) -> None:
+        await normalizer.warm_up(tags)
+
+        for tag in tags:
+            await normalizer.normalize(tag)
+
+    table = []
+
+    for entry_tags in entries_tags:
+
+        def per_tag_run() -> None:
+            asyncio.run(per_tag(entry_tags))
+
+        def batch_run() -> None:
+            asyncio.run(batch(entry_tags))
+
+        per_tag_time = _measure(per_tag_run, repeats)
+        batch_time = _measure(batch_run, repeats)
+
+        table.append(
+            [
+                len(entry_tags),
+                f"{per_tag_time * 1000:.2f}",
+                f"{batch_time * 1000:.2f}",
+                f"{per_tag_time / batch_time:.1f}x",
+            ]
+        )
+
+    headers = ["tags", "per tag, ms", "batch, ms", "speedup"]
+
+    sys.stdout.write(tabulate.tabulate(table, headers=headers, tablefmt="grid"))
+    sys.stdout.write("\n")
+
+
+# numbers of statements in a transaction: from a single entry removal to a bulk tags application
+_statements_numbers = (2, 3, 5, 10, 50)
+
+
+def _round_trip_commands(number: int) -> list[tuple[str, dict[str, object] | None]]:
+    return [("SELECT %(value)s::int AS value", {"value": value}) for value in range(number)]
+
+
+async def run_postgresql_pipeline(repeats: int) -> None:
+    from ffun.application.application import with_app
+
+    async with with_app():
+        table = []
+
+        for number in _statements_numbers:
+            commands = _round_trip_commands(number)
+
+            async def run() -> None:
+                async with transaction() as execute:
+                    await pipeline(execute, commands)
+
+            times = {}
+
+            # measure the same helper that is used by operations, with the pipeline mode disabled and enabled
+            for pipeline_mode in (False, True):
+                postgresql.PIPELINE_MODE = pipeline_mode
+                times[pipeline_mode] = await _measure_async(run, repeats)
+
+            table.append(
+                [
+                    number,
+                    f"{times[False] * 1000:.2f}",
+                    f"{times[True] * 1000:.2f}",
+                    f"{times[False] / times[True]:.1f}x",
+                ]
+            )
+
+    headers = ["statements", "one by one, ms", "pipeline, ms", "speedup"]
+
+    sys.stdout.write(tabulate.tabulate(table, headers=headers, tablefmt="grid"))
+    sys.stdout.write("\n")
+
+
+@cli_app.command()  # type: ignore
+def postgresql_pipeline(repeats: int = 100) -> None:
+    """Compare sending statements of a transaction one by one with sending them in the pipeline mode.
+
+    Run it against the PostgreSQL configured in the settings to decide whether to enable
+    `FFUN_POSTGRESQL__PIPELINE_MODE`: the pipeline saves network round trips, but costs some CPU time.
+    Set `FFUN_POSTGRESQL__PREPARE_THRESHOLD` to measure the effect of server-side prepared statements.
+    """
+    asyncio.run(run_postgresql_pipeline(repeats=repeats))
+
+
+def _collections_feed_urls(collections_root: pathlib.Path) -> list[str]:
+    feed_urls: list[str] = []
+
+    for path in sorted(collections_root.glob("*.toml")):
+        data: dict[str, object] = toml.loads(path.read_text())
+
+        feeds = cast(list[dict[str, str]], data["feeds"])
+
+        feed_urls.extend(feed["url"] for feed in feeds)
+
+    return feed_urls
+
+
+# variants of links that are met in feeds: as is, with tracking params, relative, with fragments
+def _urls_corpus(feed_urls: list[str]) -> list[UnknownUrl]:
+    corpus = []
+
+    for url in feed_urls:
+        corpus.append(UnknownUrl(url))
+        corpus.append(UnknownUrl(f"{url}?utm_source=rss&utm_medium=feed"))
+        corpus.append(UnknownUrl(f"{url}#comments"))
+        corpus.append(UnknownUrl("./" + url.rsplit("/", 1)[-1]))
+
+    return corpus
+
+
+# function name, number of urls, original implementation, memoized implementation
+UrlsBenchmark = tuple[str, int, Callable[[], object], Callable[[], object]]
+
+
+@cli_app.command()  # type: ignore
+def urls_normalization(collections_root: pathlib.Path = _collections_root, repeats: int = 100) -> None:
+    """Compare the original URL normalization functions with the memoized ones on feed urls from collections.
+
+    Memoized functions are measured twice: with caches cleared before each run (only the canonical fast path works)
+    and with warm caches (as in a long-running worker that parses the same feeds again and again).
+    """
+    corpus = _urls_corpus(_collections_feed_urls(collections_root))
+
+    original_url = AbsoluteUrl("https://example.com/feed.xml")
+
+    absolute_urls = [url for url in (urls.adjust_external_url(url, original_url) for url in corpus) if url is not None]
+
+    functions: list[UrlsBenchmark] = [
+        (
+            "normalize_classic_unknown_url",
+            len(corpus),
+            lambda: [urls._normalize_classic_unknown_url(url) for url in corpus],
+            lambda: [urls.normalize_classic_unknown_url(url) for url in corpus],
+        ),
+        (
+            "adjust_external_url",
+            len(corpus),
+            lambda: [urls._adjust_external_url(url, original_url) for url in corpus],
+            lambda: [urls.adjust_external_url(url, original_url) for url in corpus],
+        ),
+        (
+            "url_to_uid",
+            len(absolute_urls),
+            lambda: [urls._url_to_uid(url) for url in absolute_urls],
+            lambda: [urls.url_to_uid(url) for url in absolute_urls],
+        ),
+        (
+            "url_to_source_uid",
+            len(absolute_urls),
+            lambda: [urls._url_to_source_uid(url) for url in absolute_urls],
+            lambda: [urls.url_to_source_uid(url) for url in absolute_urls],
+        ),
+    ]
+
+    table = []
+
+    for name, urls_number, original, memoized in functions:
+
+        def cold() -> None:
+            urls.clear_urls_caches()
+            memoized()
+
+        original_time = _measure(original, repeats)
+        cold_time = _measure(cold, repeats)
+        warm_time = _measure(memoized, repeats)
+
+        table.append(
+            [
+                name,
+                urls_number,
+                f"{original_time * 1000:.2f}",
+                f"{cold_time * 1000:.2f}",
+                f"{warm_time * 1000:.2f}",
+                f"{original_time / warm_time:.1f}x",
+            ]
+        )
+
+    headers = ["function", "urls", "original, ms", "cold cache, ms", "warm cache, ms", "speedup"]
+
+    sys.stdout.write(tabulate.tabulate(table, headers=headers, tablefmt="grid"))
+    sys.stdout.write("\n")
+
+
+@contextlib.contextmanager
+def _logs_configured(writer: logging.Writer, sample_rate: float) -> Iterator[logging.FFunBoundLogger]:
+    original_sample_rate = logging.settings.sample_rate
+
+    with open(os.devnull, "w") as file:
+        logger_factory = logging.create_logger_factory(writer, file)
+
+        logging.configure(use_sentry=False, level=logging.settings.structlog_level, logger_factory=logger_factory)
+
+        logging.settings.sample_rate = sample_rate
+
+        try:
+            yield logging.get_module_logger()
+        finally:
+            logging.settings.sample_rate = original_sample_rate
+
+            # time of writing queued records is a part of the measurement
+            if isinstance(logger_factory, logging.QueuedWriteLoggerFactory):
+                logger_factory.writer.close()
+
+
+_log_attributes = {
+    "entry_id": new_entry_id(),
+    "feed_id": new_feed_id(),
+    "at": datetime.datetime.now(datetime.UTC),
+    "state": FeedState.loaded,
+    "number": 42,
+}
+
+
+def _log_info(logger: logging.FFunBoundLogger) -> None:
+    logger.info("benchmark_event", **_log_attributes)
+
+
+def _log_debug(logger: logging.FFunBoundLogger) -> None:
+    logger.debug("benchmark_event", **_log_attributes)
+
+
+def _log_sampled_info(logger: logging.FFunBoundLogger) -> None:
+    logger.sampled_info("benchmark_event", **_log_attributes)
+
+
+LogCall = Callable[[logging.FFunBoundLogger], None]
+
+
+def _measure_logs(writer: logging.Writer, log: LogCall, sample_rate: float, records: int) -> float:
+    started_at = time.perf_counter()
+
+    with _logs_configured(writer, sample_rate) as logger:
+        for _ in range(records):
+            log(logger)
+
+    return (time.perf_counter() - started_at) / records
+
+
+@cli_app.command()  # type: ignore
+def logs(records: int = 100_000) -> None:
+    """Measure the cost of a log record in a hot loop for each writer.
+
+    Records are rendered by the configured renderer (`FFUN_LOGS_RENDERER`) and written to /dev/null.
+    """
+    # label, log call, sample rate
+    cases: list[tuple[str, LogCall, float]] = [
+        ("info", _log_info, 1.0),
+        ("debug, filtered by level", _log_debug, 1.0),
+        ("sampled_info, 10%", _log_sampled_info, 0.1),
+        ("sampled_info, 1%", _log_sampled_info, 0.01),
+    ]
+
+    table = []
+
+    for label, log, sample_rate in cases:
+        table.append(
+            [label]
+            + [f"{_measure_logs(writer, log, sample_rate, records) * 1_000_000:.2f}" for writer in logging.Writer]
+        )
+
+    headers = ["record"] + [f"{writer.value} writer, µs" for writer in logging.Writer]
+
+    sys.stdout.write(tabulate.tabulate(table, headers=headers, tablefmt="grid"))
+    sys.stdout.write("\n")
+
+
+async def run_suite(
+    dataset: "benchmarks_suite.Dataset", repeats: int, selected: set[str], output: pathlib.Path | None
+) -> None:
+    from ffun.application.application import with_app
+    from ffun.cli.commands import benchmarks_suite
+
+    async with with_app():
+        report = await benchmarks_suite.run(dataset, repeats=repeats, selected=selected)
+
+    content = report.model_dump_json(indent=2)
+
+    if output is None:
+        sys.stdout.write(content)
+        sys.stdout.write("\n")
+        return
+
+    output.write_text(content)
+
+
+@cli_app.command()  # type: ignore
+def suite(  # noqa: CFQ002
+    output: pathlib.Path | None = None,
+    benchmark: list[str] | None = typer.Option(None),
+    repeats: int = 10,
+    seed: int = 42,
+    users: int = 10,
+    feeds: int = 50,
+    feeds_per_user: int = 20,
+    entries_per_feed: int = 50,
+    tags: int = 500,
+    tags_per_entry: int = 20,
+    rules_per_user: int = 20,
+    i_know_it_seeds_the_db: bool = typer.Option(False, "--i-know-it-seeds-the-db"),
+) -> None:
+    """Seed the configured PostgreSQL with a synthetic dataset and measure hot paths on it.
+
+    Results are written in JSON, compare results of two runs by `ffun benchmarks compare`.
+    Run it against a dedicated database: seeded data is not removed.
+    The suite refuses to run on a database without a "bench" or "test" word in its name (like `ffun_bench`),
+    unless `--i-know-it-seeds-the-db` is passed.
+    Pass `--benchmark <name>` (multiple times) to run only some benchmarks.
+    """
+    from ffun.cli.commands import benchmarks_suite
+
+    database = app_settings.postgresql.database
+
+    if not i_know_it_seeds_the_db and not benchmarks_suite.is_dedicated_database(database):
+        raise typer.BadParameter(
+            f"the suite seeds the database '{database}' and never removes the data, "
+            'run it against a database with a "bench" or "test" word in its name or pass --i-know-it-seeds-the-db'
+        )
+
+    selected = set(benchmark) if benchmark else set(benchmarks_suite.names)
+
+    unknown = selected - set(benchmarks_suite.names)
+
+    if unknown:
+        raise typer.BadParameter(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    dataset = benchmarks_suite.Dataset(
+        seed=seed,
+        users=users,
+        feeds=feeds,
+        feeds_per_user=feeds_per_user,
+        entries_per_feed=entries_per_feed,
+        tags=tags,
+        tags_per_entry=tags_per_entry,
+        rules_per_user=rules_per_user,
+    )
+
+    asyncio.run(run_suite(dataset, repeats=repeats, selected=selected, output=output))
+
+
+@cli_app.command()  # type: ignore
+def compare(base: pathlib.Path, current: pathlib.Path, threshold: float = 0.1) -> None:
+    """Compare medians of two `ffun benchmarks suite` reports.
+
+    Exits with a non-zero code if some benchmark is slower than in the base report by more than `threshold`.
+    """
+    from ffun.cli.commands import benchmarks_suite
+
+    base_report = benchmarks_suite.Report.model_validate_json(base.read_text())
+    current_report = benchmarks_suite.Report.model_validate_json(current.read_text())
+
+    if base_report.dataset != current_report.dataset:
+        sys.stdout.write("WARNING: reports are made on different datasets\n")
+
+    table = []
+
+    regressions = []
+
+    for current_result in current_report.results:
+        base_result = base_report.result(current_result.name)
+
+        if base_result is None:
+            table.append([current_result.name, "-", f"{current_result.median * 1000:.2f}", "-"])
+            continue
+
+        change = current_result.median / base_result.median - 1
+
+        if change > threshold:
+            regressions.append(current_result.name)
+
+        table.append(
+            [
+                current_result.name,
+                f"{base_result.median * 1000:.2f}",
+                f"{current_result.median * 1000:.2f}",
+                f"{change * 100:+.1f}%",
+            ]
+        )
+
+    headers = ["benchmark", "base median, ms", "current median, ms", "change"]
+
+    sys.stdout.write(tabulate.tabulate(table, headers=headers, tablefmt="grid"))
+    sys.stdout.write("\n")
+
+    if regressions:
+        sys.stdout.write(f"Regressions: {', '.join(regressions)}\n")
+        raise typer.Exit(code=1)
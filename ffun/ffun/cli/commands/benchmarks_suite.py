@@ -0,0 +1,382 @@
+"""
+Reproducible benchmarks of hot paths.
+
+The suite seeds the configured PostgreSQL with a synthetic dataset and measures hot paths on it.
+Results are reported in JSON to compare them between commits.
+
+- Run it against a dedicated local database: seeded data is not removed.
+- The dataset is generated from a seed, so runs with the same parameters measure the same workload.
+"""
+
+import datetime
+import functools
+import platform
+import random
+import re
+import statistics
+import time
+import uuid
+from html import escape
+from typing import Awaitable, Callable
+
+from ffun.api.spa.http_handlers import _external_entries
+from ffun.auth.settings import single_user_service_id
+from ffun.core import utils
+from ffun.core.entities import BaseEntity
+from ffun.domain.domain import new_entry_id, new_feed_id
+from ffun.domain.entities import EntryId, FeedId, FeedUrl, LLMTokens, ProcessorId, SourceId, TagUid, UserId
+from ffun.domain.urls import str_to_absolute_url, str_to_feed_url, url_to_source_uid
+from ffun.feeds import domain as f_domain
+from ffun.feeds.entities import Feed, FeedState
+from ffun.feeds_links import domain as fl_domain
+from ffun.library import domain as l_domain
+from ffun.library.entities import CollectedEntry, Entry
+from ffun.llms_framework.entities import LLMConfiguration
+from ffun.ontology import domain as o_domain
+from ffun.ontology.entities import NormalizedTag, RawTag
+from ffun.openai.provider_interface import provider as openai_provider
+from ffun.parsers.feed import parse_feed
+from ffun.queues import BaseQueueItem, QueueKind, QueueRecordId
+from ffun.queues import domain as q_domain
+from ffun.scores import domain as s_domain
+from ffun.tags import domain as t_domain
+from ffun.tags.entities import TagCategory
+from ffun.tags.normalizers import get_normalizers
+from ffun.users import domain as u_domain
+
+_processor_id = ProcessorId(100500)
+
+_words = (
+    "python rust postgresql database index query cache queue worker feed entry news article tag rule score "
+    "science physics biology economics startup market release update security vulnerability performance "
+    "benchmark latency throughput memory network server client browser mobile design research model"
+).split()
+
+# entries are published in this period, all of them must be returned by `get_entries_by_filter`
+_entries_period = datetime.timedelta(days=30)
+
+# seeded data is never removed => the suite runs only against databases that are obviously not real ones
+# names are matched by whole words (split by non-alphanumeric characters), so "latest" is not a test database
+_dedicated_database_markers = frozenset(("bench", "benchmark", "benchmarks", "test", "tests"))
+
+_queue_batch = 100
+_catalog_batch = 10
+_feed_items = 100
+_text_size = 20_000
+
+
+class Dataset(BaseEntity):
+    seed: int = 42
+    users: int = 10
+    feeds: int = 50
+    feeds_per_user: int = 20
+    entries_per_feed: int = 50
+    tags: int = 500
+    tags_per_entry: int = 20
+    rules_per_user: int = 20
+
+
+class BenchmarkResult(BaseEntity):
+    name: str
+    repeats: int
+    min: float
+    median: float
+    mean: float
+    max: float
+
+
+class Report(BaseEntity):
+    created_at: datetime.datetime
+    python: str
+    dataset: Dataset
+    results: list[BenchmarkResult]
+
+    def result(self, name: str) -> BenchmarkResult | None:
+        for result in self.results:
+            if result.name == name:
+                return result
+
+        return None
+
+
+class SeededData(BaseEntity):
+    user_ids: list[UserId]
+    feeds: list[Feed]
+    user_feeds: dict[UserId, list[FeedId]]
+    tags: list[TagUid]
+
+
+class BenchmarkQueueItem(BaseQueueItem):
+    entry_id: EntryId
+
+
+Benchmark = Callable[[], Awaitable[object]]
+
+
+def is_dedicated_database(database: str) -> bool:
+    words = re.split(r"[^a-z0-9]+", database.lower())
+    return not _dedicated_database_markers.isdisjoint(words)
+
+
+def _text(rnd: random.Random, words_number: int) -> str:
+    return " ".join(rnd.choices(_words, k=words_number))
+
+
+def _tags_vocabulary(rnd: random.Random, number: int) -> list[TagUid]:
+    # words are repeated in different forms to give work to the tags normalizers
+    return [TagUid(f"{'-'.join(rnd.choices(_words, k=rnd.randint(1, 3)))}-{i}") for i in range(number)]
+
+
+def _feed_url(prefix: str, number: int) -> FeedUrl:
+    return str_to_feed_url(f"https://{prefix}-{number}.example.com/feed.xml")
+
+
+def _fake_feed(url: FeedUrl, source_id: SourceId, number: int) -> Feed:
+    timestamp = utils.now()
+
+    return Feed(
+        id=new_feed_id(),
+        source_id=source_id,
+        url=url,
+        state=FeedState.loaded,
+        last_error=None,
+        load_attempted_at=timestamp,
+        loaded_at=timestamp,
+        title=f"Benchmark feed {number}",
+        description=f"Benchmark feed {number}",
+    )
+
+
+def _fake_entries(rnd: random.Random, feed: Feed, number: int) -> list[CollectedEntry]:
+    entries = []
+
+    now = utils.now()
+
+    site_url = feed.url.rsplit("/", 1)[0]
+
+    for _ in range(number):
+        external_id = uuid.UUID(int=rnd.getrandbits(128)).hex
+
+        entries.append(
+            CollectedEntry(
+                id=new_entry_id(),
+                source_id=feed.source_id,
+                title=_text(rnd, 8),
+                body=_text(rnd, 200),
+                external_id=external_id,
+                external_url=str_to_absolute_url(f"{site_url}/entries/{external_id}"),
+                external_tags=set(),
+                published_at=now - rnd.random() * _entries_period,
+                references=[],
+            )
+        )
+
+    return entries
+
+
+async def _seed_feeds(dataset: Dataset, prefix: str) -> list[Feed]:
+    urls = [_feed_url(prefix, i) for i in range(dataset.feeds)]
+
+    source_ids = await f_domain.get_source_ids([url_to_source_uid(url) for url in urls])
+
+    feeds = [_fake_feed(url, source_ids[url_to_source_uid(url)], i) for i, url in enumerate(urls)]
+
+    feed_ids = await f_domain.save_feeds(feeds)
+
+    return [feed.replace(id=feed_id) for feed, feed_id in zip(feeds, feed_ids)]
+
+
+async def seed(dataset: Dataset) -> SeededData:
+    rnd = random.Random(dataset.seed)
+
+    # data of different runs must not intersect, otherwise feeds will be reused
+    prefix = uuid.uuid4().hex
+
+    feeds = await _seed_feeds(dataset, prefix)
+
+    tags = _tags_vocabulary(rnd, dataset.tags)
+
+    for feed in feeds:
+        entries = _fake_entries(rnd, feed, dataset.entries_per_feed)
+
+        await l_domain.catalog_entries(feed.id, entries)
+
+        for entry in entries:
+            entry_tags = [
+                NormalizedTag(uid=uid, link=None, categories={TagCategory.free_form})
+                for uid in rnd.sample(tags, k=min(dataset.tags_per_entry, len(tags)))
+            ]
+
+            await o_domain.apply_tags_to_entry(entry.id, _processor_id, entry_tags)
+
+    tag_ids = list((await o_domain.get_ids_by_uids(tags)).values())
+
+    user_ids = []
+    user_feeds = {}
+
+    for i in range(dataset.users):
+        user_id = await u_domain.get_or_create_user_id(single_user_service_id, f"benchmark-{prefix}-{i}")
+
+        feed_ids = [feed.id for feed in rnd.sample(feeds, k=min(dataset.feeds_per_user, len(feeds)))]
+
+        await fl_domain.add_links(user_id, feed_ids)
+
+        for _ in range(dataset.rules_per_user):
+            await s_domain.create_or_update_rule(
+                user_id,
+                required_tags=rnd.sample(tag_ids, k=min(2, len(tag_ids))),
+                excluded_tags=[],
+                score=rnd.randint(-5, 5),
+            )
+
+        user_ids.append(user_id)
+        user_feeds[user_id] = feed_ids
+
+    return SeededData(user_ids=user_ids, feeds=feeds, user_feeds=user_feeds, tags=tags)
+
+
+def _feed_content(rnd: random.Random, items_number: int) -> str:
+    items = []
+
+    for i in range(items_number):
+        items.append(
+            f"""
+            <item>
+              <title>{escape(_text(rnd, 8))}</title>
+              <link>https://example.com/entries/{i}</link>
+              <guid>https://example.com/entries/{i}</guid>
+              <category>{escape(rnd.choice(_words))}</category>
+              <pubDate>Mon, 13 Oct 2025 10:00:00 +0000</pubDate>
+              <description>{escape(_text(rnd, 200))}</description>
+            </item>"""
+        )
+
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+    <rss version="2.0">
+      <channel>
+        <title>Benchmark feed</title>
+        <link>https://example.com</link>
+        <description>Benchmark feed</description>
+        {"".join(items)}
+      </channel>
+    </rss>"""
+
+
+async def _measure(name: str, callback: Benchmark, repeats: int) -> BenchmarkResult:
+    # warm up caches & connections
+    await callback()
+
+    times = []
+
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        await callback()
+        times.append(time.perf_counter() - started_at)
+
+    return BenchmarkResult(
+        name=name,
+        repeats=repeats,
+        min=min(times),
+        median=statistics.median(times),
+        mean=statistics.mean(times),
+        max=max(times),
+    )
+
+
+class _Suite:
+    """Workload of the benchmarks, prepared once per run from the seeded data."""
+
+    def __init__(self, data: SeededData, dataset: Dataset, repeats: int, pulled_ids: list[QueueRecordId]) -> None:
+        rnd = random.Random(dataset.seed)
+
+        self.pulled_ids = pulled_ids
+
+        self.user_id = data.user_ids[0]
+        self.feed_ids = data.user_feeds[self.user_id]
+        self.catalog_feed_id = data.feeds[0].id
+
+        # each run must catalog new entries, so batches are prepared for all runs (including the warm up)
+        self.catalog_batches = iter([_fake_entries(rnd, data.feeds[0], _catalog_batch) for _ in range(repeats + 1)])
+
+        self.queue_items = [BenchmarkQueueItem(entry_id=new_entry_id()) for _ in range(_queue_batch)]
+
+        self.raw_tags = [RawTag(raw_uid=uid, categories={TagCategory.free_form}) for uid in data.tags[:100]]
+
+        # measure the whole chain of normalizers, not the chains cache
+        self.normalizers = get_normalizers()
+
+        self.feed_content = _feed_content(rnd, _feed_items)
+        self.feed_url = data.feeds[0].url
+        self.feed_source = url_to_source_uid(self.feed_url)
+
+        self.text = _text(rnd, _text_size // 6)
+        self.llm_config = LLMConfiguration(
+            model="gpt-4o-mini-2024-07-18", system="You are a helpful assistant.", max_return_tokens=LLMTokens(1)
+        )
+
+        self.entries: list[Entry] = []
+
+    async def get_entries_by_filter(self) -> None:
+        self.entries[:] = await l_domain.get_entries_by_filter(
+            feeds_ids=self.feed_ids, limit=10_000, period=_entries_period
+        )
+
+    async def external_entries(self) -> None:
+        if not self.entries:
+            await self.get_entries_by_filter()
+
+        await _external_entries(self.entries, with_body=False, user_id=self.user_id, min_tag_count=0)
+
+    async def catalog_entries(self) -> None:
+        await l_domain.catalog_entries(self.catalog_feed_id, next(self.catalog_batches))
+
+    async def queues_push(self) -> None:
+        await q_domain.push(QueueKind.benchmarks, self.queue_items)
+
+    async def queues_pull(self) -> None:
+        records = await q_domain.pull(QueueKind.benchmarks, BenchmarkQueueItem, limit=_queue_batch)
+        self.pulled_ids.extend(record.id for record in records if record.id is not None)
+
+    async def tags_normalize(self) -> None:
+        await t_domain.normalize(self.raw_tags, normalizers_=self.normalizers)
+
+    async def parse(self) -> None:
+        parse_feed(self.feed_content, original_url=self.feed_url, source=self.feed_source)
+
+    async def cut_text_to_max_tokens(self) -> None:
+        openai_provider.cut_text_to_max_tokens(self.llm_config, text=self.text, max_tokens=LLMTokens(1024))
+
+
+SuiteBenchmark = Callable[[_Suite], Awaitable[None]]
+
+# order matters: pull takes items pushed by the push benchmark
+_benchmarks: dict[str, SuiteBenchmark] = {
+    "library.get_entries_by_filter": _Suite.get_entries_by_filter,
+    "api.external_entries": _Suite.external_entries,
+    "library.catalog_entries": _Suite.catalog_entries,
+    "queues.push": _Suite.queues_push,
+    "queues.pull": _Suite.queues_pull,
+    "tags.normalize": _Suite.tags_normalize,
+    "parsers.parse_feed": _Suite.parse,
+    "openai.cut_text_to_max_tokens": _Suite.cut_text_to_max_tokens,
+}
+
+names = tuple(_benchmarks)
+
+
+async def run(dataset: Dataset, repeats: int, selected: set[str]) -> Report:
+    data = await seed(dataset)
+
+    pulled_ids: list[QueueRecordId] = []
+
+    suite = _Suite(data, dataset, repeats, pulled_ids)
+
+    results = [
+        await _measure(name, functools.partial(benchmark, suite), repeats)
+        for name, benchmark in _benchmarks.items()
+        if name in selected
+    ]
+
+    await q_domain.acknowledge(pulled_ids)
+
+    return Report(created_at=utils.now(), python=platform.python_version(), dataset=dataset, results=results)
@@ -1,83 +1,120 @@
 import asyncio
+import pathlib
 
 import typer
 
 from ffun.application.application import with_app
 from ffun.core import logging
-from ffun.domain.entities import TagId
+from ffun.domain.entities import FeedId, TagId
 from ffun.feeds import domain as f_domain
+from ffun.librarian import domain as ln_domain
 from ffun.library import domain as l_domain
 from ffun.meta import domain as m_domain
+from ffun.meta.cleaner import Cleaner
+from ffun.meta.settings import settings as m_settings
 
 logger = logging.get_module_logger()
 
 cli_app = typer.Typer()
 
 
-async def run_clean(chunk: int) -> None:
+async def run_clean(chunk: int, parallelism: int, rows_per_second: float | None) -> None:
     async with with_app():
-        logger.info("cleaning_started", chunk=chunk)
+        logger.info("cleaning_started", chunk=chunk, parallelism=parallelism, rows_per_second=rows_per_second)
 
-        logger.info("cleaning_orphaned_entries_started", chunk=chunk)
+        cleaner = Cleaner(chunk=chunk, parallelism=parallelism, rows_per_second=rows_per_second)
 
-        while await m_domain.clean_orphaned_entries(chunk=chunk) != 0:
+        while await cleaner.step():
             pass
 
-        logger.info("cleaning_orphaned_entries_finished")
+        await ln_domain.clean_llm_responses_cache()
 
-        logger.info("cleaning_orphaned_feeds_started", chunk=chunk)
+        logger.info("cleaning_finished")
 
-        while await m_domain.clean_orphaned_feeds(chunk=chunk) != 0:
-            pass
 
-        logger.info("cleaning_orphaned_feeds_finished")
+@cli_app.command()  # type: ignore
+def clean(
+    chunk: int = m_settings.cleaner_chunk,
+    parallelism: int = m_settings.cleaner_parallelism,
+    rows_per_second: float | None = m_settings.cleaner_rows_per_second,
+) -> None:
+    asyncio.run(run_clean(chunk=chunk, parallelism=parallelism, rows_per_second=rows_per_second))
 
-        logger.info("cleaning_orphaned_tags_started", chunk=chunk)
 
-        while await m_domain.clean_orphaned_tags(chunk=chunk) != 0:
-            pass
+def _read_renormalization_checkpoint(checkpoint: pathlib.Path | None, from_tag_id: int) -> int:
+    if checkpoint is None or not checkpoint.exists():
+        return from_tag_id
 
-        logger.info("cleaning_orphaned_tags_finished")
+    last_processed_tag_id = int(checkpoint.read_text().strip())
 
-        logger.info("cleaning_finished")
+    logger.info("renormalization_checkpoint_found", last_processed_tag_id=last_processed_tag_id)
 
-
-@cli_app.command()  # type: ignore
-def clean(chunk: int = 10000) -> None:
-    asyncio.run(run_clean(chunk=chunk))
+    return max(from_tag_id, last_processed_tag_id + 1)
 
 
-async def run_renormalize_tags(from_tag_id: int, to_tag_id: int) -> None:
+async def run_renormalize_tags(from_tag_id: int, to_tag_id: int, chunk: int, checkpoint: pathlib.Path | None) -> None:
     async with with_app():
-        logger.info("renormalization_started", from_tag_id=from_tag_id, to_tag_id=to_tag_id)
+        logger.info("renormalization_started", from_tag_id=from_tag_id, to_tag_id=to_tag_id, chunk=chunk)
+
+        start_tag_id = _read_renormalization_checkpoint(checkpoint, from_tag_id)
+
+        for chunk_start in range(start_tag_id, to_tag_id + 1, chunk):
+            chunk_end = min(chunk_start + chunk - 1, to_tag_id)
 
-        await m_domain.renormalize_tags(tag_ids=[TagId(tag_id) for tag_id in range(from_tag_id, to_tag_id + 1)])
+            await m_domain.renormalize_tags(tag_ids=[TagId(tag_id) for tag_id in range(chunk_start, chunk_end + 1)])
+
+            # the last processed tag is saved only after the whole chunk is applied
+            # => an interrupted run restarts from the first not completed chunk
+            if checkpoint is not None:
+                checkpoint.write_text(str(chunk_end))
+
+            logger.info("renormalization_chunk_processed", chunk_start=chunk_start, chunk_end=chunk_end)
 
         logger.info("renormalization_finished")
 
 
 @cli_app.command()  # type: ignore
-def renormalize_tags(from_tag_id: int, to_tag_id: int) -> None:
-    asyncio.run(run_renormalize_tags(from_tag_id, to_tag_id))
+def renormalize_tags(
+    from_tag_id: int, to_tag_id: int, chunk: int = 1000, checkpoint: pathlib.Path | None = None
+) -> None:
+    asyncio.run(run_renormalize_tags(from_tag_id, to_tag_id, chunk=chunk, checkpoint=checkpoint))
+
 
+async def _shrink_feeds_in_parallel(feed_ids: list[FeedId], batch: int) -> None:
+    batches = [feed_ids[i : i + batch] for i in range(0, len(feed_ids), batch)]
+    await asyncio.gather(*(l_domain.shrink_feeds(feed_ids_batch) for feed_ids_batch in batches))
 
-async def run_shrink_feeds(chunk: int, log_every_n: int) -> None:
+
+async def run_shrink_feeds(batch: int, parallelism: int) -> None:
     async with with_app():
-        logger.info("feeds_shrinking_started")
+        logger.info("feeds_shrinking_started", batch=batch, parallelism=parallelism)
 
         counter = 0
 
-        async for feed in f_domain.all_feeds_iterator(chunk=chunk):
-            counter += 1
+        feed_ids: list[FeedId] = []
+
+        # every batch is shrinked by a single statement, up to `parallelism` batches are processed concurrently
+        # => a run uses no more than `parallelism` connections from the pool
+        async for feed in f_domain.all_feeds_iterator(chunk=batch * parallelism):
+            feed_ids.append(feed.id)
+
+            if len(feed_ids) < batch * parallelism:
+                continue
+
+            await _shrink_feeds_in_parallel(feed_ids, batch)
+
+            counter += len(feed_ids)
+            feed_ids = []
+
+            logger.info("shrinked_feeds", number=counter)
 
-            if counter % log_every_n == 0:
-                logger.info("shrinked_feeds", number=counter)
+        await _shrink_feeds_in_parallel(feed_ids, batch)
 
-            await l_domain.shrink_feed(feed.id)
+        counter += len(feed_ids)
 
-        logger.info("feeds_shrinking_finished")
+        logger.info("feeds_shrinking_finished", number=counter)
 
 
 @cli_app.command()  # type: ignore
-def shrink_feeds(chunk: int = 1000, log_every_n: int = 1000) -> None:
-    asyncio.run(run_shrink_feeds(chunk=chunk, log_every_n=log_every_n))
+def shrink_feeds(batch: int = 100, parallelism: int = 4) -> None:
+    asyncio.run(run_shrink_feeds(batch=batch, parallelism=parallelism))
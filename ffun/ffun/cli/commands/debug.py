@@ -1,10 +1,12 @@
 import asyncio
 import sys
 
+import tabulate
 import typer
 from rich import print as rich_print
 
 from ffun.application.application import with_app
+from ffun.core.import_times import measure_import_times
 from ffun.domain.urls import str_to_feed_url, url_to_source_uid
 from ffun.loader import domain as l_domain
 from ffun.parsers.feed import parse_into_feedparser
@@ -83,3 +85,16 @@ async def run_load_feed_raw(feed_url: str) -> None:
 @cli_app.command()  # type: ignore
 def load_feed_raw(feed_url: str) -> None:
     asyncio.run(run_load_feed_raw(feed_url))
+
+
+@cli_app.command()  # type: ignore
+def import_time(module: str = "ffun.application.application", top: int = 30) -> None:
+    """Show the slowest imports (by cumulative time) of the module, imported in a fresh interpreter."""
+    times = measure_import_times(module)
+
+    times.sort(key=lambda time: time.cumulative_us, reverse=True)
+
+    table = [[time.module, f"{time.self_us / 1000:.1f}", f"{time.cumulative_us / 1000:.1f}"] for time in times[:top]]
+
+    sys.stdout.write(tabulate.tabulate(table, headers=["module", "self, ms", "cumulative, ms"], tablefmt="grid"))
+    sys.stdout.write("\n")
@@ -8,7 +8,7 @@ from ffun.cli.application import app
 from ffun.dispatcher.domain import count_entries_by_processing_status, move_failed_entries_to_processor_queue
 from ffun.dispatcher.entities import EntryProcessingStatus
 from ffun.domain.entities import ProcessorId
-from ffun.librarian.background_processors import processors
+from ffun.librarian.background_processors import get_processors
 
 
 async def run_dispatcher_failed_entries_count() -> None:
@@ -17,7 +17,7 @@ async def run_dispatcher_failed_entries_count() -> None:
 
     table = []
 
-    for processor_info in processors:
+    for processor_info in get_processors():
         table.append(
             [processor_info.id, processor_info.processor.name, failed_entries_count.get(processor_info.id, 0)]
         )
@@ -33,7 +33,7 @@ def dispatcher_failed_entries_count() -> None:
 async def run_dispatcher_failed_entries_move_to_queue(processor_id: int, limit: int) -> None:
     typed_processor_id = ProcessorId(processor_id)
 
-    if not any(processor_info.id == typed_processor_id for processor_info in processors):
+    if not any(processor_info.id == typed_processor_id for processor_info in get_processors()):
         raise ValueError(f"Processor with id {processor_id} not found")
 
     async with with_app():
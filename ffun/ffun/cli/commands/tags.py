@@ -0,0 +1,16 @@
+import pathlib
+
+import typer
+
+cli_app = typer.Typer()
+
+
+@cli_app.command()  # type: ignore
+def build_vectors_artifact(
+    output: pathlib.Path, model: str = "en_core_web_lg", dtype: str = "float16"  # float16 or float32
+) -> None:
+    """Precompute normalized vectors of the SpaCy model to memory-map them in the form normalizer."""
+    # SpaCy is heavy to import => do not slow down other CLI commands
+    from ffun.tags.normalizers import vectors
+
+    vectors.build_artifact(model=model, path=output, dtype=dtype)
@@ -0,0 +1,85 @@
+import pytest
+
+from ffun.cli.commands import benchmarks_suite
+from ffun.feeds_links import domain as fl_domain
+from ffun.library import domain as l_domain
+
+_dataset = benchmarks_suite.Dataset(
+    users=2, feeds=3, feeds_per_user=2, entries_per_feed=4, tags=10, tags_per_entry=3, rules_per_user=2
+)
+
+
+class TestIsDedicatedDatabase:
+
+    @pytest.mark.parametrize(
+        "database, expected",
+        [
+            ("ffun", False),
+            ("production", False),
+            ("ffun_bench", True),
+            ("ffun-test", True),
+            ("BENCHMARKS", True),
+            ("ffun_tests", True),
+            ("latest", False),
+            ("ffun_latest", False),
+            ("contest", False),
+        ],
+    )
+    def test(self, database: str, expected: bool) -> None:
+        assert benchmarks_suite.is_dedicated_database(database) == expected
+
+
+class TestSeed:
+
+    @pytest.mark.asyncio
+    async def test(self) -> None:
+        data = await benchmarks_suite.seed(_dataset)
+
+        assert len(data.user_ids) == 2
+        assert len(data.feeds) == 3
+        assert len(data.tags) == 10
+
+        for user_id in data.user_ids:
+            links = await fl_domain.get_linked_feeds(user_id)
+
+            assert {link.feed_id for link in links} == set(data.user_feeds[user_id])
+
+        entries = await l_domain.get_entries_by_filter(feeds_ids=[feed.id for feed in data.feeds], limit=100)
+
+        assert len(entries) == 12
+
+    @pytest.mark.asyncio
+    async def test_same_workload_for_the_same_seed(self) -> None:
+        data_1 = await benchmarks_suite.seed(_dataset)
+        data_2 = await benchmarks_suite.seed(_dataset)
+
+        assert data_1.tags == data_2.tags
+        assert not {feed.id for feed in data_1.feeds} & {feed.id for feed in data_2.feeds}
+
+
+class TestRun:
+
+    @pytest.mark.asyncio
+    async def test(self) -> None:
+        selected = {
+            "library.get_entries_by_filter",
+            "api.external_entries",
+            "library.catalog_entries",
+            "queues.push",
+            "queues.pull",
+            "parsers.parse_feed",
+        }
+
+        report = await benchmarks_suite.run(_dataset, repeats=2, selected=selected)
+
+        assert report.dataset == _dataset
+        assert [result.name for result in report.results] == [
+            name for name in benchmarks_suite.names if name in selected
+        ]
+
+        for result in report.results:
+            assert result.repeats == 2
+            assert 0 < result.min <= result.median <= result.max
+
+        assert report.result("queues.push") is not None
+        assert report.result("tags.normalize") is None
@@ -6,7 +6,7 @@ from ffun.application.application import with_app
 from ffun.cli.application import app
 
 
-async def run(loader: bool, librarian: bool) -> None:
+async def run(loader: bool, librarian: bool, cleaner: bool, importer: bool) -> None:
     async with with_app():
         async with contextlib.AsyncExitStack() as stack:
             if loader:
@@ -15,10 +15,16 @@ async def run(loader: bool, librarian: bool) -> None:
             if librarian:
                 await stack.enter_async_context(app_workers.use_librarian())
 
+            if cleaner:
+                await stack.enter_async_context(app_workers.use_cleaner())
+
+            if importer:
+                await stack.enter_async_context(app_workers.use_importer())
+
             while True:
                 await asyncio.sleep(0.1)
 
 
 @app.command()  # type: ignore
-def workers(loader: bool = False, librarian: bool = False) -> None:
-    asyncio.run(run(loader=loader, librarian=librarian))
+def workers(loader: bool = False, librarian: bool = False, cleaner: bool = False, importer: bool = False) -> None:
+    asyncio.run(run(loader=loader, librarian=librarian, cleaner=cleaner, importer=importer))
@@ -10,12 +10,14 @@ from ffun.auth.tests.fixtures import *  # noqa
 from ffun.core import migrations
 from ffun.feeds.tests.fixtures import *  # noqa
 from ffun.feeds_collections.tests.fixtures import *  # noqa
+from ffun.feeds_discoverer.tests.fixtures import *  # noqa
 from ffun.librarian.processors.tests.fixtures import *  # noqa
 from ffun.librarian.tests.fixtures import *  # noqa
 from ffun.library.tests.fixtures import *  # noqa
 from ffun.llms_framework.tests.fixtures import *  # noqa
 from ffun.ontology.tests.fixtures import *  # noqa
 from ffun.parsers.tests.fixtures import *  # noqa
+from ffun.tags.tests.fixtures import *  # noqa
 from ffun.users.tests.fixtures import *  # noqa
 
 
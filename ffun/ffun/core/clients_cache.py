@@ -0,0 +1,105 @@
+import collections
+import contextlib
+from typing import AsyncGenerator, Awaitable, Callable, Generic, TypeVar
+
+from ffun.core import logging
+
+logger = logging.get_module_logger()
+
+
+CLIENT = TypeVar("CLIENT")
+
+
+class ClientsCache(Generic[CLIENT]):
+    """LRU cache of API clients (with their connection pools) by keys.
+
+    Clients are closed when they are evicted from the cache or when the cache is closed.
+    Evicted clients which are still in use are closed after the last usage is finished.
+
+    Keys are usually API keys => never log them.
+    """
+
+    __slots__ = ("_name", "_max_size", "_create", "_close", "_clients", "_usages", "_evicted")
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int,
+        create: Callable[[str], CLIENT],
+        close: Callable[[CLIENT], Awaitable[None]],
+    ) -> None:
+        self._name = name
+        self._max_size = max_size
+        self._create = create
+        self._close = close
+        self._clients: collections.OrderedDict[str, CLIENT] = collections.OrderedDict()
+        self._usages: dict[int, int] = {}
+        self._evicted: dict[int, CLIENT] = {}
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _get(self, key: str) -> CLIENT:
+        if key in self._clients:
+            self._clients.move_to_end(key)
+            return self._clients[key]
+
+        logger.info("api_client_created", cache=self._name)
+
+        client = self._create(key)
+
+        self._clients[key] = client
+
+        while len(self._clients) > self._max_size:
+            _, evicted_client = self._clients.popitem(last=False)
+            self._evicted[id(evicted_client)] = evicted_client
+            logger.info("api_client_evicted", cache=self._name)
+
+        return client
+
+    async def _close_client(self, client: CLIENT) -> None:
+        try:
+            await self._close(client)
+        except Exception:
+            logger.exception("error_while_closing_api_client", cache=self._name)
+
+    async def _close_unused_evicted(self) -> None:
+        for client_id, client in list(self._evicted.items()):
+            if self._usages.get(client_id, 0) > 0:
+                continue
+
+            del self._evicted[client_id]
+
+            await self._close_client(client)
+
+    @contextlib.asynccontextmanager
+    async def use(self, key: str) -> AsyncGenerator[CLIENT, None]:
+        client = self._get(key)
+
+        client_id = id(client)
+
+        self._usages[client_id] = self._usages.get(client_id, 0) + 1
+
+        try:
+            await self._close_unused_evicted()
+
+            yield client
+
+        finally:
+            self._usages[client_id] -= 1
+
+            if self._usages[client_id] == 0:
+                del self._usages[client_id]
+
+            await self._close_unused_evicted()
+
+    async def close(self) -> None:
+        clients = list(self._clients.values()) + list(self._evicted.values())
+
+        self._clients.clear()
+        self._evicted.clear()
+
+        for client in clients:
+            await self._close_client(client)
+
+        logger.info("api_clients_closed", cache=self._name, number=len(clients))
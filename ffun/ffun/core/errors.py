@@ -36,3 +36,7 @@ class DuplicatedMeasureLabels(CoreError):
 
 class DuplicatedLogArguments(CoreError):
     pass
+
+
+class MetricKindMismatch(CoreError):
+    pass
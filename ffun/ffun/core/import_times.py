@@ -0,0 +1,38 @@
+import subprocess  # noqa: S404
+import sys
+
+from ffun.core.entities import BaseEntity
+
+
+class ModuleImportTime(BaseEntity):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def _parse_line(line: str) -> ModuleImportTime | None:
+    # line format: "import time: self [us] | cumulative | imported package"
+    if not line.startswith("import time:"):
+        return None
+
+    self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+
+    if not self_us.strip().isdigit():
+        # header line
+        return None
+
+    return ModuleImportTime(module=module.strip(), self_us=int(self_us), cumulative_us=int(cumulative_us))
+
+
+def measure_import_times(module: str) -> list[ModuleImportTime]:
+    """Import the module in a fresh interpreter and return import times of all modules imported by it."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = [_parse_line(line) for line in result.stderr.splitlines()]
+
+    return [time for time in times if time is not None]
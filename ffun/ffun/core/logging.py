@@ -1,3 +1,4 @@
+import atexit
 import contextlib
 import copy
 import datetime
@@ -5,12 +6,15 @@ import enum
 import functools
 import inspect
 import logging
+import queue
+import random
 import sys
+import threading
 import time
 import uuid
 from collections import abc
 from collections.abc import Awaitable, Callable
-from typing import ContextManager, Iterable, Iterator, ParamSpec, Protocol, TypeVar, cast
+from typing import ContextManager, Iterable, Iterator, ParamSpec, Protocol, TextIO, TypeVar, cast
 
 import pydantic_settings
 import structlog
@@ -18,6 +22,8 @@ from sentry_sdk import capture_exception, capture_message
 from structlog import contextvars as structlog_contextvars
 
 from ffun.core import errors
+from ffun.core.metrics_registry import MetricKind
+from ffun.core.metrics_registry import registry as metrics_registry
 from ffun.domain.entities import UserId
 
 LabelValue = int | str | None
@@ -28,9 +34,26 @@ class Renderer(str, enum.Enum):
     json = "json"
 
 
+class Writer(str, enum.Enum):
+    # write & flush each record in the logging thread
+    direct = "direct"
+    # pass records to a background thread that writes them by batches
+    queued = "queued"
+
+
+class MetricsBackend(str, enum.Enum):
+    logs = "logs"
+    registry = "registry"
+
+
 class Settings(pydantic_settings.BaseSettings):
     level: str = "INFO"
     renderer: Renderer = Renderer.console
+    metrics: MetricsBackend = MetricsBackend.logs
+    writer: Writer = Writer.direct
+    writer_batch_size: int = 1000
+    # share of records written by `sampled_info`, for per-item events in hot loops
+    sample_rate: float = 1.0
 
     model_config = pydantic_settings.SettingsConfigDict(
         env_nested_delimiter="__", env_file=".env", env_prefix="FFUN_LOGS_", extra="allow"
@@ -50,6 +73,8 @@ class LogProcessorType(Protocol):
 
 
 class Formatter:
+    """Formats values of a specific type; `ProcessorFormatter` caches the choice of a formatter by the value type."""
+
     __slots__ = ()
 
     def can_format(self, value: object) -> bool:
@@ -93,17 +118,40 @@ class EnumFormatter(Formatter):
 
 
 class ProcessorFormatter:
-    __slots__ = ("_formatters",)
+    """Formats values of log records.
+
+    Formatters check only types of values, so the formatter is chosen once per type and cached.
+    """
+
+    __slots__ = ("_formatters", "_by_type")
 
     def __init__(self, formatters: Iterable[Formatter]) -> None:
         self._formatters = list(formatters)
+        self._by_type: dict[type, Formatter | None] = dict.fromkeys((str, int, float, bool, type(None)))
+
+    def _formatter(self, value: object) -> Formatter | None:
+        value_type = type(value)
+
+        if value_type in self._by_type:
+            return self._by_type[value_type]
+
+        chosen = None
+
+        for formatter in self._formatters:
+            if formatter.can_format(value):
+                chosen = formatter
+                break
+
+        self._by_type[value_type] = chosen
+
+        return chosen
 
     def __call__(self, _: object, __: object, event_dict: dict[str, object]) -> dict[str, object]:
         for key, value in event_dict.items():
-            for formatter in self._formatters:
-                if formatter.can_format(value):
-                    event_dict[key] = formatter.format(value)
-                    break
+            formatter = self._formatter(value)
+
+            if formatter is not None:
+                event_dict[key] = formatter.format(value)
 
         return event_dict
 
@@ -177,9 +225,18 @@ def processors_list(use_sentry: bool) -> list[LogProcessorType]:
 
 
 class FFunBoundLogger(structlog.typing.FilteringBoundLogger):
+    def sampled_info(self, event: str, **kwargs: object) -> object:
+        pass
+
     def measure(self, event: str, value: float | int, **labels: LabelValue) -> None:
         pass
 
+    def measure_gauge(self, event: str, value: float | int, **labels: LabelValue) -> None:
+        pass
+
+    def measure_counter(self, event: str, value: float | int, **labels: LabelValue) -> None:
+        pass
+
     def measure_block_time(  # type: ignore
         self, event: str, **labels: LabelValue
     ) -> ContextManager[dict[str, LabelValue]]:
@@ -205,13 +262,30 @@ class MeasuringBoundLoggerMixin:
     would be able to filter/process messages universally.
     """
 
-    def measure(self, event: str, value: float | int, **labels: LabelValue) -> object:
+    def _measure(self, kind: MetricKind, event: str, value: float | int, labels: dict[str, LabelValue]) -> object:
+        if settings.metrics == MetricsBackend.registry:
+            observe_measure(event, value, kind=kind, **labels)
+            return None
+
+        # kinds are not written to logs: all measures are aggregated by the logs processing in the same way
         if not labels:
             return self.info(event, m_kind="measure", m_value=value)  # type: ignore
 
         with bound_measure_labels(**labels):
             return self.info(event, m_kind="measure", m_value=value)  # type: ignore
 
+    def measure(self, event: str, value: float | int, **labels: LabelValue) -> object:
+        """Measure a value from a distribution, like a duration of a request."""
+        return self._measure(MetricKind.histogram, event, value, labels)
+
+    def measure_gauge(self, event: str, value: float | int, **labels: LabelValue) -> object:
+        """Measure the current value of something, like a size of a pool."""
+        return self._measure(MetricKind.gauge, event, value, labels)
+
+    def measure_counter(self, event: str, value: float | int, **labels: LabelValue) -> object:
+        """Measure an increment of a counter, like a number of requests since the previous measure."""
+        return self._measure(MetricKind.counter, event, value, labels)
+
     @contextlib.contextmanager
     def measure_block_time(self, event: str, **labels: LabelValue) -> Iterator[dict[str, LabelValue]]:
         started_at = time.monotonic()
@@ -225,6 +299,29 @@ class MeasuringBoundLoggerMixin:
                 self.measure(event, time.monotonic() - started_at, **extra_labels)
 
 
+def observe_measure(
+    event: str, value: float | int, kind: MetricKind = MetricKind.histogram, **labels: LabelValue
+) -> None:
+    """Record a measure into the in-process metrics registry instead of writing a log record."""
+    bound_vars: dict[str, object] = structlog_contextvars.get_contextvars()
+
+    if "m_labels" in bound_vars:
+        bound_labels = cast(dict[str, LabelValue], bound_vars["m_labels"])
+
+        if labels.keys() & bound_labels.keys():
+            raise errors.DuplicatedMeasureLabels()
+
+        labels = {**bound_labels, **labels}
+
+    match kind:
+        case MetricKind.histogram:
+            metrics_registry.histogram(event).histogram(**labels).observe(value)
+        case MetricKind.gauge:
+            metrics_registry.gauge(event).gauge(**labels).set(value)
+        case MetricKind.counter:
+            metrics_registry.counter(event).counter(**labels).inc(value)
+
+
 class BusinessBoundLoggerMixin:
     """We extend a logger class with additional business events logic.
 
@@ -266,27 +363,166 @@ class BusinessBoundLoggerMixin:
         )
 
 
+class SamplingBoundLoggerMixin:
+    """We extend a logger class with sampled records for per-item events in hot loops.
+
+    Only `settings.sample_rate` share of such records is processed and written,
+    written records have the `sample_rate` attribute to restore the real number of events.
+    """
+
+    def sampled_info(self, event: str, **kwargs: object) -> object:
+        # filtering by level is cheaper than sampling and must be done before any processing
+        if not self.is_enabled_for(logging.INFO):  # type: ignore
+            return None
+
+        if settings.sample_rate >= 1:
+            return self.info(event, **kwargs)  # type: ignore
+
+        if random.random() >= settings.sample_rate:
+            return None
+
+        return self.info(event, sample_rate=settings.sample_rate, **kwargs)  # type: ignore
+
+
 def make_measuring_bound_logger(level: int) -> type[FFunBoundLogger]:
     filtering_logger_class = structlog.make_filtering_bound_logger(level)
 
     class _FFunBoundLogger(
-        MeasuringBoundLoggerMixin, BusinessBoundLoggerMixin, filtering_logger_class  # type: ignore
+        MeasuringBoundLoggerMixin,
+        BusinessBoundLoggerMixin,
+        SamplingBoundLoggerMixin,
+        filtering_logger_class,  # type: ignore
     ):
         pass
 
     return _FFunBoundLogger
 
 
-def initialize(use_sentry: bool) -> None:
+class QueuedWriter:
+    """Writes log records from a background thread by batches.
+
+    The logging thread only puts rendered records into a queue, so it does not wait for the output.
+    """
+
+    __slots__ = ("_file", "_batch_size", "_queue", "_thread")
+
+    def __init__(self, file: TextIO, batch_size: int) -> None:
+        self._file = file
+        self._batch_size = batch_size
+        self._queue: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="ffun-logs-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        self._queue.put(message)
+
+    def _next_batch(self) -> tuple[list[str], bool]:
+        message = self._queue.get()
+
+        if message is None:
+            return [], True
+
+        batch = [message]
+
+        while len(batch) < self._batch_size:
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if message is None:
+                return batch, True
+
+            batch.append(message)
+
+        return batch, False
+
+    def _run(self) -> None:
+        stopped = False
+
+        while not stopped:
+            batch, stopped = self._next_batch()
+
+            if batch:
+                self._file.write("\n".join(batch) + "\n")
+                self._file.flush()
+
+    def close(self) -> None:
+        """Write all queued records and stop the thread."""
+        if not self._thread.is_alive():
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+
+
+class QueuedWriteLogger:
+    __slots__ = ("_writer",)
+
+    def __init__(self, writer: QueuedWriter) -> None:
+        self._writer = writer
+
+    def msg(self, message: str) -> None:
+        self._writer.write(message)
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class QueuedWriteLoggerFactory:
+    __slots__ = ("writer",)
+
+    def __init__(self, writer: QueuedWriter) -> None:
+        self.writer = writer
+
+    def __call__(self, *args: object) -> QueuedWriteLogger:
+        return QueuedWriteLogger(self.writer)
+
+
+LoggerFactory = structlog.WriteLoggerFactory | QueuedWriteLoggerFactory
+
+
+def create_logger_factory(writer: Writer, file: TextIO) -> LoggerFactory:
+    if writer == Writer.direct:
+        return structlog.WriteLoggerFactory(file=file)
+
+    queued_writer = QueuedWriter(file, batch_size=settings.writer_batch_size)
+
+    # do not lose records on the process exit
+    atexit.register(queued_writer.close)
+
+    return QueuedWriteLoggerFactory(queued_writer)
+
+
+def configure(use_sentry: bool, level: int, logger_factory: LoggerFactory) -> None:
     structlog.configure(
         processors=processors_list(use_sentry=use_sentry),  # type: ignore
-        wrapper_class=make_measuring_bound_logger(settings.structlog_level),
+        wrapper_class=make_measuring_bound_logger(level),
         context_class=dict,
-        logger_factory=structlog.WriteLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
 
+def choose_metrics_backend(backend: MetricsBackend, registry_is_exposed: bool) -> MetricsBackend:
+    # the registry lives in the memory of a process => measures of processes that do not expose it are lost
+    if backend == MetricsBackend.registry and not registry_is_exposed:
+        get_module_logger().warning("metrics_registry_is_not_exposed", fallback_backend=MetricsBackend.logs)
+        return MetricsBackend.logs
+
+    return backend
+
+
+def initialize(use_sentry: bool, metrics_registry_is_exposed: bool = False) -> None:
+    configure(
+        use_sentry=use_sentry,
+        level=settings.structlog_level,
+        logger_factory=create_logger_factory(settings.writer, sys.stdout),
+    )
+
+    settings.metrics = choose_metrics_backend(settings.metrics, metrics_registry_is_exposed)
+
+
 def get_module_logger() -> FFunBoundLogger:
     caller_frame = inspect.currentframe().f_back  # type: ignore
     module = inspect.getmodule(caller_frame)  # type: ignore
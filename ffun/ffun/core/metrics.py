@@ -1,11 +1,17 @@
 import datetime
 
 from ffun.core import logging, utils
+from ffun.core.metrics_registry import registry
 
 logger = logging.get_module_logger()
 
 
 class Accumulator:
+    """Periodically reports count & sum of measured values as a business slice.
+
+    If the metrics registry is used, every measure is also observed by its histogram with the same name.
+    """
+
     __slots__ = ("interval", "event", "attributes", "_last_measure_at", "_count", "_sum")
 
     def __init__(self, interval: datetime.timedelta, event: str, **attributes: logging.LabelValue):
@@ -31,6 +37,9 @@ class Accumulator:
         self._count += 1
         self._sum += value
 
+        if logging.settings.metrics == logging.MetricsBackend.registry:
+            registry.histogram(self.event).histogram(**self.attributes).observe(value)
+
     def flush_if_time(self) -> None:
         if self._last_measure_at is None:
             return
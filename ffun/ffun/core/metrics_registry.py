@@ -0,0 +1,246 @@
+"""In-process metrics: counters, gauges and fixed-bucket histograms aggregated in memory.
+
+Measurements only update numbers in memory, the registry is rendered in the Prometheus text format on request.
+
+This module MUST NOT depend on `ffun.core.logging`, since the logger reports measures into the registry.
+"""
+
+import array
+import bisect
+import enum
+import math
+import re
+from typing import Iterable
+
+from ffun.core import errors
+
+LabelValue = int | str | None
+LabelsKey = tuple[tuple[str, str], ...]
+
+
+# covers both times in seconds and sizes/counts
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    10000,
+    100000,
+)
+
+
+_RE_NOT_NAME_SYMBOL = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+class MetricKind(enum.StrEnum):
+    counter = "counter"
+    gauge = "gauge"
+    histogram = "histogram"
+
+
+def metric_name(name: str) -> str:
+    name = _RE_NOT_NAME_SYMBOL.sub("_", name)
+
+    if name[:1].isdigit():
+        return f"_{name}"
+
+    return name
+
+
+def labels_key(labels: dict[str, LabelValue]) -> LabelsKey:
+    return tuple(sorted((metric_name(key), "" if value is None else str(value)) for key, value in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _render_labels(key: LabelsKey, extra: tuple[str, str] | None = None) -> str:
+    labels = key if extra is None else key + (extra,)
+
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+def _render_number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    if float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def render(self, name: str, key: LabelsKey) -> Iterable[str]:
+        yield f"{name}{_render_labels(key)} {_render_number(self.value)}"
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def render(self, name: str, key: LabelsKey) -> Iterable[str]:
+        yield f"{name}{_render_labels(key)} {_render_number(self.value)}"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # the last bucket is +Inf
+        self.counts = array.array("Q", bytes(8 * (len(buckets) + 1)))
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, key: LabelsKey) -> Iterable[str]:
+        cumulative = 0
+
+        for bound, count in zip((*self.buckets, math.inf), self.counts):
+            cumulative += count
+            yield f"{name}_bucket{_render_labels(key, ('le', _render_number(bound)))} {cumulative}"
+
+        yield f"{name}_sum{_render_labels(key)} {_render_number(self.sum)}"
+        yield f"{name}_count{_render_labels(key)} {self.count}"
+
+
+Metric = Counter | Gauge | Histogram
+
+
+class MetricFamily:
+    """All metrics with the same name and different labels."""
+
+    __slots__ = ("name", "kind", "documentation", "buckets", "_metrics")
+
+    def __init__(self, name: str, kind: MetricKind, documentation: str, buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.buckets = buckets
+        self._metrics: dict[LabelsKey, Metric] = {}
+
+    def _create(self) -> Metric:
+        match self.kind:
+            case MetricKind.counter:
+                return Counter()
+            case MetricKind.gauge:
+                return Gauge()
+            case MetricKind.histogram:
+                return Histogram(self.buckets)
+
+    def labels(self, **labels: LabelValue) -> Metric:
+        key = labels_key(labels)
+
+        metric = self._metrics.get(key)
+
+        if metric is None:
+            metric = self._create()
+            self._metrics[key] = metric
+
+        return metric
+
+    def counter(self, **labels: LabelValue) -> Counter:
+        metric = self.labels(**labels)
+        assert isinstance(metric, Counter)
+        return metric
+
+    def gauge(self, **labels: LabelValue) -> Gauge:
+        metric = self.labels(**labels)
+        assert isinstance(metric, Gauge)
+        return metric
+
+    def histogram(self, **labels: LabelValue) -> Histogram:
+        metric = self.labels(**labels)
+        assert isinstance(metric, Histogram)
+        return metric
+
+    def render(self) -> Iterable[str]:
+        if self.documentation:
+            yield f"# HELP {self.name} {self.documentation}"
+
+        yield f"# TYPE {self.name} {self.kind}"
+
+        for key, metric in sorted(self._metrics.items()):
+            yield from metric.render(self.name, key)
+
+
+class Registry:
+    __slots__ = ("_families",)
+
+    def __init__(self) -> None:
+        self._families: dict[str, MetricFamily] = {}
+
+    def _family(
+        self, name: str, kind: MetricKind, documentation: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> MetricFamily:
+        family = self._families.get(name)
+
+        if family is None:
+            family = MetricFamily(metric_name(name), kind, documentation, buckets)
+            self._families[name] = family
+
+        if family.kind != kind:
+            raise errors.MetricKindMismatch(name=name, expected_kind=kind, registered_kind=family.kind)
+
+        return family
+
+    def counter(self, name: str, documentation: str = "") -> MetricFamily:
+        return self._family(name, MetricKind.counter, documentation)
+
+    def gauge(self, name: str, documentation: str = "") -> MetricFamily:
+        return self._family(name, MetricKind.gauge, documentation)
+
+    def histogram(
+        self, name: str, documentation: str = "", buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> MetricFamily:
+        return self._family(name, MetricKind.histogram, documentation, buckets)
+
+    def render(self) -> str:
+        lines = [line for name in sorted(self._families) for line in self._families[name].render()]
+
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def clear(self) -> None:
+        self._families.clear()
+
+
+registry = Registry()
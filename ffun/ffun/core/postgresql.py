@@ -1,7 +1,24 @@
 import asyncio
 import contextlib
+import contextvars
+import enum
 import functools
-from typing import Any, AsyncGenerator, Awaitable, Callable, Concatenate, ParamSpec, Protocol, TypeVar, cast
+import re
+import sys
+import time
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Concatenate,
+    Iterator,
+    ParamSpec,
+    Protocol,
+    Sequence,
+    TypeVar,
+    cast,
+)
 
 import psycopg
 import psycopg_pool
@@ -22,6 +39,16 @@ MAX_INTEGER = 2147483647
 
 POOL: psycopg_pool.AsyncConnectionPool | None = None
 
+# see `pool_lane` for details
+BACKGROUND_POOL: psycopg_pool.AsyncConnectionPool | None = None
+
+# see `pipeline` for details
+PIPELINE_MODE = False
+
+# see `measure_query` for details
+INSTRUMENTATION = False
+SLOW_QUERY_THRESHOLD = 1.0
+
 # TODO: we use Any here (and exclude this module from `Any` mypy checks)
 #       because *.operations modules require too many type conversions, and it's not worth to do it for now
 #       we should change approach in the future
@@ -34,10 +61,68 @@ class ExecuteType(Protocol):
         pass
 
 
+_SKIPPED_CALLER_MODULES = frozenset((__name__, "contextlib"))
+
+_RE_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_VALUES_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+_RE_SPACES = re.compile(r"\s+")
+
+
+def query_caller() -> str:
+    """Return the function that runs the query: the closest caller outside of this module."""
+    frame = sys._getframe(1)
+
+    while frame.f_back is not None and frame.f_globals.get("__name__") in _SKIPPED_CALLER_MODULES:
+        frame = frame.f_back
+
+    return f"{frame.f_globals.get('__name__')}:{frame.f_code.co_name}"
+
+
+def query_fingerprint(command: str) -> str:
+    """Normalize SQL: literals are replaced by `?`, lists of literals are collapsed, whitespaces are squashed.
+
+    Commands built by pypika contain values => their fingerprints are the same for different values.
+    """
+    command = _RE_STRING_LITERAL.sub("?", command)
+    command = _RE_NUMBER_LITERAL.sub("?", command)
+    command = _RE_VALUES_LIST.sub("(?)", command)
+    return _RE_SPACES.sub(" ", command).strip()
+
+
+def measure_query(caller: str, command: str, duration: float, rows: int) -> None:
+    """Report metrics of an executed query, if the instrumentation is enabled.
+
+    Metrics are labeled by the function that runs the query, to keep the number of labels low.
+    The normalized SQL is logged only for slow queries.
+    Records are bound to the current context => API queries are tagged with `request_uid`.
+    """
+    logger.measure("postgresql_query_time", duration, query=caller)
+    logger.measure("postgresql_query_rows", rows, query=caller)
+
+    if duration >= SLOW_QUERY_THRESHOLD:
+        logger.warning(
+            "postgresql_slow_query", query=caller, sql=query_fingerprint(command), duration=duration, rows=rows
+        )
+
+
 class PGAsyncCursor(psycopg.AsyncCursor):
     async def execute_and_extract(self, command: str, arguments: SQL_ARGUMENTS | None = None) -> DB_RESULT:
+        if not INSTRUMENTATION:
+            await self.execute(command, arguments)
+            return await self.extract()
+
+        started_at = time.monotonic()
+
         await self.execute(command, arguments)
 
+        result = await self.extract()
+
+        measure_query(query_caller(), command, time.monotonic() - started_at, len(result) or max(self.rowcount, 0))
+
+        return result
+
+    async def extract(self) -> DB_RESULT:
         if self.pgresult is None:
             raise NotImplementedError("We expect cursor.pgresult has already settled here")
 
@@ -54,9 +139,43 @@ class PGPAsyncConnection(psycopg.AsyncConnection):
         super().__init__(*argv, row_factory=row_factory, **kwargs)  # type: ignore
         self.cursor_factory = cursor_factory
 
-        # set prepare_threshold to None because we can use connection pool (pgbouncer/RDSPRoxy)
-        # details: https://www.psycopg.org/psycopg3/docs/advanced/prepare.html
-        self.prepare_threshold = None
+
+class PoolLane(enum.StrEnum):
+    main = "main"
+    background = "background"
+
+
+_POOL_LANE: contextvars.ContextVar[PoolLane] = contextvars.ContextVar("postgresql_pool_lane", default=PoolLane.main)
+
+
+@contextlib.contextmanager
+def pool_lane(lane: PoolLane) -> Iterator[None]:
+    """Run queries of the block (and of the tasks created in it) with connections of the lane's pool.
+
+    If the background pool is configured, long background queries (cleaning, imports) do not take connections
+    of the main pool, so they can not starve the other work of the process.
+    Without the background pool, all lanes use the main pool.
+    """
+    token = _POOL_LANE.set(lane)
+
+    try:
+        yield
+    finally:
+        _POOL_LANE.reset(token)
+
+
+def get_pool() -> psycopg_pool.AsyncConnectionPool:
+    if POOL is None:
+        raise RuntimeError("POOL MUST be initialized before any operations with database")
+
+    if BACKGROUND_POOL is not None and _POOL_LANE.get() == PoolLane.background:
+        return BACKGROUND_POOL
+
+    return POOL
+
+
+def initialized_pools() -> list[psycopg_pool.AsyncConnectionPool]:
+    return [pool for pool in (POOL, BACKGROUND_POOL) if pool is not None]
 
 
 async def pool_refresher(delay: int) -> None:
@@ -66,62 +185,207 @@ async def pool_refresher(delay: int) -> None:
         while True:
             await asyncio.sleep(delay)
 
-            if POOL is None:
-                continue
-
-            logger.info("refresh_pool")
+            for pool in initialized_pools():
+                logger.info("refresh_pool", pool=pool.name)
 
-            await POOL.check()
+                await pool.check()
     except asyncio.CancelledError:
         logger.info("pool_refresher_is_stopped")
         return
 
 
+# psycopg_pool stats => our metrics
+# the current state of the pool
+_POOL_STATS_GAUGES = {
+    "pool_size": "postgresql_pool_size",
+    "pool_available": "postgresql_pool_available",
+    "requests_waiting": "postgresql_pool_requests_waiting",
+}
+
+# counters since the previous call of pop_stats
+_POOL_STATS_COUNTERS = {
+    "requests_num": "postgresql_pool_requests",
+    "requests_queued": "postgresql_pool_requests_queued",
+    "requests_wait_ms": "postgresql_pool_requests_wait_ms",
+    "requests_errors": "postgresql_pool_requests_errors",
+    "usage_ms": "postgresql_pool_usage_ms",
+    "connections_errors": "postgresql_pool_connections_errors",
+    "connections_lost": "postgresql_pool_connections_lost",
+}
+
+
+def measure_pool_stats(pool: psycopg_pool.AsyncConnectionPool) -> dict[str, int]:
+    """Report stats of the pool since the previous call and reset its counters."""
+    stats = pool.pop_stats()
+
+    for key, event in _POOL_STATS_GAUGES.items():
+        logger.measure_gauge(event, stats.get(key, 0), pool=pool.name)
+
+    for key, event in _POOL_STATS_COUNTERS.items():
+        logger.measure_counter(event, stats.get(key, 0), pool=pool.name)
+
+    logger.measure_gauge(
+        "postgresql_pool_connections_in_use",
+        stats.get("pool_size", 0) - stats.get("pool_available", 0),
+        pool=pool.name,
+    )
+
+    return stats
+
+
+class PoolResizePolicy:
+    """Resize the pool within bounds by the time requests wait for connections.
+
+    If requests wait longer than the threshold on average (or are still waiting), the minimal pool size
+    is increased by the step. If requests do not wait and at least a step of connections is idle,
+    it is decreased by the step.
+
+    `pool_max_size` is the maximal pool size the pool was created with (`None` means `min_size`),
+    the maximal size is raised only while the minimal size exceeds it.
+    """
+
+    __slots__ = ("min_size", "max_size", "step", "wait_threshold", "pool_max_size")
+
+    def __init__(
+        self, min_size: int, max_size: int, step: int, wait_threshold: float, pool_max_size: int | None = None
+    ) -> None:
+        self.min_size = min_size
+        self.max_size = max_size
+        self.step = step
+        self.wait_threshold = wait_threshold
+        self.pool_max_size = min_size if pool_max_size is None else pool_max_size
+
+    def new_min_size(self, stats: dict[str, int]) -> int:
+        current_size = stats["pool_min"]
+
+        requests = stats.get("requests_num", 0)
+
+        average_wait = stats.get("requests_wait_ms", 0) / 1000 / requests if requests else 0.0
+
+        if average_wait > self.wait_threshold or stats.get("requests_waiting", 0) > 0:
+            return min(current_size + self.step, self.max_size)
+
+        if stats.get("pool_available", 0) >= self.step:
+            return max(current_size - self.step, self.min_size)
+
+        return current_size
+
+    def new_max_size(self, new_min_size: int) -> int:
+        return max(new_min_size, self.pool_max_size)
+
+
+async def resize_pool(pool: psycopg_pool.AsyncConnectionPool, policy: PoolResizePolicy, stats: dict[str, int]) -> None:
+    new_min_size = policy.new_min_size(stats)
+
+    if new_min_size == stats["pool_min"]:
+        return
+
+    logger.info("resize_pool", pool=pool.name, old_min_size=stats["pool_min"], new_min_size=new_min_size)
+
+    await pool.resize(min_size=new_min_size, max_size=policy.new_max_size(new_min_size))
+
+
+async def monitor_pools(policy: PoolResizePolicy | None) -> None:
+    for pool in initialized_pools():
+        stats = measure_pool_stats(pool)
+
+        # the background pool is small and waiting is expected for it
+        if policy is not None and pool is POOL:
+            await resize_pool(pool, policy, stats)
+
+
+async def pool_monitor(delay: int, policy: PoolResizePolicy | None) -> None:
+    logger.info("star_pool_monitor")
+
+    try:
+        while True:
+            await asyncio.sleep(delay)
+
+            try:
+                await monitor_pools(policy)
+            except Exception:
+                logger.exception("pool_monitor_error")
+    except asyncio.CancelledError:
+        logger.info("pool_monitor_is_stopped")
+        return
+
+
 async def prepare_pool(  # noqa: CFQ002
-    name: str, dsn: str, min_size: int, max_size: int | None, timeout: float, num_workers: int, max_lifetime: int
+    name: str,
+    dsn: str,
+    min_size: int,
+    max_size: int | None,
+    timeout: float,
+    num_workers: int,
+    max_lifetime: int,
+    prepare_threshold: int | None = None,
+    pipeline_mode: bool = False,
+    instrumentation: bool = False,
+    slow_query_threshold: float = 1.0,
+    background_pool_size: int | None = None,
 ) -> None:
-    global POOL
+    global POOL, BACKGROUND_POOL, PIPELINE_MODE, INSTRUMENTATION, SLOW_QUERY_THRESHOLD
 
     if POOL is not None:
         raise RuntimeError("Secondary db pool initialization is not allowed")
 
-    POOL = psycopg_pool.AsyncConnectionPool(
-        dsn,
-        min_size=min_size,
-        max_size=max_size,
-        max_lifetime=max_lifetime,
-        timeout=timeout,
-        connection_class=PGPAsyncConnection,
-        num_workers=num_workers,
-        name=name,
-        open=False,
-        kwargs={"autocommit": True},
-    )
+    PIPELINE_MODE = pipeline_mode
+    INSTRUMENTATION = instrumentation
+    SLOW_QUERY_THRESHOLD = slow_query_threshold
+
+    # `prepare_threshold` MUST be passed explicitly: psycopg sets it after the connection is created,
+    # so any value set in the connection constructor is overridden by psycopg's default.
+    # Keep it None if we connect through a connection pool (pgbouncer/RDSPRoxy),
+    # details: https://www.psycopg.org/psycopg3/docs/advanced/prepare.html
+
+    def create_pool(pool_name: str, pool_min_size: int, pool_max_size: int | None) -> psycopg_pool.AsyncConnectionPool:
+        return psycopg_pool.AsyncConnectionPool(
+            dsn,
+            min_size=pool_min_size,
+            max_size=pool_max_size,
+            max_lifetime=max_lifetime,
+            timeout=timeout,
+            connection_class=PGPAsyncConnection,
+            num_workers=num_workers,
+            name=pool_name,
+            open=False,
+            kwargs={"autocommit": True, "prepare_threshold": prepare_threshold},
+        )
+
+    POOL = create_pool(name, min_size, max_size)
 
     await POOL.open(wait=False)
 
+    if background_pool_size is not None:
+        BACKGROUND_POOL = create_pool(f"{name}_background", background_pool_size, None)
 
-async def destroy_pool() -> None:
-    global POOL
+        await BACKGROUND_POOL.open(wait=False)
 
-    if POOL is None:
-        return
 
-    try:
-        await POOL.close()
-    except asyncio.CancelledError:
-        # TODO: is this a correct solution?
-        pass
+async def destroy_pool() -> None:
+    global POOL, BACKGROUND_POOL
+
+    for pool in initialized_pools():
+        try:
+            await pool.close()
+        except asyncio.CancelledError:
+            # TODO: is this a correct solution?
+            pass
 
     POOL = None
+    BACKGROUND_POOL = None
 
 
 @contextlib.asynccontextmanager
 async def transaction(autocommit: bool = False) -> AsyncGenerator[ExecuteType, None]:
-    if POOL is None:
-        raise RuntimeError("POOL MUST be initialized before any operations with database")
+    pool = get_pool()
+
+    started_at = time.monotonic()
+
+    async with pool.connection() as connection:
+        if INSTRUMENTATION:
+            logger.measure("postgresql_pool_wait_time", time.monotonic() - started_at, query=query_caller())
 
-    async with POOL.connection() as connection:
         if connection.autocommit != autocommit:
             await connection.set_autocommit(autocommit)
 
@@ -134,6 +398,50 @@ async def execute(command: str, arguments: SQL_ARGUMENTS | None = None) -> DB_RE
         return await execute(command, arguments)
 
 
+async def pipeline(execute: ExecuteType, commands: Sequence[tuple[str, SQL_ARGUMENTS | None]]) -> list[DB_RESULT]:
+    """Execute commands in the pipeline mode: send all of them at once and wait for the replies only once.
+
+    Commands are executed in the passed order, in the transaction of `execute`.
+
+    Commands are executed one by one if:
+
+    - the pipeline mode is disabled: it saves network round trips, but costs some CPU time for each command,
+      so it is worth enabling only if the database is not on the same host;
+    - `execute` is not bound to a transaction (for example, module-level `execute`).
+
+    Details: https://www.psycopg.org/psycopg3/docs/advanced/pipeline.html
+    """
+    cursor = getattr(execute, "__self__", None)
+
+    if not PIPELINE_MODE or not isinstance(cursor, PGAsyncCursor) or len(commands) < 2:
+        return [await execute(command, arguments) for command, arguments in commands]
+
+    connection = cursor.connection
+
+    async with contextlib.AsyncExitStack() as stack:
+        # every command requires its own cursor to keep its result
+        cursors = [cast(PGAsyncCursor, await stack.enter_async_context(connection.cursor())) for _ in commands]
+
+        started_at = time.monotonic()
+
+        async with connection.pipeline():
+            for command_cursor, (command, arguments) in zip(cursors, commands):
+                await command_cursor.execute(command, arguments)
+
+        results = [await command_cursor.extract() for command_cursor in cursors]
+
+        # commands are sent together => we can only measure the whole pipeline
+        if INSTRUMENTATION:
+            measure_query(
+                query_caller(),
+                ";\n".join(command for command, _ in commands),
+                time.monotonic() - started_at,
+                sum(len(result) for result in results),
+            )
+
+        return results
+
+
 P = ParamSpec("P")
 T = TypeVar("T")
 
@@ -0,0 +1,120 @@
+import pytest
+
+from ffun.core.clients_cache import ClientsCache
+
+
+class FakeClient:
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.closed = False
+
+
+async def _close(client: FakeClient) -> None:
+    client.closed = True
+
+
+async def _close_with_error(client: FakeClient) -> None:
+    raise RuntimeError("boom")
+
+
+def _cache(max_size: int) -> ClientsCache[FakeClient]:
+    return ClientsCache(name="test", max_size=max_size, create=FakeClient, close=_close)
+
+
+class TestClientsCache:
+
+    @pytest.mark.asyncio
+    async def test_reuse_client(self) -> None:
+        cache = _cache(max_size=2)
+
+        async with cache.use("key-1") as client_1:
+            pass
+
+        async with cache.use("key-1") as client_2:
+            pass
+
+        assert client_1 is client_2
+        assert not client_1.closed
+        assert len(cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_different_keys(self) -> None:
+        cache = _cache(max_size=2)
+
+        async with cache.use("key-1") as client_1:
+            assert client_1.key == "key-1"
+
+        async with cache.use("key-2") as client_2:
+            assert client_2.key == "key-2"
+
+        assert client_1 is not client_2
+        assert len(cache) == 2
+
+    @pytest.mark.asyncio
+    async def test_evict_least_recently_used(self) -> None:
+        cache = _cache(max_size=2)
+
+        async with cache.use("key-1") as client_1:
+            pass
+
+        async with cache.use("key-2") as client_2:
+            pass
+
+        async with cache.use("key-1"):
+            pass
+
+        async with cache.use("key-3") as client_3:
+            pass
+
+        assert not client_1.closed
+        assert client_2.closed
+        assert not client_3.closed
+        assert len(cache) == 2
+
+        async with cache.use("key-2") as new_client_2:
+            pass
+
+        assert new_client_2 is not client_2
+        assert client_1.closed
+
+    @pytest.mark.asyncio
+    async def test_evicted_client_in_use_is_closed_after_usage(self) -> None:
+        cache = _cache(max_size=1)
+
+        async with cache.use("key-1") as client_1:
+            async with cache.use("key-2") as client_2:
+                assert not client_1.closed
+
+            assert not client_1.closed
+
+        assert client_1.closed
+        assert not client_2.closed
+
+    @pytest.mark.asyncio
+    async def test_close(self) -> None:
+        cache = _cache(max_size=1)
+
+        async with cache.use("key-1") as client_1:
+            async with cache.use("key-2") as client_2:
+                pass
+
+            await cache.close()
+
+            assert client_1.closed
+            assert client_2.closed
+
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_close_errors_are_ignored(self) -> None:
+        cache = ClientsCache(name="test", max_size=1, create=FakeClient, close=_close_with_error)
+
+        async with cache.use("key-1"):
+            pass
+
+        async with cache.use("key-2"):
+            pass
+
+        await cache.close()
+
+        assert len(cache) == 0
@@ -0,0 +1,31 @@
+import pytest
+
+from ffun.core.import_times import measure_import_times
+
+
+class TestMeasureImportTimes:
+
+    def test_measure(self) -> None:
+        times = measure_import_times("json")
+
+        modules = {time.module for time in times}
+
+        assert "json" in modules
+        assert "json.decoder" in modules
+        assert all(time.cumulative_us >= time.self_us >= 0 for time in times)
+
+
+# Regression test: heavy libraries must be imported only when they are really used,
+# otherwise every API process and CLI command pays for them on start.
+# tldextract is not in the list: it is required to validate sources of integrations in settings.
+_heavy_modules = ("spacy", "lemminflect", "openai", "tiktoken", "bs4", "feedparser")
+
+
+class TestHeavyModulesAreNotImportedEagerly:
+
+    @pytest.mark.parametrize("module", ["ffun.application.application", "ffun.cli.application"])
+    def test_heavy_modules(self, module: str) -> None:
+        modules = {time.module for time in measure_import_times(module)}
+
+        assert module in modules
+        assert modules.isdisjoint(_heavy_modules), sorted(modules.intersection(_heavy_modules))
@@ -1,19 +1,34 @@
 import asyncio
+import datetime
+import enum
+import io
 import uuid
 
 import pytest
+from pytest_mock import MockerFixture
 
 from ffun.core import errors
 from ffun.core.logging import (
     ArgumentConstructor,
+    EnumFormatter,
     IdentityConstructor,
+    MetricsBackend,
+    QueuedWriter,
     async_args_to_log,
     bound_log_args,
     bound_measure_labels,
+    choose_metrics_backend,
+    create_formatter,
     get_module_logger,
     sync_args_to_log,
 )
-from ffun.core.tests.helpers import assert_log_context_vars, assert_logs_has_business_event, capture_logs
+from ffun.core.metrics_registry import Registry
+from ffun.core.tests.helpers import (
+    assert_log_context_vars,
+    assert_logs,
+    assert_logs_has_business_event,
+    capture_logs,
+)
 from ffun.domain.domain import new_user_id
 
 logger = get_module_logger()
@@ -60,6 +75,22 @@ class TestMeasuringBoundLoggerMixin:
             }
         ]
 
+    @pytest.mark.parametrize("method", ["measure_gauge", "measure_counter"])
+    def test_measure_kinds__logged_as_measures(self, method: str) -> None:
+        with capture_logs() as logs:
+            getattr(logger, method)("my_event", 42, x="a")
+
+        assert logs == [
+            {
+                "module": "ffun.core.tests.test_logging",
+                "m_kind": "measure",
+                "m_value": 42,
+                "event": "my_event",
+                "log_level": "info",
+                "m_labels": {"x": "a"},
+            }
+        ]
+
     @pytest.mark.asyncio
     async def test_measure_block_time__no_labels(self) -> None:
         delta = 0.1
@@ -125,6 +156,166 @@ class TestMeasuringBoundLoggerMixin:
         ]
 
 
+class TestMeasureToRegistry:
+
+    @pytest.fixture()
+    def registry(self, mocker: MockerFixture) -> Registry:
+        registry = Registry()
+        mocker.patch("ffun.core.logging.settings.metrics", MetricsBackend.registry)
+        mocker.patch("ffun.core.logging.metrics_registry", registry)
+        return registry
+
+    def test_measure(self, registry: Registry) -> None:
+        with capture_logs() as logs:
+            logger.measure("my_event", 0.5, x="a")
+            logger.measure("my_event", 2, x="a")
+            logger.measure("my_event", 3, x="b")
+
+        assert logs == []
+
+        family = registry.histogram("my_event")
+
+        assert family.histogram(x="a").count == 2
+        assert family.histogram(x="a").sum == 2.5
+        assert family.histogram(x="b").count == 1
+
+    def test_measure_gauge(self, registry: Registry) -> None:
+        with capture_logs() as logs:
+            logger.measure_gauge("my_event", 5, x="a")
+            logger.measure_gauge("my_event", 3, x="a")
+
+        assert logs == []
+
+        assert registry.gauge("my_event").gauge(x="a").value == 3
+
+    def test_measure_counter(self, registry: Registry) -> None:
+        with capture_logs() as logs:
+            logger.measure_counter("my_event", 5, x="a")
+            logger.measure_counter("my_event", 3, x="a")
+
+        assert logs == []
+
+        assert registry.counter("my_event").counter(x="a").value == 8
+
+    def test_bound_labels(self, registry: Registry) -> None:
+        with bound_measure_labels(x="a"):
+            logger.measure("my_event", 1, y=2)
+
+        assert registry.histogram("my_event").histogram(x="a", y=2).count == 1
+
+    def test_duplicated_labels(self, registry: Registry) -> None:
+        with bound_measure_labels(x="a"):
+            with pytest.raises(errors.DuplicatedMeasureLabels):
+                logger.measure("my_event", 1, x="b")
+
+    @pytest.mark.asyncio
+    async def test_measure_block_time(self, registry: Registry) -> None:
+        with logger.measure_block_time("my_event", x="a") as extra_labels:
+            extra_labels["y"] = 1
+
+        histogram = registry.histogram("my_event").histogram(x="a", y=1)
+
+        assert histogram.count == 1
+        assert 0 <= histogram.sum < 1
+
+
+class TestProcessorFormatter:
+
+    class E(enum.Enum):
+        a = 1
+
+    def test_format(self) -> None:
+        formatter = create_formatter()
+
+        uid = uuid.uuid4()
+        date = datetime.datetime(2025, 1, 2, 3, 4, 5)
+
+        event_dict: dict[str, object] = {"a": uid, "b": date, "c": self.E.a, "d": "x", "e": 1, "f": None}
+
+        assert formatter(None, None, event_dict) == {
+            "a": str(uid),
+            "b": "2025-01-02T03:04:05",
+            "c": "a",
+            "d": "x",
+            "e": 1,
+            "f": None,
+        }
+
+    def test_formatter_cached_by_type(self) -> None:
+        formatter = create_formatter()
+
+        assert self.E not in formatter._by_type
+        assert list not in formatter._by_type
+
+        assert isinstance(formatter._formatter(self.E.a), EnumFormatter)
+        assert formatter._formatter([1]) is None
+
+        assert isinstance(formatter._by_type[self.E], EnumFormatter)
+        assert formatter._by_type[list] is None
+
+    def test_simple_types_are_not_formatted(self) -> None:
+        formatter = create_formatter()
+
+        for value in ("x", 1, 1.5, True, None):
+            assert formatter._formatter(value) is None
+
+
+class TestSamplingBoundLoggerMixin:
+
+    def test_no_sampling(self) -> None:
+        with capture_logs() as logs:
+            logger.sampled_info("my_event", x=1)
+
+        assert logs == [{"module": "ffun.core.tests.test_logging", "event": "my_event", "log_level": "info", "x": 1}]
+
+    def test_all_skipped(self, mocker: MockerFixture) -> None:
+        mocker.patch("ffun.core.logging.settings.sample_rate", 0)
+
+        with capture_logs() as logs:
+            for _ in range(100):
+                logger.sampled_info("my_event", x=1)
+
+        assert logs == []
+
+    def test_sampled(self, mocker: MockerFixture) -> None:
+        mocker.patch("ffun.core.logging.settings.sample_rate", 0.5)
+        randoms: list[float] = [0.1, 0.7, 0.3]
+        mocker.patch("random.random", side_effect=randoms)
+
+        with capture_logs() as logs:
+            for i in range(3):
+                logger.sampled_info("my_event", x=i)
+
+        assert [(log["x"], log["sample_rate"]) for log in logs] == [(0, 0.5), (2, 0.5)]
+
+
+class TestQueuedWriter:
+
+    def test_write(self) -> None:
+        file = io.StringIO()
+
+        writer = QueuedWriter(file, batch_size=2)
+
+        for i in range(5):
+            writer.write(f"record {i}")
+
+        writer.close()
+
+        assert file.getvalue() == "".join(f"record {i}\n" for i in range(5))
+
+    def test_close_twice(self) -> None:
+        file = io.StringIO()
+
+        writer = QueuedWriter(file, batch_size=10)
+
+        writer.write("record")
+
+        writer.close()
+        writer.close()
+
+        assert file.getvalue() == "record\n"
+
+
 class TestBusinessBoundLoggerMixin:
     """Test mixin methods after they applied to the logger class.
 
@@ -492,3 +683,25 @@ class TestBoundMeasureLabels:
             with bound_measure_labels(x=1):
                 with bound_measure_labels(x=2):
                     pass
+
+
+class TestChooseMetricsBackend:
+
+    @pytest.mark.parametrize("registry_is_exposed", [True, False])
+    def test_logs(self, registry_is_exposed: bool) -> None:
+        with capture_logs() as logs:
+            assert choose_metrics_backend(MetricsBackend.logs, registry_is_exposed) == MetricsBackend.logs
+
+        assert_logs(logs, metrics_registry_is_not_exposed=0)
+
+    def test_registry_is_exposed(self) -> None:
+        with capture_logs() as logs:
+            assert choose_metrics_backend(MetricsBackend.registry, True) == MetricsBackend.registry
+
+        assert_logs(logs, metrics_registry_is_not_exposed=0)
+
+    def test_registry_is_not_exposed(self) -> None:
+        with capture_logs() as logs:
+            assert choose_metrics_backend(MetricsBackend.registry, False) == MetricsBackend.logs
+
+        assert_logs(logs, metrics_registry_is_not_exposed=1)
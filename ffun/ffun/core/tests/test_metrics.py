@@ -1,9 +1,12 @@
 import datetime
 
 import pytest
+from pytest_mock import MockerFixture
 
 from ffun.core import utils
+from ffun.core.logging import MetricsBackend
 from ffun.core.metrics import Accumulator
+from ffun.core.metrics_registry import Registry
 from ffun.core.tests.helpers import assert_logs_has_business_slice, assert_logs_has_no_business_slice, capture_logs
 
 
@@ -43,6 +46,28 @@ class TestAccumulator:
 
         assert accumulator._last_measure_at == last_measure_at
 
+    def test_measure__observed_by_registry(self, accumulator: Accumulator, mocker: MockerFixture) -> None:
+        registry = Registry()
+        mocker.patch("ffun.core.metrics.registry", registry)
+        mocker.patch("ffun.core.logging.settings.metrics", MetricsBackend.registry)
+
+        accumulator.measure(5)
+        accumulator.measure(10)
+
+        histogram = registry.histogram("test_event").histogram(key="value")
+
+        assert histogram.count == 2
+        assert histogram.sum == 15
+
+    def test_measure__registry_is_not_used(self, accumulator: Accumulator, mocker: MockerFixture) -> None:
+        registry = Registry()
+        mocker.patch("ffun.core.metrics.registry", registry)
+        mocker.patch("ffun.core.logging.settings.metrics", MetricsBackend.logs)
+
+        accumulator.measure(5)
+
+        assert registry.render() == ""
+
     def test_flush_if_time__no_measures(self, accumulator: Accumulator) -> None:
 
         with capture_logs() as logs:
@@ -0,0 +1,141 @@
+import pytest
+
+from ffun.core import errors
+from ffun.core.metrics_registry import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricKind,
+    Registry,
+    labels_key,
+    metric_name,
+)
+
+
+class TestMetricName:
+
+    @pytest.mark.parametrize(
+        "name, expected",
+        [
+            ("postgresql_query_time", "postgresql_query_time"),
+            ("feeds.load-time", "feeds_load_time"),
+            ("1st_metric", "_1st_metric"),
+        ],
+    )
+    def test(self, name: str, expected: str) -> None:
+        assert metric_name(name) == expected
+
+
+class TestLabelsKey:
+
+    def test(self) -> None:
+        assert labels_key({"b": 2, "a": "x", "c": None}) == (("a", "x"), ("b", "2"), ("c", ""))
+
+    def test_empty(self) -> None:
+        assert labels_key({}) == ()
+
+
+class TestHistogram:
+
+    def test_observe(self) -> None:
+        histogram = Histogram((1, 5, 10))
+
+        for value in (0.5, 1, 3, 10, 11, 100):
+            histogram.observe(value)
+
+        assert list(histogram.counts) == [2, 1, 1, 2]
+        assert histogram.sum == 125.5
+        assert histogram.count == 6
+
+    def test_render(self) -> None:
+        histogram = Histogram((1, 2.5))
+
+        histogram.observe(0.5)
+        histogram.observe(2)
+        histogram.observe(3)
+
+        assert list(histogram.render("x", (("a", "b"),))) == [
+            'x_bucket{a="b",le="1"} 1',
+            'x_bucket{a="b",le="2.5"} 2',
+            'x_bucket{a="b",le="+Inf"} 3',
+            'x_sum{a="b"} 5.5',
+            'x_count{a="b"} 3',
+        ]
+
+
+class TestCounterAndGauge:
+
+    def test_counter(self) -> None:
+        counter = Counter()
+
+        counter.inc()
+        counter.inc(2.5)
+
+        assert counter.value == 3.5
+        assert list(counter.render("x", ())) == ["x 3.5"]
+
+    def test_gauge(self) -> None:
+        gauge = Gauge()
+
+        gauge.set(10)
+        gauge.inc(-3)
+
+        assert gauge.value == 7
+        assert list(gauge.render("x", ())) == ["x 7"]
+
+
+class TestRegistry:
+
+    def test_same_family(self) -> None:
+        registry = Registry()
+
+        assert registry.counter("x") is registry.counter("x")
+        assert registry.counter("x").counter(a=1) is registry.counter("x").counter(a="1")
+        assert registry.counter("x").counter(a=1) is not registry.counter("x").counter(a=2)
+
+    def test_kind_mismatch(self) -> None:
+        registry = Registry()
+
+        registry.counter("x")
+
+        with pytest.raises(errors.MetricKindMismatch):
+            registry.histogram("x")
+
+    def test_family_kind(self) -> None:
+        registry = Registry()
+
+        assert registry.counter("a").kind == MetricKind.counter
+        assert registry.gauge("b").kind == MetricKind.gauge
+        assert registry.histogram("c").kind == MetricKind.histogram
+
+    def test_render__empty(self) -> None:
+        assert Registry().render() == ""
+
+    def test_render(self) -> None:
+        registry = Registry()
+
+        registry.gauge("queue.size", "Size of queues").gauge(queue='a"b').set(3)
+        registry.counter("requests").counter().inc(2)
+        registry.histogram("time", buckets=(1,)).histogram(path="x\\y").observe(0.5)
+
+        assert registry.render() == (
+            "# HELP queue_size Size of queues\n"
+            "# TYPE queue_size gauge\n"
+            'queue_size{queue="a\\"b"} 3\n'
+            "# TYPE requests counter\n"
+            "requests 2\n"
+            "# TYPE time histogram\n"
+            'time_bucket{path="x\\\\y",le="1"} 1\n'
+            'time_bucket{path="x\\\\y",le="+Inf"} 1\n'
+            'time_sum{path="x\\\\y"} 0.5\n'
+            'time_count{path="x\\\\y"} 1\n'
+        )
+
+    def test_clear(self) -> None:
+        registry = Registry()
+
+        registry.counter("x").counter().inc()
+
+        registry.clear()
+
+        assert registry.render() == ""
@@ -189,6 +189,7 @@ class TestExistedRouteUrls:
             "/spa/api/private/discover-feeds",
             "/spa/api/private/add-feed",
             "/spa/api/private/add-opml",
+            "/spa/api/private/get-feeds-import",
             "/spa/api/private/get-opml",
             "/spa/api/private/unsubscribe",
             "/spa/api/private/subscribe-to-collections",
@@ -0,0 +1,365 @@
+import asyncio
+
+import psycopg
+import psycopg_pool
+import pytest
+from pytest_mock import MockerFixture
+
+from ffun.core import logging, postgresql
+from ffun.core.postgresql import SQL_ARGUMENTS, execute, pipeline, transaction
+from ffun.core.tests.helpers import assert_logs, assert_logs_has_record, assert_logs_levels, capture_logs
+
+
+class TestPreparePool:
+
+    @pytest.mark.asyncio
+    async def test_prepared_statements_disabled_by_default(self) -> None:
+        assert postgresql.POOL is not None
+
+        async with postgresql.POOL.connection() as connection:
+            assert connection.prepare_threshold is None
+
+
+class TestPipeline:
+
+    @pytest.fixture(autouse=True)
+    def pipeline_mode(self, mocker: MockerFixture) -> None:
+        mocker.patch("ffun.core.postgresql.PIPELINE_MODE", True)
+
+    @pytest.mark.asyncio
+    async def test_no_commands(self) -> None:
+        async with transaction() as trx:
+            assert await pipeline(trx, []) == []
+
+    @pytest.mark.asyncio
+    async def test_results_in_order(self) -> None:
+        arguments: SQL_ARGUMENTS = {"value": 0}
+
+        async with transaction() as trx:
+            results = await pipeline(
+                trx,
+                [
+                    ("CREATE TEMPORARY TABLE t_pipeline (value INT) ON COMMIT DROP", None),
+                    ("INSERT INTO t_pipeline (value) VALUES (1), (2) RETURNING value", None),
+                    ("SELECT SUM(value) AS total FROM t_pipeline WHERE value > %(value)s", arguments),
+                ],
+            )
+
+        assert results == [[], [{"value": 1}, {"value": 2}], [{"total": 3}]]
+
+    @pytest.mark.asyncio
+    async def test_pipeline_mode_disabled(self, mocker: MockerFixture) -> None:
+        mocker.patch("ffun.core.postgresql.PIPELINE_MODE", False)
+
+        async with transaction() as trx:
+            results = await pipeline(trx, [("SELECT 1 AS value", None), ("SELECT 2 AS value", None)])
+
+        assert results == [[{"value": 1}], [{"value": 2}]]
+
+    @pytest.mark.asyncio
+    async def test_not_bound_to_transaction(self) -> None:
+        results = await pipeline(execute, [("SELECT 1 AS value", None), ("SELECT 2 AS value", None)])
+
+        assert results == [[{"value": 1}], [{"value": 2}]]
+
+    @pytest.mark.asyncio
+    async def test_error(self) -> None:
+        with pytest.raises(psycopg.errors.DivisionByZero):  # type: ignore
+            async with transaction() as trx:
+                await pipeline(trx, [("SELECT 1 AS value", None), ("SELECT 1 / 0 AS value", None)])
+
+        # the connection is returned to the pool in a usable state
+        assert await execute("SELECT 1 AS value") == [{"value": 1}]
+
+
+async def _run_query_in_function() -> None:
+    await execute("SELECT 1 AS value")
+
+
+class TestQueryCaller:
+
+    def test(self) -> None:
+        assert postgresql.query_caller() == f"{__name__}:test"
+
+
+class TestQueryFingerprint:
+
+    @pytest.mark.parametrize(
+        "command, fingerprint",
+        [
+            ("SELECT 1", "SELECT ?"),
+            ("SELECT * FROM t_table_2 WHERE id = %(id)s", "SELECT * FROM t_table_2 WHERE id = %(id)s"),
+            ("SELECT *\n  FROM t\n  WHERE uid = 'it''s'", "SELECT * FROM t WHERE uid = ?"),
+            ("DELETE FROM t WHERE id IN ('a','b', 'c')", "DELETE FROM t WHERE id IN (?)"),
+            (
+                'INSERT INTO "t" ("id","value") VALUES (\'a\',1),(\'b\',2.5)',
+                'INSERT INTO "t" ("id","value") VALUES (?)',
+            ),
+        ],
+    )
+    def test(self, command: str, fingerprint: str) -> None:
+        assert postgresql.query_fingerprint(command) == fingerprint
+
+
+class TestInstrumentation:
+
+    @pytest.fixture(autouse=True)
+    def instrumentation(self, mocker: MockerFixture) -> None:
+        mocker.patch("ffun.core.postgresql.INSTRUMENTATION", True)
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, mocker: MockerFixture) -> None:
+        mocker.patch("ffun.core.postgresql.INSTRUMENTATION", False)
+
+        with capture_logs() as logs:
+            await _run_query_in_function()
+
+        assert_logs(logs, postgresql_query_time=0, postgresql_query_rows=0, postgresql_pool_wait_time=0)
+
+    @pytest.mark.asyncio
+    async def test_query(self) -> None:
+        caller = f"{__name__}:_run_query_in_function"
+
+        with capture_logs() as logs:
+            with logging.bound_log_args(request_uid="request-1"):
+                await _run_query_in_function()
+
+        assert_logs(logs, postgresql_query_time=1, postgresql_query_rows=1, postgresql_pool_wait_time=1)
+
+        for event in ("postgresql_query_time", "postgresql_pool_wait_time"):
+            assert_logs_has_record(logs, event, m_labels={"query": caller}, request_uid="request-1")
+
+        assert_logs_has_record(logs, "postgresql_query_rows", m_value=1, m_labels={"query": caller})
+
+        assert_logs(logs, postgresql_slow_query=0)
+
+    @pytest.mark.asyncio
+    async def test_affected_rows(self) -> None:
+        with capture_logs() as logs:
+            async with transaction() as trx:
+                await trx("CREATE TEMPORARY TABLE t_instrumentation (value INT) ON COMMIT DROP")
+                await trx("INSERT INTO t_instrumentation (value) VALUES (1), (2), (3)")
+
+        assert_logs_has_record(logs, "postgresql_query_rows", m_value=3)
+
+    @pytest.mark.asyncio
+    async def test_slow_query(self, mocker: MockerFixture) -> None:
+        mocker.patch("ffun.core.postgresql.SLOW_QUERY_THRESHOLD", 0)
+
+        arguments: SQL_ARGUMENTS = {"value": 7}
+
+        with capture_logs() as logs:
+            await execute("SELECT %(value)s::int AS value WHERE 1 = 1", arguments)
+
+        assert_logs_has_record(
+            logs,
+            "postgresql_slow_query",
+            query=f"{__name__}:test_slow_query",
+            sql="SELECT %(value)s::int AS value WHERE ? = ?",
+            rows=1,
+        )
+        assert_logs_levels(logs, postgresql_slow_query="warning")
+
+    @pytest.mark.asyncio
+    async def test_pipeline(self, mocker: MockerFixture) -> None:
+        mocker.patch("ffun.core.postgresql.PIPELINE_MODE", True)
+
+        with capture_logs() as logs:
+            async with transaction() as trx:
+                await pipeline(trx, [("SELECT 1 AS value", None), ("SELECT 2 AS value UNION SELECT 3", None)])
+
+        assert_logs(logs, postgresql_query_time=1)
+        assert_logs_has_record(
+            logs, "postgresql_query_rows", m_value=3, m_labels={"query": f"{__name__}:test_pipeline"}
+        )
+
+
+class TestPoolLane:
+
+    def test_no_background_pool(self) -> None:
+        with postgresql.pool_lane(postgresql.PoolLane.background):
+            assert postgresql.get_pool() is postgresql.POOL
+
+    def test_background_pool(self, mocker: MockerFixture) -> None:
+        background_pool = psycopg_pool.AsyncConnectionPool("", open=False)
+
+        mocker.patch("ffun.core.postgresql.BACKGROUND_POOL", background_pool)
+
+        assert postgresql.get_pool() is postgresql.POOL
+
+        with postgresql.pool_lane(postgresql.PoolLane.background):
+            assert postgresql.get_pool() is background_pool
+
+        assert postgresql.get_pool() is postgresql.POOL
+
+    @pytest.mark.asyncio
+    async def test_inherited_by_tasks(self, mocker: MockerFixture) -> None:
+        background_pool = psycopg_pool.AsyncConnectionPool("", open=False)
+
+        mocker.patch("ffun.core.postgresql.BACKGROUND_POOL", background_pool)
+
+        async def get_pool() -> object:
+            return postgresql.get_pool()
+
+        with postgresql.pool_lane(postgresql.PoolLane.background):
+            task = asyncio.create_task(get_pool())
+
+        assert await task is background_pool
+
+
+class TestMeasurePoolStats:
+
+    @pytest.mark.asyncio
+    async def test(self) -> None:
+        assert postgresql.POOL is not None
+
+        await execute("SELECT 1")
+
+        with capture_logs() as logs:
+            stats = postgresql.measure_pool_stats(postgresql.POOL)
+
+        assert stats["requests_num"] >= 1
+
+        pool_name = postgresql.POOL.name
+
+        assert_logs_has_record(
+            logs, "postgresql_pool_requests", m_value=stats["requests_num"], m_labels={"pool": pool_name}
+        )
+        assert_logs_has_record(logs, "postgresql_pool_size", m_value=stats["pool_size"], m_labels={"pool": pool_name})
+        assert_logs_has_record(
+            logs,
+            "postgresql_pool_connections_in_use",
+            m_value=stats["pool_size"] - stats["pool_available"],
+            m_labels={"pool": pool_name},
+        )
+        assert_logs_has_record(logs, "postgresql_pool_connections_errors", m_value=0, m_labels={"pool": pool_name})
+
+        # counters are reset
+        assert postgresql.POOL.get_stats().get("requests_num", 0) == 0
+
+
+class TestPoolResizePolicy:
+
+    @pytest.mark.parametrize(
+        "stats, new_min_size",
+        [
+            ({"pool_min": 10, "requests_num": 100, "requests_wait_ms": 1000, "pool_available": 0}, 10),
+            ({"pool_min": 10, "requests_num": 100, "requests_wait_ms": 20000, "pool_available": 0}, 15),
+            ({"pool_min": 10, "requests_num": 0, "requests_waiting": 1, "pool_available": 0}, 15),
+            ({"pool_min": 18, "requests_num": 100, "requests_wait_ms": 20000, "pool_available": 0}, 20),
+            ({"pool_min": 15, "requests_num": 100, "requests_wait_ms": 0, "pool_available": 7}, 10),
+            ({"pool_min": 12, "requests_num": 100, "requests_wait_ms": 0, "pool_available": 7}, 10),
+            ({"pool_min": 15, "requests_num": 100, "requests_wait_ms": 0, "pool_available": 4}, 15),
+            ({"pool_min": 15}, 15),
+        ],
+    )
+    def test_new_min_size(self, stats: dict[str, int], new_min_size: int) -> None:
+        policy = postgresql.PoolResizePolicy(min_size=10, max_size=20, step=5, wait_threshold=0.1)
+
+        assert policy.new_min_size(stats) == new_min_size
+
+
+class TestResizePool:
+
+    @pytest.mark.asyncio
+    async def test_resized(self, mocker: MockerFixture) -> None:
+        resize = mocker.patch("psycopg_pool.AsyncConnectionPool.resize")
+
+        pool = psycopg_pool.AsyncConnectionPool("", open=False)
+
+        policy = postgresql.PoolResizePolicy(min_size=10, max_size=20, step=5, wait_threshold=0.1)
+
+        await postgresql.resize_pool(pool, policy, {"pool_min": 10, "pool_max": 10, "requests_waiting": 3})
+
+        resize.assert_called_once_with(min_size=15, max_size=15)
+
+    @pytest.mark.asyncio
+    async def test_configured_max_size_is_kept(self, mocker: MockerFixture) -> None:
+        resize = mocker.patch("psycopg_pool.AsyncConnectionPool.resize")
+
+        pool = psycopg_pool.AsyncConnectionPool("", open=False)
+
+        policy = postgresql.PoolResizePolicy(min_size=10, max_size=20, step=5, wait_threshold=0.1, pool_max_size=30)
+
+        await postgresql.resize_pool(pool, policy, {"pool_min": 15, "pool_max": 30, "pool_available": 10})
+
+        resize.assert_called_once_with(min_size=10, max_size=30)
+
+    @pytest.mark.asyncio
+    async def test_max_size_shrinks_back(self, mocker: MockerFixture) -> None:
+        resize = mocker.patch("psycopg_pool.AsyncConnectionPool.resize")
+
+        pool = psycopg_pool.AsyncConnectionPool("", open=False)
+
+        policy = postgresql.PoolResizePolicy(min_size=10, max_size=20, step=5, wait_threshold=0.1, pool_max_size=12)
+
+        await postgresql.resize_pool(pool, policy, {"pool_min": 20, "pool_max": 20, "pool_available": 10})
+
+        resize.assert_called_once_with(min_size=15, max_size=15)
+
+        resize.reset_mock()
+
+        await postgresql.resize_pool(pool, policy, {"pool_min": 15, "pool_max": 15, "pool_available": 10})
+
+        resize.assert_called_once_with(min_size=10, max_size=12)
+
+    @pytest.mark.asyncio
+    async def test_not_changed(self, mocker: MockerFixture) -> None:
+        resize = mocker.patch("psycopg_pool.AsyncConnectionPool.resize")
+
+        pool = psycopg_pool.AsyncConnectionPool("", open=False)
+
+        policy = postgresql.PoolResizePolicy(min_size=10, max_size=20, step=5, wait_threshold=0.1)
+
+        await postgresql.resize_pool(pool, policy, {"pool_min": 10, "pool_max": 10})
+
+        resize.assert_not_called()
+
+
+class TestMonitorPools:
+
+    @pytest.mark.asyncio
+    async def test_no_policy(self, mocker: MockerFixture) -> None:
+        resize = mocker.patch("psycopg_pool.AsyncConnectionPool.resize")
+
+        with capture_logs() as logs:
+            await postgresql.monitor_pools(policy=None)
+
+        assert_logs(logs, postgresql_pool_size=1)
+        resize.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_main_pool_is_resized(self, mocker: MockerFixture) -> None:
+        assert postgresql.POOL is not None
+
+        mocker.patch("ffun.core.postgresql.BACKGROUND_POOL", psycopg_pool.AsyncConnectionPool("", open=False))
+
+        resize = mocker.patch("psycopg_pool.AsyncConnectionPool.resize")
+
+        stats = postgresql.POOL.get_stats()
+
+        # policy forces the growth of the main pool
+        policy = postgresql.PoolResizePolicy(
+            min_size=stats["pool_min"] + 1, max_size=stats["pool_min"] + 1, step=1, wait_threshold=-1
+        )
+
+        with capture_logs() as logs:
+            await postgresql.monitor_pools(policy)
+
+        assert_logs(logs, postgresql_pool_size=2, resize_pool=1)
+        resize.assert_called_once_with(min_size=stats["pool_min"] + 1, max_size=stats["pool_min"] + 1)
+
+
+class TestPoolMonitor:
+
+    @pytest.mark.asyncio
+    async def test_errors_do_not_stop_monitor(self, mocker: MockerFixture) -> None:
+        errors: list[BaseException | None] = [Exception("test error"), None, asyncio.CancelledError()]
+
+        monitor = mocker.patch("ffun.core.postgresql.monitor_pools", side_effect=errors)
+
+        with capture_logs() as logs:
+            await postgresql.pool_monitor(delay=0, policy=None)
+
+        assert monitor.call_count == 3
+        assert_logs(logs, pool_monitor_error=1, pool_monitor_is_stopped=1)
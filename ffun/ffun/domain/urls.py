@@ -1,11 +1,11 @@
 import contextlib
+import functools
 import re
 import unicodedata
-from typing import Annotated, Iterable, Iterator, MutableMapping, Protocol, cast
+from typing import TYPE_CHECKING, Annotated, Iterable, Iterator, MutableMapping, Protocol, cast
 from urllib.parse import quote_plus, unquote
 
 import pydantic
-import tldextract
 from furl import furl
 from orderedmultidict import omdict
 
@@ -13,6 +13,9 @@ from ffun.core import logging
 from ffun.domain import errors
 from ffun.domain.entities import AbsoluteUrl, FeedUrl, SourceUid, UnknownUrl, UrlUid
 
+if TYPE_CHECKING:
+    from tldextract.tldextract import ExtractResult
+
 logger = logging.get_module_logger()
 
 
@@ -72,6 +75,28 @@ class FUrl(Protocol):
 
 RE_SCHEMA = re.compile(r"^(\w+):")
 
+# URL normalization functions are pure and are called for every feed & entry url on each parsing
+# => we memoize their results and skip furl for urls that are already in the canonical form
+URLS_CACHE_SIZE = 16 * 1024
+
+# furl decodes punycode hosts => they are not canonical
+_RE_LABEL = r"(?!xn--)[a-z0-9\-]+"
+_RE_HOST = rf"{_RE_LABEL}(?:\.{_RE_LABEL})+"
+# "." & ".." segments are not canonical
+_RE_NOT_DOTS = r"(?!\.{1,2}(?:/|$))"
+_RE_SEGMENT = rf"{_RE_NOT_DOTS}[a-z0-9_~\-.]+"
+_RE_CASED_SEGMENT = rf"{_RE_NOT_DOTS}[a-zA-Z0-9_~\-.]+"
+
+# lowercase ascii urls without query, fragment, port, credentials, quoted symbols and trailing slash
+# are not changed by url_to_uid, except the scheme removal
+RE_CANONICAL_UID_URL = re.compile(rf"^(?:https?:)?//({_RE_HOST}(?:/{_RE_SEGMENT})*)$")
+
+# simple http(s) urls are returned by adjust_external_url as is
+RE_CANONICAL_ABSOLUTE_URL = re.compile(rf"^https?://{_RE_HOST}(?:(?:/{_RE_CASED_SEGMENT})+/?)?$")
+
+# source uid depends only on the host => the rest of the url is not important
+RE_CANONICAL_SOURCE_URL = re.compile(rf"^(?:https?:)?//({_RE_HOST})(?:[/?#]|$)")
+
 
 @contextlib.contextmanager
 def check_furl_error() -> Iterator[None]:
@@ -97,9 +122,16 @@ def construct_f_url(url: UnknownUrl | AbsoluteUrl | str) -> FUrl | None:
         return None
 
 
+def _extract_tld(host: str) -> "ExtractResult":
+    # tldextract is imported on the first usage, since its import is noticeable on the start of every process
+    import tldextract
+
+    return tldextract.extract(host)
+
+
 def initialize_tld_cache() -> None:
     logger.info("initializing_tld_cache")
-    tldextract.extract("example.com")
+    _extract_tld("example.com")
     logger.info("tld_cache_initialized")
 
 
@@ -127,7 +159,7 @@ def _fix_classic_url_to_absolute(url: str) -> AbsoluteUrl | None:
         return None
 
     # check if url has a proper domain
-    if tldextract.extract(domain_part).suffix == "":
+    if _extract_tld(domain_part).suffix == "":
         return None
 
     f_url = construct_f_url(f"//{url}")
@@ -139,7 +171,7 @@ def _fix_classic_url_to_absolute(url: str) -> AbsoluteUrl | None:
 
 
 # ATTENTION: see note at the top of the file
-def normalize_classic_unknown_url(url: UnknownUrl) -> AbsoluteUrl | None:  # noqa: CCR001
+def _normalize_classic_unknown_url(url: UnknownUrl) -> AbsoluteUrl | None:  # noqa: CCR001
     url = UnknownUrl(url.strip())
 
     # check if url is parsable
@@ -169,6 +201,16 @@ def normalize_classic_unknown_url(url: UnknownUrl) -> AbsoluteUrl | None:  # noq
     return _fix_classic_url_to_absolute(url)
 
 
+_normalize_classic_unknown_url_memoized = functools.lru_cache(maxsize=URLS_CACHE_SIZE)(_normalize_classic_unknown_url)
+
+
+def normalize_classic_unknown_url(url: UnknownUrl) -> AbsoluteUrl | None:
+    if RE_CANONICAL_ABSOLUTE_URL.match(url):
+        return AbsoluteUrl(url)
+
+    return _normalize_classic_unknown_url_memoized(url)
+
+
 # ATTENTION: see note at the top of the file
 def is_full_url(url: UnknownUrl) -> bool:
     return normalize_classic_unknown_url(url) is not None
@@ -271,15 +313,26 @@ def adjust_magnetic_url(url: UnknownUrl) -> AbsoluteUrl:
 
 
 # ATTENTION: see note at the top of the file
-def adjust_external_url(url: UnknownUrl, original_url: AbsoluteUrl | FeedUrl) -> AbsoluteUrl | None:
+def _adjust_external_url(url: UnknownUrl, original_url: AbsoluteUrl | FeedUrl) -> AbsoluteUrl | None:
     if is_magnetic_url(url):
         return adjust_magnetic_url(url)
 
     return _adjust_classic_url(url, original_url)
 
 
+_adjust_external_url_memoized = functools.lru_cache(maxsize=URLS_CACHE_SIZE)(_adjust_external_url)
+
+
+def adjust_external_url(url: UnknownUrl, original_url: AbsoluteUrl | FeedUrl) -> AbsoluteUrl | None:
+    # absolute urls do not depend on the original url => do not spend cache records on them
+    if RE_CANONICAL_ABSOLUTE_URL.match(url):
+        return AbsoluteUrl(url)
+
+    return _adjust_external_url_memoized(url, original_url)
+
+
 # ATTENTION: see note at the top of the file
-def url_to_uid(url: AbsoluteUrl | FeedUrl) -> UrlUid:
+def _url_to_uid(url: AbsoluteUrl | FeedUrl) -> UrlUid:
     # The goal of this function is to detect URLs that most likely (99.(9)%) point to the same resource
     # It normalizes and simplifies a URL according to heuristics
     # I.e. there is a small possibility that two different URLs will be normalized to the same uid
@@ -339,8 +392,32 @@ def url_to_uid(url: AbsoluteUrl | FeedUrl) -> UrlUid:
     return UrlUid(resulted_url)
 
 
+_url_to_uid_memoized = functools.lru_cache(maxsize=URLS_CACHE_SIZE)(_url_to_uid)
+
+
+def url_to_uid(url: AbsoluteUrl | FeedUrl) -> UrlUid:
+    if match := RE_CANONICAL_UID_URL.match(url):
+        return UrlUid(url[match.start(1) :])
+
+    return _url_to_uid_memoized(url)
+
+
 # ATTENTION: see note at the top of the file
-def url_to_source_uid(url: AbsoluteUrl | FeedUrl) -> SourceUid:
+def _source_domain(domain: str) -> SourceUid:
+    # TODO: move rules to settings
+
+    if domain.startswith("www."):
+        domain = domain[4:]
+
+    if domain.endswith(".reddit.com"):
+        # xxx.reddit.com domains are just the old GUI version of reddit.com, or API, or old RSS urls
+        domain = "reddit.com"
+
+    return SourceUid(domain)
+
+
+# ATTENTION: see note at the top of the file
+def _url_to_source_uid(url: AbsoluteUrl | FeedUrl) -> SourceUid:
     # Because some portals (Reddit, ArXiv) provide customizable feed URLs,
     # we could see the same news entry in different feeds
     # => we should track the entry's source not by feed but by the portal
@@ -356,18 +433,26 @@ def url_to_source_uid(url: AbsoluteUrl | FeedUrl) -> SourceUid:
 
     assert domain is not None
 
-    # TODO: move rules to settings
+    assert isinstance(domain, str)
 
-    if domain.startswith("www."):
-        domain = domain[4:]
+    return _source_domain(domain)
 
-    if domain.endswith(".reddit.com"):
-        # xxx.reddit.com domains are just the old GUI version of reddit.com, or API, or old RSS urls
-        domain = "reddit.com"
 
-    assert isinstance(domain, str)
+_url_to_source_uid_memoized = functools.lru_cache(maxsize=URLS_CACHE_SIZE)(_url_to_source_uid)
 
-    return SourceUid(domain)
+
+def url_to_source_uid(url: AbsoluteUrl | FeedUrl) -> SourceUid:
+    if match := RE_CANONICAL_SOURCE_URL.match(url):
+        return _source_domain(url[match.start(1) : match.end(1)])
+
+    return _url_to_source_uid_memoized(url)
+
+
+def clear_urls_caches() -> None:
+    _normalize_classic_unknown_url_memoized.cache_clear()
+    _adjust_external_url_memoized.cache_clear()
+    _url_to_uid_memoized.cache_clear()
+    _url_to_source_uid_memoized.cache_clear()
 
 
 def url_to_host(url: AbsoluteUrl | FeedUrl) -> str:
@@ -384,7 +469,7 @@ def url_to_host(url: AbsoluteUrl | FeedUrl) -> str:
 
 
 def host_to_registered_domain(host: str) -> str:
-    extracted = tldextract.extract(host)
+    extracted = _extract_tld(host)
 
     if extracted.suffix == "":
         return host
@@ -460,7 +545,7 @@ def to_feed_url(url: AbsoluteUrl) -> FeedUrl:
 #################
 
 
-def _pydantic_source_uid_validator(value: str) -> SourceUid:
+def str_to_source_uid(value: str) -> SourceUid:
     absolute_url = normalize_classic_unknown_url(UnknownUrl(value))
 
     if absolute_url is None:
@@ -469,4 +554,8 @@ def _pydantic_source_uid_validator(value: str) -> SourceUid:
     return url_to_source_uid(absolute_url)
 
 
+def _pydantic_source_uid_validator(value: str) -> SourceUid:
+    return str_to_source_uid(value)
+
+
 SourceUidField = Annotated[str, pydantic.AfterValidator(_pydantic_source_uid_validator)]
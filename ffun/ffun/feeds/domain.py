@@ -3,6 +3,7 @@ from ffun.feeds import errors, operations, utils
 from ffun.feeds.entities import Feed
 
 save_feed = operations.save_feed
+save_feeds = operations.save_feeds
 update_feed_info = operations.update_feed_info
 get_next_feeds_to_load = operations.get_next_feeds_to_load
 mark_feed_as_loaded = operations.mark_feed_as_loaded
@@ -13,6 +14,7 @@ get_feed_ids_by_uids = operations.get_feed_ids_by_uids
 get_source_ids = operations.get_source_ids
 get_orphaned_feeds = operations.get_orphaned_feeds
 tech_remove_feed = operations.tech_remove_feed
+tech_remove_feeds = operations.tech_remove_feeds
 count_total_feeds = operations.count_total_feeds
 count_total_feeds_per_state = operations.count_total_feeds_per_state
 count_total_feeds_per_last_error = operations.count_total_feeds_per_last_error
@@ -21,15 +23,6 @@ entries_per_day = utils.entries_per_day
 is_young = utils.is_young
 
 
-async def save_feeds(feeds: list[Feed]) -> list[FeedId]:
-    real_ids = []
-
-    for feed in feeds:
-        real_ids.append(await save_feed(feed))
-
-    return real_ids
-
-
 async def get_feed(feed_id: FeedId) -> Feed:
     feeds = await get_feeds([feed_id])
 
@@ -66,6 +66,35 @@ async def save_feed(feed: Feed) -> FeedId:
         return found_ids[uid]
 
 
+async def save_feeds(feeds: list[Feed]) -> list[FeedId]:
+    """Bulk version of `save_feed`: returns ids of the saved or already existed feeds in the order of `feeds`."""
+    if not feeds:
+        return []
+
+    uids = [domain_urls.url_to_uid(feed.url) for feed in feeds]
+
+    query = PostgreSQLQuery.into("f_feeds").columns(
+        "id", "source_id", "url", "site_url", "state", "title", "description", "uid"
+    )
+
+    for feed, uid in zip(feeds, uids):
+        query = query.insert(
+            feed.id, feed.source_id, feed.url, feed.site_url, feed.state, feed.title, feed.description, uid
+        )
+
+    # conflicts by any unique column (`uid` or `url`) mean that the feed already exists
+    query = query.on_conflict().do_nothing()
+
+    await execute(str(query))
+
+    found_ids = await get_feed_ids_by_uids(uids)
+
+    if len(found_ids) != len(set(uids)):
+        raise NotImplementedError("something went wrong")
+
+    return [found_ids[uid] for uid in uids]
+
+
 @run_in_transaction
 async def get_next_feeds_to_load(execute: ExecuteType, number: int, loaded_before: datetime.datetime) -> list[Feed]:
     sql = """
@@ -216,6 +245,18 @@ async def tech_remove_feed(feed_id: FeedId) -> None:
     await execute(sql, {"feed_id": feed_id})
 
 
+async def tech_remove_feeds(feed_ids: list[FeedId]) -> None:
+    if not feed_ids:
+        return
+
+    sql = """
+    DELETE FROM f_feeds
+    WHERE id = ANY(%(feed_ids)s)
+    """
+
+    await execute(sql, {"feed_ids": feed_ids})
+
+
 async def count_total_feeds() -> int:
     result = await execute("SELECT COUNT(*) FROM f_feeds")
     return result[0]["count"]  # type: ignore
@@ -1,7 +1,7 @@
 import pytest
 
 from ffun.domain.domain import new_feed_id
-from ffun.feeds import domain, errors, utils
+from ffun.feeds import domain, errors, operations, utils
 from ffun.feeds.domain import get_feed
 
 
@@ -13,9 +13,9 @@ class TestGetFeed:
             await get_feed(new_feed_id())
 
 
-# save_feeds function is checked in tests of other functions
 class TestSaveFeeds:
-    pass
+    def test_reexports_operation(self) -> None:
+        assert domain.save_feeds is operations.save_feeds
 
 
 class TestEntriesPerDay:
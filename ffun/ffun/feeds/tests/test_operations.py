@@ -12,7 +12,7 @@ from ffun.domain.domain import new_feed_id
 from ffun.domain.entities import FeedId
 from ffun.domain.urls import str_to_absolute_url, url_to_uid
 from ffun.feeds import errors
-from ffun.feeds.domain import get_feed, save_feeds
+from ffun.feeds.domain import get_feed
 from ffun.feeds.entities import Feed, FeedError, FeedState
 from ffun.feeds.operations import (
     all_feeds_iterator,
@@ -28,7 +28,9 @@ from ffun.feeds.operations import (
     mark_feed_as_loaded,
     mark_feed_as_orphaned,
     save_feed,
+    save_feeds,
     tech_remove_feed,
+    tech_remove_feeds,
     update_feed_info,
 )
 from ffun.feeds.tests import make
@@ -88,6 +90,43 @@ class TestSaveFeed:
             await get_feed(feed_2.id)
 
 
+class TestSaveFeeds:
+    @pytest.mark.asyncio
+    async def test_no_feeds(self) -> None:
+        async with TableSizeNotChanged("f_feeds"):
+            assert await save_feeds([]) == []
+
+    @pytest.mark.asyncio
+    async def test_new_feeds(self) -> None:
+        new_feeds = [await make.fake_feed() for _ in range(3)]
+
+        async with TableSizeDelta("f_feeds", delta=3):
+            feed_ids = await save_feeds(new_feeds)
+
+        assert feed_ids == [feed.id for feed in new_feeds]
+
+        saved_feeds = await get_feeds(feed_ids)
+
+        assert {feed.replace(created_at=None) for feed in saved_feeds} == set(new_feeds)
+
+    @pytest.mark.asyncio
+    async def test_existed_and_duplicated_feeds(self, new_feed: Feed) -> None:
+        original_feed_id = await save_feed(new_feed)
+
+        another_feed = await make.fake_feed()
+
+        url_part = uuid.uuid4().hex
+        same_uid_feed = await make.fake_feed(url=f"http://example.com/{url_part}")
+        same_uid_feed_clone = same_uid_feed.replace(id=uuid.uuid4(), url=f"https://example.com/{url_part}")
+
+        async with TableSizeDelta("f_feeds", delta=2):
+            feed_ids = await save_feeds(
+                [new_feed.replace(id=uuid.uuid4()), another_feed, same_uid_feed, same_uid_feed_clone, another_feed]
+            )
+
+        assert feed_ids == [original_feed_id, another_feed.id, same_uid_feed.id, same_uid_feed.id, another_feed.id]
+
+
 class TestGetNextFeedToLoad:
     @pytest.mark.asyncio
     async def test_find_new_feed(self, saved_feed_id: FeedId) -> None:
@@ -427,6 +466,20 @@ class TestTechRemoveFeed:
         await tech_remove_feed(new_feed_id())
 
 
+class TestTechRemoveFeeds:
+    @pytest.mark.asyncio
+    async def test(self, five_saved_feed_ids: list[FeedId]) -> None:
+        async with TableSizeDelta("f_feeds", delta=-3):
+            await tech_remove_feeds(five_saved_feed_ids[:3] + [new_feed_id()])
+
+        assert {feed.id for feed in await get_feeds(five_saved_feed_ids)} == set(five_saved_feed_ids[3:])
+
+    @pytest.mark.asyncio
+    async def test_no_feeds(self) -> None:
+        async with TableSizeNotChanged("f_feeds"):
+            await tech_remove_feeds([])
+
+
 class TestAllFeedsIterator:
     @pytest.mark.parametrize("chunk", [1, 2, 3, 4, 5, 6, 7])
     @pytest.mark.asyncio
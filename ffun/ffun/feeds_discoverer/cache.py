@@ -0,0 +1,79 @@
+import collections
+import datetime
+import time
+
+from ffun.domain.entities import FeedUrl
+from ffun.feeds_discoverer.settings import settings
+
+
+class _Record:
+    __slots__ = ("expire_at", "content")
+
+    def __init__(self, expire_at: float, content: str) -> None:
+        self.expire_at = expire_at
+        self.content = content
+
+
+class FetchCache:
+    """Short-living LRU cache of loaded pages, bounded by the total size of their content.
+
+    Many users add the same popular sites => discovery requests share loaded content.
+    Parsed HTML is not cached: it takes several times more memory than its source,
+    so it lives only in the context of a single discovery request.
+    """
+
+    __slots__ = ("_ttl", "_max_bytes", "_bytes", "_records")
+
+    def __init__(self, ttl: datetime.timedelta, max_bytes: int) -> None:
+        self._ttl = ttl.total_seconds()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._records: collections.OrderedDict[FeedUrl, _Record] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _remove(self, url: FeedUrl) -> None:
+        record = self._records.pop(url, None)
+
+        if record is not None:
+            self._bytes -= len(record.content)
+
+    def get_content(self, url: FeedUrl) -> str | None:
+        record = self._records.get(url)
+
+        if record is None:
+            return None
+
+        if record.expire_at <= time.monotonic():
+            self._remove(url)
+            return None
+
+        self._records.move_to_end(url)
+
+        return record.content
+
+    def set_content(self, url: FeedUrl, content: str) -> None:
+        self._remove(url)
+
+        # content size is measured the same way as the bytes budget of discovery requests
+        if len(content) > self._max_bytes:
+            return
+
+        self._records[url] = _Record(expire_at=time.monotonic() + self._ttl, content=content)
+        self._bytes += len(content)
+
+        while self._bytes > self._max_bytes:
+            _, record = self._records.popitem(last=False)
+            self._bytes -= len(record.content)
+
+    def clear(self) -> None:
+        self._records.clear()
+        self._bytes = 0
+
+
+fetch_cache = FetchCache(ttl=settings.fetch_cache_ttl, max_bytes=settings.fetch_cache_max_bytes)
@@ -1,9 +1,7 @@
 import asyncio
 import contextlib
 import contextvars
-from typing import Iterator, cast
-
-from bs4 import BeautifulSoup, ResultSet, Tag
+from typing import TYPE_CHECKING, Iterator, cast
 
 from ffun.core import logging
 from ffun.domain.entities import AbsoluteUrl, FeedUrl, UnknownUrl
@@ -18,16 +16,22 @@ from ffun.domain.urls import (
     url_to_host,
     url_to_source_uid,
 )
+from ffun.feeds_discoverer.cache import fetch_cache
 from ffun.feeds_discoverer.entities import Context, Discoverer, DiscoverResult, Result, Status
+from ffun.feeds_discoverer.session import DiscoverySession
+from ffun.feeds_discoverer.settings import settings
 from ffun.integrations.settings import settings as i_settings
 from ffun.loader import domain as lo_domain
 from ffun.loader import errors as lo_errors
 from ffun.parsers import entities as p_entities
 
+if TYPE_CHECKING:
+    from bs4 import ResultSet, Tag
+
 logger = logging.get_module_logger()
 
-_VISITED_URLS: contextvars.ContextVar[set[FeedUrl] | None] = contextvars.ContextVar(
-    "feeds_discoverer_visited_urls",
+_SESSION: contextvars.ContextVar[DiscoverySession | None] = contextvars.ContextVar(
+    "feeds_discoverer_session",
     default=None,
 )
 
@@ -37,7 +41,6 @@ _VISITED_URLS: contextvars.ContextVar[set[FeedUrl] | None] = contextvars.Context
 # 2. Check common feed URL patterns (e.g., /feed, /rss, /feed.xml, /feeds/rss.xml, .rss, etc.)
 #    However, this may lead to making too many requests, which is not ideal.
 #    Implement that only if there are a lot of site without discoverable feeds.
-# 3. There no protection from checking the same link multiple times, we should add some.
 
 
 ALLOWED_EXTENSIONS_FOR_LINKS = [".xml", ".rss", ".atom", ".rdf", ".feed", ".php", ".asp", ".aspx", ".json", ".cgi", ""]
@@ -67,24 +70,42 @@ async def _discover_adjust_url(context: Context) -> DiscoverResult:
     return context.replace(url=url, host=host), None
 
 
-async def _discover_load_url(context: Context) -> DiscoverResult:
-    """Fetch the URL content via the loader."""
+async def _discover_load_url(context: Context) -> DiscoverResult:  # noqa: CCR001
+    """Fetch the URL content via the loader.
+
+    Content is taken from the shared cache if possible, otherwise it is loaded within the session budget.
+    """
     assert context.url is not None
 
     logger.info("discovering_loading_content", url=context.url)
 
-    visited_urls = _VISITED_URLS.get()
+    session = _SESSION.get()
 
-    assert visited_urls is not None
+    assert session is not None
 
-    if context.url in visited_urls:
+    if context.url in session.visited_urls:
         logger.info("discovering_url_already_attempted", url=context.url)
         return context, Result(feeds=[], status=Status.no_feeds_found)
 
-    visited_urls.add(context.url)
+    session.visited_urls.add(context.url)
+
+    content = fetch_cache.get_content(context.url)
+
+    if content is not None:
+        logger.info("discovering_content_found_in_cache", url=context.url, content_size=len(content))
+        return context.replace(content=content), None
+
+    if session.exhausted():
+        logger.info("discovering_budget_exhausted", url=context.url)
+        return context, Result(feeds=[], status=Status.no_feeds_found)
 
     try:
-        content = await lo_domain.load_decoded_content(context.url, none_on_error=False)
+        async with session.load_slot():
+            async with asyncio.timeout(session.time_left()):
+                content = await lo_domain.load_decoded_content(context.url, none_on_error=False)
+    except TimeoutError:
+        logger.info("discovering_time_budget_exhausted", url=context.url)
+        return context, Result(feeds=[], status=Status.cannot_access_url)
     except lo_errors.LoadError:
         logger.info("can_not_access_content")
         return context, Result(feeds=[], status=Status.cannot_access_url)
@@ -94,6 +115,10 @@ async def _discover_load_url(context: Context) -> DiscoverResult:
 
     assert content is not None
 
+    session.spend_bytes(len(content))
+
+    fetch_cache.set_content(context.url, content)
+
     logger.info("discovering_content_loaded", url=context.url, content_size=len(content))
 
     return context.replace(content=content), None
@@ -126,10 +151,13 @@ async def _discover_extract_feed_info(context: Context) -> DiscoverResult:
 
 async def _discover_create_soup(context: Context) -> DiscoverResult:
     """Parse loaded HTML into a BeautifulSoup document for link extraction."""
+    assert context.url is not None
     assert context.content is not None
 
     logger.info("discovering_creating_soup")
 
+    from bs4 import BeautifulSoup
+
     try:
         soup = BeautifulSoup(context.content, "html.parser")
     except Exception:
@@ -153,7 +181,7 @@ async def _discover_extract_feeds_from_links(context: Context) -> DiscoverResult
 
     links_to_check = set()
 
-    links = cast(ResultSet[Tag], context.soup.find_all("link"))
+    links = cast("ResultSet[Tag]", context.soup.find_all("link"))
 
     for link in links:
 
@@ -197,7 +225,7 @@ async def _discover_extract_feeds_from_anchors(context: Context) -> DiscoverResu
 
     anchors_to_check = set()
 
-    anchors = cast(ResultSet[Tag], context.soup.find_all("a"))
+    anchors = cast("ResultSet[Tag]", context.soup.find_all("a"))
 
     for anchor in anchors:
         if not anchor.has_attr("href"):
@@ -234,11 +262,8 @@ async def _discover_check_parent_urls(context: Context) -> DiscoverResult:
 
     parent_url: AbsoluteUrl | FeedUrl | None = get_parent_url(context.url)
 
-    # TODO: currently, the logic should be protected from the exponential explosion
-    #       because of the recursion (each parent URL can be processed by `_discover_check_parent_urls`
-    #       leading to root URLs being processed multiple times.
-    #       However, it would be better to add explicit protection against checking the same URL multiple times.
-    #       See comments at the top of the file.
+    # Parents are checked recursively (each parent URL can be processed by `_discover_check_parent_urls`),
+    # root URLs are not loaded multiple times because of the visited URLs of the session.
     while True:
         if parent_url is None:
             break
@@ -256,6 +281,38 @@ async def _discover_check_parent_urls(context: Context) -> DiscoverResult:
     return context, None
 
 
+async def _wait_for_candidates(tasks: list[asyncio.Task[Result]]) -> list[Result]:
+    """Wait for checks of candidate links.
+
+    When some feeds are found, the rest of checks get a short grace period and are cancelled after it.
+    Most sites have all their feeds linked on the same page => slow candidates rarely add new feeds,
+    but they define the latency of the whole request.
+    """
+    results: list[Result] = []
+
+    pending: set[asyncio.Task[Result]] = set(tasks)
+
+    try:
+        while pending and not any(result.feeds for result in results):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            results.extend(task.result() for task in done)
+
+        if pending:
+            done, pending = await asyncio.wait(pending, timeout=settings.found_feeds_grace_period.total_seconds())
+            results.extend(task.result() for task in done)
+
+    finally:
+        if pending:
+            logger.info("discovering_candidates_cancelled", candidates_number=len(pending))
+
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return results
+
+
 async def _discover_check_candidate_links(context: Context) -> DiscoverResult:  # noqa: CCR001
     """Recursively check candidate URLs and aggregate any feeds found.
 
@@ -277,12 +334,12 @@ async def _discover_check_candidate_links(context: Context) -> DiscoverResult:
         link for link in filtered_links if current_registered_domain == host_to_registered_domain(url_to_host(link))
     ]
 
-    tasks = []
-
-    for link in filtered_links:
-        tasks.append(discover(url=link, depth=context.depth - 1, discoverers=context.discoverers))
+    tasks = [
+        asyncio.create_task(discover(url=link, depth=context.depth - 1, discoverers=context.discoverers))
+        for link in filtered_links
+    ]
 
-    results: list[Result] = await asyncio.gather(*tasks)
+    results = await _wait_for_candidates(tasks)
 
     feeds: list[p_entities.FeedInfo] = []
 
@@ -356,18 +413,26 @@ _discoverers: list[Discoverer] = [
 
 
 @contextlib.contextmanager
-def visited_cache() -> Iterator[None]:
+def discovery_session() -> Iterator[DiscoverySession]:
+    """Start a new session for the top-level discovery call, reuse the existing one for recursive calls."""
+    session = _SESSION.get()
+
+    if session is not None:
+        yield session
+        return
 
-    reset_token: contextvars.Token[set[FeedUrl] | None] | None = None
+    session = DiscoverySession(
+        max_concurrent_loads=settings.max_concurrent_loads,
+        time_budget=settings.time_budget,
+        bytes_budget=settings.bytes_budget,
+    )
 
-    if _VISITED_URLS.get() is None:
-        reset_token = _VISITED_URLS.set(set())
+    reset_token = _SESSION.set(session)
 
     try:
-        yield
+        yield session
     finally:
-        if reset_token is not None:
-            _VISITED_URLS.reset(reset_token)
+        _SESSION.reset(reset_token)
 
 
 async def discover(
@@ -380,7 +445,7 @@ async def discover(
 
     context = Context(raw_url=UnknownUrl(url), depth=depth, discoverers=discoverers)
 
-    with visited_cache():
+    with discovery_session():
         for discoverer in discoverers:
             context, result = await discoverer(context)
 
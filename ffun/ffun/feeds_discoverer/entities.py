@@ -1,9 +1,8 @@
 import enum
 from collections.abc import Awaitable
-from typing import Protocol, Union, runtime_checkable
+from typing import TYPE_CHECKING, Protocol, Union, runtime_checkable
 
 import pydantic
-from bs4 import BeautifulSoup
 
 from ffun.core.entities import BaseEntity
 from ffun.domain.entities import AbsoluteUrl, FeedUrl, UnknownUrl
@@ -12,6 +11,13 @@ from ffun.parsers import entities as p_entities
 DiscoverResult = tuple["Context", Union[None, "Result"]]
 
 
+# bs4 is imported only when the first page is parsed, since its import is noticeable on the start of every process
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup as Soup
+else:
+    Soup = object
+
+
 @runtime_checkable
 class Discoverer(Protocol):
     def __call__(self, context: "Context") -> Awaitable[DiscoverResult]:
@@ -31,7 +37,7 @@ class Context(BaseEntity):
     url: FeedUrl | None = None
     host: str | None = None
     content: str | None = None
-    soup: BeautifulSoup | None = None
+    soup: Soup | None = None
     depth: int = 1
     candidate_urls: set[AbsoluteUrl] = pydantic.Field(default_factory=set)
     discoverers: list[Discoverer] = pydantic.Field(default_factory=list)
@@ -0,0 +1,38 @@
+import asyncio
+import contextlib
+import datetime
+import time
+from typing import AsyncIterator
+
+from ffun.domain.entities import FeedUrl
+
+
+class DiscoverySession:
+    """State shared by all recursive checks of a single discovery request.
+
+    - visited URLs, to not load the same URL twice;
+    - a limit of concurrent loads;
+    - time and bytes budgets: when any of them is exhausted, no new URLs are loaded.
+    """
+
+    __slots__ = ("visited_urls", "_semaphore", "_deadline", "_bytes_left")
+
+    def __init__(self, max_concurrent_loads: int, time_budget: datetime.timedelta, bytes_budget: int) -> None:
+        self.visited_urls: set[FeedUrl] = set()
+        self._semaphore = asyncio.Semaphore(max_concurrent_loads)
+        self._deadline = time.monotonic() + time_budget.total_seconds()
+        self._bytes_left = bytes_budget
+
+    def time_left(self) -> float:
+        return max(0.0, self._deadline - time.monotonic())
+
+    def exhausted(self) -> bool:
+        return self._bytes_left <= 0 or self.time_left() <= 0
+
+    def spend_bytes(self, number: int) -> None:
+        self._bytes_left -= number
+
+    @contextlib.asynccontextmanager
+    async def load_slot(self) -> AsyncIterator[None]:
+        async with self._semaphore:
+            yield
@@ -0,0 +1,24 @@
+import datetime
+
+import pydantic_settings
+
+from ffun.core.settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    # budget of a single discovery request (including all recursive checks)
+    max_concurrent_loads: int = 8
+    time_budget: datetime.timedelta = datetime.timedelta(seconds=15)
+    bytes_budget: int = 20 * 1024 * 1024
+
+    # when some candidate links lead to feeds, other candidates are waited for this period only
+    found_feeds_grace_period: datetime.timedelta = datetime.timedelta(seconds=1)
+
+    # loaded pages are shared between discovery requests
+    fetch_cache_ttl: datetime.timedelta = datetime.timedelta(minutes=5)
+    fetch_cache_max_bytes: int = 64 * 1024 * 1024
+
+    model_config = pydantic_settings.SettingsConfigDict(env_prefix="FFUN_FEEDS_DISCOVERER_")
+
+
+settings = Settings()
@@ -0,0 +1,9 @@
+import pytest
+
+from ffun.feeds_discoverer.cache import fetch_cache
+
+
+# the same URLs are mocked differently in different tests => loaded pages must not leak between tests
+@pytest.fixture(autouse=True)
+def clear_fetch_cache() -> None:
+    fetch_cache.clear()
@@ -0,0 +1,105 @@
+import datetime
+
+from pytest_mock import MockerFixture
+
+from ffun.domain.entities import FeedUrl
+from ffun.feeds_discoverer.cache import FetchCache
+
+_url = FeedUrl("http://localhost/test")
+_another_url = FeedUrl("http://localhost/another")
+
+
+class TestFetchCache:
+
+    def test_content(self) -> None:
+        cache = FetchCache(ttl=datetime.timedelta(minutes=1), max_bytes=100)
+
+        assert cache.get_content(_url) is None
+
+        cache.set_content(_url, "content")
+
+        assert cache.get_content(_url) == "content"
+        assert cache.get_content(_another_url) is None
+
+    def test_expiration(self, mocker: MockerFixture) -> None:
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+
+        cache = FetchCache(ttl=datetime.timedelta(seconds=10), max_bytes=100)
+
+        cache.set_content(_url, "content")
+
+        monotonic.return_value = 109.0
+
+        assert cache.get_content(_url) == "content"
+
+        monotonic.return_value = 110.0
+
+        assert cache.get_content(_url) is None
+        assert len(cache) == 0
+
+    def test_max_bytes(self) -> None:
+        cache = FetchCache(ttl=datetime.timedelta(minutes=1), max_bytes=20)
+
+        cache.set_content(_url, "content")
+        cache.set_content(_another_url, "another content")
+
+        assert len(cache) == 1
+        assert cache.size_bytes == len("another content")
+        assert cache.get_content(_url) is None
+        assert cache.get_content(_another_url) == "another content"
+
+    def test_least_recently_used_is_removed(self) -> None:
+        third_url = FeedUrl("http://localhost/third")
+
+        cache = FetchCache(ttl=datetime.timedelta(minutes=1), max_bytes=20)
+
+        cache.set_content(_url, "content-1")
+        cache.set_content(_another_url, "content-2")
+
+        assert cache.get_content(_url) == "content-1"
+
+        cache.set_content(third_url, "content-3")
+
+        assert cache.get_content(_url) == "content-1"
+        assert cache.get_content(_another_url) is None
+        assert cache.get_content(third_url) == "content-3"
+
+    def test_content_replaced(self) -> None:
+        cache = FetchCache(ttl=datetime.timedelta(minutes=1), max_bytes=100)
+
+        cache.set_content(_url, "content")
+        cache.set_content(_url, "new content")
+
+        assert len(cache) == 1
+        assert cache.size_bytes == len("new content")
+        assert cache.get_content(_url) == "new content"
+
+    def test_too_big_content(self) -> None:
+        cache = FetchCache(ttl=datetime.timedelta(minutes=1), max_bytes=5)
+
+        cache.set_content(_url, "content")
+
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
+
+    def test_expired_content_is_not_counted(self, mocker: MockerFixture) -> None:
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+
+        cache = FetchCache(ttl=datetime.timedelta(seconds=10), max_bytes=100)
+
+        cache.set_content(_url, "content")
+
+        monotonic.return_value = 110.0
+
+        assert cache.get_content(_url) is None
+        assert cache.size_bytes == 0
+
+    def test_clear(self) -> None:
+        cache = FetchCache(ttl=datetime.timedelta(minutes=1), max_bytes=100)
+
+        cache.set_content(_url, "content")
+
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
@@ -1,12 +1,17 @@
+import asyncio
+import datetime
+
 import httpx
 import pytest
 from pytest_mock import MockerFixture
 from respx.router import MockRouter
 
 from ffun.domain.entities import AbsoluteUrl, FeedUrl, UnknownUrl
+from ffun.domain.urls import str_to_feed_url, url_to_uid
 from ffun.feeds_discoverer import domain as fd_domain
+from ffun.feeds_discoverer.cache import fetch_cache
 from ffun.feeds_discoverer.domain import (
-    _VISITED_URLS,
+    _SESSION,
     _discover_adjust_url,
     _discover_check_candidate_links,
     _discover_check_parent_urls,
@@ -18,12 +23,15 @@ from ffun.feeds_discoverer.domain import (
     _discover_load_url,
     _discover_stop_recursion,
     _discoverers,
+    _wait_for_candidates,
     discover,
-    visited_cache,
+    discovery_session,
 )
 from ffun.feeds_discoverer.entities import Context, Result, Status
+from ffun.feeds_discoverer.settings import settings
 from ffun.feeds_discoverer.tests import make
 from ffun.integrations.tests.helpers import FakeIntegration
+from ffun.parsers import entities as p_entities
 
 
 class FakeDiscover:
@@ -65,12 +73,10 @@ class TestDiscoverLoadUrl:
 
         context = make.context("http://localhost/test")
 
-        with visited_cache():
+        with discovery_session() as session:
             new_context, result = await _discover_load_url(context)
 
-            cache = _VISITED_URLS.get()
-            assert cache is not None
-            assert "http://localhost/test" in cache
+            assert "http://localhost/test" in session.visited_urls
 
         assert new_context == context
         assert result == Result(feeds=[], status=Status.cannot_access_url)
@@ -85,12 +91,10 @@ class TestDiscoverLoadUrl:
 
         context = make.context("http://localhost/test")
 
-        with visited_cache():
+        with discovery_session() as session:
             new_context, result = await _discover_load_url(context)
 
-            cache = _VISITED_URLS.get()
-            assert cache is not None
-            assert "http://localhost/test" in cache
+            assert "http://localhost/test" in session.visited_urls
 
         assert new_context == context.replace(content=expected_content)
         assert result is None
@@ -99,12 +103,8 @@ class TestDiscoverLoadUrl:
     async def test_prevent_second_attempt(self, respx_mock: MockRouter) -> None:
         mock = respx_mock.get("/test").mock(return_value=httpx.Response(200, content="unused"))
 
-        with visited_cache():
-            cache = _VISITED_URLS.get()
-
-            assert cache is not None
-
-            cache.add(FeedUrl("http://localhost/test"))
+        with discovery_session() as session:
+            session.visited_urls.add(FeedUrl("http://localhost/test"))
 
             context = make.context("http://localhost/test")
 
@@ -114,6 +114,80 @@ class TestDiscoverLoadUrl:
         assert new_context == context
         assert result == Result(feeds=[], status=Status.no_feeds_found)
 
+    @pytest.mark.asyncio
+    async def test_content_cached(self, respx_mock: MockRouter) -> None:
+        mock = respx_mock.get("/test").mock(return_value=httpx.Response(200, content="test-response"))
+
+        context = make.context("http://localhost/test")
+
+        with discovery_session():
+            await _discover_load_url(context)
+
+        assert fetch_cache.get_content(FeedUrl("http://localhost/test")) == "test-response"
+
+        # next request
+        with discovery_session():
+            new_context, result = await _discover_load_url(context)
+
+        assert mock.call_count == 1
+        assert new_context == context.replace(content="test-response")
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_bytes_budget_exhausted(self, respx_mock: MockRouter, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "bytes_budget", 10)
+
+        mock = respx_mock.get("/test").mock(return_value=httpx.Response(200, content="test-response"))
+        another_mock = respx_mock.get("/another").mock(return_value=httpx.Response(200, content="test-response"))
+
+        with discovery_session():
+            _, result = await _discover_load_url(make.context("http://localhost/test"))
+
+            assert result is None
+
+            context = make.context("http://localhost/another")
+
+            new_context, result = await _discover_load_url(context)
+
+        assert mock.called
+        assert not another_mock.called
+        assert new_context == context
+        assert result == Result(feeds=[], status=Status.no_feeds_found)
+
+    @pytest.mark.asyncio
+    async def test_time_budget_exhausted(self, respx_mock: MockRouter, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "time_budget", datetime.timedelta(seconds=0.1))
+
+        async def slow_response(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(10)
+            return httpx.Response(200, content="test-response")
+
+        respx_mock.get("/test").mock(side_effect=slow_response)
+
+        context = make.context("http://localhost/test")
+
+        with discovery_session():
+            new_context, result = await _discover_load_url(context)
+
+        assert new_context == context
+        assert result == Result(feeds=[], status=Status.cannot_access_url)
+
+        assert fetch_cache.get_content(FeedUrl("http://localhost/test")) is None
+
+
+class TestDiscoverySession:
+
+    def test_nested_sessions(self) -> None:
+        assert _SESSION.get() is None
+
+        with discovery_session() as session:
+            with discovery_session() as nested_session:
+                assert nested_session is session
+
+            assert _SESSION.get() is session
+
+        assert _SESSION.get() is None
+
 
 class TestDiscoverExtractFeedInfo:
 
@@ -519,6 +593,47 @@ class TestDiscoverCheckCandidateLinks:
         }
 
 
+class TestWaitForCandidates:
+
+    @staticmethod
+    async def _check(delay: float, feeds_number: int) -> Result:
+        await asyncio.sleep(delay)
+
+        url = str_to_feed_url("http://localhost/feed")
+
+        feeds = [
+            p_entities.FeedInfo(url=url, title="title", description="description", entries=[], uid=url_to_uid(url))
+            for _ in range(feeds_number)
+        ]
+
+        return Result(feeds=feeds, status=Status.feeds_found if feeds else Status.no_feeds_found)
+
+    @pytest.mark.asyncio
+    async def test_no_feeds_found(self) -> None:
+        tasks = [asyncio.create_task(self._check(delay, 0)) for delay in [0, 0.01, 0.02]]
+
+        results = await _wait_for_candidates(tasks)
+
+        assert len(results) == 3
+        assert all(task.done() and not task.cancelled() for task in tasks)
+
+    @pytest.mark.asyncio
+    async def test_slow_candidates_cancelled(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "found_feeds_grace_period", datetime.timedelta(seconds=0.05))
+
+        tasks = [
+            asyncio.create_task(self._check(0, 1)),
+            asyncio.create_task(self._check(0.01, 1)),
+            asyncio.create_task(self._check(10, 1)),
+        ]
+
+        results = await _wait_for_candidates(tasks)
+
+        assert len(results) == 2
+        assert all(len(result.feeds) == 1 for result in results)
+        assert tasks[2].cancelled()
+
+
 class TestDiscoverStopRecursion:
 
     @pytest.mark.asyncio
@@ -6,6 +6,7 @@ from ffun.feeds.entities import FeedId
 from ffun.feeds_links import operations
 
 add_link = operations.add_link
+add_links = operations.add_links
 remove_link = operations.remove_link
 get_link = operations.get_link
 get_linked_feeds = operations.get_linked_feeds
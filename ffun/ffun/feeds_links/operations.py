@@ -1,6 +1,8 @@
 import uuid
 from typing import Any, Iterable
 
+from pypika import PostgreSQLQuery
+
 from ffun.core import logging
 from ffun.core.postgresql import ExecuteType, execute
 from ffun.domain.entities import UserId
@@ -27,6 +29,26 @@ async def add_link(user_id: UserId, feed_id: FeedId) -> None:
     logger.business_event("feed_linked", user_id=user_id, feed_id=feed_id, in_collection=collections.has_feed(feed_id))
 
 
+async def add_links(user_id: UserId, feed_ids: list[FeedId]) -> None:
+    """Bulk version of `add_link`."""
+    if not feed_ids:
+        return
+
+    query = PostgreSQLQuery.into("fl_links").columns("id", "user_id", "feed_id")
+
+    for feed_id in feed_ids:
+        query = query.insert(uuid.uuid4(), user_id, feed_id)
+
+    query = query.on_conflict("user_id", "feed_id").do_nothing()
+
+    await execute(str(query))
+
+    for feed_id in feed_ids:
+        logger.business_event(
+            "feed_linked", user_id=user_id, feed_id=feed_id, in_collection=collections.has_feed(feed_id)
+        )
+
+
 async def remove_link(user_id: UserId, feed_id: FeedId) -> None:
     sql = """
         DELETE FROM fl_links WHERE user_id = %(user_id)s AND feed_id = %(feed_id)s
@@ -10,6 +10,7 @@ from ffun.feeds_collections.entities import CollectionId
 from ffun.feeds_links.entities import FeedLink
 from ffun.feeds_links.operations import (
     add_link,
+    add_links,
     count_feeds_per_user,
     count_subset_feeds_per_user,
     get_link,
@@ -102,6 +103,53 @@ class TestAddLink:
         assert links_3 == [FeedLink(user_id=user_3_id, feed_id=f[3], created_at=links_3[0].created_at)]
 
 
+class TestAddLinks:
+
+    @pytest.mark.asyncio
+    async def test_no_feeds(self, internal_user_id: UserId) -> None:
+        async with TableSizeNotChanged("fl_links"):
+            await add_links(internal_user_id, [])
+
+    @pytest.mark.parametrize("in_collection", [True, False])
+    @pytest.mark.asyncio
+    async def test_business_event(
+        self,
+        internal_user_id: UserId,
+        saved_feed_id: FeedId,
+        in_collection: bool,
+        collection_id_for_test_feeds: CollectionId,
+    ) -> None:
+        if in_collection:
+            await collections.add_test_feed_to_collections(collection_id_for_test_feeds, saved_feed_id)
+
+        with capture_logs() as logs:
+            await add_links(internal_user_id, [saved_feed_id])
+
+        assert_logs_has_business_event(
+            logs, "feed_linked", user_id=internal_user_id, feed_id=str(saved_feed_id), in_collection=in_collection
+        )
+
+    @pytest.mark.asyncio
+    async def test_existed_and_duplicated_links(
+        self, internal_user_id: UserId, another_internal_user_id: UserId, five_saved_feed_ids: list[FeedId]
+    ) -> None:
+        f = five_saved_feed_ids
+
+        await add_link(internal_user_id, f[0])
+
+        async with TableSizeDelta("fl_links", delta=3):
+            await add_links(internal_user_id, [f[0], f[1], f[2], f[1]])
+            await add_links(another_internal_user_id, [f[1]])
+
+        links = await get_linked_feeds(internal_user_id)
+
+        assert {link.feed_id for link in links} == {f[0], f[1], f[2]}
+
+        another_links = await get_linked_feeds(another_internal_user_id)
+
+        assert {link.feed_id for link in another_links} == {f[1]}
+
+
 class TestRemoveLink:
 
     @pytest.mark.parametrize("in_collection", [True, False])
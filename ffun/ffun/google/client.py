@@ -20,11 +20,16 @@ _safety_categories = [
 
 
 class Client:
-    __slots__ = ("_api_key", "entry_point", "model")
+    __slots__ = ("_api_key", "entry_point", "model", "_http_client")
 
     def __init__(self, api_key: str, entry_point: str = settings.gemini_api_entry_point) -> None:
         self._api_key = api_key
         self.entry_point = entry_point
+        # client is reused between requests to keep connections alive
+        self._http_client = http.client(headers={"Content-Type": "application/json"})
+
+    async def close(self) -> None:
+        await self._http_client.aclose()
 
     @contextlib.contextmanager
     def _handle_network_errors(self) -> Generator[None, None, None]:
@@ -77,8 +82,6 @@ class Client:
         timeout: float = settings.gemini_api_timeout,
     ) -> GoogleChatResponse:
 
-        headers = {"Content-Type": "application/json"}
-
         url = f"{self.entry_point}/models/{model}:generateContent?key={self._api_key}"
 
         http_request = {
@@ -89,8 +92,7 @@ class Client:
         }
 
         with self._handle_network_errors():
-            async with http.client(headers=headers, timeout=timeout) as client:
-                response = await client.post(url, json=http_request)
+            response = await self._http_client.post(url, json=http_request, timeout=timeout)
 
         self._handle_response_status_errors(response)
 
@@ -122,13 +124,10 @@ class Client:
         )
 
     async def list_models(self, timeout: float = settings.gemini_api_timeout) -> list[dict[str, object]]:
-        headers = {"Content-Type": "application/json"}
-
         url = f"{self.entry_point}/models?key={self._api_key}"
 
         with self._handle_network_errors():
-            async with http.client(headers=headers, timeout=timeout) as client:
-                response = await client.get(url)
+            response = await self._http_client.get(url, timeout=timeout)
 
         self._handle_response_status_errors(response)
 
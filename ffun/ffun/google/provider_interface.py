@@ -1,13 +1,15 @@
 import contextlib
-from typing import Generator, Sequence
+from typing import Callable, Generator, Sequence
 
 from ffun.core import logging
+from ffun.core.clients_cache import ClientsCache
 from ffun.google import errors
 from ffun.google.client import Client
 from ffun.google.entities import ChatMessage, GenerationConfig, GoogleChatRequest, GoogleChatResponse
+from ffun.google.settings import settings
 from ffun.llms_framework import domain as llmsf_domain
 from ffun.llms_framework import errors as llmsf_errors
-from ffun.llms_framework.entities import KeyStatus, LLMConfiguration, LLMProvider
+from ffun.llms_framework.entities import KeyStatus, LLMConfiguration, LLMProvider, LLMTokens
 from ffun.llms_framework.keys_statuses import Statuses
 from ffun.llms_framework.provider_interface import ProviderInterface
 
@@ -24,6 +26,14 @@ logger = logging.get_module_logger()
 #       Maybe, we could move flags: for_collections, for_users, for_all to the configuration of all tag processors?
 
 
+def _client(api_key: str) -> Client:
+    return Client(api_key=api_key)
+
+
+async def _close_client(client: Client) -> None:
+    await client.close()
+
+
 @contextlib.contextmanager
 def track_key_status(key: str, statuses: Statuses) -> Generator[None, None, None]:
     try:
@@ -50,6 +60,15 @@ def track_key_status(key: str, statuses: Statuses) -> Generator[None, None, None
 class GoogleInterface(ProviderInterface):
     provider = LLMProvider.google
 
+    def __init__(self) -> None:
+        super().__init__()
+        self._clients = ClientsCache(
+            name="google", max_size=settings.gemini_api_clients_cache_size, create=_client, close=_close_client
+        )
+
+    async def close(self) -> None:
+        await self._clients.close()
+
     def estimate_tokens(self, config: LLMConfiguration, text: str) -> int:
         # There are multiple ways to count tokens for Gemini:
         # 1. Use vertextai lib to count tokens locally.
@@ -61,15 +80,36 @@ class GoogleInterface(ProviderInterface):
         #    Because the context windows of Gemini models are big
         #    this approach looks ok for start.
 
+        return self._estimate_tokens_for_length(len(text))
+
+    def _estimate_tokens_for_length(self, length: int) -> int:
         # Coefficient was chosen according to ChatGPT's recommendations :-)
-        return int(len(text) * 1.8)
+        return int(length * 1.8)
+
+    def text_tokens_counter(self, config: LLMConfiguration, text: str) -> Callable[[int, int], int]:
+
+        def count(start: int, end: int) -> int:
+            return self._estimate_tokens_for_length(end - start)
+
+        return count
+
+    def cut_text_to_max_tokens(self, config: LLMConfiguration, text: str, max_tokens: LLMTokens) -> str:
+        # estimation depends only on the text length => we can find the border without probing text prefixes
+        border = int(max_tokens / 1.8)
+
+        # fix possible float rounding errors
+        while border > 0 and self._estimate_tokens_for_length(border) > max_tokens:
+            border -= 1
+
+        while border < len(text) and self._estimate_tokens_for_length(border + 1) <= max_tokens:
+            border += 1
+
+        return text[:border]
 
     async def chat_request(  # type: ignore
         self, config: LLMConfiguration, api_key: str, request: GoogleChatRequest
     ) -> GoogleChatResponse:
 
-        client = Client(api_key=api_key)
-
         generation_config = GenerationConfig(
             max_output_tokens=config.max_return_tokens,
             temperature=float(config.temperature) if config.temperature is not None else 0.0,
@@ -79,7 +119,10 @@ class GoogleInterface(ProviderInterface):
 
         try:
             with track_key_status(api_key, self.api_keys_statuses):
-                answer = await client.generate_content(model=config.model, request=request, config=generation_config)
+                async with self._clients.use(api_key) as client:
+                    answer = await client.generate_content(
+                        model=config.model, request=request, config=generation_config
+                    )
 
         except (errors.AuthError, errors.QuotaError) as e:
             message = str(e)
@@ -114,11 +157,10 @@ class GoogleInterface(ProviderInterface):
         return requests
 
     async def check_api_key(self, config: LLMConfiguration, api_key: str) -> KeyStatus:
-        client = Client(api_key=api_key)
-
         try:
             with track_key_status(api_key, self.api_keys_statuses):
-                await client.list_models()
+                async with self._clients.use(api_key) as client:
+                    await client.list_models()
         except errors.ClientError:
             pass
 
@@ -11,6 +11,7 @@ class Settings(BaseSettings):
 
     gemini_api_entry_point: str = "https://generativelanguage.googleapis.com/v1beta"
     gemini_api_timeout: float = 20.0
+    gemini_api_clients_cache_size: int = 100
 
     model_config = pydantic_settings.SettingsConfigDict(env_prefix="FFUN_GOOGLE_")
 
@@ -9,6 +9,7 @@ from ffun.google.provider_interface import GoogleInterface, track_key_status
 from ffun.llms_framework import errors as llmsf_errors
 from ffun.llms_framework.entities import KeyStatus, LLMConfiguration, LLMTokens
 from ffun.llms_framework.keys_statuses import Statuses
+from ffun.llms_framework.provider_interface import ProviderInterface
 
 
 class TestTrackKeyStatus:
@@ -84,3 +85,25 @@ class TestGoogleInterface:
                     system=ChatMessage(text="system prompt"), messages=[ChatMessage(role="user", text="user prompt")]
                 ),
             )
+
+    @pytest.mark.parametrize("max_tokens", [1, 2, 3, 4, 17, 100, 1000, 10_000])
+    def test_cut_text_to_max_tokens(self, llm_config: LLMConfiguration, max_tokens: int) -> None:
+        interface = GoogleInterface()
+
+        text = "some text " * 100
+
+        assert interface.cut_text_to_max_tokens(
+            llm_config, text=text, max_tokens=LLMTokens(max_tokens)
+        ) == ProviderInterface.cut_text_to_max_tokens(
+            interface, llm_config, text=text, max_tokens=LLMTokens(max_tokens)
+        )
+
+    def test_text_tokens_counter(self, llm_config: LLMConfiguration) -> None:
+        interface = GoogleInterface()
+
+        text = "some text " * 100
+
+        count = interface.text_tokens_counter(llm_config, text)
+
+        for start, end in [(0, len(text)), (0, 10), (17, 131), (500, len(text))]:
+            assert count(start, end) == interface.estimate_tokens(llm_config, text=text[start:end])
@@ -11,6 +11,7 @@ from ffun.integrations.plugin import Plugin
 
 
 class Integration(BaseSettings):
+    # sources are validated on the start of a process => a wrong configuration is found as early as possible
     sources: list[SourceUidField]
     plugin: str
     extras: dict[str, str] = pydantic.Field(default_factory=dict)
@@ -19,6 +20,10 @@ class Integration(BaseSettings):
     def plugin_instance(self) -> Plugin:
         return build_plugin(Plugin, self.plugin, self.extras)
 
+    @cached_property
+    def source_uids(self) -> frozenset[SourceUid]:
+        return frozenset(SourceUid(source) for source in self.sources)
+
 
 class Settings(BaseSettings):
 
@@ -56,7 +61,7 @@ class Settings(BaseSettings):
 
     def get_integration_by_source(self, source: SourceUid) -> Integration | None:
         for integration in self.integrations:
-            if source in integration.sources:
+            if source in integration.source_uids:
                 return integration
 
         return None
@@ -0,0 +1,30 @@
+import pydantic
+import pytest
+
+from ffun.domain.entities import SourceUid
+from ffun.integrations.settings import Integration, Settings
+
+
+class TestIntegration:
+    def test_source_uids(self) -> None:
+        integration = Integration(
+            sources=["reddit.com", "https://old.reddit.com/r/feedsfun/", "rss.arxiv.org"], plugin="fake:plugin"
+        )
+
+        assert integration.source_uids == {SourceUid("reddit.com"), SourceUid("rss.arxiv.org")}
+
+    def test_wrong_source(self) -> None:
+        with pytest.raises(pydantic.ValidationError, match="Invalid URL for source uid"):
+            Integration(sources=["wrong source"], plugin="fake:plugin")
+
+
+class TestSettings:
+    def test_get_integration_by_source(self) -> None:
+        reddit = Integration(sources=["https://www.reddit.com"], plugin="fake:plugin")
+        github = Integration(sources=["github.com"], plugin="fake:plugin")
+
+        settings = Settings(integrations=[reddit, github])
+
+        assert settings.get_integration_by_source(SourceUid("reddit.com")) is reddit
+        assert settings.get_integration_by_source(SourceUid("github.com")) is github
+        assert settings.get_integration_by_source(SourceUid("example.com")) is None
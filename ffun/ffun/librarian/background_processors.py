@@ -1,4 +1,5 @@
 import asyncio
+import functools
 
 from ffun.core import logging
 from ffun.core.background_tasks import InfiniteTask
@@ -7,7 +8,7 @@ from ffun.dispatcher.background_dispatcher import EntriesDispatcher
 from ffun.dispatcher.entities import EntryToTag, ProcessorDispatchInfo, ProcessorDispatchRoute, ProcessorRouteId
 from ffun.domain.entities import EntryId, ProcessorId
 from ffun.librarian import domain
-from ffun.librarian.entities import ProcessorType
+from ffun.librarian.entities import ProcessorType, TagProcessor
 from ffun.librarian.processors.base import Processor, ProcessorContext
 from ffun.librarian.processors.domain import Processor as DomainProcessor
 from ffun.librarian.processors.llm_general import Processor as LLMGeneralProcessor
@@ -57,27 +58,19 @@ class ProcessorInfo:
         )
 
 
-processors: list[ProcessorInfo] = []
-
+def _create_processor(processor_config: TagProcessor) -> Processor:
+    if processor_config.type == ProcessorType.domain:
+        return DomainProcessor(name=processor_config.name)
 
-for processor_config in settings.tag_processors:
-    if not processor_config.enabled:
-        logger.info(
-            "tag_processor_is_disabled", processor_id=processor_config.id, processor_name=processor_config.name
-        )
-        continue
+    if processor_config.type == ProcessorType.native_tags:
+        return NativeTagsProcessor(name=processor_config.name)
 
-    logger.info("add_tag_processor", processor_id=processor_config.id, processor_name=processor_config.name)
+    if processor_config.type == ProcessorType.upper_case_title:
+        return UpperCaseTitleProcessor(name=processor_config.name)
 
-    tags_processor: Processor
-    if processor_config.type == ProcessorType.domain:
-        tags_processor = DomainProcessor(name=processor_config.name)
-    elif processor_config.type == ProcessorType.native_tags:
-        tags_processor = NativeTagsProcessor(name=processor_config.name)
-    elif processor_config.type == ProcessorType.upper_case_title:
-        tags_processor = UpperCaseTitleProcessor(name=processor_config.name)
-    elif processor_config.type == ProcessorType.llm_general:
-        tags_processor = LLMGeneralProcessor(
+    if processor_config.type == ProcessorType.llm_general:
+        return LLMGeneralProcessor(
+            processor_id=processor_config.id,
             name=processor_config.name,
             entry_template=processor_config.entry_template,
             text_cleaner=processor_config.text_cleaner,
@@ -88,19 +81,37 @@ for processor_config in settings.tag_processors:
             text_parts_intersection=processor_config.text_parts_intersection,
             routes=processor_config.routes,
         )
-    else:
-        raise NotImplementedError(f"Unknown processor type: {processor_config.type}")
-
-    processor = ProcessorInfo(
-        id=processor_config.id,
-        type=processor_config.type,
-        processor=tags_processor,
-        concurrency=processor_config.workers,
-        routes=processor_config.dispatch_routes(),
-        quality_route_id=processor_config.quality_route_id,
-    )
 
-    processors.append(processor)
+    raise NotImplementedError(f"Unknown processor type: {processor_config.type}")
+
+
+# Processors are created on the first access, so modules that only import this one
+# (CLI commands, API) do not pay for parsing of the processors' configs.
+@functools.cache  # type: ignore
+def get_processors() -> list[ProcessorInfo]:
+    processors: list[ProcessorInfo] = []
+
+    for processor_config in settings.tag_processors:
+        if not processor_config.enabled:
+            logger.info(
+                "tag_processor_is_disabled", processor_id=processor_config.id, processor_name=processor_config.name
+            )
+            continue
+
+        logger.info("add_tag_processor", processor_id=processor_config.id, processor_name=processor_config.name)
+
+        processor = ProcessorInfo(
+            id=processor_config.id,
+            type=processor_config.type,
+            processor=_create_processor(processor_config),
+            concurrency=processor_config.workers,
+            routes=processor_config.dispatch_routes(),
+            quality_route_id=processor_config.quality_route_id,
+        )
+
+        processors.append(processor)
+
+    return processors
 
 
 class EntriesProcessor(InfiniteTask):
@@ -213,7 +224,26 @@ class EntriesProcessor(InfiniteTask):
         await d_domain.acknowledge([record.id for record in records if record.id is not None])
 
 
+class BatchesProcessor(InfiniteTask):
+    """Submits entries from batch routes of a processor as batch jobs and applies results of finished jobs."""
+
+    __slots__ = ("_processor_info",)
+
+    def __init__(self, processor_info: ProcessorInfo, **kwargs: object) -> None:
+        super().__init__(**kwargs)  # type: ignore
+        self._processor_info = processor_info
+
+    async def single_run(self) -> None:
+        processor_id = self._processor_info.id
+        processor = self._processor_info.processor
+
+        await domain.submit_batches(processor_id=processor_id, processor=processor)
+        await domain.process_batches_results(processor_id=processor_id, processor=processor)
+
+
 def create_background_processors() -> list[InfiniteTask]:
+    processors = get_processors()
+
     if not processors:
         return []
 
@@ -236,4 +266,13 @@ def create_background_processors() -> list[InfiniteTask]:
             )
         )
 
+        if processor_info.processor.uses_batches:
+            background_processors.append(
+                BatchesProcessor(
+                    processor_info=processor_info,
+                    name=f"batches_processor_{processor_info.processor.name}",
+                    delay_between_runs=settings.batches_check_interval.total_seconds(),
+                )
+            )
+
     return background_processors
@@ -1,12 +1,16 @@
-from ffun.core import logging, metrics
+from ffun.core import logging, metrics, utils
 from ffun.dispatcher import domain as d_domain
-from ffun.dispatcher.entities import EntryProcessingStatus
-from ffun.domain.entities import ProcessorId
-from ffun.librarian import errors
+from ffun.dispatcher.entities import EntryProcessingStatus, ProcessorRouteId
+from ffun.domain.entities import EntryId, ProcessorId
+from ffun.librarian import errors, operations
+from ffun.librarian.entities import BatchEntry
 from ffun.librarian.processors.base import Processor, ProcessorContext
 from ffun.librarian.settings import settings
+from ffun.library import domain as l_domain
 from ffun.library.entities import Entry
+from ffun.llms_framework.entities import LLMBatchId
 from ffun.ontology import domain as o_domain
+from ffun.ontology.entities import RawTag
 from ffun.tags import domain as t_domain
 
 logger = logging.get_module_logger()
@@ -31,6 +35,41 @@ def accumulator(event: str, processor_id: ProcessorId) -> metrics.Accumulator:
     return accumulator
 
 
+async def clean_llm_responses_cache() -> None:
+    removed_by_age = await operations.remove_cached_llm_responses_older_than(
+        utils.now() - settings.llm_responses_cache_retention
+    )
+
+    removed_by_size = await operations.remove_cached_llm_responses_over_limit(settings.llm_responses_cache_max_records)
+
+    logger.info("llm_responses_cache_cleaned", removed_by_age=removed_by_age, removed_by_size=removed_by_size)
+
+
+async def _apply_raw_tags(processor_id: ProcessorId, entry_id: EntryId, raw_tags: list[RawTag]) -> None:
+    raw_tags_metric = accumulator("processor_raw_tags", processor_id)
+    normalized_tags_metric = accumulator("processor_normalized_tags", processor_id)
+
+    raw_tags_for_log = set(tag.raw_uid for tag in raw_tags)
+
+    raw_tags_metric.measure(len(raw_tags))
+
+    norm_tags = await t_domain.normalize(raw_tags)
+
+    tags_for_log = {tag.uid for tag in norm_tags}
+
+    logger.info(
+        "tags_found",
+        tags=sorted(tags_for_log),  # type: ignore
+        lost=raw_tags_for_log - tags_for_log,
+        added=tags_for_log - raw_tags_for_log,  # type: ignore
+    )
+
+    normalized_tags_metric.measure(len(norm_tags))
+
+    await o_domain.apply_tags_to_entry(entry_id, processor_id, norm_tags)
+    await d_domain.set_entry_processing_statuses(processor_id, [entry_id], EntryProcessingStatus.processed)
+
+
 @logging.async_args_to_log("processor.name", "entry.id")
 async def process_entry(
     processor_id: ProcessorId,
@@ -38,35 +77,26 @@ async def process_entry(
     entry: Entry,
     context: ProcessorContext,
 ) -> None:
-    logger.info("dicover_tags", route_id=context.route_id)
+    logger.sampled_info("dicover_tags", route_id=context.route_id)
 
     raw_tags_metric = accumulator("processor_raw_tags", processor_id)
     normalized_tags_metric = accumulator("processor_normalized_tags", processor_id)
 
     try:
-        raw_tags = await processor.process(entry, context=context)
+        if processor.processes_in_batches(context):
+            raw_tags = await processor.cached_tags(entry, context=context)
 
-        raw_tags_for_log = set(tag.raw_uid for tag in raw_tags)
-
-        raw_tags_metric.measure(len(raw_tags))
-
-        norm_tags = await t_domain.normalize(raw_tags)
-
-        tags_for_log = {tag.uid for tag in norm_tags}
-
-        logger.info(
-            "tags_found",
-            tags=sorted(tags_for_log),  # type: ignore
-            lost=raw_tags_for_log - tags_for_log,
-            added=tags_for_log - raw_tags_for_log,  # type: ignore
-        )
+            if raw_tags is None:
+                # entry keeps the dispatched status till its batch job is finished
+                await operations.add_batch_entries(processor_id, context.route_id, [entry.id])
+                logger.sampled_info("entry_added_to_batch")
+                return
+        else:
+            raw_tags = await processor.process(entry, context=context)
 
-        normalized_tags_metric.measure(len(norm_tags))
+        await _apply_raw_tags(processor_id, entry.id, raw_tags)
 
-        await o_domain.apply_tags_to_entry(entry.id, processor_id, norm_tags)
-        await d_domain.set_entry_processing_statuses(processor_id, [entry.id], EntryProcessingStatus.processed)
-
-        logger.info("processor_successed")
+        logger.sampled_info("processor_successed")
     except errors.SkipEntryProcessing as e:
         logger.warning("processor_requested_to_skip_entry", error_info=str(e))
         await d_domain.set_entry_processing_statuses(
@@ -84,4 +114,166 @@ async def process_entry(
         raw_tags_metric.flush_if_time()
         normalized_tags_metric.flush_if_time()
 
-    logger.info("entry_processed")
+    logger.sampled_info("entry_processed")
+
+
+def _group_by_route(batch_entries: list[BatchEntry]) -> dict[ProcessorRouteId, list[BatchEntry]]:
+    groups: dict[ProcessorRouteId, list[BatchEntry]] = {}
+
+    for batch_entry in batch_entries:
+        groups.setdefault(batch_entry.route_id, []).append(batch_entry)
+
+    return groups
+
+
+def _group_by_batch(batch_entries: list[BatchEntry]) -> dict[LLMBatchId, list[BatchEntry]]:
+    groups: dict[LLMBatchId, list[BatchEntry]] = {}
+
+    for batch_entry in batch_entries:
+        assert batch_entry.batch_id is not None
+        groups.setdefault(batch_entry.batch_id, []).append(batch_entry)
+
+    return groups
+
+
+def _batch_is_ready(batch_entries: list[BatchEntry]) -> bool:
+    if len(batch_entries) >= settings.batch_min_entries:
+        return True
+
+    oldest_created_at = min(batch_entry.created_at for batch_entry in batch_entries)
+
+    return oldest_created_at + settings.batch_max_waiting_time <= utils.now()
+
+
+def _batch_is_too_old(batch_entries: list[BatchEntry]) -> bool:
+    oldest_created_at = min(batch_entry.created_at for batch_entry in batch_entries)
+
+    return oldest_created_at + settings.batch_max_age <= utils.now()
+
+
+async def _drop_batch_entries(
+    processor_id: ProcessorId, entry_ids: list[EntryId], status: EntryProcessingStatus
+) -> None:
+    await d_domain.set_entry_processing_statuses(processor_id, entry_ids, status)
+    await operations.remove_batch_entries(processor_id, entry_ids)
+
+
+async def _submit_route_batch(
+    processor_id: ProcessorId, processor: Processor, route_id: ProcessorRouteId, route_entries: list[BatchEntry]
+) -> None:
+    entry_ids = [batch_entry.entry_id for batch_entry in route_entries]
+
+    entries = await l_domain.get_entries_by_ids(entry_ids)
+
+    entries_to_submit = [entry for entry in entries.values() if entry is not None]
+
+    # entries may be removed while they were waiting for a batch
+    removed_entry_ids = [entry_id for entry_id, entry in entries.items() if entry is None]
+
+    await operations.remove_batch_entries(processor_id, removed_entry_ids)
+
+    if not entries_to_submit:
+        return
+
+    context = ProcessorContext(route_id=route_id)
+
+    try:
+        batch_id, requests_numbers = await processor.submit_batch(entries_to_submit, context=context)
+    except errors.TemporaryErrorInProcessor as e:
+        # entries stay in the table and will be submitted on the next run
+        logger.info("batch_submission_temporary_error", route_id=route_id, error_info=str(e))
+        return
+
+    # otherwise, rejected entries will be at the head of the queue forever
+    rejected_entry_ids = [entry.id for entry in entries_to_submit if entry.id not in requests_numbers]
+
+    if rejected_entry_ids:
+        logger.info("batch_entries_rejected", route_id=route_id, entries_number=len(rejected_entry_ids))
+        await _drop_batch_entries(processor_id, rejected_entry_ids, EntryProcessingStatus.failed)
+
+    if batch_id is None:
+        return
+
+    await operations.mark_batch_entries_submitted(processor_id, batch_id, requests_numbers)
+
+    logger.info("batch_submitted", route_id=route_id, batch_id=batch_id, entries_number=len(requests_numbers))
+
+
+@logging.async_args_to_log("processor_id")
+async def submit_batches(processor_id: ProcessorId, processor: Processor) -> None:
+    batch_entries = await operations.get_unsubmitted_batch_entries(processor_id, limit=settings.batch_max_entries)
+
+    for route_id, route_entries in _group_by_route(batch_entries).items():
+        if not _batch_is_ready(route_entries):
+            continue
+
+        await _submit_route_batch(processor_id, processor, route_id, route_entries)
+
+
+async def _apply_batch_tags(
+    processor_id: ProcessorId, batch_id: LLMBatchId, entry_ids: list[EntryId], tags: dict[EntryId, list[RawTag]]
+) -> None:
+    # entries may be removed while their batch job was running
+    existing_entries = await l_domain.get_entries_by_ids(entry_ids)
+
+    for entry_id in entry_ids:
+        if existing_entries.get(entry_id) is None:
+            continue
+
+        if entry_id not in tags:
+            logger.info("batch_entry_failed", batch_id=batch_id, entry_id=entry_id)
+            await d_domain.set_entry_processing_statuses(processor_id, [entry_id], EntryProcessingStatus.failed)
+            continue
+
+        try:
+            await _apply_raw_tags(processor_id, entry_id, tags[entry_id])
+        except Exception:
+            logger.exception("batch_entry_processing_failed", batch_id=batch_id, entry_id=entry_id)
+            await d_domain.set_entry_processing_statuses(processor_id, [entry_id], EntryProcessingStatus.failed)
+
+    accumulator("processor_raw_tags", processor_id).flush_if_time()
+    accumulator("processor_normalized_tags", processor_id).flush_if_time()
+
+
+async def _process_batch_results(
+    processor_id: ProcessorId, processor: Processor, batch_id: LLMBatchId, entries_in_batch: list[BatchEntry]
+) -> None:
+    context = ProcessorContext(route_id=entries_in_batch[0].route_id)
+
+    requests_numbers = {batch_entry.entry_id: batch_entry.requests_number or 0 for batch_entry in entries_in_batch}
+
+    entry_ids = list(requests_numbers)
+
+    try:
+        tags = await processor.batch_results(batch_id, requests_numbers, context=context)
+    except errors.TemporaryErrorInProcessor as e:
+        if not _batch_is_too_old(entries_in_batch):
+            # the job may be finished already => check it again on the next run
+            logger.info("batch_results_temporary_error", batch_id=batch_id, error_info=str(e))
+            return
+
+        logger.info("batch_is_too_old", batch_id=batch_id, error_info=str(e))
+        await _drop_batch_entries(processor_id, entry_ids, EntryProcessingStatus.failed)
+        return
+    except errors.BatchFailedInProcessor as e:
+        logger.info("batch_failed", batch_id=batch_id, error_info=str(e))
+        await _drop_batch_entries(processor_id, entry_ids, EntryProcessingStatus.failed)
+        return
+
+    if tags is None:
+        logger.info("batch_is_not_finished", batch_id=batch_id)
+        return
+
+    await _apply_batch_tags(processor_id, batch_id, entry_ids, tags)
+
+    await operations.remove_batch_entries(processor_id, entry_ids)
+
+    logger.info("batch_processed", batch_id=batch_id, entries_number=len(entry_ids))
+
+
+@logging.async_args_to_log("processor_id")
+async def process_batches_results(processor_id: ProcessorId, processor: Processor) -> None:
+    batch_entries = await operations.get_submitted_batch_entries(processor_id)
+
+    for batch_id, entries_in_batch in _group_by_batch(batch_entries).items():
+        await _process_batch_results(processor_id, processor, batch_id, entries_in_batch)
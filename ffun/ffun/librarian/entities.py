@@ -1,3 +1,4 @@
+import datetime
 import enum
 from typing import TYPE_CHECKING, Annotated, Literal, Protocol
 
@@ -7,9 +8,10 @@ from pydantic_core import PydanticCustomError
 from ffun.core import logging
 from ffun.core.entities import BaseEntity
 from ffun.dispatcher.entities import ProcessorDispatchRoute, ProcessorRouteId
-from ffun.domain.entities import LLMTokens, ProcessorId
+from ffun.domain.entities import EntryId, LLMTokens, ProcessorId
 from ffun.llms_framework.entities import (
     LLMApiKey,
+    LLMBatchId,
     LLMConfiguration,
     LLMProvider,
 )
@@ -96,6 +98,10 @@ class UpperCaseTitleProcessor(BaseProcessor):
 class LLMGeneralProcessorRoute(ProcessorRoute):
     api_key: LLMApiKey | None = None
 
+    # Submit requests as provider batch jobs instead of calling LLM for every entry.
+    # Batch jobs are cheaper but may take hours to complete => use them only when nobody waits for tags.
+    batch: bool = False
+
     @pydantic.model_validator(mode="before")
     @classmethod
     def api_key_none(cls, data: dict[str, object]) -> object:
@@ -116,6 +122,17 @@ class LLMGeneralProcessorRoute(ProcessorRoute):
 
         return self
 
+    @pydantic.model_validator(mode="after")
+    def require_api_key_for_batches(self) -> "LLMGeneralProcessorRoute":
+        if self.batch and self.api_key is None:
+            raise PydanticCustomError(
+                "api_key_required_for_batches",
+                "API key must be set on routes that process entries in batches. "
+                "Batches are processed with a single key, so they can not be paid by users.",
+            )
+
+        return self
+
 
 if TYPE_CHECKING:
     # TODO: fix after Pydantic learn how to process such parametrization at runtime
@@ -162,3 +179,12 @@ TagProcessor = Annotated[
 
 class ProcessorsConfig(pydantic.BaseModel):
     tag_processors: tuple[TagProcessor, ...]
+
+
+class BatchEntry(BaseEntity):
+    processor_id: ProcessorId
+    entry_id: EntryId
+    route_id: ProcessorRouteId
+    batch_id: LLMBatchId | None
+    requests_number: int | None
+    created_at: datetime.datetime
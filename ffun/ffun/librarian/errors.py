@@ -17,9 +17,17 @@ class CanNotSaveUnexistingPointer(Error):
     pass
 
 
+class BatchFailedInProcessor(Error):
+    pass
+
+
 class UnexpectedErrorInProcessor(Error):
     pass
 
 
 class UnknownProcessorRoute(Error):
     pass
+
+
+class ProviderDoesNotSupportBatches(Error):
+    pass
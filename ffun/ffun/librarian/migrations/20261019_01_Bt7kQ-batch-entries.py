@@ -0,0 +1,46 @@
+"""
+batch-entries
+"""
+
+from typing import Any
+
+from psycopg import Connection
+from yoyo import step
+
+__depends__ = {"20260513_03_c0DeX-drop-failed-entries"}
+
+
+sql_create_batch_entries = """
+CREATE TABLE ln_batch_entries (
+    processor_id INTEGER NOT NULL,
+    entry_id UUID NOT NULL,
+    route_id TEXT NOT NULL,
+    batch_id TEXT NULL,
+    requests_number INTEGER NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    submitted_at TIMESTAMP WITH TIME ZONE NULL,
+
+    PRIMARY KEY (processor_id, entry_id)
+)
+"""
+
+sql_create_batch_entries_index = """
+CREATE INDEX idx_ln_batch_entries_processor_id_batch_id_created_at
+ON ln_batch_entries (processor_id, batch_id, created_at)
+"""
+
+
+def apply_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute(sql_create_batch_entries)
+    cursor.execute(sql_create_batch_entries_index)
+
+
+def rollback_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute("DROP TABLE ln_batch_entries")
+
+
+steps = [step(apply_step, rollback_step)]
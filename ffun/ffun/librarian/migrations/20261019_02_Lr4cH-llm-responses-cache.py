@@ -0,0 +1,43 @@
+"""
+llm-responses-cache
+"""
+
+from typing import Any
+
+from psycopg import Connection
+from yoyo import step
+
+__depends__ = {"20261019_01_Bt7kQ-batch-entries"}
+
+
+sql_create_llm_responses_cache = """
+CREATE TABLE ln_llm_responses_cache (
+    processor_id INTEGER NOT NULL,
+    config_hash TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    contents JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (processor_id, config_hash, text_hash)
+)
+"""
+
+sql_create_llm_responses_cache_index = """
+CREATE INDEX idx_ln_llm_responses_cache_created_at ON ln_llm_responses_cache (created_at)
+"""
+
+
+def apply_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute(sql_create_llm_responses_cache)
+    cursor.execute(sql_create_llm_responses_cache_index)
+
+
+def rollback_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute("DROP TABLE ln_llm_responses_cache")
+
+
+steps = [step(apply_step, rollback_step)]
@@ -0,0 +1,186 @@
+import datetime
+from collections.abc import Iterable
+from typing import Any
+
+from psycopg.types.json import Jsonb
+
+from ffun.core.postgresql import execute
+from ffun.dispatcher.entities import ProcessorRouteId
+from ffun.domain.entities import EntryId, ProcessorId
+from ffun.librarian.entities import BatchEntry
+from ffun.llms_framework.entities import LLMBatchId
+
+
+def row_to_batch_entry(row: dict[str, Any]) -> BatchEntry:
+    return BatchEntry(
+        processor_id=row["processor_id"],
+        entry_id=row["entry_id"],
+        route_id=row["route_id"],
+        batch_id=row["batch_id"],
+        requests_number=row["requests_number"],
+        created_at=row["created_at"],
+    )
+
+
+async def add_batch_entries(
+    processor_id: ProcessorId, route_id: ProcessorRouteId, entry_ids: Iterable[EntryId]
+) -> None:
+    ids = list(dict.fromkeys(entry_ids))
+
+    if not ids:
+        return
+
+    sql = """
+    INSERT INTO ln_batch_entries (processor_id, entry_id, route_id)
+    SELECT %(processor_id)s, unnest(%(entry_ids)s::uuid[]), %(route_id)s
+    ON CONFLICT (processor_id, entry_id) DO NOTHING
+    """
+
+    await execute(sql, {"processor_id": processor_id, "entry_ids": ids, "route_id": route_id})
+
+
+async def get_unsubmitted_batch_entries(processor_id: ProcessorId, limit: int) -> list[BatchEntry]:
+    sql = """
+    SELECT *
+    FROM ln_batch_entries
+    WHERE processor_id = %(processor_id)s
+      AND batch_id IS NULL
+    ORDER BY created_at ASC, entry_id ASC
+    LIMIT %(limit)s
+    """
+
+    rows = await execute(sql, {"processor_id": processor_id, "limit": limit})
+
+    return [row_to_batch_entry(row) for row in rows]
+
+
+async def get_submitted_batch_entries(processor_id: ProcessorId) -> list[BatchEntry]:
+    sql = """
+    SELECT *
+    FROM ln_batch_entries
+    WHERE processor_id = %(processor_id)s
+      AND batch_id IS NOT NULL
+    ORDER BY created_at ASC, entry_id ASC
+    """
+
+    rows = await execute(sql, {"processor_id": processor_id})
+
+    return [row_to_batch_entry(row) for row in rows]
+
+
+async def mark_batch_entries_submitted(
+    processor_id: ProcessorId, batch_id: LLMBatchId, requests_numbers: dict[EntryId, int]
+) -> None:
+    if not requests_numbers:
+        return
+
+    sql = """
+    WITH submitted AS (
+        SELECT unnest(%(entry_ids)s::uuid[]) AS entry_id,
+               unnest(%(requests_numbers)s::integer[]) AS requests_number
+    )
+    UPDATE ln_batch_entries AS be
+    SET batch_id = %(batch_id)s,
+        requests_number = submitted.requests_number,
+        submitted_at = CURRENT_TIMESTAMP
+    FROM submitted
+    WHERE be.processor_id = %(processor_id)s
+      AND be.entry_id = submitted.entry_id
+    """
+
+    await execute(
+        sql,
+        {
+            "processor_id": processor_id,
+            "batch_id": batch_id,
+            "entry_ids": list(requests_numbers.keys()),
+            "requests_numbers": list(requests_numbers.values()),
+        },
+    )
+
+
+async def remove_batch_entries(processor_id: ProcessorId, entry_ids: Iterable[EntryId]) -> None:
+    ids = list(dict.fromkeys(entry_ids))
+
+    if not ids:
+        return
+
+    sql = """
+    DELETE FROM ln_batch_entries
+    WHERE processor_id = %(processor_id)s
+      AND entry_id = ANY(%(entry_ids)s)
+    """
+
+    await execute(sql, {"processor_id": processor_id, "entry_ids": ids})
+
+
+async def get_cached_llm_responses(processor_id: ProcessorId, config_hash: str, text_hash: str) -> list[str] | None:
+    sql = """
+    SELECT contents
+    FROM ln_llm_responses_cache
+    WHERE processor_id = %(processor_id)s
+      AND config_hash = %(config_hash)s
+      AND text_hash = %(text_hash)s
+    """
+
+    rows = await execute(sql, {"processor_id": processor_id, "config_hash": config_hash, "text_hash": text_hash})
+
+    if not rows:
+        return None
+
+    return list(rows[0]["contents"])
+
+
+async def cache_llm_responses(
+    processor_id: ProcessorId, config_hash: str, text_hash: str, contents: list[str]
+) -> None:
+    sql = """
+    INSERT INTO ln_llm_responses_cache (processor_id, config_hash, text_hash, contents)
+    VALUES (%(processor_id)s, %(config_hash)s, %(text_hash)s, %(contents)s)
+    ON CONFLICT (processor_id, config_hash, text_hash) DO UPDATE SET
+        contents = EXCLUDED.contents,
+        created_at = CURRENT_TIMESTAMP
+    """
+
+    await execute(
+        sql,
+        {
+            "processor_id": processor_id,
+            "config_hash": config_hash,
+            "text_hash": text_hash,
+            "contents": Jsonb(contents),
+        },
+    )
+
+
+async def remove_cached_llm_responses_older_than(border: datetime.datetime) -> int:
+    sql = """
+    DELETE FROM ln_llm_responses_cache
+    WHERE created_at < %(border)s
+    RETURNING 1
+    """
+
+    rows = await execute(sql, {"border": border})
+
+    return len(rows)
+
+
+async def remove_cached_llm_responses_over_limit(max_records: int) -> int:
+    sql = """
+    WITH excess AS (
+        SELECT processor_id, config_hash, text_hash
+        FROM ln_llm_responses_cache
+        ORDER BY created_at DESC
+        OFFSET %(max_records)s
+    )
+    DELETE FROM ln_llm_responses_cache AS c
+    USING excess
+    WHERE c.processor_id = excess.processor_id
+      AND c.config_hash = excess.config_hash
+      AND c.text_hash = excess.text_hash
+    RETURNING 1
+    """
+
+    rows = await execute(sql, {"max_records": max_records})
+
+    return len(rows)
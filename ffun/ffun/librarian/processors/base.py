@@ -1,7 +1,11 @@
+from typing import Sequence
+
 from ffun.core.entities import BaseEntity
 from ffun.dispatcher.entities import ProcessorRouteId
+from ffun.domain.entities import EntryId
 from ffun.librarian import errors
 from ffun.library.entities import Entry
+from ffun.llms_framework.entities import LLMBatchId
 from ffun.ontology.entities import RawTag
 from ffun.tags.entities import TagCategory
 
@@ -23,6 +27,41 @@ class Processor:
     async def process(self, entry: Entry, context: ProcessorContext) -> list[RawTag]:
         raise NotImplementedError('You must implement "process" method in child class')
 
+    @property
+    def uses_batches(self) -> bool:
+        return False
+
+    def processes_in_batches(self, context: ProcessorContext) -> bool:
+        return False
+
+    async def cached_tags(self, entry: Entry, context: ProcessorContext) -> list[RawTag] | None:
+        """Return tags for the entry if they are known without processing it, for example, from a cache.
+
+        Used to skip batch jobs for such entries.
+        """
+        return None
+
+    async def submit_batch(
+        self, entries: Sequence[Entry], context: ProcessorContext
+    ) -> tuple[LLMBatchId | None, dict[EntryId, int]]:
+        """Submit entries as a batch job, return the batch id and the number of requests for every entry.
+
+        Entries, which can not be processed, are not returned; if there are no such entries, no job is submitted
+        and the batch id is None.
+        """
+        raise NotImplementedError('You must implement "submit_batch" method in child class')
+
+    async def batch_results(
+        self, batch_id: LLMBatchId, requests_numbers: dict[EntryId, int], context: ProcessorContext
+    ) -> dict[EntryId, list[RawTag]] | None:
+        """Return tags for entries of a finished batch job or None if the job is still running.
+
+        Entries, which requests failed, are not returned.
+        Raises `BatchFailedInProcessor` if the whole job failed
+        and `TemporaryErrorInProcessor` if the job state can not be checked now.
+        """
+        raise NotImplementedError('You must implement "batch_results" method in child class')
+
 
 ######################################
 # Some processors for testing purposes
@@ -40,6 +79,43 @@ class AlwaysConstantProcessor(Processor):
         return [RawTag(raw_uid=tag, categories={TagCategory.test_final}) for tag in self._tags]
 
 
+class AlwaysConstantBatchProcessor(AlwaysConstantProcessor):
+    """Processes all entries in batches, batch jobs are finished at the moment of submission."""
+
+    __slots__ = ("batches",)
+
+    def __init__(self, **kwargs: object):
+        super().__init__(**kwargs)  # type: ignore
+        self.batches: dict[LLMBatchId, dict[EntryId, int]] = {}
+
+    @property
+    def uses_batches(self) -> bool:
+        return True
+
+    def processes_in_batches(self, context: ProcessorContext) -> bool:
+        return True
+
+    async def submit_batch(
+        self, entries: Sequence[Entry], context: ProcessorContext
+    ) -> tuple[LLMBatchId | None, dict[EntryId, int]]:
+        batch_id = LLMBatchId(f"batch-{len(self.batches)}")
+
+        self.batches[batch_id] = {entry.id: 1 for entry in entries}
+
+        return batch_id, self.batches[batch_id]
+
+    async def batch_results(
+        self, batch_id: LLMBatchId, requests_numbers: dict[EntryId, int], context: ProcessorContext
+    ) -> dict[EntryId, list[RawTag]] | None:
+        if batch_id not in self.batches:
+            raise errors.BatchFailedInProcessor(message="unknown batch")
+
+        return {
+            entry_id: [RawTag(raw_uid=tag, categories={TagCategory.test_final}) for tag in self._tags]
+            for entry_id in self.batches.pop(batch_id)
+        }
+
+
 class AlwaysSkipEntryProcessor(Processor):
     async def process(self, entry: Entry, context: ProcessorContext) -> list[RawTag]:
         raise errors.SkipEntryProcessing()
@@ -1,22 +1,30 @@
+import hashlib
 from typing import Any, Sequence
 
 from ffun.core import logging
-from ffun.domain.entities import LLMTokens
-from ffun.librarian import errors
+from ffun.domain.entities import EntryId, LLMTokens, ProcessorId
+from ffun.librarian import errors, operations
 from ffun.librarian.entities import LLMGeneralProcessorRoute, TagsExtractor, TextCleaner
 from ffun.librarian.processors import base
+from ffun.librarian.settings import settings
+from ffun.library import domain as l_domain
 from ffun.library.entities import Entry
 from ffun.llms_framework import errors as llmsf_errors
 from ffun.llms_framework.domain import (
     call_llm,
+    collect_llm_batch,
     configured_api_key_usage,
+    configured_batch_api_key_usage,
     cut_text_to_max_tokens,
     search_for_user_api_key,
+    submit_llm_batch,
 )
 from ffun.llms_framework.entities import (
     APIKeyUsage,
     ChatRequest,
     ChatResponse,
+    LLMApiKey,
+    LLMBatchId,
     LLMConfiguration,
     LLMProvider,
 )
@@ -27,8 +35,17 @@ from ffun.tags.entities import TagCategory
 logger = logging.get_module_logger()
 
 
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _custom_id(entry_id: EntryId, request_index: int) -> str:
+    return f"{entry_id}-{request_index}"
+
+
 class Processor(base.Processor):
     __slots__ = (
+        "processor_id",
         "llm_config",
         "llm_provider",
         "entry_template",
@@ -37,10 +54,12 @@ class Processor(base.Processor):
         "max_tokens_per_entry",
         "text_parts_intersection",
         "routes_by_id",
+        "_config_hash",
     )
 
     def __init__(  # noqa
         self,
+        processor_id: ProcessorId,
         llm_provider: LLMProvider,
         llm_config: LLMConfiguration,
         entry_template: str,
@@ -52,6 +71,7 @@ class Processor(base.Processor):
         **kwargs: Any,
     ):
         super().__init__(**kwargs)  # type: ignore
+        self.processor_id = processor_id
         self.llm_config = llm_config
         self.llm_provider = llm_providers.get(llm_provider).provider
         self.entry_template = entry_template
@@ -62,6 +82,12 @@ class Processor(base.Processor):
         self.text_parts_intersection = text_parts_intersection
         self.routes_by_id = {route.id: route for route in routes}
 
+        # everything, except the processed text, that defines LLM responses
+        self._config_hash = _hash(f"{llm_provider}\n{text_parts_intersection}\n{llm_config.model_dump_json()}")
+
+        if self.uses_batches and not self.llm_provider.supports_batches:
+            raise errors.ProviderDoesNotSupportBatches(processor=self.name, llm_provider=llm_provider)
+
     def _text_to_process(self, entry: Entry) -> str:
         dirty_text = self.entry_template.format(entry=entry)
 
@@ -73,14 +99,34 @@ class Processor(base.Processor):
 
         return cut_text
 
-    async def _api_key_usage(
-        self, entry: Entry, requests: Sequence[ChatRequest], context: base.ProcessorContext
-    ) -> APIKeyUsage | None:
+    def _route(self, context: base.ProcessorContext) -> LLMGeneralProcessorRoute:
         route = self.routes_by_id.get(context.route_id)
 
         if route is None:
             raise errors.UnknownProcessorRoute(route_id=context.route_id)
 
+        return route
+
+    def _batch_api_key(self, context: base.ProcessorContext) -> LLMApiKey:
+        route = self._route(context)
+
+        # guaranteed by LLMGeneralProcessorRoute validation
+        assert route.api_key is not None
+
+        return route.api_key
+
+    @property
+    def uses_batches(self) -> bool:
+        return any(route.batch for route in self.routes_by_id.values())
+
+    def processes_in_batches(self, context: base.ProcessorContext) -> bool:
+        return self._route(context).batch
+
+    async def _api_key_usage(
+        self, entry: Entry, requests: Sequence[ChatRequest], context: base.ProcessorContext
+    ) -> APIKeyUsage | None:
+        route = self._route(context)
+
         if route.api_key is not None:
             return configured_api_key_usage(
                 llm=self.llm_provider,
@@ -96,10 +142,41 @@ class Processor(base.Processor):
             requests=requests,
         )
 
+    async def _cached_contents(self, text: str) -> list[str] | None:
+        if not settings.llm_responses_cache_enabled:
+            return None
+
+        return await operations.get_cached_llm_responses(self.processor_id, self._config_hash, _hash(text))
+
+    async def _cache_contents(self, text: str, contents: list[str]) -> None:
+        if not settings.llm_responses_cache_enabled:
+            return
+
+        await operations.cache_llm_responses(self.processor_id, self._config_hash, _hash(text), contents)
+
+    async def _cached_tags(self, text: str) -> list[RawTag] | None:
+        # The same text may come from different feeds => do not pay for it twice
+        cached_contents = await self._cached_contents(text)
+
+        if cached_contents is None:
+            return None
+
+        logger.info("llm_responses_cache_hit")
+
+        return self.extract_tags_from_contents(cached_contents)
+
+    async def cached_tags(self, entry: Entry, context: base.ProcessorContext) -> list[RawTag] | None:
+        return await self._cached_tags(self._text_to_process(entry))
+
     async def process(self, entry: Entry, context: base.ProcessorContext) -> list[RawTag]:
 
         cleaned_text = self._text_to_process(entry)
 
+        cached_tags = await self._cached_tags(cleaned_text)
+
+        if cached_tags is not None:
+            return cached_tags
+
         requests = self.llm_provider.prepare_requests(self.llm_config, cleaned_text, self.text_parts_intersection)
 
         api_key_usage = await self._api_key_usage(entry=entry, requests=requests, context=context)
@@ -114,14 +191,118 @@ class Processor(base.Processor):
         except llmsf_errors.TemporaryError as e:
             raise errors.TemporaryErrorInProcessor(message=str(e)) from e
 
-        return self.extract_tags(responses)
+        contents = [response.response_content() for response in responses]
+
+        await self._cache_contents(cleaned_text, contents)
+
+        return self.extract_tags_from_contents(contents)
+
+    def _batch_entry_requests(self, entry: Entry) -> Sequence[ChatRequest]:
+        cleaned_text = self._text_to_process(entry)
+
+        try:
+            return self.llm_provider.prepare_requests(self.llm_config, cleaned_text, self.text_parts_intersection)
+        except (llmsf_errors.TextIsEmpty, llmsf_errors.TextIsTooShort) as e:
+            # such entry will fail on every submission => do not let it block other entries
+            logger.info("batch_entry_text_rejected", entry_id=entry.id, error_info=str(e))
+            return []
+
+    async def submit_batch(
+        self, entries: Sequence[Entry], context: base.ProcessorContext
+    ) -> tuple[LLMBatchId | None, dict[EntryId, int]]:
+        requests: dict[str, ChatRequest] = {}
+        requests_numbers: dict[EntryId, int] = {}
+
+        for entry in entries:
+            entry_requests = self._batch_entry_requests(entry)
+
+            if not entry_requests:
+                continue
+
+            for i, request in enumerate(entry_requests):
+                requests[_custom_id(entry.id, i)] = request
+
+            requests_numbers[entry.id] = len(entry_requests)
+
+        if not requests:
+            return None, requests_numbers
+
+        try:
+            batch_id = await submit_llm_batch(
+                llm=self.llm_provider,
+                llm_config=self.llm_config,
+                api_key=self._batch_api_key(context),
+                requests=requests,
+            )
+        except llmsf_errors.TemporaryError as e:
+            raise errors.TemporaryErrorInProcessor(message=str(e)) from e
+
+        return batch_id, requests_numbers
+
+    async def batch_results(
+        self, batch_id: LLMBatchId, requests_numbers: dict[EntryId, int], context: base.ProcessorContext
+    ) -> dict[EntryId, list[RawTag]] | None:
+        # the whole batch is reserved at once, with the batch prices
+        api_key_usage = configured_batch_api_key_usage(
+            llm=self.llm_provider,
+            llm_config=self.llm_config,
+            api_key=self._batch_api_key(context),
+            requests_number=sum(requests_numbers.values()),
+        )
+
+        try:
+            responses = await collect_llm_batch(
+                llm=self.llm_provider, llm_config=self.llm_config, api_key_usage=api_key_usage, batch_id=batch_id
+            )
+        except llmsf_errors.TemporaryError as e:
+            raise errors.TemporaryErrorInProcessor(message=str(e)) from e
+        except llmsf_errors.BatchFailed as e:
+            raise errors.BatchFailedInProcessor(message=str(e)) from e
+
+        if responses is None:
+            return None
+
+        contents: dict[EntryId, list[str]] = {}
+
+        for entry_id, requests_number in requests_numbers.items():
+            custom_ids = [_custom_id(entry_id, i) for i in range(requests_number)]
+
+            # tags of a partially processed entry will be incomplete => do not return it, so it is marked as failed
+            if not all(custom_id in responses for custom_id in custom_ids):
+                continue
+
+            contents[entry_id] = [responses[custom_id].response_content() for custom_id in custom_ids]
+
+        await self._cache_batch_contents(contents)
+
+        return {
+            entry_id: self.extract_tags_from_contents(entry_contents) for entry_id, entry_contents in contents.items()
+        }
+
+    async def _cache_batch_contents(self, contents: dict[EntryId, list[str]]) -> None:
+        if not settings.llm_responses_cache_enabled or not contents:
+            return
+
+        # texts are not stored with batch jobs => build them again, entries are not changed after collecting
+        entries = await l_domain.get_entries_by_ids(list(contents))
+
+        for entry_id, entry_contents in contents.items():
+            entry = entries.get(entry_id)
+
+            if entry is None:
+                continue
+
+            await self._cache_contents(self._text_to_process(entry), entry_contents)
 
     def extract_tags(self, responses: Sequence[ChatResponse]) -> list[RawTag]:
+        return self.extract_tags_from_contents([response.response_content() for response in responses])
+
+    def extract_tags_from_contents(self, contents: Sequence[str]) -> list[RawTag]:
         raw_tags = set()
         tags: list[RawTag] = []
 
-        for response in responses:
-            raw_tags.update(self.tag_extractor(response.response_content()))
+        for content in contents:
+            raw_tags.update(self.tag_extractor(content))
 
         for raw_tag in raw_tags:
             tags.append(
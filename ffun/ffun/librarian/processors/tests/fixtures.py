@@ -1,6 +1,6 @@
 import pytest
 
-from ffun.librarian.background_processors import processors
+from ffun.librarian.background_processors import get_processors
 from ffun.librarian.entities import ProcessorType
 from ffun.librarian.processors.llm_general import Processor as LLMGeneralProcessor
 
@@ -8,7 +8,7 @@ from ffun.librarian.processors.llm_general import Processor as LLMGeneralProcess
 @pytest.fixture(scope="session", autouse=True)
 def do_not_use_real_configured_api_keys_in_tests() -> None:
 
-    for processor in processors:
+    for processor in get_processors():
         if processor.type != ProcessorType.llm_general:
             continue
 
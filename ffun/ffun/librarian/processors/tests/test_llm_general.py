@@ -1,15 +1,20 @@
+import random
+
 import pytest
+from pytest_mock import MockerFixture
 
 from ffun.dispatcher.entities import ProcessorRouteId
-from ffun.domain.entities import FeedId
+from ffun.domain.entities import FeedId, ProcessorId
 from ffun.feeds_links import domain as fl_domain
-from ffun.librarian import errors
+from ffun.librarian import errors, operations
 from ffun.librarian.entities import LLMGeneralProcessorRoute
 from ffun.librarian.processors.base import ProcessorContext
-from ffun.librarian.processors.llm_general import Processor
+from ffun.librarian.processors.llm_general import Processor, _hash
+from ffun.librarian.settings import settings
 from ffun.librarian.tag_extractors import dog_tags_extractor
 from ffun.librarian.text_cleaners import clear_nothing
 from ffun.library.entities import Entry
+from ffun.llms_framework import errors as llmsf_errors
 from ffun.llms_framework.entities import (
     ChatRequest,
     LLMApiKey,
@@ -18,12 +23,13 @@ from ffun.llms_framework.entities import (
     LLMTokens,
     UserKeyInfo,
 )
-from ffun.llms_framework.provider_interface import ChatResponseTest
+from ffun.llms_framework.provider_interface import ChatRequestTest, ChatResponseTest
 from ffun.ontology.entities import RawTag
 from ffun.tags.entities import TagCategory
 
 CONFIGURED_KEY_ROUTE_ID = ProcessorRouteId("configured-key-route")
 USER_KEY_ROUTE_ID = ProcessorRouteId("user-key-route")
+BATCH_ROUTE_ID = ProcessorRouteId("batch-route")
 UNKNOWN_ROUTE_ID = ProcessorRouteId("unknown-route")
 
 
@@ -42,6 +48,7 @@ class TestProcessor:
     @pytest.fixture  # type: ignore
     def llm_processor(self, llm_config: LLMConfiguration, fake_llm_api_key: LLMApiKey) -> Processor:
         return Processor(
+            processor_id=ProcessorId(random.randint(100_000, 1_000_000_000)),
             name="test-llm-processor",
             llm_provider=LLMProvider.test,
             llm_config=llm_config,
@@ -63,6 +70,13 @@ class TestProcessor:
                     allowed_for_users=False,
                     api_key=fake_llm_api_key,
                 ),
+                LLMGeneralProcessorRoute(
+                    id=BATCH_ROUTE_ID,
+                    allowed_for_collections=True,
+                    allowed_for_users=False,
+                    api_key=fake_llm_api_key,
+                    batch=True,
+                ),
             ),
         )
 
@@ -190,3 +204,213 @@ class TestProcessor:
 
         with pytest.raises(errors.TemporaryErrorInProcessor):
             await llm_processor.process(entry, context=ProcessorContext(route_id=CONFIGURED_KEY_ROUTE_ID))
+
+    @pytest.mark.asyncio
+    async def test_process__responses_are_cached(
+        self, llm_processor: Processor, cataloged_entry: Entry, another_cataloged_entry: Entry, mocker: MockerFixture
+    ) -> None:
+        entry = cataloged_entry.replace(title="@tag-1 @tag-2", body="@tag-3")
+
+        context = ProcessorContext(route_id=CONFIGURED_KEY_ROUTE_ID)
+
+        tags = await llm_processor.process(entry, context=context)
+
+        call_llm = mocker.patch("ffun.librarian.processors.llm_general.call_llm")
+
+        # the same text from another entry
+        same_text_entry = another_cataloged_entry.replace(title=entry.title, body=entry.body)
+
+        cached_tags = await llm_processor.process(
+            same_text_entry, context=ProcessorContext(route_id=USER_KEY_ROUTE_ID)
+        )
+
+        call_llm.assert_not_called()
+
+        assert sorted(tag.raw_uid for tag in cached_tags) == sorted(tag.raw_uid for tag in tags)
+
+    @pytest.mark.asyncio
+    async def test_process__cache_disabled(
+        self, llm_processor: Processor, cataloged_entry: Entry, mocker: MockerFixture
+    ) -> None:
+        mocker.patch.object(settings, "llm_responses_cache_enabled", False)
+
+        entry = cataloged_entry.replace(title="@tag-1 @tag-2", body="@tag-3")
+
+        context = ProcessorContext(route_id=CONFIGURED_KEY_ROUTE_ID)
+
+        await llm_processor.process(entry, context=context)
+
+        assert (
+            await operations.get_cached_llm_responses(
+                llm_processor.processor_id, llm_processor._config_hash, _hash(llm_processor._text_to_process(entry))
+            )
+            is None
+        )
+
+    def test_processes_in_batches(self, llm_processor: Processor) -> None:
+        assert llm_processor.uses_batches
+
+        assert llm_processor.processes_in_batches(ProcessorContext(route_id=BATCH_ROUTE_ID))
+        assert not llm_processor.processes_in_batches(ProcessorContext(route_id=CONFIGURED_KEY_ROUTE_ID))
+
+        with pytest.raises(errors.UnknownProcessorRoute):
+            llm_processor.processes_in_batches(ProcessorContext(route_id=UNKNOWN_ROUTE_ID))
+
+    def test_provider_must_support_batches(
+        self,
+        llm_processor: Processor,
+        llm_config: LLMConfiguration,
+        fake_llm_api_key: LLMApiKey,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(llm_processor.llm_provider, "supports_batches", False)
+
+        with pytest.raises(errors.ProviderDoesNotSupportBatches):
+            Processor(
+                processor_id=ProcessorId(1),
+                name="test-llm-processor",
+                llm_provider=LLMProvider.test,
+                llm_config=llm_config,
+                entry_template="{entry.title} {entry.body}",
+                text_cleaner=clear_nothing,
+                tag_extractor=dog_tags_extractor,
+                max_tokens_per_entry=LLMTokens(1_000),
+                text_parts_intersection=100,
+                routes=(
+                    LLMGeneralProcessorRoute(
+                        id=BATCH_ROUTE_ID,
+                        allowed_for_collections=True,
+                        api_key=fake_llm_api_key,
+                        batch=True,
+                    ),
+                ),
+            )
+
+    @pytest.mark.asyncio
+    async def test_batch(
+        self, llm_processor: Processor, cataloged_entry: Entry, another_cataloged_entry: Entry
+    ) -> None:
+        entry_1 = cataloged_entry.replace(title="@tag-1 @tag-2", body="@tag-3 @tag-2")
+        entry_2 = another_cataloged_entry.replace(title="@tag-4", body="raise RequestWasRejected")
+
+        context = ProcessorContext(route_id=BATCH_ROUTE_ID)
+
+        batch_id, requests_numbers = await llm_processor.submit_batch([entry_1, entry_2], context=context)
+
+        assert batch_id is not None
+        assert requests_numbers == {entry_1.id: 1, entry_2.id: 1}
+
+        tags = await llm_processor.batch_results(batch_id, requests_numbers, context=context)
+
+        assert tags is not None
+        assert set(tags) == {entry_1.id}
+
+        assert sorted(tag.raw_uid for tag in tags[entry_1.id]) == ["tag-1", "tag-2", "tag-3"]
+
+    @pytest.mark.asyncio
+    async def test_batch__responses_are_cached(
+        self, llm_processor: Processor, cataloged_entry: Entry, another_cataloged_entry: Entry
+    ) -> None:
+        context = ProcessorContext(route_id=BATCH_ROUTE_ID)
+
+        assert await llm_processor.cached_tags(cataloged_entry, context=context) is None
+
+        batch_id, requests_numbers = await llm_processor.submit_batch([cataloged_entry], context=context)
+
+        assert batch_id is not None
+
+        tags = await llm_processor.batch_results(batch_id, requests_numbers, context=context)
+
+        assert tags is not None
+
+        # the same text from another entry
+        same_text_entry = another_cataloged_entry.replace(title=cataloged_entry.title, body=cataloged_entry.body)
+
+        cached_tags = await llm_processor.cached_tags(same_text_entry, context=context)
+
+        assert cached_tags is not None
+        assert sorted(tag.raw_uid for tag in cached_tags) == sorted(tag.raw_uid for tag in tags[cataloged_entry.id])
+
+    @pytest.mark.asyncio
+    async def test_batch__cache_disabled(
+        self, llm_processor: Processor, cataloged_entry: Entry, mocker: MockerFixture
+    ) -> None:
+        mocker.patch.object(settings, "llm_responses_cache_enabled", False)
+
+        context = ProcessorContext(route_id=BATCH_ROUTE_ID)
+
+        batch_id, requests_numbers = await llm_processor.submit_batch([cataloged_entry], context=context)
+
+        assert batch_id is not None
+
+        assert await llm_processor.batch_results(batch_id, requests_numbers, context=context) is not None
+
+        assert await llm_processor.cached_tags(cataloged_entry, context=context) is None
+
+    @pytest.mark.asyncio
+    async def test_batch__failed(self, llm_processor: Processor, cataloged_entry: Entry) -> None:
+        entry = cataloged_entry.replace(title="@tag-1", body="raise BatchFailed")
+
+        context = ProcessorContext(route_id=BATCH_ROUTE_ID)
+
+        batch_id, requests_numbers = await llm_processor.submit_batch([entry], context=context)
+
+        assert batch_id is not None
+
+        with pytest.raises(errors.BatchFailedInProcessor):
+            await llm_processor.batch_results(batch_id, requests_numbers, context=context)
+
+    @pytest.mark.asyncio
+    async def test_batch__temporary_error(
+        self, llm_processor: Processor, cataloged_entry: Entry, mocker: MockerFixture
+    ) -> None:
+        entry = cataloged_entry.replace(title="@tag-1", body="@tag-2")
+
+        context = ProcessorContext(route_id=BATCH_ROUTE_ID)
+
+        batch_id, requests_numbers = await llm_processor.submit_batch([entry], context=context)
+
+        assert batch_id is not None
+
+        mocker.patch.object(
+            llm_processor.llm_provider, "get_batch_results", side_effect=llmsf_errors.TemporaryError(message="error")
+        )
+
+        with pytest.raises(errors.TemporaryErrorInProcessor):
+            await llm_processor.batch_results(batch_id, requests_numbers, context=context)
+
+    @pytest.mark.asyncio
+    async def test_batch__entry_with_empty_text(
+        self, llm_processor: Processor, cataloged_entry: Entry, another_cataloged_entry: Entry, mocker: MockerFixture
+    ) -> None:
+        entry_1 = cataloged_entry.replace(title="", body="")
+        entry_2 = another_cataloged_entry.replace(title="@tag-1", body="@tag-2")
+
+        # the test provider does not split texts, as the real ones do
+        prepared: list[object] = [llmsf_errors.TextIsEmpty(), [ChatRequestTest(text="@tag-1 @tag-2")]]
+        mocker.patch.object(llm_processor.llm_provider, "prepare_requests", side_effect=prepared)
+
+        context = ProcessorContext(route_id=BATCH_ROUTE_ID)
+
+        batch_id, requests_numbers = await llm_processor.submit_batch([entry_1, entry_2], context=context)
+
+        assert batch_id is not None
+        assert requests_numbers == {entry_2.id: 1}
+
+        tags = await llm_processor.batch_results(batch_id, requests_numbers, context=context)
+
+        assert tags is not None
+        assert sorted(tag.raw_uid for tag in tags[entry_2.id]) == ["tag-1", "tag-2"]
+
+    @pytest.mark.asyncio
+    async def test_batch__all_entries_rejected(
+        self, llm_processor: Processor, cataloged_entry: Entry, mocker: MockerFixture
+    ) -> None:
+        mocker.patch.object(llm_processor.llm_provider, "prepare_requests", side_effect=llmsf_errors.TextIsTooShort())
+        submit = mocker.patch.object(llm_processor.llm_provider, "submit_batch")
+
+        context = ProcessorContext(route_id=BATCH_ROUTE_ID)
+
+        assert await llm_processor.submit_batch([cataloged_entry], context=context) == (None, {})
+
+        submit.assert_not_called()
@@ -17,6 +17,19 @@ class Settings(BaseSettings):
 
     metric_accumulation_interval: datetime.timedelta = datetime.timedelta(minutes=10)
 
+    # batch jobs of processor routes with `batch = true`
+    batch_min_entries: int = 100
+    batch_max_entries: int = 5_000
+    batch_max_waiting_time: datetime.timedelta = datetime.timedelta(hours=1)
+    batches_check_interval: datetime.timedelta = datetime.timedelta(minutes=1)
+    # entries of batch jobs, which results can not be checked for this time since entries were queued, are failed
+    batch_max_age: datetime.timedelta = datetime.timedelta(days=3)
+
+    # responses of LLM processors by processed texts, see `ffun cleaner clean` for the cleanup
+    llm_responses_cache_enabled: bool = True
+    llm_responses_cache_retention: datetime.timedelta = datetime.timedelta(days=30)
+    llm_responses_cache_max_records: int = 100_000
+
     @pydantic.computed_field  # type: ignore
     @functools.cached_property
     def tag_processors(self) -> tuple[TagProcessor, ...]:
@@ -17,7 +17,7 @@ from ffun.feeds.entities import Feed
 from ffun.librarian import background_processors
 from ffun.librarian.background_processors import EntriesProcessor
 from ffun.librarian.entities import ProcessorType
-from ffun.librarian.processors.base import AlwaysConstantProcessor
+from ffun.librarian.processors.base import AlwaysConstantBatchProcessor, AlwaysConstantProcessor
 from ffun.library.entities import Entry
 from ffun.library.tests import helpers as l_helpers
 from ffun.library.tests import make as l_make
@@ -413,13 +413,37 @@ class TestEntriesProcessor:
 
 class TestCreateBackgroundProcessors:
     def test_no_processors(self, mocker: MockerFixture) -> None:
-        mocker.patch.object(background_processors, "processors", [])
+        mocker.patch.object(background_processors, "get_processors", return_value=[])  # type: ignore
 
         assert background_processors.create_background_processors() == []
 
     def test_success(self, mocker: MockerFixture, fake_processor_info: background_processors.ProcessorInfo) -> None:
-        mocker.patch.object(background_processors, "processors", [fake_processor_info])
+        processors = [fake_processor_info]
+        mocker.patch.object(background_processors, "get_processors", return_value=processors)
 
         tasks = background_processors.create_background_processors()
 
         assert [task.name for task in tasks] == ["entries_dispatcher", "entries_processor_fake_constant_processor"]
+
+    def test_batches_processor(
+        self, mocker: MockerFixture, fake_processor_info: background_processors.ProcessorInfo
+    ) -> None:
+        batch_processor_info = background_processors.ProcessorInfo(
+            id=fake_processor_info.id,
+            type=fake_processor_info.type,
+            processor=AlwaysConstantBatchProcessor(name="fake_batch_processor", tags=["tag-1"]),
+            concurrency=fake_processor_info.concurrency,
+            routes=fake_processor_info.routes,
+            quality_route_id=fake_processor_info.quality_route_id,
+        )
+
+        processors = [batch_processor_info]
+        mocker.patch.object(background_processors, "get_processors", return_value=processors)
+
+        tasks = background_processors.create_background_processors()
+
+        assert [task.name for task in tasks] == [
+            "entries_dispatcher",
+            "entries_processor_fake_batch_processor",
+            "batches_processor_fake_batch_processor",
+        ]
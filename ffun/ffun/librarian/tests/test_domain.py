@@ -1,4 +1,6 @@
 import contextlib
+import datetime
+import random
 from typing import Generator
 
 import pytest
@@ -7,27 +9,47 @@ from structlog.testing import capture_logs
 
 from ffun.core.metrics import Accumulator
 from ffun.core.tests.helpers import assert_logs
+from ffun.dispatcher import domain as d_domain
 from ffun.dispatcher.entities import EntryProcessingStatus, ProcessorRouteId
 from ffun.dispatcher.tests.helpers import assert_processing_status
 from ffun.domain.entities import ProcessorId
-from ffun.librarian import errors
+from ffun.librarian import errors, operations
 from ffun.librarian.domain import (
     accumulator,
+    clean_llm_responses_cache,
+    process_batches_results,
     process_entry,
+    submit_batches,
 )
 from ffun.librarian.processors.base import (
+    AlwaysConstantBatchProcessor,
     AlwaysConstantProcessor,
     AlwaysErrorProcessor,
     AlwaysSkipEntryProcessor,
     AlwaysTemporaryErrorProcessor,
     ProcessorContext,
 )
+from ffun.librarian.settings import settings
 from ffun.library.entities import Entry
+from ffun.llms_framework.entities import LLMBatchId
 from ffun.ontology import domain as o_domain
+from ffun.ontology.entities import RawTag
+from ffun.tags.entities import TagCategory
 
 TEST_ROUTE_ID = ProcessorRouteId("test-route")
 
 
+@pytest.fixture  # type: ignore
+def batch_processor_id() -> ProcessorId:
+    # batch entries are stored in DB => every test needs its own processor to not see entries of other tests
+    return ProcessorId(random.randint(100_000, 1_000_000_000))
+
+
+@pytest.fixture  # type: ignore
+def batch_processor() -> AlwaysConstantBatchProcessor:
+    return AlwaysConstantBatchProcessor(name="fake-batch-processor", tags=["tag-1", "tag-2"])
+
+
 @contextlib.contextmanager
 def check_metric_accumulator(
     processor_id: ProcessorId, name: str, count_delta: int, sum_delta: int
@@ -58,8 +80,8 @@ def check_metric_accumulators(
         called_for.append(self)
 
     # Disable normalizers to measure calls only of processors' metrics.
-    # Attention: we overwrite value imported into the domain module, not the original one.
-    mocker.patch("ffun.tags.domain.normalizers", [])
+    # Attention: we overwrite function imported into the domain module, not the original one.
+    mocker.patch("ffun.tags.domain.get_normalizers", return_value=[])  # type: ignore
 
     mocker.patch("ffun.core.metrics.Accumulator.flush_if_time", patch_flush)
 
@@ -182,3 +204,412 @@ class TestProcessEntry:
         assert cataloged_entry.id not in tags
 
         await assert_processing_status(fake_processor_id, cataloged_entry.id, EntryProcessingStatus.failed)
+
+    @pytest.mark.asyncio
+    async def test_batch_route(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        await d_domain.set_entry_processing_statuses(
+            batch_processor_id, [cataloged_entry.id], EntryProcessingStatus.dispatched
+        )
+
+        with capture_logs() as logs, check_metric_accumulators(mocker, batch_processor_id, 0, 0, 0, 0):  # type: ignore
+            await process_entry(
+                processor_id=batch_processor_id,
+                processor=batch_processor,
+                entry=cataloged_entry,
+                context=ProcessorContext(route_id=TEST_ROUTE_ID),
+            )
+
+        assert_logs(logs, entry_added_to_batch=1, processor_successed=0)  # type: ignore
+
+        batch_entries = await operations.get_unsubmitted_batch_entries(batch_processor_id, limit=10)
+
+        assert [(batch_entry.entry_id, batch_entry.route_id) for batch_entry in batch_entries] == [
+            (cataloged_entry.id, TEST_ROUTE_ID)
+        ]
+
+        await assert_processing_status(batch_processor_id, cataloged_entry.id, EntryProcessingStatus.dispatched)
+
+    @pytest.mark.asyncio
+    async def test_batch_route__cached_tags(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        cached_tags = [RawTag(raw_uid="tag-1", categories={TagCategory.test_final})]
+
+        mocker.patch.object(AlwaysConstantBatchProcessor, "cached_tags", return_value=cached_tags)
+
+        with capture_logs() as logs:  # type: ignore
+            await process_entry(
+                processor_id=batch_processor_id,
+                processor=batch_processor,
+                entry=cataloged_entry,
+                context=ProcessorContext(route_id=TEST_ROUTE_ID),
+            )
+
+        assert_logs(logs, entry_added_to_batch=0, processor_successed=1)  # type: ignore
+
+        assert await operations.get_unsubmitted_batch_entries(batch_processor_id, limit=10) == []
+
+        tags = await o_domain.get_tags_ids_for_entries([cataloged_entry.id])
+
+        expected_ids = await o_domain.get_ids_by_uids({"tag-1"})  # type: ignore
+
+        assert tags[cataloged_entry.id] == set(expected_ids.values())
+
+        await assert_processing_status(batch_processor_id, cataloged_entry.id, EntryProcessingStatus.processed)
+
+
+class TestSubmitBatches:
+
+    @pytest.mark.asyncio
+    async def test_not_enough_entries(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 2)
+
+        await operations.add_batch_entries(batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id])
+
+        await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert batch_processor.batches == {}
+
+        assert len(await operations.get_unsubmitted_batch_entries(batch_processor_id, limit=10)) == 1
+
+    @pytest.mark.asyncio
+    async def test_waiting_too_long(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 2)
+        mocker.patch.object(settings, "batch_max_waiting_time", datetime.timedelta(seconds=0))
+
+        await operations.add_batch_entries(batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id])
+
+        await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert batch_processor.batches == {LLMBatchId("batch-0"): {cataloged_entry.id: 1}}
+
+    @pytest.mark.asyncio
+    async def test_submit(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        another_cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 1)
+
+        another_route_id = ProcessorRouteId("another-route")
+
+        await operations.add_batch_entries(batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id])
+        await operations.add_batch_entries(batch_processor_id, another_route_id, [another_cataloged_entry.id])
+
+        with capture_logs() as logs:  # type: ignore
+            await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert_logs(logs, batch_submitted=2)  # type: ignore
+
+        assert len(batch_processor.batches) == 2
+
+        assert await operations.get_unsubmitted_batch_entries(batch_processor_id, limit=10) == []
+
+        batch_entries = await operations.get_submitted_batch_entries(batch_processor_id)
+
+        assert {
+            (batch_entry.entry_id, batch_entry.route_id, batch_entry.requests_number) for batch_entry in batch_entries
+        } == {
+            (cataloged_entry.id, TEST_ROUTE_ID, 1),
+            (another_cataloged_entry.id, another_route_id, 1),
+        }
+
+    @pytest.mark.asyncio
+    async def test_temporary_error(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 1)
+        mocker.patch.object(
+            AlwaysConstantBatchProcessor, "submit_batch", side_effect=errors.TemporaryErrorInProcessor()
+        )
+
+        await operations.add_batch_entries(batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id])
+
+        with capture_logs() as logs:  # type: ignore
+            await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert_logs(logs, batch_submission_temporary_error=1, batch_submitted=0)  # type: ignore
+
+        assert len(await operations.get_unsubmitted_batch_entries(batch_processor_id, limit=10)) == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_entries(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        another_cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 1)
+        mocker.patch.object(
+            AlwaysConstantBatchProcessor,
+            "submit_batch",
+            return_value=(LLMBatchId("batch-x"), {cataloged_entry.id: 1}),
+        )
+
+        await operations.add_batch_entries(
+            batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id, another_cataloged_entry.id]
+        )
+
+        with capture_logs() as logs:  # type: ignore
+            await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert_logs(logs, batch_entries_rejected=1, batch_submitted=1)  # type: ignore
+
+        await assert_processing_status(batch_processor_id, another_cataloged_entry.id, EntryProcessingStatus.failed)
+
+        assert await operations.get_unsubmitted_batch_entries(batch_processor_id, limit=10) == []
+
+        batch_entries = await operations.get_submitted_batch_entries(batch_processor_id)
+
+        assert [batch_entry.entry_id for batch_entry in batch_entries] == [cataloged_entry.id]
+
+    @pytest.mark.asyncio
+    async def test_all_entries_rejected(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 1)
+        mocker.patch.object(AlwaysConstantBatchProcessor, "submit_batch", return_value=(None, {}))
+
+        await operations.add_batch_entries(batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id])
+
+        with capture_logs() as logs:  # type: ignore
+            await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert_logs(logs, batch_entries_rejected=1, batch_submitted=0)  # type: ignore
+
+        await assert_processing_status(batch_processor_id, cataloged_entry.id, EntryProcessingStatus.failed)
+
+        assert await operations.get_unsubmitted_batch_entries(batch_processor_id, limit=10) == []
+        assert await operations.get_submitted_batch_entries(batch_processor_id) == []
+
+
+class TestProcessBatchesResults:
+
+    @pytest.mark.asyncio
+    async def test_success(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 1)
+
+        await operations.add_batch_entries(batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id])
+
+        await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        with capture_logs() as logs:  # type: ignore
+            await process_batches_results(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert_logs(logs, batch_processed=1)  # type: ignore
+
+        tags = await o_domain.get_tags_ids_for_entries([cataloged_entry.id])
+
+        expected_ids = await o_domain.get_ids_by_uids({"tag-1", "tag-2"})  # type: ignore
+
+        assert tags[cataloged_entry.id] == set(expected_ids.values())
+
+        await assert_processing_status(batch_processor_id, cataloged_entry.id, EntryProcessingStatus.processed)
+
+        assert await operations.get_submitted_batch_entries(batch_processor_id) == []
+
+    @pytest.mark.asyncio
+    async def test_not_finished(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 1)
+        mocker.patch.object(AlwaysConstantBatchProcessor, "batch_results", return_value=None)
+
+        await operations.add_batch_entries(batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id])
+
+        await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        with capture_logs() as logs:  # type: ignore
+            await process_batches_results(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert_logs(logs, batch_is_not_finished=1, batch_processed=0)  # type: ignore
+
+        assert len(await operations.get_submitted_batch_entries(batch_processor_id)) == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_failed(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+    ) -> None:
+        await operations.add_batch_entries(batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id])
+        await operations.mark_batch_entries_submitted(
+            batch_processor_id, LLMBatchId("unknown-batch"), {cataloged_entry.id: 1}
+        )
+
+        with capture_logs() as logs:  # type: ignore
+            await process_batches_results(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert_logs(logs, batch_failed=1)  # type: ignore
+
+        await assert_processing_status(batch_processor_id, cataloged_entry.id, EntryProcessingStatus.failed)
+
+        assert await operations.get_submitted_batch_entries(batch_processor_id) == []
+
+    @pytest.mark.asyncio
+    async def test_temporary_error(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 1)
+
+        await operations.add_batch_entries(batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id])
+
+        await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        mocker.patch.object(
+            AlwaysConstantBatchProcessor, "batch_results", side_effect=errors.TemporaryErrorInProcessor()
+        )
+
+        with capture_logs() as logs:  # type: ignore
+            await process_batches_results(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert_logs(logs, batch_results_temporary_error=1, batch_failed=0)  # type: ignore
+
+        assert len(await operations.get_submitted_batch_entries(batch_processor_id)) == 1
+
+    @pytest.mark.asyncio
+    async def test_temporary_error__batch_is_too_old(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 1)
+        mocker.patch.object(settings, "batch_max_age", datetime.timedelta(seconds=0))
+
+        await operations.add_batch_entries(batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id])
+
+        await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        mocker.patch.object(
+            AlwaysConstantBatchProcessor, "batch_results", side_effect=errors.TemporaryErrorInProcessor()
+        )
+
+        with capture_logs() as logs:  # type: ignore
+            await process_batches_results(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert_logs(logs, batch_is_too_old=1, batch_results_temporary_error=0)  # type: ignore
+
+        await assert_processing_status(batch_processor_id, cataloged_entry.id, EntryProcessingStatus.failed)
+
+        assert await operations.get_submitted_batch_entries(batch_processor_id) == []
+
+    @pytest.mark.asyncio
+    async def test_entry_failed(
+        self,
+        batch_processor_id: ProcessorId,
+        batch_processor: AlwaysConstantBatchProcessor,
+        cataloged_entry: Entry,
+        another_cataloged_entry: Entry,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(settings, "batch_min_entries", 1)
+
+        await operations.add_batch_entries(
+            batch_processor_id, TEST_ROUTE_ID, [cataloged_entry.id, another_cataloged_entry.id]
+        )
+
+        await submit_batches(processor_id=batch_processor_id, processor=batch_processor)
+
+        # emulate failed requests of the second entry
+        del batch_processor.batches[LLMBatchId("batch-0")][another_cataloged_entry.id]
+
+        with capture_logs() as logs:  # type: ignore
+            await process_batches_results(processor_id=batch_processor_id, processor=batch_processor)
+
+        assert_logs(logs, batch_entry_failed=1, batch_processed=1)  # type: ignore
+
+        await assert_processing_status(batch_processor_id, cataloged_entry.id, EntryProcessingStatus.processed)
+        await assert_processing_status(batch_processor_id, another_cataloged_entry.id, EntryProcessingStatus.failed)
+
+        assert await operations.get_submitted_batch_entries(batch_processor_id) == []
+
+
+class TestCleanLLMResponsesCache:
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_clean(self, batch_processor_id: ProcessorId, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "llm_responses_cache_retention", datetime.timedelta(days=1))
+        mocker.patch.object(settings, "llm_responses_cache_max_records", 1_000_000_000)
+
+        await operations.cache_llm_responses(batch_processor_id, "config-hash", "text-hash", ["content"])
+
+        await clean_llm_responses_cache()
+
+        assert await operations.get_cached_llm_responses(batch_processor_id, "config-hash", "text-hash") == ["content"]
+
+    @pytest.mark.asyncio
+    async def test_remove_old_records(self, batch_processor_id: ProcessorId, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "llm_responses_cache_retention", datetime.timedelta(seconds=0))
+
+        await operations.cache_llm_responses(batch_processor_id, "config-hash", "text-hash", ["content"])
+
+        await clean_llm_responses_cache()
+
+        assert await operations.get_cached_llm_responses(batch_processor_id, "config-hash", "text-hash") is None
+
+    @pytest.mark.asyncio
+    async def test_remove_records_over_limit(self, batch_processor_id: ProcessorId, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "llm_responses_cache_retention", datetime.timedelta(days=1))
+        mocker.patch.object(settings, "llm_responses_cache_max_records", 1)
+
+        await operations.cache_llm_responses(batch_processor_id, "config-hash", "text-hash-1", ["content-1"])
+        await operations.cache_llm_responses(batch_processor_id, "config-hash", "text-hash-2", ["content-2"])
+
+        await clean_llm_responses_cache()
+
+        assert await operations.get_cached_llm_responses(batch_processor_id, "config-hash", "text-hash-1") is None
+        assert await operations.get_cached_llm_responses(batch_processor_id, "config-hash", "text-hash-2") == [
+            "content-2"
+        ]
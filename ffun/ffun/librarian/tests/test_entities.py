@@ -113,6 +113,16 @@ class TestLLMGeneralProcessorRoute:
 
         assert exc_info.value.errors()[0]["type"] == "api_key_required_for_collections"  # type: ignore
 
+    def test_api_key_is_required_for_batches(self) -> None:
+        with pytest.raises(pydantic.ValidationError) as exc_info:
+            LLMGeneralProcessorRoute(id=ProcessorRouteId("batch-route"), batch=True, api_key=None)
+
+        assert exc_info.value.errors()[0]["type"] == "api_key_required_for_batches"  # type: ignore
+
+        route = LLMGeneralProcessorRoute(id=ProcessorRouteId("batch-route"), batch=True, api_key=LLMApiKey("key"))
+
+        assert route.batch
+
     def test_api_key__empty_string_is_normalized_to_none(self) -> None:
         route = LLMGeneralProcessorRoute(
             id=ProcessorRouteId("user-route"),
@@ -43,6 +43,11 @@ async def unlink_all(execute: ExecuteType, feed_id: FeedId) -> set[EntryId]:
     return await operations.unlink_all(execute, feed_id)
 
 
+@run_in_transaction
+async def unlink_feeds(execute: ExecuteType, feed_ids: list[FeedId]) -> set[EntryId]:
+    return await operations.unlink_feeds(execute, feed_ids)
+
+
 async def get_entry(entry_id: EntryId) -> Entry:
     entries = await get_entries_by_ids([entry_id])
     found_entry = entries.get(entry_id)
@@ -117,3 +122,11 @@ async def shrink_feed(execute: ExecuteType, feed_id: FeedId) -> None:
     await operations.try_mark_as_orphanes(execute, removed_1 | removed_2)
 
     logger.info("shrinking_feed_finished", feed_id=feed_id)
+
+
+@run_in_transaction
+async def shrink_feeds(execute: ExecuteType, feed_ids: list[FeedId]) -> None:
+    """Bulk version of `shrink_feed`."""
+    removed = await operations.unlink_feeds_tails(execute, feed_ids)
+
+    await operations.try_mark_as_orphanes(execute, removed)
@@ -0,0 +1,39 @@
+"""
+feed-last-ingestion
+"""
+
+from typing import Any
+
+from psycopg import Connection
+from yoyo import step
+
+__depends__ = {"20260527_01_c0DeX-feed-entry-counts"}
+
+
+def apply_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE l_feed_last_ingestion (
+            feed_id UUID PRIMARY KEY,
+            ingested_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+        """
+    )
+
+    cursor.execute(
+        """
+        INSERT INTO l_feed_last_ingestion (feed_id, ingested_at)
+        SELECT feed_id, MAX(ingested_at)
+        FROM l_feeds_to_entries
+        GROUP BY feed_id
+        """
+    )
+
+
+def rollback_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE l_feed_last_ingestion")
+
+
+steps = [step(apply_step, rollback_step)]
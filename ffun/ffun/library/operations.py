@@ -7,7 +7,7 @@ from psycopg.types.json import Jsonb
 from pypika import PostgreSQLQuery
 
 from ffun.core import logging, utils
-from ffun.core.postgresql import ExecuteType, execute, run_in_transaction
+from ffun.core.postgresql import ExecuteType, execute, pipeline, run_in_transaction
 from ffun.domain.entities import Days, EntryId, FeedId
 from ffun.library import errors
 from ffun.library.entities import CollectedEntry, Entry, FeedEntryLink, Reference
@@ -32,8 +32,8 @@ logger = logging.get_module_logger()
 #       but they require some hacks:
 #       - We can replace l_feeds_to_entries.created_at with l_feeds_to_entries.entry_created_at in queries
 #         because for most sources (sites) they should be nearly equal to the actual publish date
-#       - We can remove index on `ingested_at` in favor of getting the link with the latest `created_at`
-#         and using its `ingested_at`.
+#       - We can remove index on `ingested_at`, since the time of the last ingestion
+#         is stored in `l_feed_last_ingestion`.
 
 
 def dict_to_reference(row: dict[str, Any]) -> Reference:
@@ -90,6 +90,18 @@ async def remove_feed_entries_count(feed_ids: Iterable[FeedId]) -> None:
     await execute(sql, {"feed_ids": feed_ids})
 
 
+async def _update_last_ingested_at(feed_id: FeedId, ingested_at: datetime.datetime) -> None:
+    # GREATEST protects the marker from moving back in case of concurrent loads of the same feed
+    sql = """
+    INSERT INTO l_feed_last_ingestion (feed_id, ingested_at)
+    VALUES (%(feed_id)s, %(ingested_at)s)
+    ON CONFLICT (feed_id) DO UPDATE SET
+      ingested_at = GREATEST(l_feed_last_ingestion.ingested_at, EXCLUDED.ingested_at)
+    """
+
+    await execute(sql, {"feed_id": feed_id, "ingested_at": ingested_at})
+
+
 @run_in_transaction
 async def _catalog_entry(
     execute: ExecuteType, feed_id: FeedId, entry: CollectedEntry, ingested_at: datetime.datetime
@@ -100,7 +112,6 @@ async def _catalog_entry(
     VALUES (%(id)s, %(source_id)s, %(title)s, %(body)s, %(external_id)s,
             %(external_url)s, %(external_tags)s, %(published_at)s, %(refs)s)
     ON CONFLICT (source_id, external_id) DO NOTHING
-    RETURNING id, created_at
     """
 
     # 1. We expect that `entry_created_at` is constant.
@@ -119,9 +130,14 @@ async def _catalog_entry(
     #    => the simplicity of the HTTP API has priority over idiomaticity of the DB schema and semantics
     #
     # 4. `created_at = updated_at` is true only for newly inserted links, because conflicts update `updated_at`.
+    #
+    # 5. The link is created from the row of the entry (the new or the existed one),
+    #    so both statements do not depend on each other results and are sent in a single pipeline.
     sql_insert_feed_to_entry = """
     INSERT INTO l_feeds_to_entries (feed_id, entry_id, ingested_at, entry_created_at)
-    VALUES (%(feed_id)s, %(entry_id)s, %(ingested_at)s, %(entry_created_at)s)
+    SELECT %(feed_id)s, id, %(ingested_at)s, created_at
+    FROM l_entries
+    WHERE source_id = %(source_id)s AND external_id = %(external_id)s
     ON CONFLICT (feed_id, entry_id) DO UPDATE SET
       ingested_at = EXCLUDED.ingested_at,
       entry_created_at = EXCLUDED.entry_created_at,
@@ -129,51 +145,46 @@ async def _catalog_entry(
     RETURNING entry_id, created_at = updated_at AS new_link_created
     """
 
-    result = await execute(
-        sql_insert_entry,
-        {
-            "id": entry.id,
-            "source_id": entry.source_id,
-            "title": entry.title,
-            "body": entry.body,
-            "external_id": entry.external_id,
-            "external_url": entry.external_url,
-            "external_tags": list(entry.external_tags),
-            "published_at": entry.published_at,
-            "refs": Jsonb(
-                [ref.model_dump(mode="json", exclude_defaults=True, exclude_none=True) for ref in entry.references]
+    _, result = await pipeline(
+        execute,
+        [
+            (
+                sql_insert_entry,
+                {
+                    "id": entry.id,
+                    "source_id": entry.source_id,
+                    "title": entry.title,
+                    "body": entry.body,
+                    "external_id": entry.external_id,
+                    "external_url": entry.external_url,
+                    "external_tags": list(entry.external_tags),
+                    "published_at": entry.published_at,
+                    "refs": Jsonb(
+                        [
+                            ref.model_dump(mode="json", exclude_defaults=True, exclude_none=True)
+                            for ref in entry.references
+                        ]
+                    ),
+                },
             ),
-        },
+            (
+                sql_insert_feed_to_entry,
+                {
+                    "feed_id": feed_id,
+                    "ingested_at": ingested_at,
+                    "source_id": entry.source_id,
+                    "external_id": entry.external_id,
+                },
+            ),
+        ],
     )
 
-    if result:
-        entry_id = EntryId(result[0]["id"])
-        entry_created_at = result[0]["created_at"]
-    else:
-        result = await execute(
-            "SELECT id, created_at FROM l_entries WHERE source_id = %(source_id)s AND external_id = %(external_id)s",
-            {"source_id": entry.source_id, "external_id": entry.external_id},
-        )
-
-        if result:
-            entry_id = EntryId(result[0]["id"])
-            entry_created_at = result[0]["created_at"]
-        else:
-            raise NotImplementedError("Can not find entry by source_id and external_id")
-
-    result = await execute(
-        sql_insert_feed_to_entry,
-        {
-            "feed_id": feed_id,
-            "entry_id": entry_id,
-            "ingested_at": ingested_at,
-            "entry_created_at": entry_created_at,
-        },
-    )
+    if not result:
+        raise NotImplementedError("Can not find entry by source_id and external_id")
 
     if result[0]["new_link_created"]:
         await _increment_feed_entries_count(execute, feed_id, ingested_at.astimezone(datetime.UTC).date())
-        return entry_id
+        return EntryId(result[0]["entry_id"])
 
     return None
 
@@ -195,12 +206,21 @@ async def catalog_entries(feed_id: FeedId, entries: Iterable[CollectedEntry]) ->
     #    (and its denormalized copy in `l_feeds_to_entries.entry_created_at`) for filtering and sorting
     #    entries.
     #    => We catalog entries in reversed order, so the oldest entry will have the oldest `created_at`.
-    for entry in reversed(list(entries)):
+    #
+    # 3. We store the marker of the last ingestion separately, to not search it in `l_feeds_to_entries`
+    #    each time we shrink the feed. The marker is updated only after all entries are cataloged:
+    #    if the load is interrupted, the previous marker stays and protects entries of both loads from unlinking.
+    entries_list = list(entries)
+
+    for entry in reversed(entries_list):
         entry_id = await _catalog_entry(feed_id, entry, ingested_at)
 
         if entry_id is not None:
             linked_entry_ids.append(entry_id)
 
+    if entries_list:
+        await _update_last_ingested_at(feed_id, ingested_at)
+
     return linked_entry_ids
 
 
@@ -384,8 +404,8 @@ async def update_external_url(entity_id: EntryId, url: str) -> None:
 
 async def get_last_ingested_at(execute: ExecuteType, feed_id: FeedId) -> datetime.datetime | None:
     sql = """
-    SELECT MAX(ingested_at) AS last_ingested_at
-    FROM l_feeds_to_entries
+    SELECT ingested_at
+    FROM l_feed_last_ingestion
     WHERE feed_id = %(feed_id)s
     """
 
@@ -394,7 +414,7 @@ async def get_last_ingested_at(execute: ExecuteType, feed_id: FeedId) -> datetim
     if not result:
         return None
 
-    last_ingested_at = result[0]["last_ingested_at"]
+    last_ingested_at = result[0]["ingested_at"]
     assert last_ingested_at is None or isinstance(last_ingested_at, datetime.datetime)
     return last_ingested_at
 
@@ -452,6 +472,8 @@ async def unlink_all(execute: ExecuteType, feed_id: FeedId) -> set[EntryId]:
 
     result = await execute(sql, {"feed_id": feed_id})
 
+    await execute("DELETE FROM l_feed_last_ingestion WHERE feed_id = %(feed_id)s", {"feed_id": feed_id})
+
     if not result:
         logger.info("feed_has_no_entries", feed_id=feed_id)
         return set()
@@ -465,6 +487,30 @@ async def unlink_all(execute: ExecuteType, feed_id: FeedId) -> set[EntryId]:
     return unlinked
 
 
+async def unlink_feeds(execute: ExecuteType, feed_ids: list[FeedId]) -> set[EntryId]:
+    """Bulk version of `unlink_all`: unlink all entries from all passed feeds with a single query."""
+    if not feed_ids:
+        return set()
+
+    sql = """
+    DELETE FROM l_feeds_to_entries
+    WHERE feed_id = ANY(%(feed_ids)s)
+    RETURNING entry_id
+    """
+
+    result = await execute(sql, {"feed_ids": feed_ids})
+
+    await execute("DELETE FROM l_feed_last_ingestion WHERE feed_id = ANY(%(feed_ids)s)", {"feed_ids": feed_ids})
+
+    unlinked = {row["entry_id"] for row in result}
+
+    await try_mark_as_orphanes(execute, unlinked)
+
+    logger.info("feeds_entries_removed", feeds_number=len(feed_ids), entries_removed=len(result))
+
+    return unlinked
+
+
 async def unlink_old_entries(
     execute: ExecuteType, feed_id: FeedId, period: datetime.timedelta | None = None
 ) -> set[EntryId]:
@@ -526,6 +572,70 @@ async def unlink_old_entries(
     return {row["entry_id"] for row in result}
 
 
+async def unlink_feeds_tails(
+    execute: ExecuteType,
+    feed_ids: list[FeedId],
+    offset: int | None = None,
+    period: datetime.timedelta | None = None,
+) -> set[EntryId]:
+    """Bulk version of `unlink_feed_tail` + `unlink_old_entries`: shrink all passed feeds with a single query.
+
+    Entries of each feed are ranked by a window function partitioned by `feed_id`,
+    so the rules are the same as for the single-feed functions:
+
+    - entries after the first `offset` ones are removed;
+    - entries older than `period` are removed if they are not among the first `min_entries_per_feed` ones;
+    - entries ingested on the last feed load are never removed.
+    """
+    if offset is None:
+        offset = settings.max_entries_per_feed
+
+    if period is None:
+        period = settings.max_entry_age
+
+    if offset < settings.min_entries_per_feed:
+        raise errors.FeedHeadIsTooShort()
+
+    if not feed_ids:
+        return set()
+
+    sql = """
+    WITH ranked AS MATERIALIZED (
+        SELECT fe.feed_id,
+               fe.entry_id,
+               fe.created_at,
+               fe.ingested_at,
+               li.ingested_at AS last_ingested_at,
+               ROW_NUMBER() OVER (PARTITION BY fe.feed_id ORDER BY fe.created_at DESC, fe.entry_id DESC) AS position
+        FROM l_feeds_to_entries AS fe
+        JOIN l_feed_last_ingestion AS li ON li.feed_id = fe.feed_id
+        WHERE fe.feed_id = ANY(%(feed_ids)s)
+    )
+    DELETE FROM l_feeds_to_entries
+    USING ranked
+    WHERE l_feeds_to_entries.feed_id = ranked.feed_id
+      AND l_feeds_to_entries.entry_id = ranked.entry_id
+      AND ranked.ingested_at < ranked.last_ingested_at
+      AND (ranked.position > %(offset)s
+           OR (ranked.position > %(min_entries_per_feed)s AND ranked.created_at < NOW() - %(period)s))
+    RETURNING l_feeds_to_entries.entry_id AS entry_id
+    """
+
+    result = await execute(
+        sql,
+        {
+            "feed_ids": feed_ids,
+            "offset": offset,
+            "period": period,
+            "min_entries_per_feed": settings.min_entries_per_feed,
+        },
+    )
+
+    logger.info("feeds_tails_removed", feeds_number=len(feed_ids), entries_limit=offset, entries_removed=len(result))
+
+    return {row["entry_id"] for row in result}
+
+
 # TODO: metrics for orphaned entries and for feeds that produce them
 async def try_mark_as_orphanes(execute: ExecuteType, entry_ids: set[EntryId]) -> None:
     if not entry_ids:
@@ -548,14 +658,17 @@ async def try_mark_as_orphanes(execute: ExecuteType, entry_ids: set[EntryId]) ->
     await execute(str(query))
 
 
-async def get_orphaned_entries(limit: int) -> set[EntryId]:
+async def get_orphaned_entries(limit: int, after_entry_id: EntryId | None = None) -> set[EntryId]:
+    """Return orphaned entries in the order of their ids, starting after `after_entry_id` if it is defined."""
     sql = """
     SELECT entry_id
     FROM l_orphaned_entries
+    WHERE %(after_entry_id)s::uuid IS NULL OR entry_id > %(after_entry_id)s::uuid
+    ORDER BY entry_id
     LIMIT %(limit)s
     """
 
-    rows = await execute(sql, {"limit": limit})
+    rows = await execute(sql, {"limit": limit, "after_entry_id": after_entry_id})
 
     return {row["entry_id"] for row in rows}
 
@@ -575,9 +688,14 @@ async def remove_entries_by_ids(execute: ExecuteType, entry_ids: Iterable[EntryI
     ids = list(entry_ids)
 
     try:
-        await execute("DELETE FROM l_feeds_to_entries WHERE entry_id = ANY(%(ids)s)", {"ids": ids})
-        await execute("DELETE FROM l_entries WHERE id = ANY(%(ids)s)", {"ids": ids})
-        await execute("DELETE FROM l_orphaned_entries WHERE entry_id = ANY(%(ids)s)", {"ids": ids})
+        await pipeline(
+            execute,
+            [
+                ("DELETE FROM l_feeds_to_entries WHERE entry_id = ANY(%(ids)s)", {"ids": ids}),
+                ("DELETE FROM l_entries WHERE id = ANY(%(ids)s)", {"ids": ids}),
+                ("DELETE FROM l_orphaned_entries WHERE entry_id = ANY(%(ids)s)", {"ids": ids}),
+            ],
+        )
     except psycopg.errors.ForeignKeyViolation as e:
         logger.warning("foreign_key_violation_on_entry_removal", entry_ids=ids)
         raise errors.ConcurentOperationOnRemovedEntries() from e
@@ -20,20 +20,6 @@ async def update_link_created_time(feed_id: FeedId, entry_id: EntryId, new_time:
     )
 
 
-async def update_link_ingested_time(feed_id: FeedId, entry_id: EntryId, new_time: datetime.datetime) -> None:
-    await execute(
-        (
-            "UPDATE l_feeds_to_entries SET ingested_at = %(ingested_at)s "
-            "WHERE feed_id = %(feed_id)s AND entry_id = %(entry_id)s"
-        ),
-        {  # type: ignore
-            "ingested_at": new_time,
-            "feed_id": feed_id,
-            "entry_id": entry_id,
-        },
-    )
-
-
 async def update_links_created_time(
     feed_id: FeedId, entries_ids: Iterable[EntryId], new_time: datetime.datetime
 ) -> None:
@@ -19,6 +19,7 @@ from ffun.library.domain import (
     normalize_entry,
     remove_feed_entries_count,
     shrink_feed,
+    shrink_feeds,
 )
 from ffun.library.entities import CollectedEntry, Entry, EntryChange
 from ffun.library.settings import settings
@@ -254,3 +255,22 @@ class TestShrinkFeed:
         unlink_feed_tail.assert_called_once_with(mock.ANY, loaded_feed.id)
         unlink_old_entries.assert_called_once_with(mock.ANY, loaded_feed.id)
         try_mark_as_orphanes.assert_called_once_with(mock.ANY, removed_entries)
+
+
+class TestShrinkFeeds:
+    @pytest.mark.asyncio
+    async def test_all_required_methods_called(self, mocker: MockerFixture, loaded_feed: Feed) -> None:
+        removed_entries: set[EntryId] = {new_entry_id(), new_entry_id()}
+
+        unlink_feeds_tails: mock.AsyncMock = mocker.patch(
+            "ffun.library.operations.unlink_feeds_tails",
+            return_value=removed_entries,
+        )
+        try_mark_as_orphanes: mock.AsyncMock = mocker.patch("ffun.library.operations.try_mark_as_orphanes")
+
+        feed_ids = [loaded_feed.id]
+
+        await shrink_feeds(feed_ids)
+
+        unlink_feeds_tails.assert_called_once_with(mock.ANY, feed_ids)
+        try_mark_as_orphanes.assert_called_once_with(mock.ANY, removed_entries)
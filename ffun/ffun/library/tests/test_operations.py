@@ -47,6 +47,8 @@ from ffun.library.operations import (
     try_mark_as_orphanes,
     unlink_all,
     unlink_feed_tail,
+    unlink_feeds,
+    unlink_feeds_tails,
     unlink_old_entries,
     update_external_url,
 )
@@ -682,26 +684,50 @@ class TestGetLastIngestedAt:
         assert await get_last_ingested_at(execute, loaded_feed_id) is None
 
     @pytest.mark.asyncio
-    async def test_returns_max_ingested_at_for_requested_feed(
-        self, loaded_feed: Feed, another_loaded_feed: Feed
+    async def test_returns_last_ingestion_of_requested_feed(
+        self, loaded_feed: Feed, another_loaded_feed: Feed, mocker: MockerFixture
     ) -> None:
-        first_entry = make.fake_entry(loaded_feed.source_id)
-        second_entry = make.fake_entry(another_loaded_feed.source_id)
-        third_entry = make.fake_entry(loaded_feed.source_id)
-
         first_ingested_at = utils.now() - datetime.timedelta(minutes=2)
         second_ingested_at = first_ingested_at + datetime.timedelta(minutes=1)
         third_ingested_at = second_ingested_at + datetime.timedelta(minutes=1)
 
-        await catalog_entries(loaded_feed.id, [first_entry])
-        await catalog_entries(another_loaded_feed.id, [second_entry])
-        await catalog_entries(loaded_feed.id, [third_entry])
-
-        await helpers.update_link_ingested_time(loaded_feed.id, first_entry.id, first_ingested_at)
-        await helpers.update_link_ingested_time(another_loaded_feed.id, second_entry.id, second_ingested_at)
-        await helpers.update_link_ingested_time(loaded_feed.id, third_entry.id, third_ingested_at)
+        for feed, ingested_at in [
+            (loaded_feed, first_ingested_at),
+            (another_loaded_feed, second_ingested_at),
+            (loaded_feed, third_ingested_at),
+        ]:
+            mocker.patch("ffun.core.utils.now", return_value=ingested_at)
+            await catalog_entries(feed.id, [make.fake_entry(feed.source_id)])
 
         assert await get_last_ingested_at(execute, loaded_feed.id) == third_ingested_at
+        assert await get_last_ingested_at(execute, another_loaded_feed.id) == second_ingested_at
+
+    @pytest.mark.asyncio
+    async def test_not_moved_back(self, loaded_feed: Feed, mocker: MockerFixture) -> None:
+        last_ingested_at = utils.now()
+
+        for ingested_at in [last_ingested_at, last_ingested_at - datetime.timedelta(minutes=1)]:
+            mocker.patch("ffun.core.utils.now", return_value=ingested_at)
+            await catalog_entries(loaded_feed.id, [make.fake_entry(loaded_feed.source_id)])
+
+        assert await get_last_ingested_at(execute, loaded_feed.id) == last_ingested_at
+
+    @pytest.mark.asyncio
+    async def test_empty_load(self, loaded_feed_id: FeedId) -> None:
+        await catalog_entries(loaded_feed_id, [])
+
+        assert await get_last_ingested_at(execute, loaded_feed_id) is None
+
+    @pytest.mark.asyncio
+    async def test_removed_with_feed_links(self, loaded_feed: Feed, another_loaded_feed: Feed) -> None:
+        await make.n_entries_list(loaded_feed, n=1)
+        await make.n_entries_list(another_loaded_feed, n=1)
+
+        await unlink_all(execute, loaded_feed.id)
+        await unlink_feeds(execute, [another_loaded_feed.id])
+
+        assert await get_last_ingested_at(execute, loaded_feed.id) is None
+        assert await get_last_ingested_at(execute, another_loaded_feed.id) is None
 
 
 class TestGetFeedLinksForEntries:
@@ -1225,6 +1251,34 @@ class TestUnlinkAll:
         assert orphaned_entries & {entry.id for entry in entries} == set()
 
 
+class TestUnlinkFeeds:
+
+    @pytest.mark.asyncio
+    async def test_no_feeds(self) -> None:
+        async with TableSizeNotChanged("l_feeds_to_entries"):
+            assert await unlink_feeds(execute, []) == set()
+
+    @pytest.mark.asyncio
+    async def test_unlink_and_mark_orphans(
+        self, loaded_feed: Feed, another_loaded_feed: Feed, five_saved_feed_ids: list[FeedId]
+    ) -> None:
+        entries = await make.n_entries_list(loaded_feed, n=3)
+        another_entries = await make.n_entries_list(another_loaded_feed, n=2)
+
+        # the entry is linked to a feed that is not unlinked => it is not orphaned
+        await catalog_entries(five_saved_feed_ids[0], _to_collected_entries(another_entries[:1]))
+
+        async with TableSizeDelta("l_feeds_to_entries", delta=-5):
+            async with TableSizeNotChanged("l_entries"):
+                async with TableSizeDelta("l_orphaned_entries", delta=4):
+                    unlinked = await unlink_feeds(execute, [loaded_feed.id, another_loaded_feed.id])
+
+        assert unlinked == {entry.id for entry in entries + another_entries}
+
+        orphaned_entries = await get_orphaned_entries(limit=100500)
+        assert orphaned_entries & unlinked == {entry.id for entry in entries + another_entries[1:]}
+
+
 class TestUnlinkOldEntries:
 
     @pytest.mark.asyncio
@@ -1425,6 +1479,110 @@ class TestUnlinkOldEntries:
         assert {entry.id for entry in another_feed_entries} == {entry.id for entry in entries}
 
 
+class TestUnlinkFeedsTails:
+
+    @pytest.mark.asyncio
+    async def test_too_short_head(self, loaded_feed: Feed) -> None:
+        with pytest.raises(errors.FeedHeadIsTooShort):
+            await unlink_feeds_tails(execute, [loaded_feed.id], offset=settings.min_entries_per_feed - 1)
+
+    @pytest.mark.asyncio
+    async def test_no_feeds(self) -> None:
+        async with TableSizeNotChanged("l_feeds_to_entries"):
+            assert await unlink_feeds_tails(execute, []) == set()
+
+    @pytest.mark.asyncio
+    async def test_no_entries(self, loaded_feed: Feed, another_loaded_feed: Feed) -> None:
+        async with TableSizeNotChanged("l_feeds_to_entries"):
+            assert await unlink_feeds_tails(execute, [loaded_feed.id, another_loaded_feed.id]) == set()
+
+    @pytest.mark.asyncio
+    async def test_tails_of_many_feeds(self, loaded_feed: Feed, another_loaded_feed: Feed) -> None:
+        min_entries = settings.min_entries_per_feed
+
+        entries = await make.n_entries_list(loaded_feed, n=min_entries + 5)
+        await catalog_entries(loaded_feed.id, _to_collected_entries(entries[:min_entries]))
+
+        another_entries = await make.n_entries_list(another_loaded_feed, n=min_entries + 4)
+        await catalog_entries(another_loaded_feed.id, _to_collected_entries(another_entries[:min_entries]))
+
+        with capture_logs() as logs:
+            async with TableSizeDelta("l_feeds_to_entries", delta=-(2 + 1)):
+                async with TableSizeNotChanged("l_entries"):
+                    unlinked = await unlink_feeds_tails(
+                        execute, [loaded_feed.id, another_loaded_feed.id], offset=min_entries + 3
+                    )
+
+        assert unlinked == {entry.id for entry in entries[min_entries + 3 :] + another_entries[min_entries + 3 :]}
+
+        assert_logs(logs, feeds_tails_removed=1)
+
+        feed_entries = await get_entries_by_filter(feeds_ids=[loaded_feed.id], limit=100500)
+        assert {entry.id for entry in feed_entries} == {entry.id for entry in entries[: min_entries + 3]}
+
+        another_feed_entries = await get_entries_by_filter(feeds_ids=[another_loaded_feed.id], limit=100500)
+        assert {entry.id for entry in another_feed_entries} == {
+            entry.id for entry in another_entries[: min_entries + 3]
+        }
+
+    @pytest.mark.asyncio
+    async def test_respect_last_ingestion(self, loaded_feed: Feed) -> None:
+        min_entries = settings.min_entries_per_feed
+        keep_entries = min_entries + 3
+
+        entries = await make.n_entries_list(loaded_feed, n=keep_entries + 5)
+
+        await catalog_entries(loaded_feed.id, _to_collected_entries(entries[:keep_entries]))
+
+        async with TableSizeDelta("l_feeds_to_entries", delta=-5):
+            unlinked = await unlink_feeds_tails(execute, [loaded_feed.id], offset=min_entries)
+
+        assert unlinked == {entry.id for entry in entries[keep_entries:]}
+
+    @pytest.mark.asyncio
+    async def test_old_entries(self, loaded_feed: Feed) -> None:
+        min_entries = settings.min_entries_per_feed
+
+        entries = await make.n_entries_list(loaded_feed, n=min_entries + 5)
+
+        await catalog_entries(loaded_feed.id, _to_collected_entries(entries[: min_entries - 3]))
+
+        async with TableSizeDelta("l_feeds_to_entries", delta=-5):
+            unlinked = await unlink_feeds_tails(execute, [loaded_feed.id], period=datetime.timedelta(days=0))
+
+        assert unlinked == {entry.id for entry in entries[min_entries:]}
+
+    @pytest.mark.asyncio
+    async def test_no_old_entries(self, loaded_feed: Feed) -> None:
+        min_entries = settings.min_entries_per_feed
+
+        entries = await make.n_entries_list(loaded_feed, n=min_entries + 5)
+
+        await catalog_entries(loaded_feed.id, _to_collected_entries(entries[:1]))
+
+        async with TableSizeNotChanged("l_feeds_to_entries"):
+            unlinked = await unlink_feeds_tails(execute, [loaded_feed.id], period=datetime.timedelta(days=1))
+
+        assert unlinked == set()
+
+    @pytest.mark.asyncio
+    async def test_respect_neighbour_feed(self, loaded_feed: Feed, another_loaded_feed: Feed) -> None:
+        min_entries = settings.min_entries_per_feed
+
+        entries = await make.n_entries_list(loaded_feed, n=min_entries + 5)
+        await catalog_entries(loaded_feed.id, _to_collected_entries(entries[:min_entries]))
+
+        await catalog_entries(another_loaded_feed.id, _to_collected_entries(entries))
+
+        async with TableSizeDelta("l_feeds_to_entries", delta=-2):
+            unlinked = await unlink_feeds_tails(execute, [loaded_feed.id], offset=min_entries + 3)
+
+        assert unlinked == {entry.id for entry in entries[min_entries + 3 :]}
+
+        another_feed_entries = await get_entries_by_filter(feeds_ids=[another_loaded_feed.id], limit=100500)
+        assert {entry.id for entry in another_feed_entries} == {entry.id for entry in entries}
+
+
 class TestRemoveEntriesByIds:
 
     @pytest.mark.asyncio
@@ -1510,6 +1668,16 @@ class TestGetOrphanedEntries:
 
         assert len(orphaned_entries & ids) == 2
 
+    @pytest.mark.asyncio
+    async def test_cursor(self) -> None:
+        ids = sorted(new_entry_id() for _ in range(5))
+        await try_mark_as_orphanes(execute, set(ids))
+
+        assert await get_orphaned_entries(limit=2) == set(ids[:2])
+        assert await get_orphaned_entries(limit=2, after_entry_id=ids[1]) == set(ids[2:4])
+        assert await get_orphaned_entries(limit=2, after_entry_id=ids[3]) == {ids[4]}
+        assert await get_orphaned_entries(limit=2, after_entry_id=ids[4]) == set()
+
 
 class TestTryMarkAsOrphanes:
 
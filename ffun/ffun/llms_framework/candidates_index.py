@@ -0,0 +1,68 @@
+import collections
+import datetime
+import time
+
+from ffun.feeds.entities import FeedId
+from ffun.llms_framework.entities import LLMProvider, UserKeyCandidate
+from ffun.llms_framework.settings import settings
+
+CandidatesKey = tuple[LLMProvider, frozenset[FeedId]]
+CandidatesRecord = tuple[float, list[UserKeyCandidate]]  # expiration time + candidates
+
+
+class CandidatesIndex:
+    """Short-living LRU index of users, whose API keys can be used to process entries of feeds.
+
+    Maps a provider + a set of feeds to the subscribers of the feeds, who have keys for the provider.
+    Records expire after the TTL, so changes of subscriptions and users' settings are visible after it.
+
+    Resources of users are not indexed, they are checked by the reservation itself.
+    """
+
+    __slots__ = ("_ttl", "_max_size", "_records")
+
+    def __init__(self, ttl: datetime.timedelta, max_size: int) -> None:
+        self._ttl = ttl.total_seconds()
+        self._max_size = max_size
+        self._records: collections.OrderedDict[CandidatesKey, CandidatesRecord] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, provider: LLMProvider, feed_ids: set[FeedId]) -> list[UserKeyCandidate] | None:
+        key = (provider, frozenset(feed_ids))
+
+        record = self._records.get(key)
+
+        if record is None:
+            return None
+
+        expire_at, candidates = record
+
+        if expire_at <= time.monotonic():
+            del self._records[key]
+            return None
+
+        self._records.move_to_end(key)
+
+        return candidates
+
+    def set(self, provider: LLMProvider, feed_ids: set[FeedId], candidates: list[UserKeyCandidate]) -> None:
+        if self._max_size <= 0:
+            return
+
+        key = (provider, frozenset(feed_ids))
+
+        self._records[key] = (time.monotonic() + self._ttl, candidates)
+        self._records.move_to_end(key)
+
+        while len(self._records) > self._max_size:
+            self._records.popitem(last=False)
+
+    def clear(self) -> None:
+        self._records.clear()
+
+
+candidates_index = CandidatesIndex(
+    ttl=settings.user_keys_candidates_ttl, max_size=settings.user_keys_candidates_index_size
+)
@@ -1,7 +1,7 @@
 import asyncio
 import math
 from decimal import Decimal
-from typing import Sequence
+from typing import Mapping, Sequence
 
 from ffun.core import logging
 from ffun.domain.datetime_intervals import month_interval_start
@@ -13,6 +13,7 @@ from ffun.llms_framework.entities import (
     ChatRequest,
     ChatResponse,
     LLMApiKey,
+    LLMBatchId,
     LLMConfiguration,
     LLMCostPoints,
     LLMTokens,
@@ -30,65 +31,71 @@ def cost_points_to_usd_cost(points: LLMCostPoints) -> USDCost:
     return _cost_points.to_cost(points)
 
 
-def split_text(text: str, parts: int, intersection: int) -> list[str]:
+def split_text_borders(text_length: int, parts: int, intersection: int) -> list[tuple[int, int]]:
     if parts < 1:
         raise errors.TextPartsMustBePositive()
 
     if intersection < 0:
         raise errors.TextIntersectionMustBePositiveOrZero()
 
-    if not text:
+    if text_length == 0:
         raise errors.TextIsEmpty()
 
     if parts == 1:
-        return [text]
+        return [(0, text_length)]
 
-    base_part_size = int(math.ceil(len(text) / parts))
+    base_part_size = int(math.ceil(text_length / parts))
 
-    if base_part_size * parts - len(text) >= base_part_size:
+    if base_part_size * parts - text_length >= base_part_size:
         raise errors.TextIsTooShort()
 
-    text_parts: list[str] = []
+    borders: list[tuple[int, int]] = []
 
     index = 0
 
-    while index < len(text):
+    while index < text_length:
         left_border = max(0, index - intersection)
-        right_border = min(len(text), index + base_part_size + intersection)
-
-        part = text[left_border:right_border]
+        right_border = min(text_length, index + base_part_size + intersection)
 
-        text_parts.append(part)
+        borders.append((left_border, right_border))
 
         index += base_part_size
 
-    return text_parts
+    return borders
+
+
+def split_text(text: str, parts: int, intersection: int) -> list[str]:
+    borders = split_text_borders(len(text), parts=parts, intersection=intersection)
+
+    return [text[left_border:right_border] for left_border, right_border in borders]
 
 
-def split_text_according_to_tokens(  # noqa: CCR001
+def split_text_according_to_tokens(
     llm: ProviderInterface,
     llm_config: LLMConfiguration,
     text: str,
     text_parts_intersection: int,
 ) -> list[str]:
-    parts_number = 0
-
     model = llm.get_model(llm_config)
 
-    while True:
-        parts_number += 1
+    max_part_tokens = model.max_context_size - llm_config.max_return_tokens
 
-        parts = split_text(text, parts=parts_number, intersection=text_parts_intersection)
+    count_tokens = llm.text_tokens_counter(llm_config, text)
 
-        parts_tokens = [llm.estimate_tokens(llm_config, text=part) for part in parts]
+    # Each part contains at least its share of the text tokens and the full prompt overhead
+    # => we can not split the text into fewer parts than this number.
+    parts_number = max(1, math.ceil(count_tokens(0, len(text)) / max_part_tokens))
 
-        if any(tokens + llm_config.max_return_tokens >= model.max_context_size for tokens in parts_tokens):
-            continue
+    while True:
+        borders = split_text_borders(len(text), parts=parts_number, intersection=text_parts_intersection)
+
+        if all(count_tokens(left_border, right_border) < max_part_tokens for left_border, right_border in borders):
+            return [text[left_border:right_border] for left_border, right_border in borders]
 
-        return parts
+        parts_number += 1
 
 
-def cut_text_to_max_tokens(  # noqa: CCR001
+def cut_text_to_max_tokens(
     llm: ProviderInterface,
     llm_config: LLMConfiguration,
     text: str,
@@ -98,28 +105,7 @@ def cut_text_to_max_tokens(  # noqa: CCR001
     if max_tokens <= 0:
         raise errors.MaxTokensMustBePositive()
 
-    left_border = 0
-
-    right_border = len(text)
-    right_tokens = llm.estimate_tokens(llm_config, text=text)
-
-    if right_tokens <= max_tokens:
-        return text
-
-    while True:
-        mid_border = (left_border + right_border) // 2
-        mid_tokens = llm.estimate_tokens(llm_config, text=text[:mid_border])
-
-        if mid_tokens > max_tokens:
-            right_border = mid_border
-            right_tokens = mid_tokens
-        else:
-            left_border = mid_border
-
-        if right_border - left_border <= 1:
-            break
-
-    return text[:left_border]
+    return llm.cut_text_to_max_tokens(llm_config, text=text, max_tokens=max_tokens)
 
 
 def _estimate_reserved_cost(
@@ -151,6 +137,25 @@ def configured_api_key_usage(
     )
 
 
+def configured_batch_api_key_usage(
+    *,
+    llm: ProviderInterface,
+    llm_config: LLMConfiguration,
+    api_key: LLMApiKey,
+    requests_number: int,
+) -> APIKeyUsage:
+    model = llm.get_model(llm_config)
+
+    return APIKeyUsage(
+        provider=llm.provider,
+        user_id=None,
+        api_key=api_key,
+        reserved_cost=USDCost(requests_number * model.max_batch_request_cost),
+        used_cost=None,
+        interval_started_at=month_interval_start(),
+    )
+
+
 async def search_for_user_api_key(
     llm: ProviderInterface,
     llm_config: LLMConfiguration,
@@ -211,3 +216,52 @@ async def call_llm(
             raise first_request_error
 
     return results  # type: ignore
+
+
+async def submit_llm_batch(
+    llm: ProviderInterface, llm_config: LLMConfiguration, api_key: LLMApiKey, requests: Mapping[str, ChatRequest]
+) -> LLMBatchId:
+    batch_id = await llm.submit_batch(llm_config, api_key, requests)
+
+    logger.info("llm_batch_submitted", batch_id=batch_id, requests_number=len(requests))
+
+    return batch_id
+
+
+async def collect_llm_batch(
+    llm: ProviderInterface, llm_config: LLMConfiguration, api_key_usage: APIKeyUsage, batch_id: LLMBatchId
+) -> dict[str, ChatResponse] | None:
+    """Return responses of a finished batch job by custom ids of requests or None if the job is still running.
+
+    Key usage is registered only when the job is finished, because only then we know the real cost.
+    `api_key_usage` must reserve the cost of all requests of the batch.
+    """
+    model = llm.get_model(llm_config)
+
+    try:
+        responses = await llm.get_batch_results(llm_config, api_key_usage.api_key, batch_id)
+    except errors.BatchFailed:
+        # failed batch jobs are not billed
+        async with use_api_key(api_key_usage):
+            api_key_usage.used_cost = USDCost(Decimal(0))
+        raise
+
+    if responses is None:
+        return None
+
+    async with use_api_key(api_key_usage):
+        api_key_usage.used_cost = USDCost(
+            sum(
+                (
+                    model.batch_tokens_cost(
+                        input_tokens=response.input_tokens(), output_tokens=response.output_tokens()
+                    )
+                    for response in responses.values()
+                ),
+                Decimal(0),
+            )
+        )
+
+    logger.info("llm_batch_collected", batch_id=batch_id, responses_number=len(responses))
+
+    return responses
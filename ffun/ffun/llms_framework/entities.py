@@ -1,5 +1,6 @@
 import datetime
 import enum
+from decimal import Decimal
 from typing import Annotated, Literal, NewType
 
 import pydantic
@@ -12,6 +13,7 @@ from ffun.feeds.entities import FeedId
 LLMApiKey = NewType("LLMApiKey", str)
 LLMUserApiKey = NewType("LLMUserApiKey", LLMApiKey)
 LLMCostPoints = NewType("LLMCostPoints", int)
+LLMBatchId = NewType("LLMBatchId", str)
 
 
 class LLMProvider(enum.StrEnum):
@@ -29,6 +31,9 @@ class ModelInfo(pydantic.BaseModel):
     input_1m_tokens_cost: USDCost
     output_1m_tokens_cost: USDCost
 
+    # part of the regular price that providers charge for requests from batch jobs
+    batch_cost_ratio: Decimal = Decimal(1)
+
     def tokens_cost(self, input_tokens: LLMTokens, output_tokens: LLMTokens) -> USDCost:
         cost = (
             self.input_1m_tokens_cost * input_tokens / 1_000_000
@@ -36,10 +41,19 @@ class ModelInfo(pydantic.BaseModel):
         )
         return USDCost(cost)
 
+    def batch_tokens_cost(self, input_tokens: LLMTokens, output_tokens: LLMTokens) -> USDCost:
+        return USDCost(
+            self.tokens_cost(input_tokens=input_tokens, output_tokens=output_tokens) * self.batch_cost_ratio
+        )
+
     @property
     def max_request_cost(self) -> USDCost:
         return self.tokens_cost(input_tokens=self.max_context_size, output_tokens=self.max_return_tokens)
 
+    @property
+    def max_batch_request_cost(self) -> USDCost:
+        return self.batch_tokens_cost(input_tokens=self.max_context_size, output_tokens=self.max_return_tokens)
+
 
 class KeyStatus(str, enum.Enum):
     works = "works"
@@ -96,11 +110,14 @@ class APIKeyUsage(BaseEntity):
         return self.reserved_cost
 
 
-class UserKeyInfo(BaseEntity):
+class UserKeyCandidate(BaseEntity):
     user_id: UserId
     api_key: LLMApiKey | None
     max_tokens_cost_in_month: USDCost
     process_entries_not_older_than: datetime.timedelta
+
+
+class UserKeyInfo(UserKeyCandidate):
     cost_used: USDCost
 
 
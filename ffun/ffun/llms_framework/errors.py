@@ -43,3 +43,7 @@ class FeedsFromCollectionsMustNotBeProcessedWithUserAPIKeys(Error):
 
 class MaxTokensMustBePositive(Error):
     pass
+
+
+class BatchFailed(Error):
+    pass
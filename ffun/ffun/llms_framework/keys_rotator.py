@@ -1,7 +1,7 @@
 import contextlib
 import datetime
 from decimal import Decimal
-from typing import Any, AsyncGenerator, Iterable
+from typing import Any, AsyncGenerator, Iterable, Sequence, TypeVar
 
 from ffun.core import logging
 from ffun.domain.entities import UserId
@@ -9,6 +9,7 @@ from ffun.feeds.entities import FeedId
 from ffun.feeds_collections.collections import collections
 from ffun.feeds_links import domain as fl_domain
 from ffun.llms_framework import errors
+from ffun.llms_framework.candidates_index import candidates_index
 from ffun.llms_framework.entities import (
     APIKeyUsage,
     KeyStatus,
@@ -18,6 +19,7 @@ from ffun.llms_framework.entities import (
     LLMProvider,
     SelectKeyContext,
     USDCost,
+    UserKeyCandidate,
     UserKeyInfo,
 )
 from ffun.llms_framework.provider_interface import ProviderInterface
@@ -27,6 +29,8 @@ from ffun.user_settings import entities as us_entities
 
 logger = logging.get_module_logger()
 
+CandidateT = TypeVar("CandidateT", bound=UserKeyCandidate)
+
 
 # TODO: cost
 class CostPoints:
@@ -70,51 +74,60 @@ async def _api_key_is_working(llm: ProviderInterface, llm_config: LLMConfigurati
 
 
 async def _filter_out_users_with_wrong_keys(
-    llm: ProviderInterface, llm_config: LLMConfiguration, infos: list[UserKeyInfo], **kwargs: Any
-) -> list[UserKeyInfo]:
+    llm: ProviderInterface, llm_config: LLMConfiguration, infos: list[CandidateT], **kwargs: Any
+) -> list[CandidateT]:
     return [info for info in infos if info.api_key and await _api_key_is_working(llm, llm_config, info.api_key)]
 
 
-async def _filter_out_users_without_keys(infos: list[UserKeyInfo], **kwargs: Any) -> list[UserKeyInfo]:
+async def _filter_out_users_without_keys(infos: list[CandidateT], **kwargs: Any) -> list[CandidateT]:
     return [info for info in infos if info.api_key]
 
 
 async def _filter_out_users_for_whome_entry_is_too_old(
-    infos: list[UserKeyInfo], entry_age: datetime.timedelta, **kwargs: Any
-) -> list[UserKeyInfo]:
+    infos: list[CandidateT], entry_age: datetime.timedelta, **kwargs: Any
+) -> list[CandidateT]:
     return [info for info in infos if info.process_entries_not_older_than >= entry_age]
 
 
-async def _filter_out_users_with_overused_keys(
-    infos: list[UserKeyInfo], reserved_cost: USDCost, **kwargs: Any
-) -> list[UserKeyInfo]:
-    return [info for info in infos if info.cost_used + reserved_cost < info.max_tokens_cost_in_month]
+def _user_key_info(candidate: UserKeyCandidate, cost_used: USDCost) -> UserKeyInfo:
+    return UserKeyInfo(
+        user_id=candidate.user_id,
+        api_key=candidate.api_key,
+        max_tokens_cost_in_month=candidate.max_tokens_cost_in_month,
+        process_entries_not_older_than=candidate.process_entries_not_older_than,
+        cost_used=cost_used,
+    )
 
 
+# Users are not filtered by their resources: the reservation chooses the least used user
+# and checks the limit atomically, in a single statement for all candidates
 async def _choose_user(
-    infos: list[UserKeyInfo], reserved_cost: USDCost, interval_started_at: datetime.datetime
+    infos: Sequence[UserKeyCandidate], reserved_cost: USDCost, interval_started_at: datetime.datetime
 ) -> UserKeyInfo | None:
     from ffun.product.entities import Resource as AppResource
 
-    for info in infos:
+    if not infos:
+        return None
+
+    amount = _cost_points.to_points(reserved_cost)
 
-        if await r_domain.try_to_reserve(
-            user_id=info.user_id,
-            kind=AppResource.tokens_cost,
-            interval_started_at=interval_started_at,
-            amount=_cost_points.to_points(reserved_cost),
-            limit=_cost_points.to_points(info.max_tokens_cost_in_month),
-        ):
-            return info
+    resource = await r_domain.reserve_for_least_used(
+        limits={info.user_id: _cost_points.to_points(info.max_tokens_cost_in_month) for info in infos},
+        kind=AppResource.tokens_cost,
+        interval_started_at=interval_started_at,
+        amount=amount,
+    )
+
+    if resource is None:
+        return None
 
-    return None
+    info = next(info for info in infos if info.user_id == resource.user_id)
+
+    return _user_key_info(info, cost_used=_cost_points.to_cost(LLMCostPoints(resource.total - amount)))
 
 
 # TODO: test that works for openai and gemini
-async def _get_user_key_infos(  # pylint: disable=R0914
-    provider: LLMProvider, user_ids: Iterable[UserId], interval_started_at: datetime.datetime
-) -> list[UserKeyInfo]:
-    from ffun.product.entities import Resource as AppResource
+async def _get_user_key_candidates(provider: LLMProvider, user_ids: Iterable[UserId]) -> list[UserKeyCandidate]:
     from ffun.product.entities import UserSetting
 
     # TODO: move somewhere in configs
@@ -140,11 +153,7 @@ async def _get_user_key_infos(  # pylint: disable=R0914
         kinds=kinds,
     )
 
-    resources = await r_domain.load_resources(
-        user_ids=user_ids, kind=AppResource.tokens_cost, interval_started_at=interval_started_at
-    )
-
-    infos = []
+    candidates = []
 
     for user_id in user_ids:
         settings = users_settings[user_id]
@@ -161,24 +170,37 @@ async def _get_user_key_infos(  # pylint: disable=R0914
         assert isinstance(api_key_raw, str)
         api_key = LLMApiKey(api_key_raw)
 
-        infos.append(
-            UserKeyInfo(
+        candidates.append(
+            UserKeyCandidate(
                 user_id=user_id,
                 api_key=api_key,
                 max_tokens_cost_in_month=max_tokens_cost_in_month,
                 process_entries_not_older_than=datetime.timedelta(days=days),
-                cost_used=_cost_points.to_cost(LLMCostPoints(resources[user_id].total)),
             )
         )
 
-    return infos
+    return candidates
+
+
+async def _get_indexed_candidates(provider: LLMProvider, feed_ids: set[FeedId]) -> list[UserKeyCandidate]:
+    candidates = candidates_index.get(provider, feed_ids)
+
+    if candidates is not None:
+        return candidates
+
+    user_ids = await fl_domain.get_linked_users_flat(feed_ids)
+
+    candidates = await _filter_out_users_without_keys(await _get_user_key_candidates(provider, user_ids))
+
+    candidates_index.set(provider, feed_ids, candidates)
+
+    return candidates
 
 
 _filters = (  # type: ignore
     _filter_out_users_without_keys,  # type: ignore
     _filter_out_users_for_whome_entry_is_too_old,  # type: ignore
     _filter_out_users_with_wrong_keys,  # type: ignore
-    _filter_out_users_with_overused_keys,  # type: ignore
 )
 
 
@@ -186,23 +208,17 @@ async def _get_candidates(  # noqa
     llm: ProviderInterface,
     llm_config: LLMConfiguration,
     feed_ids: set[FeedId],
-    interval_started_at: datetime.datetime,
     entry_age: datetime.timedelta,
-    reserved_cost: USDCost,
     filters: tuple[Any, ...] = _filters,
-) -> list[UserKeyInfo]:
-    user_ids = await fl_domain.get_linked_users_flat(feed_ids)
-
-    infos = await _get_user_key_infos(llm.provider, user_ids, interval_started_at)
+) -> list[UserKeyCandidate]:
+    infos = await _get_indexed_candidates(llm.provider, feed_ids)
 
     for _filter in filters:  # type: ignore
 
         if not infos:
             return []
 
-        infos = await _filter(  # type: ignore
-            llm=llm, llm_config=llm_config, infos=infos, entry_age=entry_age, reserved_cost=reserved_cost
-        )
+        infos = await _filter(llm=llm, llm_config=llm_config, infos=infos, entry_age=entry_age)  # type: ignore
 
     return infos
 
@@ -215,16 +231,7 @@ async def _find_best_user_with_key(
     interval_started_at: datetime.datetime,
     reserved_cost: USDCost,
 ) -> UserKeyInfo | None:
-    infos = await _get_candidates(
-        llm=llm,
-        llm_config=llm_config,
-        feed_ids=feed_ids,
-        interval_started_at=interval_started_at,
-        entry_age=entry_age,
-        reserved_cost=reserved_cost,
-    )
-
-    infos.sort(key=lambda info: info.cost_used)
+    infos = await _get_candidates(llm=llm, llm_config=llm_config, feed_ids=feed_ids, entry_age=entry_age)
 
     return await _choose_user(infos=infos, reserved_cost=reserved_cost, interval_started_at=interval_started_at)
 
@@ -1,10 +1,12 @@
-from typing import Sequence
+import uuid
+from typing import Callable, Mapping, Sequence
 
 from ffun.llms_framework import errors
 from ffun.llms_framework.entities import (
     ChatRequest,
     ChatResponse,
     KeyStatus,
+    LLMBatchId,
     LLMConfiguration,
     LLMProvider,
     LLMTokens,
@@ -18,6 +20,8 @@ class ProviderInterface:
 
     provider: LLMProvider = NotImplemented
 
+    supports_batches: bool = False
+
     def __init__(self) -> None:
         self.api_keys_statuses = Statuses()
 
@@ -39,12 +43,65 @@ class ProviderInterface:
     def estimate_tokens(self, config: LLMConfiguration, text: str) -> int:
         raise NotImplementedError("Must be implemented in a subclass")
 
+    def text_tokens_counter(self, config: LLMConfiguration, text: str) -> Callable[[int, int], int]:
+        """Return a function that estimates tokens for `text[start:end]` as `estimate_tokens` does.
+
+        The default implementation estimates every requested part from scratch.
+        Providers with a local tokenizer should override it to tokenize the text only once.
+        """
+
+        def count(start: int, end: int) -> int:
+            return self.estimate_tokens(config, text=text[start:end])
+
+        return count
+
+    def cut_text_to_max_tokens(self, config: LLMConfiguration, text: str, max_tokens: LLMTokens) -> str:
+        """Return the longest prefix of the text that fits into `max_tokens`.
+
+        The default implementation binary-searches over character offsets with `estimate_tokens`,
+        so it works for any provider. Providers with a local tokenizer should override it
+        to tokenize the text only once.
+        """
+        left_border = 0
+        right_border = len(text)
+
+        if self.estimate_tokens(config, text=text) <= max_tokens:
+            return text
+
+        while right_border - left_border > 1:
+            mid_border = (left_border + right_border) // 2
+
+            if self.estimate_tokens(config, text=text[:mid_border]) > max_tokens:
+                right_border = mid_border
+            else:
+                left_border = mid_border
+
+        return text[:left_border]
+
     async def chat_request(self, config: LLMConfiguration, api_key: str, request: ChatRequest) -> ChatResponse:
         raise NotImplementedError("Must be implemented in a subclass")
 
     async def check_api_key(self, config: LLMConfiguration, api_key: str) -> KeyStatus:
         raise NotImplementedError("Must be implemented in a subclass")
 
+    async def submit_batch(
+        self, config: LLMConfiguration, api_key: str, requests: Mapping[str, ChatRequest]
+    ) -> LLMBatchId:
+        """Submit requests as a single batch job, keys of `requests` are custom ids of the requests."""
+        raise NotImplementedError("Must be implemented in a subclass")
+
+    async def get_batch_results(
+        self, config: LLMConfiguration, api_key: str, batch_id: LLMBatchId
+    ) -> dict[str, ChatResponse] | None:
+        """Return responses by custom ids of requests or None if the batch job is not finished yet.
+
+        Responses for failed requests are not returned.
+        """
+        raise NotImplementedError("Must be implemented in a subclass")
+
+    async def close(self) -> None:
+        """Release resources of the provider, like cached API clients."""
+
 
 class ChatRequestTest(ChatRequest):
     text: str
@@ -67,6 +124,12 @@ class ChatResponseTest(ChatResponse):
 class ProviderTest(ProviderInterface):
     provider = LLMProvider.test
 
+    supports_batches = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: dict[LLMBatchId, dict[str, ChatResponse] | None] = {}
+
     def prepare_requests(
         self, config: LLMConfiguration, text: str, text_parts_intersection: int
     ) -> Sequence[ChatRequestTest]:
@@ -90,5 +153,33 @@ class ProviderTest(ProviderInterface):
     async def check_api_key(self, config: LLMConfiguration, api_key: str) -> KeyStatus:
         return KeyStatus.works
 
+    async def submit_batch(  # type: ignore
+        self, config: LLMConfiguration, api_key: str, requests: Mapping[str, ChatRequestTest]
+    ) -> LLMBatchId:
+        """Stub of a batch job: all requests are completed at the moment of submission."""
+        batch_id = LLMBatchId(uuid.uuid4().hex)
+
+        if any("raise BatchFailed" in request.text for request in requests.values()):
+            self.batches[batch_id] = None
+            return batch_id
+
+        self.batches[batch_id] = {
+            custom_id: ChatResponseTest(content=request.text)
+            for custom_id, request in requests.items()
+            if "raise RequestWasRejected" not in request.text
+        }
+
+        return batch_id
+
+    async def get_batch_results(
+        self, config: LLMConfiguration, api_key: str, batch_id: LLMBatchId
+    ) -> dict[str, ChatResponse] | None:
+        responses = self.batches.pop(batch_id, None)
+
+        if responses is None:
+            raise errors.BatchFailed(message="batch failed")
+
+        return responses
+
 
 provider_test = ProviderTest()
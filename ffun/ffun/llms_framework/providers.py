@@ -18,3 +18,8 @@ llm_providers: LLMProviders = Register()
 llm_providers.add(Value(LLMProvider.test, provider_test))
 llm_providers.add(Value(LLMProvider.openai, openai_provider))
 llm_providers.add(Value(LLMProvider.google, google_provider))
+
+
+async def close_providers() -> None:
+    for value in llm_providers.all().values():
+        await value.provider.close()
@@ -27,6 +27,10 @@ class Settings(BaseSettings):
     key_quota_timeout: datetime.timedelta = datetime.timedelta(hours=1)
     key_broken_timeout: datetime.timedelta = datetime.timedelta(hours=1)
 
+    # changes of users' settings are visible to workers after this timeout
+    user_keys_candidates_ttl: datetime.timedelta = datetime.timedelta(minutes=1)
+    user_keys_candidates_index_size: int = 10_000
+
     @pydantic.computed_field  # type: ignore
     @functools.cached_property
     def models(self) -> list[ModelInfo]:
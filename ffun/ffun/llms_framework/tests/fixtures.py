@@ -7,21 +7,24 @@ import pytest_asyncio
 
 from ffun.domain.datetime_intervals import month_interval_start
 from ffun.domain.entities import UserId
+from ffun.llms_framework.candidates_index import candidates_index
 from ffun.llms_framework.entities import LLMApiKey, LLMProvider, USDCost, UserKeyInfo
-from ffun.llms_framework.keys_rotator import _cost_points, _get_user_key_infos
+from ffun.llms_framework.keys_rotator import _cost_points, _get_user_key_candidates, _user_key_info
 from ffun.llms_framework.keys_statuses import Statuses
 from ffun.llms_framework.provider_interface import ProviderTest
 from ffun.resources import domain as r_domain
 from ffun.user_settings import domain as us_domain
 from ffun.user_settings.entities import SettingKind
 
+_used_cost = USDCost(Decimal(345))
+
 
 async def _save_user_key_info_settings(user_id: UserId, interval_started_at: datetime.datetime) -> None:
     from ffun.product.entities import Resource as AppResource
     from ffun.product.entities import UserSetting
 
     max_tokens_cost_in_month = USDCost(Decimal(1000))
-    used_cost = USDCost(Decimal(345))
+    used_cost = _used_cost
 
     await us_domain.save_setting(
         user_id=user_id, kind=SettingKind(int(UserSetting.test_api_key)), value=uuid.uuid4().hex
@@ -35,12 +38,11 @@ async def _save_user_key_info_settings(user_id: UserId, interval_started_at: dat
         user_id=user_id, kind=SettingKind(int(UserSetting.process_entries_not_older_than)), value=3
     )
 
-    await r_domain.try_to_reserve(
-        user_id=user_id,
+    await r_domain.reserve_for_least_used(
+        limits={user_id: _cost_points.to_points(max_tokens_cost_in_month)},
         kind=AppResource.tokens_cost,
         interval_started_at=interval_started_at,
         amount=_cost_points.to_points(used_cost),
-        limit=_cost_points.to_points(max_tokens_cost_in_month),
     )
 
     await r_domain.convert_reserved_to_used(
@@ -52,13 +54,21 @@ async def _save_user_key_info_settings(user_id: UserId, interval_started_at: dat
     )
 
 
+# candidates are loaded as the keys rotator loads them for the candidates index,
+# their used cost is known from the saved resources
+async def _user_key_infos(user_ids: list[UserId]) -> list[UserKeyInfo]:
+    candidates = await _get_user_key_candidates(LLMProvider.test, user_ids)
+
+    return [_user_key_info(candidate, cost_used=_used_cost) for candidate in candidates]
+
+
 @pytest_asyncio.fixture  # type: ignore
 async def user_key_info(internal_user_id: UserId) -> UserKeyInfo:
     interval_started_at = month_interval_start()
 
     await _save_user_key_info_settings(internal_user_id, interval_started_at)
 
-    infos = await _get_user_key_infos(LLMProvider.test, [internal_user_id], interval_started_at)
+    infos = await _user_key_infos([internal_user_id])
 
     return infos[0]
 
@@ -73,7 +83,13 @@ async def five_user_key_infos(
     for user_id in five_internal_user_ids:
         await _save_user_key_info_settings(user_id, interval_started_at)
 
-    return await _get_user_key_infos(LLMProvider.test, five_internal_user_ids, interval_started_at)
+    return await _user_key_infos(five_internal_user_ids)
+
+
+# subscriptions and settings change between tests => cached candidates must not leak into other tests
+@pytest.fixture(autouse=True)
+def clear_candidates_index() -> None:
+    candidates_index.clear()
 
 
 @pytest.fixture  # type: ignore
@@ -0,0 +1,90 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+from pytest_mock import MockerFixture
+
+from ffun.domain.entities import UserId
+from ffun.feeds.entities import FeedId
+from ffun.llms_framework.candidates_index import CandidatesIndex
+from ffun.llms_framework.entities import LLMApiKey, LLMProvider, USDCost, UserKeyCandidate
+
+
+def _candidate() -> UserKeyCandidate:
+    return UserKeyCandidate(
+        user_id=UserId(uuid.uuid4()),
+        api_key=LLMApiKey(uuid.uuid4().hex),
+        max_tokens_cost_in_month=USDCost(Decimal(100)),
+        process_entries_not_older_than=datetime.timedelta(days=1),
+    )
+
+
+_feed_ids = {FeedId(uuid.uuid4()), FeedId(uuid.uuid4())}
+_another_feed_ids = {FeedId(uuid.uuid4())}
+
+
+class TestCandidatesIndex:
+
+    def test_get_set(self) -> None:
+        index = CandidatesIndex(ttl=datetime.timedelta(minutes=1), max_size=10)
+
+        candidates = [_candidate(), _candidate()]
+
+        assert index.get(LLMProvider.test, _feed_ids) is None
+
+        index.set(LLMProvider.test, _feed_ids, candidates)
+
+        assert index.get(LLMProvider.test, set(_feed_ids)) == candidates
+        assert index.get(LLMProvider.openai, _feed_ids) is None
+        assert index.get(LLMProvider.test, _another_feed_ids) is None
+
+    def test_expiration(self, mocker: MockerFixture) -> None:
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+
+        index = CandidatesIndex(ttl=datetime.timedelta(seconds=10), max_size=10)
+
+        candidates = [_candidate()]
+
+        index.set(LLMProvider.test, _feed_ids, candidates)
+
+        monotonic.return_value = 109.0
+
+        assert index.get(LLMProvider.test, _feed_ids) == candidates
+
+        monotonic.return_value = 110.0
+
+        assert index.get(LLMProvider.test, _feed_ids) is None
+        assert len(index) == 0
+
+    def test_max_size(self) -> None:
+        index = CandidatesIndex(ttl=datetime.timedelta(minutes=1), max_size=2)
+
+        feed_ids = [{FeedId(uuid.uuid4())} for _ in range(3)]
+
+        index.set(LLMProvider.test, feed_ids[0], [])
+        index.set(LLMProvider.test, feed_ids[1], [])
+
+        # last recently used record is kept
+        assert index.get(LLMProvider.test, feed_ids[0]) == []
+
+        index.set(LLMProvider.test, feed_ids[2], [])
+
+        assert len(index) == 2
+        assert index.get(LLMProvider.test, feed_ids[0]) == []
+        assert index.get(LLMProvider.test, feed_ids[1]) is None
+
+    def test_disabled(self) -> None:
+        index = CandidatesIndex(ttl=datetime.timedelta(minutes=1), max_size=0)
+
+        index.set(LLMProvider.test, _feed_ids, [_candidate()])
+
+        assert index.get(LLMProvider.test, _feed_ids) is None
+
+    def test_clear(self) -> None:
+        index = CandidatesIndex(ttl=datetime.timedelta(minutes=1), max_size=10)
+
+        index.set(LLMProvider.test, _feed_ids, [_candidate()])
+
+        index.clear()
+
+        assert len(index) == 0
@@ -1,26 +1,32 @@
 from decimal import Decimal
 
 import pytest
+from pytest_mock import MockerFixture
 
 from ffun.domain.datetime_intervals import month_interval_start
 from ffun.domain.entities import FeedId, UserId
 from ffun.feeds_links import domain as fl_domain
 from ffun.library.entities import Entry
-from ffun.llms_framework import errors
+from ffun.llms_framework import domain, errors
 from ffun.llms_framework.domain import (
     _estimate_reserved_cost,
     _llm_call_result_cost,
     call_llm,
+    collect_llm_batch,
     configured_api_key_usage,
+    configured_batch_api_key_usage,
     cost_points_to_usd_cost,
     cut_text_to_max_tokens,
     search_for_user_api_key,
     split_text,
     split_text_according_to_tokens,
+    split_text_borders,
+    submit_llm_batch,
 )
 from ffun.llms_framework.entities import (
     APIKeyUsage,
     LLMApiKey,
+    LLMBatchId,
     LLMConfiguration,
     LLMCostPoints,
     LLMTokens,
@@ -41,6 +47,23 @@ class TestCostPointsToUsdCost:
         assert cost_points_to_usd_cost(LLMCostPoints(1_500_000_000)) == USDCost(Decimal("1.5"))
 
 
+class TestSplitTextBorders:
+
+    def test_single_part(self) -> None:
+        assert split_text_borders(100, parts=1, intersection=10) == [(0, 100)]
+
+    def test_borders_match_split_text(self) -> None:
+        text = "some-text"
+
+        for parts in range(1, 4):
+            for intersection in range(4):
+                borders = split_text_borders(len(text), parts=parts, intersection=intersection)
+
+                assert [text[left:right] for left, right in borders] == split_text(
+                    text, parts=parts, intersection=intersection
+                )
+
+
 class TestSplitText:
 
     @pytest.mark.parametrize("parts_number", [-100, -1, 0])
@@ -115,8 +138,7 @@ class TestSplitTextAccordingToTokens:
         assert parts == [text]
 
     def test_multiple_parts(self, fake_llm_provider: ProviderTest, llm_config: LLMConfiguration) -> None:
-        # We test that algorithm will pass a few iterations before finding the right split
-        # => for this test, text must be splittable to 3 parts
+        # for this test, text must be splittable to 3 parts
 
         model = fake_llm_provider.get_model(llm_config)
 
@@ -153,6 +175,40 @@ class TestSplitTextAccordingToTokens:
             text_parts_intersection=2,
         ) == split_text(text, parts=2, intersection=2)
 
+    def test_starts_from_minimal_possible_parts_number(
+        self, fake_llm_provider: ProviderTest, llm_config: LLMConfiguration, mocker: MockerFixture
+    ) -> None:
+        model = fake_llm_provider.get_model(llm_config)
+
+        text = "a" * (model.max_context_size * 10)
+
+        split_text_borders_spy = mocker.spy(domain, "split_text_borders")
+
+        parts = split_text_according_to_tokens(
+            llm=fake_llm_provider,
+            llm_config=llm_config,
+            text=text,
+            text_parts_intersection=_text_parts_intersection,
+        )
+
+        assert len(parts) == 11
+
+        split_text_borders_spy.assert_called_once_with(len(text), parts=11, intersection=_text_parts_intersection)
+
+    def test_part_tokens_are_counted_once_for_text(
+        self, fake_llm_provider: ProviderTest, llm_config: LLMConfiguration, mocker: MockerFixture
+    ) -> None:
+        text_tokens_counter_spy = mocker.spy(fake_llm_provider, "text_tokens_counter")
+
+        split_text_according_to_tokens(
+            llm=fake_llm_provider,
+            llm_config=llm_config,
+            text="a" * 100_000,
+            text_parts_intersection=_text_parts_intersection,
+        )
+
+        text_tokens_counter_spy.assert_called_once()
+
 
 class TestSearchForUserAPIKey:
 
@@ -330,6 +386,41 @@ class TestConfiguredAPIKeyUsage:
         )
 
 
+class TestConfiguredBatchAPIKeyUsage:
+
+    @pytest.fixture  # type: ignore
+    def llm_config(self) -> LLMConfiguration:
+        return LLMConfiguration(
+            model="test-model-1",
+            system="system prompt",
+            max_return_tokens=LLMTokens(143),
+            temperature=0,
+            top_p=0,
+        )
+
+    def test_constructs_usage(
+        self, fake_llm_provider: ProviderTest, llm_config: LLMConfiguration, mocker: MockerFixture
+    ) -> None:
+        api_key = LLMApiKey("configured-api-key")
+
+        model = fake_llm_provider.get_model(llm_config)
+
+        mocker.patch.object(model, "batch_cost_ratio", Decimal("0.5"))
+
+        key_usage = configured_batch_api_key_usage(
+            llm=fake_llm_provider, llm_config=llm_config, api_key=api_key, requests_number=3
+        )
+
+        assert key_usage == APIKeyUsage(
+            provider=fake_llm_provider.provider,
+            user_id=None,
+            api_key=api_key,
+            reserved_cost=USDCost(3 * model.max_request_cost / 2),
+            used_cost=None,
+            interval_started_at=month_interval_start(),
+        )
+
+
 class TestLLMCallResultCost:
 
     @pytest.fixture  # type: ignore
@@ -399,12 +490,11 @@ class TestCallLLM:
             interval_started_at=interval_started_at,
         )
 
-        await r_domain.try_to_reserve(
-            user_id=internal_user_id,
+        await r_domain.reserve_for_least_used(
+            limits={internal_user_id: _cost_points.to_points(USDCost(Decimal(124512512)))},
             kind=AppResource.tokens_cost,
             interval_started_at=interval_started_at,
             amount=_cost_points.to_points(key_usage.reserved_cost),
-            limit=_cost_points.to_points(USDCost(Decimal(124512512))),
         )
 
         requests = [ChatRequestTest(text="abcd"), ChatRequestTest(text="efgh1234"), ChatRequestTest(text="99")]
@@ -465,12 +555,11 @@ class TestCallLLM:
             interval_started_at=interval_started_at,
         )
 
-        await r_domain.try_to_reserve(
-            user_id=internal_user_id,
+        await r_domain.reserve_for_least_used(
+            limits={internal_user_id: _cost_points.to_points(USDCost(Decimal(124512512)))},
             kind=AppResource.tokens_cost,
             interval_started_at=interval_started_at,
             amount=_cost_points.to_points(key_usage.reserved_cost),
-            limit=_cost_points.to_points(USDCost(Decimal(124512512))),
         )
 
         requests = [ChatRequestTest(text=text) for text in request_texts]
@@ -512,12 +601,11 @@ class TestCallLLM:
             interval_started_at=interval_started_at,
         )
 
-        await r_domain.try_to_reserve(
-            user_id=internal_user_id,
+        await r_domain.reserve_for_least_used(
+            limits={internal_user_id: _cost_points.to_points(USDCost(Decimal(124512512)))},
             kind=AppResource.tokens_cost,
             interval_started_at=interval_started_at,
             amount=_cost_points.to_points(key_usage.reserved_cost),
-            limit=_cost_points.to_points(USDCost(Decimal(124512512))),
         )
 
         requests = [
@@ -538,3 +626,93 @@ class TestCallLLM:
 
         assert key_usage.used_cost == cost
         assert resources[internal_user_id].used == _cost_points.to_points(cost)
+
+
+class TestLLMBatch:
+
+    @pytest.fixture  # type: ignore
+    def llm_config(self) -> LLMConfiguration:
+        return LLMConfiguration(
+            model="test-model-1",
+            system="system prompt",
+            max_return_tokens=LLMTokens(143),
+            temperature=0,
+            top_p=0,
+        )
+
+    @pytest.mark.asyncio
+    async def test_submit_and_collect(
+        self, fake_llm_provider: ProviderTest, llm_config: LLMConfiguration, fake_llm_api_key: LLMApiKey
+    ) -> None:
+        model = fake_llm_provider.get_model(llm_config)
+
+        requests = {
+            "request-1": ChatRequestTest(text="abcd"),
+            "request-2": ChatRequestTest(text="raise RequestWasRejected"),
+            "request-3": ChatRequestTest(text="99"),
+        }
+
+        batch_id = await submit_llm_batch(
+            llm=fake_llm_provider, llm_config=llm_config, api_key=fake_llm_api_key, requests=requests
+        )
+
+        key_usage = configured_batch_api_key_usage(
+            llm=fake_llm_provider, llm_config=llm_config, api_key=fake_llm_api_key, requests_number=len(requests)
+        )
+
+        responses = await collect_llm_batch(
+            llm=fake_llm_provider, llm_config=llm_config, api_key_usage=key_usage, batch_id=batch_id
+        )
+
+        assert responses == {
+            "request-1": ChatResponseTest(content="abcd"),
+            "request-3": ChatResponseTest(content="99"),
+        }
+
+        assert key_usage.used_cost == model.batch_tokens_cost(input_tokens=LLMTokens(6), output_tokens=LLMTokens(6))
+
+    @pytest.mark.asyncio
+    async def test_not_finished(
+        self,
+        fake_llm_provider: ProviderTest,
+        llm_config: LLMConfiguration,
+        fake_llm_api_key: LLMApiKey,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(fake_llm_provider, "get_batch_results", return_value=None)
+
+        key_usage = configured_batch_api_key_usage(
+            llm=fake_llm_provider, llm_config=llm_config, api_key=fake_llm_api_key, requests_number=1
+        )
+
+        use_api_key = mocker.patch("ffun.llms_framework.domain.use_api_key")
+
+        responses = await collect_llm_batch(
+            llm=fake_llm_provider, llm_config=llm_config, api_key_usage=key_usage, batch_id=LLMBatchId("some-batch")
+        )
+
+        assert responses is None
+        assert key_usage.used_cost is None
+        use_api_key.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_failed(
+        self, fake_llm_provider: ProviderTest, llm_config: LLMConfiguration, fake_llm_api_key: LLMApiKey
+    ) -> None:
+        batch_id = await submit_llm_batch(
+            llm=fake_llm_provider,
+            llm_config=llm_config,
+            api_key=fake_llm_api_key,
+            requests={"request-1": ChatRequestTest(text="raise BatchFailed")},
+        )
+
+        key_usage = configured_batch_api_key_usage(
+            llm=fake_llm_provider, llm_config=llm_config, api_key=fake_llm_api_key, requests_number=1
+        )
+
+        with pytest.raises(errors.BatchFailed):
+            await collect_llm_batch(
+                llm=fake_llm_provider, llm_config=llm_config, api_key_usage=key_usage, batch_id=batch_id
+            )
+
+        assert key_usage.used_cost == Decimal(0)
@@ -32,6 +32,22 @@ class TestModelInfo:
 
         assert model.max_request_cost == decimal.Decimal("0.0075")
 
+    def test_batch_costs(self) -> None:
+        model = ModelInfo(
+            provider=LLMProvider.test,
+            name="test-model",
+            max_context_size=LLMTokens(1000),
+            max_return_tokens=LLMTokens(500),
+            input_1m_tokens_cost=USDCost(decimal.Decimal("2.5")),
+            output_1m_tokens_cost=USDCost(decimal.Decimal("10")),
+            batch_cost_ratio=decimal.Decimal("0.5"),
+        )
+
+        assert model.batch_tokens_cost(input_tokens=LLMTokens(300), output_tokens=LLMTokens(20)) == decimal.Decimal(
+            "0.000475"
+        )
+        assert model.max_batch_request_cost == decimal.Decimal("0.00375")
+
 
 class TestAPIKeyUsage:
 
@@ -13,6 +13,7 @@ from ffun.feeds_collections.collections import collections
 from ffun.feeds_collections.entities import CollectionId
 from ffun.feeds_links import domain as fl_domain
 from ffun.llms_framework import errors
+from ffun.llms_framework.candidates_index import candidates_index
 from ffun.llms_framework.entities import (
     APIKeyUsage,
     KeyStatus,
@@ -22,6 +23,7 @@ from ffun.llms_framework.entities import (
     LLMTokens,
     SelectKeyContext,
     USDCost,
+    UserKeyCandidate,
     UserKeyInfo,
 )
 from ffun.llms_framework.keys_rotator import (
@@ -29,13 +31,13 @@ from ffun.llms_framework.keys_rotator import (
     _choose_user,
     _cost_points,
     _filter_out_users_for_whome_entry_is_too_old,
-    _filter_out_users_with_overused_keys,
     _filter_out_users_with_wrong_keys,
     _filter_out_users_without_keys,
     _filters,
     _find_best_user_with_key,
     _get_candidates,
-    _get_user_key_infos,
+    _get_indexed_candidates,
+    _get_user_key_candidates,
     choose_user_api_key,
     use_api_key,
 )
@@ -139,23 +141,6 @@ class TestFilterOutUsersForWhomeEntryIsTooOld:
         assert infos == [five_user_key_infos[i] for i in [0, 2, 4]]
 
 
-class TestFilterOutUsersWithOverusedKeys:
-    @pytest.mark.asyncio
-    async def test_empty_list(self) -> None:
-        assert await _filter_out_users_with_overused_keys([], reserved_cost=USDCost(Decimal(100))) == []
-
-    @pytest.mark.asyncio
-    async def test_all_working(self, five_user_key_infos: list[UserKeyInfo]) -> None:
-        for i, max_tokens_cost_in_month in enumerate([201, 100, 300, 200, 500]):
-            five_user_key_infos[i] = five_user_key_infos[i].replace(
-                cost_used=USDCost(Decimal(50)), max_tokens_cost_in_month=USDCost(Decimal(max_tokens_cost_in_month))
-            )
-
-        infos = await _filter_out_users_with_overused_keys(five_user_key_infos, reserved_cost=USDCost(Decimal(150)))
-
-        assert infos == [five_user_key_infos[i] for i in [0, 2, 4]]
-
-
 class TestChooseUser:
     @pytest.mark.asyncio
     async def test_no_users(self) -> None:
@@ -197,28 +182,21 @@ class TestChooseUser:
         assert info == five_user_key_infos[2]
 
 
-class TestGetUserKeyInfos:
+class TestGetUserKeyCandidates:
     @pytest.mark.asyncio
     async def test_no_users(self) -> None:
-        interval_started_at = month_interval_start()
-
-        assert await _get_user_key_infos(LLMProvider.test, user_ids=[], interval_started_at=interval_started_at) == []
+        assert await _get_user_key_candidates(LLMProvider.test, user_ids=[]) == []
 
     @pytest.mark.asyncio
     async def test_works(self, five_internal_user_ids: list[UserId]) -> None:
-        from ffun.product.entities import Resource as AppResource
         from ffun.product.entities import UserSetting
 
         def setting_kind(setting: UserSetting) -> SettingKind:
             return SettingKind(int(setting))
 
-        interval_started_at = month_interval_start()
-
         keys = [LLMApiKey(uuid.uuid4().hex) for _ in range(5)]
         max_tokens_cost_in_month = [USDCost(Decimal(i + 1) * 1000) for i in range(5)]
         days = list(range(5))
-        used_costs = [USDCost(Decimal(i * 100)) for i in range(5)]
-        reserved_costs = [USDCost(Decimal(i * 10)) for i in range(5)]
 
         for i, user_id in enumerate(five_internal_user_ids):
             await us_domain.save_setting(user_id=user_id, kind=setting_kind(UserSetting.openai_api_key), value=keys[i])
@@ -233,31 +211,14 @@ class TestGetUserKeyInfos:
                 user_id=user_id, kind=setting_kind(UserSetting.process_entries_not_older_than), value=days[i]
             )
 
-            await r_domain.try_to_reserve(
-                user_id=user_id,
-                kind=AppResource.tokens_cost,
-                interval_started_at=interval_started_at,
-                amount=_cost_points.to_points(reserved_costs[i]),
-                limit=_cost_points.to_points(max_tokens_cost_in_month[i]),
-            )
-
-            await r_domain.convert_reserved_to_used(
-                user_id=user_id,
-                kind=AppResource.tokens_cost,
-                interval_started_at=interval_started_at,
-                used=_cost_points.to_points(used_costs[i]),
-                reserved=0,
-            )
-
-        infos = await _get_user_key_infos(LLMProvider.openai, five_internal_user_ids, interval_started_at)
+        candidates = await _get_user_key_candidates(LLMProvider.openai, five_internal_user_ids)
 
-        assert infos == [
-            UserKeyInfo(
+        assert candidates == [
+            UserKeyCandidate(
                 user_id=five_internal_user_ids[i],
                 api_key=keys[i],
                 max_tokens_cost_in_month=max_tokens_cost_in_month[i],
                 process_entries_not_older_than=datetime.timedelta(days=days[i]),
-                cost_used=USDCost(used_costs[i] + reserved_costs[i]),
             )
             for i in range(5)
         ]
@@ -269,23 +230,18 @@ async def test_default_filters() -> None:
         _filter_out_users_without_keys,  # type: ignore
         _filter_out_users_for_whome_entry_is_too_old,  # type: ignore
         _filter_out_users_with_wrong_keys,  # type: ignore
-        _filter_out_users_with_overused_keys,  # type: ignore
     )
 
 
 class TestGetCandidates:
     @pytest.mark.asyncio
     async def test_no_users(self, fake_llm_provider: ProviderTest, saved_feed_id: FeedId) -> None:
-        interval_started_at = month_interval_start()
-
         assert (
             await _get_candidates(
                 llm=fake_llm_provider,
                 llm_config=_llm_config,
                 feed_ids={saved_feed_id},
-                interval_started_at=interval_started_at,
                 entry_age=datetime.timedelta(days=1),
-                reserved_cost=USDCost(Decimal(100)),
             )
             == []
         )
@@ -296,16 +252,16 @@ class TestGetCandidates:
         fake_llm_provider: ProviderTest,
         saved_feed_id: FeedId,
         another_saved_feed_id: FeedId,
-        five_internal_user_ids: list[UserId],
+        five_user_key_infos: list[UserKeyInfo],
     ) -> None:
+        five_internal_user_ids = [info.user_id for info in five_user_key_infos]
+
         for user_id in five_internal_user_ids[:2]:
             await fl_domain.add_link(user_id, saved_feed_id)
 
         for user_id in five_internal_user_ids[2:]:
             await fl_domain.add_link(user_id, another_saved_feed_id)
 
-        interval_started_at = month_interval_start()
-
         filter_1_users = [five_internal_user_ids[0], five_internal_user_ids[2], five_internal_user_ids[4]]
         filter_2_users = five_internal_user_ids
         filter_3_users = five_internal_user_ids[1:]
@@ -320,9 +276,7 @@ class TestGetCandidates:
             llm=fake_llm_provider,
             llm_config=_llm_config,
             feed_ids={saved_feed_id, another_saved_feed_id},
-            interval_started_at=interval_started_at,
             entry_age=datetime.timedelta(days=1),
-            reserved_cost=USDCost(Decimal(100)),
             filters=(create_filter(filter_1_users), create_filter(filter_2_users), create_filter(filter_3_users)),
         )
 
@@ -330,13 +284,13 @@ class TestGetCandidates:
 
     @pytest.mark.asyncio
     async def test_all_users_excluded(
-        self, fake_llm_provider: ProviderTest, saved_feed_id: FeedId, five_internal_user_ids: list[UserId]
+        self, fake_llm_provider: ProviderTest, saved_feed_id: FeedId, five_user_key_infos: list[UserKeyInfo]
     ) -> None:
+        five_internal_user_ids = [info.user_id for info in five_user_key_infos]
+
         for user_id in five_internal_user_ids:
             await fl_domain.add_link(user_id, saved_feed_id)
 
-        interval_started_at = month_interval_start()
-
         filter_1_users = [five_internal_user_ids[0], five_internal_user_ids[2], five_internal_user_ids[4]]
 
         def create_filter(filter_users: list[UserId]) -> object:
@@ -352,15 +306,57 @@ class TestGetCandidates:
             llm=fake_llm_provider,
             llm_config=_llm_config,
             feed_ids={saved_feed_id},
-            interval_started_at=interval_started_at,
             entry_age=datetime.timedelta(days=1),
-            reserved_cost=USDCost(Decimal(100)),
             filters=(create_filter(filter_1_users), create_filter([]), _filter_3),
         )
 
         assert infos == []
 
 
+class TestGetIndexedCandidates:
+    @pytest.mark.asyncio
+    async def test_no_users(self, saved_feed_id: FeedId) -> None:
+        assert await _get_indexed_candidates(LLMProvider.test, {saved_feed_id}) == []
+
+    @pytest.mark.asyncio
+    async def test_users_without_keys_skipped(
+        self, saved_feed_id: FeedId, five_user_key_infos: list[UserKeyInfo], another_internal_user_id: UserId
+    ) -> None:
+        for info in five_user_key_infos[:2]:
+            await fl_domain.add_link(info.user_id, saved_feed_id)
+
+        await fl_domain.add_link(another_internal_user_id, saved_feed_id)
+
+        candidates = await _get_indexed_candidates(LLMProvider.test, {saved_feed_id})
+
+        assert {candidate.user_id for candidate in candidates} == {info.user_id for info in five_user_key_infos[:2]}
+
+    @pytest.mark.asyncio
+    async def test_cached(
+        self, saved_feed_id: FeedId, another_saved_feed_id: FeedId, five_user_key_infos: list[UserKeyInfo]
+    ) -> None:
+        await fl_domain.add_link(five_user_key_infos[0].user_id, saved_feed_id)
+
+        candidates = await _get_indexed_candidates(LLMProvider.test, {saved_feed_id})
+
+        await fl_domain.add_link(five_user_key_infos[1].user_id, saved_feed_id)
+        await fl_domain.add_link(five_user_key_infos[2].user_id, another_saved_feed_id)
+
+        assert await _get_indexed_candidates(LLMProvider.test, {saved_feed_id}) == candidates
+
+        assert {candidate.user_id for candidate in candidates} == {five_user_key_infos[0].user_id}
+
+        candidates = await _get_indexed_candidates(LLMProvider.test, {saved_feed_id, another_saved_feed_id})
+
+        assert {candidate.user_id for candidate in candidates} == {info.user_id for info in five_user_key_infos[:3]}
+
+        candidates_index.clear()
+
+        candidates = await _get_indexed_candidates(LLMProvider.test, {saved_feed_id})
+
+        assert {candidate.user_id for candidate in candidates} == {info.user_id for info in five_user_key_infos[:2]}
+
+
 class TestFindBestUserWithKey:
     @pytest.mark.asyncio
     async def test_no_users(self, fake_llm_provider: ProviderTest, saved_feed_id: FeedId) -> None:
@@ -496,12 +492,11 @@ class TestUseApiKey:
 
         reserved_cost = USDCost(Decimal(567))
 
-        await r_domain.try_to_reserve(
-            user_id=internal_user_id,
+        await r_domain.reserve_for_least_used(
+            limits={internal_user_id: _cost_points.to_points(USDCost(Decimal(1000)))},
             kind=AppResource.tokens_cost,
             interval_started_at=interval_started_at,
             amount=_cost_points.to_points(reserved_cost),
-            limit=_cost_points.to_points(USDCost(Decimal(1000))),
         )
 
         resources = await r_domain.load_resources(
@@ -552,12 +547,11 @@ class TestUseApiKey:
 
         reserved_cost = USDCost(Decimal(567))
 
-        await r_domain.try_to_reserve(
-            user_id=internal_user_id,
+        await r_domain.reserve_for_least_used(
+            limits={internal_user_id: _cost_points.to_points(USDCost(Decimal(1000)))},
             kind=AppResource.tokens_cost,
             interval_started_at=interval_started_at,
             amount=_cost_points.to_points(reserved_cost),
-            limit=_cost_points.to_points(USDCost(Decimal(1000))),
         )
 
         resources = await r_domain.load_resources(
@@ -610,13 +604,11 @@ class TestUseApiKey:
 
         reserved_cost = USDCost(Decimal(567))
 
-        await r_domain.try_to_reserve(
-            user_id=internal_user_id,
-            # TODO: differentiate tokens in all places
+        await r_domain.reserve_for_least_used(
+            limits={internal_user_id: _cost_points.to_points(USDCost(Decimal(1000)))},
             kind=AppResource.tokens_cost,
             interval_started_at=interval_started_at,
             amount=_cost_points.to_points(reserved_cost),
-            limit=_cost_points.to_points(USDCost(Decimal(1000))),
         )
 
         resources = await r_domain.load_resources(
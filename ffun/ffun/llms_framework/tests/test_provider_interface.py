@@ -71,6 +71,7 @@ class TestBaseProviderInterfaceClass:
             max_return_tokens=LLMTokens(16384),
             input_1m_tokens_cost=USDCost(Decimal("2.5")),
             output_1m_tokens_cost=USDCost(Decimal("10")),
+            batch_cost_ratio=Decimal("0.5"),
         )
 
     def test_wrong_provider(self, fake_llm_provider: ProviderTest, mocker: MockerFixture) -> None:
@@ -105,3 +106,43 @@ class TestBaseProviderInterfaceClass:
         config_2 = config_1.replace(model="test-model-1")
 
         assert fake_llm_provider.get_model(config_2) is not None
+
+    @pytest.mark.parametrize(
+        "text, max_tokens, expected",
+        [
+            ("", LLMTokens(1), ""),
+            ("abcdefghij", LLMTokens(100), "abcdefghij"),
+            ("abcdefghij", LLMTokens(10), "abcdefghij"),
+            ("abcdefghij", LLMTokens(9), "abcdefghi"),
+            ("abcdefghij", LLMTokens(4), "abcd"),
+            ("abcdefghij", LLMTokens(1), "a"),
+        ],
+    )
+    def test_cut_text_to_max_tokens(
+        self, fake_llm_provider: ProviderTest, text: str, max_tokens: LLMTokens, expected: str
+    ) -> None:
+        config = LLMConfiguration(
+            model="test-model-1",
+            system="system prompt",
+            max_return_tokens=LLMTokens(143),
+            temperature=0,
+            top_p=0,
+        )
+
+        assert fake_llm_provider.cut_text_to_max_tokens(config, text=text, max_tokens=max_tokens) == expected
+
+    def test_text_tokens_counter(self, fake_llm_provider: ProviderTest) -> None:
+        config = LLMConfiguration(
+            model="test-model-1",
+            system="system prompt",
+            max_return_tokens=LLMTokens(143),
+            temperature=0,
+            top_p=0,
+        )
+
+        text = "abcdefghij"
+
+        count = fake_llm_provider.text_tokens_counter(config, text)
+
+        assert count(0, len(text)) == fake_llm_provider.estimate_tokens(config, text)
+        assert count(2, 5) == fake_llm_provider.estimate_tokens(config, text[2:5])
@@ -81,15 +81,15 @@ async def load_content_with_proxies(  # noqa: CCR001
     #
     # TODO: build a separate system of choosing protocol for the url with caching and periodic checks
     for protocol in ("https", "http"):
-        logger.info("try_protocol", protocol=protocol)
+        logger.sampled_info("try_protocol", protocol=protocol)
 
         url_object.scheme = protocol
 
         for proxy in settings.proxies:
-            logger.info("try_proxy", proxy=proxy.name)
+            logger.sampled_info("try_proxy", proxy=proxy.name)
 
             if proxy_states[proxy.name] == ProxyState.suspended:
-                logger.info("skip_suspended_proxy", proxy=proxy.name)
+                logger.sampled_info("skip_suspended_proxy", proxy=proxy.name)
                 continue
 
             try:
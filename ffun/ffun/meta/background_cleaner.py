@@ -0,0 +1,26 @@
+from ffun.core.background_tasks import InfiniteTask
+from ffun.librarian import domain as ln_domain
+from ffun.meta.cleaner import Cleaner
+from ffun.meta.settings import settings
+
+
+class OrphansCleaner(InfiniteTask):
+    __slots__ = ("_cleaner",)
+
+    def __init__(
+        self,
+        chunk: int = settings.cleaner_chunk,
+        parallelism: int = settings.cleaner_parallelism,
+        rows_per_second: float | None = settings.cleaner_rows_per_second,
+        **kwargs: object,
+    ) -> None:
+        super().__init__(**kwargs)  # type: ignore
+        self._cleaner = Cleaner(chunk=chunk, parallelism=parallelism, rows_per_second=rows_per_second)
+
+    async def single_run(self) -> None:
+        # cursors are kept between runs of the same process => a stopped run continues from the place where it stopped
+        while await self._cleaner.step():
+            if self.stop_requested:
+                return
+
+        await ln_domain.clean_llm_responses_cache()
@@ -0,0 +1,16 @@
+from ffun.core.background_tasks import InfiniteTask
+from ffun.meta import domain
+from ffun.meta.settings import settings
+
+
+class FeedsImporter(InfiniteTask):
+    __slots__ = ("_chunks_per_run",)
+
+    def __init__(self, chunks_per_run: int = settings.importer_chunks_per_run, **kwargs: object) -> None:
+        super().__init__(**kwargs)  # type: ignore
+        self._chunks_per_run = chunks_per_run
+
+    async def single_run(self) -> None:
+        while await domain.import_feeds(limit=self._chunks_per_run) > 0:
+            if self.stop_requested:
+                break
@@ -0,0 +1,144 @@
+"""Engine for removing orphaned entities: entries, feeds and tags.
+
+Each step of the engine:
+
+- loads up to `chunk * parallelism` candidates of each kind;
+- removes them by bulk operations in `parallelism` concurrent chunks;
+- waits if the configured rows-per-second budget is exceeded, to protect production latency.
+
+Entries and tags are scanned by cursors (the last processed id), so a stopped engine continues from
+the place where it stopped, and failed chunks do not block the following ones.
+A cursor is reset when the whole table is scanned.
+Cursors are kept in memory only: a new engine (for example, after a restart of the process) starts from the beginning.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Sequence, TypeVar
+
+from ffun.core import logging
+from ffun.domain.entities import EntryId, TagId
+from ffun.library import domain as l_domain
+from ffun.meta import domain
+from ffun.ontology import domain as o_domain
+
+logger = logging.get_module_logger()
+
+
+ID = TypeVar("ID")
+
+
+class RowsBudget:
+    """Limits the speed of removing rows by sleeping after each batch."""
+
+    __slots__ = ("_rows_per_second", "_last_spent_at")
+
+    def __init__(self, rows_per_second: float | None) -> None:
+        self._rows_per_second = rows_per_second
+        self._last_spent_at = time.monotonic()
+
+    async def spend(self, rows: int) -> None:
+        if self._rows_per_second is None:
+            return
+
+        # the time of the batch processing is counted into the budget
+        delay = rows / self._rows_per_second - (time.monotonic() - self._last_spent_at)
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        self._last_spent_at = time.monotonic()
+
+
+async def _remove_entries(entries_ids: list[EntryId]) -> int:
+    if not await domain.remove_entries(entries_ids):
+        return 0
+
+    return len(entries_ids)
+
+
+class Cleaner:
+    __slots__ = ("_chunk", "_parallelism", "_budget", "_entries_cursor", "_tags_cursor")
+
+    def __init__(self, chunk: int, parallelism: int, rows_per_second: float | None) -> None:
+        self._chunk = chunk
+        self._parallelism = parallelism
+        self._budget = RowsBudget(rows_per_second)
+        self._entries_cursor: EntryId | None = None
+        self._tags_cursor: TagId | None = None
+
+    @property
+    def _limit(self) -> int:
+        return self._chunk * self._parallelism
+
+    async def _remove_in_parallel(self, ids: Sequence[ID], remove: Callable[[list[ID]], Awaitable[int]]) -> int:
+        chunks = [list(ids[i : i + self._chunk]) for i in range(0, len(ids), self._chunk)]
+
+        removed = sum(await asyncio.gather(*(remove(chunk) for chunk in chunks)))
+
+        await self._budget.spend(removed)
+
+        return removed
+
+    async def clean_entries(self) -> tuple[int, bool]:
+        """Run a single step of cleaning entries; return the number of removed entries and is there more work."""
+        await l_domain.sync_orphaned_entries()
+
+        candidates = sorted(
+            await l_domain.get_orphaned_entries(limit=self._limit, after_entry_id=self._entries_cursor)
+        )
+
+        removed = await self._remove_in_parallel(candidates, _remove_entries)
+
+        has_more = len(candidates) == self._limit
+
+        self._entries_cursor = candidates[-1] if has_more else None
+
+        return removed, has_more
+
+    async def clean_feeds(self) -> tuple[int, bool]:
+        """Run a single step of cleaning feeds; return the number of removed feeds and is there more work."""
+        # removed feeds are not returned again => no cursor is required
+        candidates = await domain.get_orphaned_feeds(limit=self._limit)
+
+        removed = await self._remove_in_parallel(candidates, domain.remove_orphaned_feeds)
+
+        return removed, len(candidates) == self._limit
+
+    async def clean_tags(self) -> tuple[int, bool]:
+        """Run a single step of cleaning tags; return the number of removed tags and is there more work."""
+        candidates = await domain.get_orphaned_tags(limit=self._limit, after_tag_id=self._tags_cursor)
+
+        removed = await self._remove_in_parallel(candidates, o_domain.remove_orphaned_tags)
+
+        has_more = len(candidates) == self._limit
+
+        self._tags_cursor = candidates[-1] if has_more else None
+
+        return removed, has_more
+
+    async def merge_relations_counts(self) -> tuple[int, bool]:
+        """Merge a chunk of tags relations counters changes; return the number of merged changes and is there more."""
+        merged = await o_domain.merge_relations_counts_deltas(limit=self._limit)
+
+        return merged, merged == self._limit
+
+    async def step(self) -> bool:
+        """Run a single step of cleaning for all kinds of entities; return is there more work."""
+        # the order is important: removed feeds orphan entries, removed entries orphan tags
+        removed_feeds, more_feeds = await self.clean_feeds()
+        removed_entries, more_entries = await self.clean_entries()
+        removed_tags, more_tags = await self.clean_tags()
+        merged_counts, more_counts = await self.merge_relations_counts()
+
+        logger.info(
+            "orphans_cleaning_step",
+            removed_feeds=removed_feeds,
+            removed_entries=removed_entries,
+            removed_tags=removed_tags,
+            merged_relations_counts=merged_counts,
+            entries_cursor=self._entries_cursor,
+            tags_cursor=self._tags_cursor,
+        )
+
+        return more_feeds or more_entries or more_tags or more_counts
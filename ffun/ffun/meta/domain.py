@@ -1,6 +1,7 @@
 from typing import Iterable
 
 from ffun.core import logging, utils
+from ffun.core.postgresql import ExecuteType, run_in_transaction
 from ffun.dispatcher import domain as d_domain
 from ffun.domain.domain import new_feed_id
 from ffun.domain.entities import EntryId, FeedId, ProcessorId, TagId, TagUid, UserId
@@ -11,11 +12,15 @@ from ffun.feeds_links import domain as fl_domain
 from ffun.library import domain as l_domain
 from ffun.library import errors as l_errors
 from ffun.markers import domain as m_domain
+from ffun.meta import operations
+from ffun.meta.entities import FeedsImport, FeedsImportId, FeedsToImport
 from ffun.meta.settings import settings
 from ffun.ontology import cache as o_cache
 from ffun.ontology import domain as o_domain
 from ffun.ontology import entities as o_entities
 from ffun.parsers import entities as p_entities
+from ffun.queues import domain as q_domain
+from ffun.queues.entities import QueueKind, QueueRecord, QueueRecordId
 from ffun.scores import domain as s_domain
 from ffun.tags import domain as t_domain
 from ffun.tags.entities import TagCategories, TagCategory
@@ -67,21 +72,84 @@ async def add_feeds(feed_infos: list[p_entities.FeedInfo], user_id: UserId) -> l
 
     real_feeds_ids = await f_domain.save_feeds(feeds)
 
-    for feed_id in real_feeds_ids:
-        await fl_domain.add_link(user_id=user_id, feed_id=feed_id)
+    await fl_domain.add_links(user_id=user_id, feed_ids=real_feeds_ids)
 
     return real_feeds_ids
 
 
-async def clean_orphaned_entries(chunk: int) -> int:
-    await l_domain.sync_orphaned_entries()
+get_feeds_import = operations.get_feeds_import
 
-    orphanes = await l_domain.get_orphaned_entries(limit=chunk)
 
-    if not await remove_entries(orphanes):
+async def start_feeds_import(feed_infos: list[p_entities.FeedInfo], user_id: UserId) -> FeedsImport:
+    """Split feeds into chunks and leave them to the background importer (see `import_feeds`)."""
+    feeds_import = await operations.create_feeds_import(user_id=user_id, total=len(feed_infos))
+
+    items = [
+        FeedsToImport(
+            import_id=feeds_import.id,
+            user_id=user_id,
+            feeds=feed_infos[i : i + settings.feeds_import_chunk],
+        )
+        for i in range(0, len(feed_infos), settings.feeds_import_chunk)
+    ]
+
+    await q_domain.push(QueueKind.feeds_to_import, items)
+
+    logger.business_event("feeds_import_started", user_id=user_id, import_id=feeds_import.id, total=len(feed_infos))
+
+    return feeds_import
+
+
+@run_in_transaction
+async def _finish_feeds_import_chunk(
+    execute: ExecuteType, record_id: QueueRecordId, import_id: FeedsImportId, processed: int, failed: int
+) -> None:
+    # the chunk is counted only by the worker that actually removed it from the queue
+    # => a chunk processed twice (e.g. after its freezing delay expired) is never counted twice
+    if await q_domain.acknowledge_in_transaction(execute, [record_id]) == 0:
+        logger.warning("feeds_import_chunk_already_acknowledged", import_id=import_id, record_id=record_id)
+        return
+
+    await operations.register_imported_feeds(execute, import_id, processed=processed, failed=failed)
+
+
+async def _import_feeds_chunk(record: QueueRecord[FeedsToImport]) -> bool:
+    assert record.id is not None
+
+    item = record.item
+
+    try:
+        await add_feeds(item.feeds, item.user_id)
+    except Exception:
+        if record.created_at + settings.importer_max_chunk_age > utils.now():
+            # the chunk stays in the queue and will be pulled again after the freezing delay
+            logger.exception("feeds_import_chunk_failed", import_id=item.import_id, record_id=record.id)
+            return False
+
+        logger.exception("feeds_import_chunk_dropped", import_id=item.import_id, record_id=record.id)
+        await _finish_feeds_import_chunk(record.id, item.import_id, processed=0, failed=len(item.feeds))
+        return False
+
+    await _finish_feeds_import_chunk(record.id, item.import_id, processed=len(item.feeds), failed=0)
+
+    return True
+
+
+async def import_feeds(limit: int) -> int:
+    records = await q_domain.pull(QueueKind.feeds_to_import, FeedsToImport, limit=limit)
+
+    if not records:
         return 0
 
-    return len(orphanes)
+    imported = 0
+
+    for record in records:
+        if await _import_feeds_chunk(record):
+            imported += 1
+
+    logger.info("feeds_imported", chunks_number=len(records), imported_chunks_number=imported)
+
+    return len(records)
 
 
 # There is a very small possibility, that user will link feed
@@ -90,47 +158,57 @@ async def clean_orphaned_entries(chunk: int) -> int:
 # - the feed must be marked as orphaned before that
 # - we wait a timeout before removing orphaned feeds
 # - the user should make their operations right at the time we process orphaned feeds
-async def clean_orphaned_feeds(chunk: int) -> int:
+async def get_orphaned_feeds(limit: int) -> list[FeedId]:
     loaded_before = utils.now() - settings.delay_before_removing_orphaned_feeds
 
-    orphanes = await f_domain.get_orphaned_feeds(limit=chunk, loaded_before=loaded_before)
+    orphanes = await f_domain.get_orphaned_feeds(limit=limit, loaded_before=loaded_before)
 
     # ensure deterministic order of processing
     orphanes.sort()
 
-    # refactor this loop into a bulk operation calls in case of performance issues
-    for orphan_id in orphanes:
-        logger.info("removing_orphaned_feed", feed_id=orphan_id)
+    return orphanes
+
 
-        # unlink all linked entries
-        await l_domain.unlink_all(orphan_id)
+async def remove_orphaned_feeds(feed_ids: list[FeedId]) -> int:
+    if not feed_ids:
+        return 0
 
-    await l_domain.remove_feed_entries_count(orphanes)
+    logger.info("removing_orphaned_feeds", feed_ids=feed_ids)
 
-    for orphan_id in orphanes:
-        await f_domain.tech_remove_feed(orphan_id)
+    # unlink all linked entries
+    await l_domain.unlink_feeds(feed_ids)
+
+    await l_domain.remove_feed_entries_count(feed_ids)
+
+    await f_domain.tech_remove_feeds(feed_ids)
 
     # just a protection in case some user linked feed while we were removing it
     # in that case return DB in the consistent state
-    await fl_domain.unlink_feeds_from_all_users(orphanes)
+    await fl_domain.unlink_feeds_from_all_users(feed_ids)
 
-    return len(orphanes)
+    return len(feed_ids)
 
 
 # There is a minor probability that we'll remove a tag while a new rule is being created.
 # We should track such cases and add detection of broken rules in the rules functionality.
 # Also, since we remove orphaned tags and GUI mostly allows to create rules for linked tags,
 # we should be fine.
-async def clean_orphaned_tags(chunk: int) -> int:
+async def get_orphaned_tags(limit: int, after_tag_id: TagId | None) -> list[TagId]:
     protected_tags = await s_domain.get_all_tags_in_rules()
 
-    return await o_domain.remove_orphaned_tags(chunk=chunk, protected_tags=list(protected_tags))
+    return await o_domain.get_orphaned_tags(
+        limit=limit, protected_tags=list(protected_tags), after_tag_id=after_tag_id
+    )
 
 
 # We expect, that when this function is called, all logic (workers, api) is already working on the new configs
 # => there will be no case when a new tag is created in the not normalized form
 #    (besides native feeds tags, but we'll handle them separately)
-# => we can load tags from rules once and use their cached list
+#
+# Tags are renormalized as a single set:
+# - all properties are normalized in memory (chains of normalizers are memoized)
+# - all changes are applied by a few set-based queries, instead of a chain of queries per tag
+# => callers should split big ranges of tags into chunks
 async def renormalize_tags(tag_ids: list[TagId]) -> None:
     logger.info("renormalization_started", tag_ids_number=len(tag_ids))
 
@@ -138,105 +216,94 @@ async def renormalize_tags(tag_ids: list[TagId]) -> None:
     all_tag_propertries = [
         property for property in all_tag_propertries if property.type == o_entities.TagPropertyType.categories
     ]
-    all_tag_propertries.sort(key=lambda p: p.tag_id)
 
-    total_properties = len(all_tag_propertries)
+    old_uids = await o_cache.TagsCache().uids_by_ids({property.tag_id for property in all_tag_propertries})
 
-    logger.info("renormalization_properties_found", properties_number=total_properties)
+    # Tag could be removed between loading properties and loading uids
+    all_tag_propertries = [property for property in all_tag_propertries if property.tag_id in old_uids]
 
-    old_tags_cache = o_cache.TagsCache()
+    logger.info("renormalization_properties_found", properties_number=len(all_tag_propertries))
 
-    for i, property in enumerate(all_tag_propertries):
-        old_tag_id = property.tag_id
-        old_uids = await old_tags_cache.uids_by_ids([old_tag_id])
+    replacements, tags_to_remove = await _normalize_properties(all_tag_propertries, old_uids)
 
-        if old_tag_id not in old_uids:
-            # Tag could be removed between loading properties and loading uids
-            continue
+    logger.info(
+        "renormalization_candidates_found", replacements_number=len(replacements), tags_to_remove=tags_to_remove
+    )
 
-        old_tag_uid = old_uids[old_tag_id]
+    await _apply_replacements(replacements)
 
-        logger.info(
-            "try_to_renormalize_tag", step=i, steps_total=total_properties, tag_id=old_tag_id, tag_uid=old_tag_uid
-        )
-
-        await _renormalize_tag(
-            old_tag_id=old_tag_id,
-            old_tag_uid=old_tag_uid,
-            processor_id=property.processor_id,
-            categories={TagCategory(name) for name in property.value.split(",")},
-        )
+    await remove_tags(tags_to_remove)
 
     logger.info("renormalization_finished")
 
 
-async def _renormalize_tag(
-    processor_id: ProcessorId, old_tag_id: TagId, old_tag_uid: TagUid, categories: set[TagCategory]
-) -> None:
-
-    logger.info(
-        "renormalizing_tag",
-        processor_id=processor_id,
-        old_tag_id=old_tag_id,
-        old_tag_uid=old_tag_uid,
-        categories=categories,
-    )
+async def _normalize_properties(
+    properties: list[o_entities.TagProperty], old_uids: dict[TagId, TagUid]
+) -> tuple[list[o_entities.TagReplacement], list[TagId]]:
+    normalized_tags = {}
 
-    keep_old_tag, new_tags = await _normalize_tag_uid(
-        old_tag_uid=old_tag_uid,
-        categories=categories,
-        processor_id=processor_id,
-    )
+    for property in properties:
+        normalized_tags[(property.tag_id, property.processor_id)] = await _normalize_tag_uid(
+            old_tag_uid=old_uids[property.tag_id],
+            categories={TagCategory(name) for name in property.value.split(",") if name},
+        )
 
-    logger.info("renormalizing_candidates_found", old_tag_id=old_tag_id, keep_old_tag=keep_old_tag, new_tags=new_tags)
+    new_tag_ids = await o_cache.TagsCache().ids_by_uids({tag.uid for tags in normalized_tags.values() for tag in tags})
 
-    for new_tag_id in new_tags:
-        await _apply_renormalized_tags(processor_id=processor_id, old_tag_id=old_tag_id, new_tag_id=new_tag_id)
+    # we update new properties for all tags, even for the old one
+    # because it at this place logic should not know which properties and how can be changed
+    # => it is easier to just update everything
+    await o_domain.apply_tags_properties(_build_renormalized_properties(normalized_tags, new_tag_ids))
 
-    if not keep_old_tag:
-        await remove_tags([old_tag_id])
+    replacements: list[o_entities.TagReplacement] = []
 
+    # a tag is removed if at least one processor's categories do not keep its original form
+    tags_to_remove = set()
 
-async def _normalize_tag_uid(
-    old_tag_uid: TagUid, categories: TagCategories, processor_id: ProcessorId
-) -> tuple[bool, list[TagId]]:
-    if not categories:
-        return False, []
+    for (old_tag_id, processor_id), tags in normalized_tags.items():
+        if all(tag.uid != old_uids[old_tag_id] for tag in tags):
+            tags_to_remove.add(old_tag_id)
 
-    raw_tag = o_entities.RawTag(raw_uid=old_tag_uid, link=None, categories=categories)
+        replacements.extend(
+            o_entities.TagReplacement(
+                processor_id=processor_id, old_tag_id=old_tag_id, new_tag_id=new_tag_ids[tag.uid]
+            )
+            for tag in tags
+            if tag.uid != old_uids[old_tag_id]
+        )
 
-    normalized_tags = await t_domain.normalize([raw_tag])
+    return replacements, sorted(tags_to_remove)
 
-    new_tags_cache = o_cache.TagsCache()
 
-    new_tag_ids = await new_tags_cache.ids_by_uids([tag.uid for tag in normalized_tags])
+def _build_renormalized_properties(
+    normalized_tags: dict[tuple[TagId, ProcessorId], list[o_entities.NormalizedTag]], new_tag_ids: dict[TagUid, TagId]
+) -> list[o_entities.TagProperty]:
+    # different old tags may be normalized into the same new tag => the last property wins
+    properties: dict[tuple[TagId, o_entities.TagPropertyType, ProcessorId], o_entities.TagProperty] = {}
 
-    # we update new properties for all tags, even for the old one
-    # because it at this place logic should not know which properties and how can be changed
-    # => it is easier to just update everything
-    new_properties = []
-    for tag in normalized_tags:
-        new_properties.extend(tag.build_properties_for(tag_id=new_tag_ids[tag.uid], processor_id=processor_id))
-    await o_domain.apply_tags_properties(new_properties)
+    for (_, processor_id), tags in normalized_tags.items():
+        for tag in tags:
+            for property in tag.build_properties_for(tag_id=new_tag_ids[tag.uid], processor_id=processor_id):
+                properties[(property.tag_id, property.type, property.processor_id)] = property
 
-    original_tag_exists = False
+    return list(properties.values())
 
-    tags_to_copy = []
 
-    for normalized_tag in normalized_tags:
-        if normalized_tag.uid == raw_tag.raw_uid:
-            original_tag_exists = True
-            continue
+async def _normalize_tag_uid(old_tag_uid: TagUid, categories: TagCategories) -> list[o_entities.NormalizedTag]:
+    if not categories:
+        return []
 
-        tags_to_copy.append(new_tag_ids[normalized_tag.uid])
+    raw_tag = o_entities.RawTag(raw_uid=old_tag_uid, link=None, categories=categories)
 
-    return original_tag_exists, tags_to_copy
+    return await t_domain.normalize([raw_tag])
 
 
-async def _apply_renormalized_tags(processor_id: ProcessorId, old_tag_id: TagId, new_tag_id: TagId) -> None:
-    await o_domain.copy_tag_properties(processor_id=processor_id, old_tag_id=old_tag_id, new_tag_id=new_tag_id)
-    await o_domain.copy_relations(processor_id=processor_id, old_tag_id=old_tag_id, new_tag_id=new_tag_id)
-    await s_domain.clone_rules_for_replacements({old_tag_id: new_tag_id})
+async def _apply_replacements(replacements: list[o_entities.TagReplacement]) -> None:
+    await o_domain.copy_tags_properties_for_replacements(replacements)
+    await o_domain.copy_relations_for_replacements(replacements)
+    await s_domain.clone_rules_for_replacement_pairs(
+        (replacement.old_tag_id, replacement.new_tag_id) for replacement in replacements
+    )
 
 
 async def remove_tags(tag_ids: list[TagId]) -> None:
@@ -0,0 +1,30 @@
+import datetime
+import uuid
+from typing import NewType
+
+from ffun.core.entities import BaseEntity
+from ffun.domain.entities import UserId
+from ffun.parsers.entities import FeedInfo
+from ffun.queues.entities import BaseQueueItem
+
+FeedsImportId = NewType("FeedsImportId", uuid.UUID)
+
+
+class FeedsImport(BaseEntity):
+    id: FeedsImportId
+    user_id: UserId
+    total: int
+    processed: int
+    failed: int
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    @property
+    def finished(self) -> bool:
+        return self.processed + self.failed >= self.total
+
+
+class FeedsToImport(BaseQueueItem):
+    import_id: FeedsImportId
+    user_id: UserId
+    feeds: list[FeedInfo]
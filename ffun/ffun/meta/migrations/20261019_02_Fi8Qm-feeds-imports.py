@@ -0,0 +1,42 @@
+"""
+feeds-imports
+"""
+
+from typing import Any
+
+from psycopg import Connection
+from yoyo import step
+
+__depends__ = {"20240512_01_0F799-unity-duplicated-feeds"}
+
+
+sql_create_feeds_imports_table = """
+CREATE TABLE m_feeds_imports (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL,
+    total INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+sql_create_feeds_imports_user_id_index = """
+CREATE INDEX m_feeds_imports_user_id_idx ON m_feeds_imports (user_id)
+"""
+
+
+def apply_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute(sql_create_feeds_imports_table)
+    cursor.execute(sql_create_feeds_imports_user_id_index)
+
+
+def rollback_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute("DROP TABLE m_feeds_imports")
+
+
+steps = [step(apply_step, rollback_step)]
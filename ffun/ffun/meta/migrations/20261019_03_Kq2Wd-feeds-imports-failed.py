@@ -0,0 +1,25 @@
+"""
+feeds-imports-failed
+"""
+
+from typing import Any
+
+from psycopg import Connection
+from yoyo import step
+
+__depends__ = {"20261019_02_Fi8Qm-feeds-imports"}
+
+
+def apply_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute("ALTER TABLE m_feeds_imports ADD COLUMN failed INTEGER NOT NULL DEFAULT 0")
+
+
+def rollback_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute("ALTER TABLE m_feeds_imports DROP COLUMN failed")
+
+
+steps = [step(apply_step, rollback_step)]
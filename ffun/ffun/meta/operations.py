@@ -0,0 +1,55 @@
+import uuid
+from typing import Any
+
+from ffun.core.postgresql import ExecuteType, execute
+from ffun.domain.entities import UserId
+from ffun.meta.entities import FeedsImport, FeedsImportId
+
+
+def row_to_feeds_import(row: dict[str, Any]) -> FeedsImport:
+    return FeedsImport(
+        id=row["id"],
+        user_id=row["user_id"],
+        total=row["total"],
+        processed=row["processed"],
+        failed=row["failed"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
+
+
+async def create_feeds_import(user_id: UserId, total: int) -> FeedsImport:
+    sql = """
+        INSERT INTO m_feeds_imports (id, user_id, total)
+        VALUES (%(id)s, %(user_id)s, %(total)s)
+        RETURNING *
+    """
+
+    result = await execute(sql, {"id": uuid.uuid4(), "user_id": user_id, "total": total})
+
+    return row_to_feeds_import(result[0])
+
+
+async def get_feeds_import(import_id: FeedsImportId) -> FeedsImport | None:
+    sql = "SELECT * FROM m_feeds_imports WHERE id = %(id)s"
+
+    result = await execute(sql, {"id": import_id})
+
+    if not result:
+        return None
+
+    return row_to_feeds_import(result[0])
+
+
+async def register_imported_feeds(
+    execute: ExecuteType, import_id: FeedsImportId, processed: int, failed: int = 0
+) -> None:
+    sql = """
+        UPDATE m_feeds_imports
+        SET processed = processed + %(processed)s,
+            failed = failed + %(failed)s,
+            updated_at = NOW()
+        WHERE id = %(id)s
+    """
+
+    await execute(sql, {"id": import_id, "processed": processed, "failed": failed})
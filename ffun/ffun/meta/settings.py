@@ -8,6 +8,19 @@ from ffun.core.settings import BaseSettings
 class Settings(BaseSettings):
     delay_before_removing_orphaned_feeds: datetime.timedelta = datetime.timedelta(days=1)
 
+    cleaner_chunk: int = 1000
+    cleaner_parallelism: int = 2
+    cleaner_rows_per_second: float | None = None
+    cleaner_delay_between_runs: float = 60
+
+    # bigger OPML imports are processed by the background importer
+    max_feeds_in_sync_import: int = 500
+    feeds_import_chunk: int = 100
+    importer_chunks_per_run: int = 10
+    importer_delay_between_runs: float = 1
+    # chunks failing for longer are dropped and their feeds are counted as failed
+    importer_max_chunk_age: datetime.timedelta = datetime.timedelta(days=1)
+
     model_config = pydantic_settings.SettingsConfigDict(env_prefix="FFUN_META_")
 
 
@@ -0,0 +1,39 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from ffun.meta.background_cleaner import OrphansCleaner
+
+
+class TestOrphansCleaner:
+
+    @pytest.mark.asyncio
+    async def test_single_run__until_no_work(self, mocker: MockerFixture) -> None:
+        results = [True, True, False]
+
+        step = mocker.patch("ffun.meta.cleaner.Cleaner.step", side_effect=results)
+        clean_cache = mocker.patch("ffun.librarian.domain.clean_llm_responses_cache")
+
+        cleaner = OrphansCleaner(
+            chunk=5, parallelism=2, rows_per_second=None, name="test_cleaner", delay_between_runs=1
+        )
+
+        await cleaner.single_run()
+
+        assert step.call_count == 3
+        clean_cache.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_single_run__stop_requested(self, mocker: MockerFixture) -> None:
+        step = mocker.patch("ffun.meta.cleaner.Cleaner.step", return_value=True)
+        clean_cache = mocker.patch("ffun.librarian.domain.clean_llm_responses_cache")
+
+        cleaner = OrphansCleaner(name="test_cleaner", delay_between_runs=1)
+
+        mocker.patch.object(
+            OrphansCleaner, "stop_requested", new_callable=mocker.PropertyMock, return_value=True  # type: ignore
+        )
+
+        await cleaner.single_run()
+
+        assert step.call_count == 1
+        clean_cache.assert_not_called()
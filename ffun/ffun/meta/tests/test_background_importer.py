@@ -0,0 +1,34 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from ffun.meta.background_importer import FeedsImporter
+
+
+class TestFeedsImporter:
+
+    @pytest.mark.asyncio
+    async def test_single_run__until_no_work(self, mocker: MockerFixture) -> None:
+        results = [3, 1, 0]
+
+        import_feeds = mocker.patch("ffun.meta.domain.import_feeds", side_effect=results)
+
+        importer = FeedsImporter(chunks_per_run=3, name="test_importer", delay_between_runs=1)
+
+        await importer.single_run()
+
+        assert import_feeds.call_count == 3
+        import_feeds.assert_called_with(limit=3)
+
+    @pytest.mark.asyncio
+    async def test_single_run__stop_requested(self, mocker: MockerFixture) -> None:
+        import_feeds = mocker.patch("ffun.meta.domain.import_feeds", return_value=1)
+
+        importer = FeedsImporter(name="test_importer", delay_between_runs=1)
+
+        mocker.patch.object(
+            FeedsImporter, "stop_requested", new_callable=mocker.PropertyMock, return_value=True  # type: ignore
+        )
+
+        await importer.single_run()
+
+        assert import_feeds.call_count == 1
@@ -0,0 +1,212 @@
+import pytest
+import pytest_asyncio
+from pytest_mock import MockerFixture
+
+from ffun.core import utils
+from ffun.core.postgresql import execute
+from ffun.domain.domain import new_entry_id
+from ffun.domain.entities import TagId
+from ffun.feeds import domain as f_domain
+from ffun.feeds.entities import Feed
+from ffun.feeds.tests import make as f_make
+from ffun.library import domain as l_domain
+from ffun.library.tests import helpers as l_helpers
+from ffun.library.tests import make as l_make
+from ffun.meta.cleaner import Cleaner, RowsBudget
+from ffun.ontology import operations as o_operations
+
+
+class TestRowsBudget:
+
+    @pytest.mark.asyncio
+    async def test_no_limit(self, mocker: MockerFixture) -> None:
+        sleep = mocker.patch("asyncio.sleep")
+
+        budget = RowsBudget(rows_per_second=None)
+
+        await budget.spend(100500)
+
+        sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_limit(self, mocker: MockerFixture) -> None:
+        sleep = mocker.patch("asyncio.sleep")
+
+        budget = RowsBudget(rows_per_second=10)
+
+        await budget.spend(50)
+
+        assert len(sleep.call_args_list) == 1
+        assert 4.5 < sleep.call_args_list[0].args[0] <= 5  # type: ignore
+
+    @pytest.mark.asyncio
+    async def test_processing_time_is_counted(self, mocker: MockerFixture) -> None:
+        sleep = mocker.patch("asyncio.sleep")
+
+        budget = RowsBudget(rows_per_second=10)
+
+        mocker.patch("time.monotonic", return_value=budget._last_spent_at + 10)
+
+        await budget.spend(50)
+
+        sleep.assert_not_called()
+
+
+class TestCleanEntries:
+
+    @pytest_asyncio.fixture(autouse=True)  # type: ignore
+    async def cleanup_orphaned_entries(self) -> None:
+        await execute("DELETE FROM l_orphaned_entries")
+
+    @pytest.mark.asyncio
+    async def test(self, loaded_feed: Feed) -> None:
+        entries = await l_make.n_entries_list(loaded_feed, n=10)
+
+        await l_helpers.unlink_entries_from_feed(loaded_feed.id, [entry.id for entry in entries[3:]])
+
+        cleaner = Cleaner(chunk=2, parallelism=2, rows_per_second=None)
+
+        assert await cleaner.clean_entries() == (4, True)
+        assert await cleaner.clean_entries() == (3, False)
+
+        loaded_entries = await l_domain.get_entries_by_ids([entry.id for entry in entries])
+
+        assert loaded_entries == {entry.id: entry for entry in entries[:3]} | {entry.id: None for entry in entries[3:]}
+
+    @pytest.mark.asyncio
+    async def test_sync_before_remove(self, loaded_feed: Feed, another_loaded_feed: Feed) -> None:
+        entries = await l_make.n_entries_list(loaded_feed, n=10)
+
+        await l_helpers.unlink_entries_from_feed(loaded_feed.id, [entry.id for entry in entries[3:]])
+        await l_domain.catalog_entries(another_loaded_feed.id, [entries[3].collected_entry()])
+
+        cleaner = Cleaner(chunk=10, parallelism=1, rows_per_second=None)
+
+        assert await cleaner.clean_entries() == (6, False)
+
+        loaded_entries = await l_domain.get_entries_by_ids([entry.id for entry in entries])
+
+        assert loaded_entries == {entry.id: entry for entry in entries[:4]} | {entry.id: None for entry in entries[4:]}
+
+    @pytest.mark.asyncio
+    async def test_failed_chunks_are_skipped(self, mocker: MockerFixture) -> None:
+        orphaned_entries = sorted(new_entry_id() for _ in range(4))
+
+        mocker.patch("ffun.library.domain.sync_orphaned_entries")
+        orphaned_entries_set = set(orphaned_entries)
+        remove_results = [False, True, True, True]
+
+        get_orphaned_entries = mocker.patch(
+            "ffun.library.domain.get_orphaned_entries", return_value=orphaned_entries_set
+        )
+        remove_entries = mocker.patch("ffun.meta.domain.remove_entries", side_effect=remove_results)
+
+        cleaner = Cleaner(chunk=2, parallelism=2, rows_per_second=None)
+
+        assert await cleaner.clean_entries() == (2, True)
+
+        assert remove_entries.call_args_list == [
+            mocker.call(orphaned_entries[:2]),  # type: ignore
+            mocker.call(orphaned_entries[2:]),  # type: ignore
+        ]
+
+        await cleaner.clean_entries()
+
+        assert get_orphaned_entries.call_args_list == [
+            mocker.call(limit=4, after_entry_id=None),  # type: ignore
+            mocker.call(limit=4, after_entry_id=orphaned_entries[-1]),  # type: ignore
+        ]
+
+
+class TestCleanFeeds:
+
+    @pytest_asyncio.fixture(autouse=True)  # type: ignore
+    async def cleanup_orphaned_feeds(self) -> None:
+        orphanes = await f_domain.get_orphaned_feeds(limit=10000, loaded_before=utils.now())
+
+        await f_domain.tech_remove_feeds(orphanes)
+
+    @pytest.mark.asyncio
+    async def test(self) -> None:
+        feeds = await f_make.n_feeds(10)
+
+        for feed in feeds[:7]:
+            await f_domain.mark_feed_as_orphaned(feed.id)
+
+        cleaner = Cleaner(chunk=2, parallelism=2, rows_per_second=None)
+
+        assert await cleaner.clean_feeds() == (4, True)
+        assert await cleaner.clean_feeds() == (3, False)
+
+        assert {feed.id for feed in await f_domain.get_feeds([feed.id for feed in feeds])} == {
+            feed.id for feed in feeds[7:]
+        }
+
+
+class TestCleanTags:
+
+    @pytest.mark.asyncio
+    async def test(self, mocker: MockerFixture, five_tags_ids: tuple[TagId, TagId, TagId, TagId, TagId]) -> None:
+        tag_ids = sorted(five_tags_ids)
+
+        chunks = [tag_ids[:4], tag_ids[4:]]
+
+        get_orphaned_tags = mocker.patch("ffun.meta.domain.get_orphaned_tags", side_effect=chunks)
+
+        cleaner = Cleaner(chunk=2, parallelism=2, rows_per_second=None)
+
+        assert await cleaner.clean_tags() == (4, True)
+        assert await cleaner.clean_tags() == (1, False)
+
+        assert get_orphaned_tags.call_args_list == [
+            mocker.call(limit=4, after_tag_id=None),  # type: ignore
+            mocker.call(limit=4, after_tag_id=tag_ids[3]),  # type: ignore
+        ]
+
+        assert await o_operations.get_tags_by_ids(tag_ids) == {}
+
+
+class TestMergeRelationsCounts:
+
+    @pytest.mark.asyncio
+    async def test(self, mocker: MockerFixture) -> None:
+        merged: list[int] = [4, 1]
+
+        merge = mocker.patch("ffun.ontology.domain.merge_relations_counts_deltas", side_effect=merged)
+
+        cleaner = Cleaner(chunk=2, parallelism=2, rows_per_second=None)
+
+        assert await cleaner.merge_relations_counts() == (4, True)
+        assert await cleaner.merge_relations_counts() == (1, False)
+
+        assert merge.call_args_list == [mocker.call(limit=4), mocker.call(limit=4)]  # type: ignore
+
+
+class TestStep:
+
+    @pytest.mark.asyncio
+    async def test(self, mocker: MockerFixture) -> None:
+        clean_feeds = mocker.patch("ffun.meta.cleaner.Cleaner.clean_feeds", return_value=(1, False))
+        clean_entries = mocker.patch("ffun.meta.cleaner.Cleaner.clean_entries", return_value=(2, True))
+        clean_tags = mocker.patch("ffun.meta.cleaner.Cleaner.clean_tags", return_value=(3, False))
+        merge_counts = mocker.patch("ffun.meta.cleaner.Cleaner.merge_relations_counts", return_value=(4, False))
+
+        cleaner = Cleaner(chunk=2, parallelism=2, rows_per_second=None)
+
+        assert await cleaner.step()
+
+        clean_feeds.assert_called_once_with()
+        clean_entries.assert_called_once_with()
+        clean_tags.assert_called_once_with()
+        merge_counts.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_no_more_work(self, mocker: MockerFixture) -> None:
+        mocker.patch("ffun.meta.cleaner.Cleaner.clean_feeds", return_value=(0, False))
+        mocker.patch("ffun.meta.cleaner.Cleaner.clean_entries", return_value=(0, False))
+        mocker.patch("ffun.meta.cleaner.Cleaner.clean_tags", return_value=(0, False))
+        mocker.patch("ffun.meta.cleaner.Cleaner.merge_relations_counts", return_value=(0, False))
+
+        cleaner = Cleaner(chunk=2, parallelism=2, rows_per_second=None)
+
+        assert not await cleaner.step()
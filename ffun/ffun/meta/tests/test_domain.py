@@ -1,3 +1,4 @@
+import datetime
 import uuid
 from itertools import chain
 
@@ -7,12 +8,11 @@ from pytest_mock import MockerFixture
 from structlog.testing import capture_logs
 
 from ffun.core import utils
-from ffun.core.postgresql import execute
 from ffun.core.tests.helpers import assert_logs
 from ffun.dispatcher import domain as d_domain
 from ffun.dispatcher.entities import EntryProcessingStatus
 from ffun.domain.domain import new_entry_id
-from ffun.domain.entities import ProcessorId, TagId, TagUid, UserId
+from ffun.domain.entities import FeedId, ProcessorId, TagId, TagUid, UserId
 from ffun.domain.urls import str_to_absolute_url, str_to_feed_url, url_to_source_uid, url_to_uid
 from ffun.feeds import domain as f_domain
 from ffun.feeds.entities import Feed
@@ -20,23 +20,32 @@ from ffun.feeds.tests import make as f_make
 from ffun.feeds_links import domain as fl_domain
 from ffun.library import domain as l_domain
 from ffun.library import errors as l_errors
-from ffun.library.tests import helpers as l_helpers
 from ffun.library.tests import make as l_make
 from ffun.meta.domain import (
-    _apply_renormalized_tags,
+    _apply_replacements,
+    _finish_feeds_import_chunk,
+    _normalize_properties,
     _normalize_tag_uid,
-    _renormalize_tag,
     add_feeds,
-    clean_orphaned_entries,
-    clean_orphaned_feeds,
-    clean_orphaned_tags,
+    get_feeds_import,
+    get_orphaned_feeds,
+    get_orphaned_tags,
+    import_feeds,
     remove_entries,
+    remove_orphaned_feeds,
     remove_tags,
     renormalize_tags,
+    start_feeds_import,
 )
+from ffun.meta.entities import FeedsToImport
+from ffun.meta.settings import settings
 from ffun.ontology import domain as o_domain
-from ffun.ontology.entities import NormalizedTag, RawTag, TagProperty, TagPropertyType
+from ffun.ontology.entities import NormalizedTag, RawTag, TagProperty, TagPropertyType, TagReplacement
 from ffun.parsers import entities as p_entities
+from ffun.queues import domain as q_domain
+from ffun.queues import operations as q_operations
+from ffun.queues.entities import QueueKind
+from ffun.queues.settings import settings as q_settings
 from ffun.tags.entities import TagCategory
 
 
@@ -192,149 +201,269 @@ class TestAddFeeds:
             assert feed.source_id == source_ids[source_uids[feed.url]]
 
 
-# test that everything is connected correctly
-# detailed cases are covered in tests of functions called in clean_orphaned_entries
-class TestCleanOrphanedEntries:
+def _feed_info() -> p_entities.FeedInfo:
+    url = str_to_feed_url(f"{uuid.uuid4().hex}.com")
+    return p_entities.FeedInfo(
+        url=url, title=uuid.uuid4().hex, description=uuid.uuid4().hex, entries=[], uid=url_to_uid(url)
+    )
+
 
+class TestStartFeedsImport:
     @pytest_asyncio.fixture(autouse=True)  # type: ignore
-    async def cleanup_orphaned_entries(self) -> None:
-        await execute("DELETE FROM l_orphaned_entries")
+    async def clear_queue(self) -> None:
+        await q_operations.tech_clear_queue(QueueKind.feeds_to_import)
 
     @pytest.mark.asyncio
-    async def test(self, loaded_feed: Feed) -> None:
-        entries = await l_make.n_entries_list(loaded_feed, n=10)
+    async def test_feeds_split_into_chunks(self, internal_user_id: UserId, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "feeds_import_chunk", 2)
+
+        feed_infos = [_feed_info() for _ in range(5)]
 
-        await l_helpers.unlink_entries_from_feed(loaded_feed.id, [entry.id for entry in entries[3:]])
+        feeds_import = await start_feeds_import(feed_infos, internal_user_id)
 
-        removed_1 = await clean_orphaned_entries(chunk=5)
+        assert feeds_import.user_id == internal_user_id
+        assert feeds_import.total == 5
+        assert feeds_import.processed == 0
+        assert not feeds_import.finished
 
-        assert removed_1 == 5
+        records = await q_operations.tech_get_queue_records(QueueKind.feeds_to_import, FeedsToImport)
 
-        removed_2 = await clean_orphaned_entries(chunk=5)
+        assert {record.item.import_id for record in records} == {feeds_import.id}
+        assert {record.item.user_id for record in records} == {internal_user_id}
+        assert sorted(len(record.item.feeds) for record in records) == [1, 2, 2]
+        assert {feed.url for record in records for feed in record.item.feeds} == {feed.url for feed in feed_infos}
 
-        assert removed_2 == 2
+        assert await f_domain.get_feed_ids_by_uids([feed.uid for feed in feed_infos]) == {}
 
-        loaded_entries = await l_domain.get_entries_by_ids([entry.id for entry in entries])
 
-        assert loaded_entries == {entry.id: entry for entry in entries[:3]} | {entry.id: None for entry in entries[3:]}
+class TestImportFeeds:
+    @pytest_asyncio.fixture(autouse=True)  # type: ignore
+    async def clear_queue(self) -> None:
+        await q_operations.tech_clear_queue(QueueKind.feeds_to_import)
 
     @pytest.mark.asyncio
-    async def test_sync_before_remove(self, loaded_feed: Feed, another_loaded_feed: Feed) -> None:
-        entries = await l_make.n_entries_list(loaded_feed, n=10)
+    async def test_no_chunks(self) -> None:
+        assert await import_feeds(limit=10) == 0
 
-        await l_helpers.unlink_entries_from_feed(loaded_feed.id, [entry.id for entry in entries[3:]])
-        await l_domain.catalog_entries(
-            another_loaded_feed.id,
-            [entries[3].collected_entry()],
-        )
+    @pytest.mark.asyncio
+    async def test_import(
+        self, internal_user_id: UserId, another_internal_user_id: UserId, mocker: MockerFixture
+    ) -> None:
+        mocker.patch.object(settings, "feeds_import_chunk", 2)
 
-        removed = await clean_orphaned_entries(chunk=10)
+        feed_infos = [_feed_info() for _ in range(3)]
 
-        assert removed == 6
+        import_1 = await start_feeds_import(feed_infos, internal_user_id)
+        import_2 = await start_feeds_import(feed_infos[:1], another_internal_user_id)
 
-        loaded_entries = await l_domain.get_entries_by_ids([entry.id for entry in entries])
+        assert await import_feeds(limit=2) == 2
+        assert await import_feeds(limit=2) == 1
+        assert await import_feeds(limit=2) == 0
 
-        assert loaded_entries == {
-            entries[0].id: entries[0],
-            entries[1].id: entries[1],
-            entries[2].id: entries[2],
-            entries[3].id: entries[3],
-            entries[4].id: None,
-            entries[5].id: None,
-            entries[6].id: None,
-            entries[7].id: None,
-            entries[8].id: None,
-            entries[9].id: None,
-        }
+        for feeds_import, user_id, expected_feeds in [
+            (import_1, internal_user_id, feed_infos),
+            (import_2, another_internal_user_id, feed_infos[:1]),
+        ]:
+            loaded_import = await get_feeds_import(feeds_import.id)
+
+            assert loaded_import is not None
+            assert loaded_import.processed == len(expected_feeds)
+            assert loaded_import.finished
+
+            links = await fl_domain.get_linked_feeds(user_id)
+            feeds = await f_domain.get_feeds([link.feed_id for link in links])
+
+            assert {feed.url for feed in feeds} == {feed.url for feed in expected_feeds}
+
+        assert await q_operations.tech_get_queue_records(QueueKind.feeds_to_import, FeedsToImport) == []
 
     @pytest.mark.asyncio
-    async def test_return_zero_when_entries_not_removed(self, mocker: MockerFixture) -> None:
-        orphaned_entries = {new_entry_id(), new_entry_id()}
+    async def test_failed_chunk_does_not_block_others(self, internal_user_id: UserId, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "feeds_import_chunk", 2)
 
-        mocker.patch("ffun.library.domain.sync_orphaned_entries")
-        mocker.patch("ffun.library.domain.get_orphaned_entries", return_value=orphaned_entries)
-        mocker.patch("ffun.meta.domain.remove_entries", return_value=False)
+        feed_infos = [_feed_info() for _ in range(4)]
 
-        assert await clean_orphaned_entries(chunk=10) == 0
+        feeds_import = await start_feeds_import(feed_infos, internal_user_id)
 
+        side_effect: list[object] = [Exception("test error"), None]
+        mocker.patch("ffun.meta.domain.add_feeds", side_effect=side_effect)
 
-# test that everything is connected correctly
-# detailed cases are covered in tests of functions called in clean_orphaned_entries
-class TestCleanOrphanedFeeds:
+        with capture_logs() as logs:  # type: ignore
+            assert await import_feeds(limit=10) == 2
+
+        assert_logs(logs, feeds_import_chunk_failed=1, feeds_import_chunk_dropped=0)  # type: ignore
+
+        loaded_import = await get_feeds_import(feeds_import.id)
+
+        assert loaded_import is not None
+        assert loaded_import.processed == 2
+        assert loaded_import.failed == 0
+        assert not loaded_import.finished
+
+        # only the failed chunk stays in the queue
+        records = await q_operations.tech_get_queue_records(QueueKind.feeds_to_import, FeedsToImport)
+
+        assert len(records) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_retried(self, internal_user_id: UserId, mocker: MockerFixture) -> None:
+        mocker.patch.object(q_settings, "freezing_delay", datetime.timedelta(seconds=0))
+
+        feed_infos = [_feed_info() for _ in range(2)]
+
+        feeds_import = await start_feeds_import(feed_infos, internal_user_id)
+
+        side_effect: list[object] = [Exception("test error")]
+        mocker.patch("ffun.meta.domain.add_feeds", side_effect=side_effect)
+
+        assert await import_feeds(limit=10) == 1
+
+        mocker.stopall()
+        mocker.patch.object(q_settings, "freezing_delay", datetime.timedelta(seconds=0))
+
+        assert await import_feeds(limit=10) == 1
+
+        loaded_import = await get_feeds_import(feeds_import.id)
+
+        assert loaded_import is not None
+        assert loaded_import.processed == 2
+        assert loaded_import.failed == 0
+        assert loaded_import.finished
+
+        assert await q_operations.tech_get_queue_records(QueueKind.feeds_to_import, FeedsToImport) == []
+
+    @pytest.mark.asyncio
+    async def test_old_failed_chunk_dropped(self, internal_user_id: UserId, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "importer_max_chunk_age", datetime.timedelta(seconds=0))
+
+        feed_infos = [_feed_info() for _ in range(2)]
+
+        feeds_import = await start_feeds_import(feed_infos, internal_user_id)
+
+        side_effect: list[object] = [Exception("test error")]
+        mocker.patch("ffun.meta.domain.add_feeds", side_effect=side_effect)
+
+        with capture_logs() as logs:  # type: ignore
+            assert await import_feeds(limit=10) == 1
+
+        assert_logs(logs, feeds_import_chunk_failed=0, feeds_import_chunk_dropped=1)  # type: ignore
+
+        loaded_import = await get_feeds_import(feeds_import.id)
+
+        assert loaded_import is not None
+        assert loaded_import.processed == 0
+        assert loaded_import.failed == 2
+        assert loaded_import.finished
+
+        assert await q_operations.tech_get_queue_records(QueueKind.feeds_to_import, FeedsToImport) == []
+
+
+class TestFinishFeedsImportChunk:
+    @pytest_asyncio.fixture(autouse=True)  # type: ignore
+    async def clear_queue(self) -> None:
+        await q_operations.tech_clear_queue(QueueKind.feeds_to_import)
+
+    @pytest.mark.asyncio
+    async def test_counted_once(self, internal_user_id: UserId) -> None:
+        feed_infos = [_feed_info() for _ in range(3)]
+
+        feeds_import = await start_feeds_import(feed_infos, internal_user_id)
+
+        records = await q_domain.pull(QueueKind.feeds_to_import, FeedsToImport, limit=10)
+
+        assert len(records) == 1
+        assert records[0].id is not None
+
+        with capture_logs() as logs:  # type: ignore
+            await _finish_feeds_import_chunk(records[0].id, feeds_import.id, processed=3, failed=0)
+            await _finish_feeds_import_chunk(records[0].id, feeds_import.id, processed=3, failed=0)
+
+        assert_logs(logs, feeds_import_chunk_already_acknowledged=1)  # type: ignore
+
+        loaded_import = await get_feeds_import(feeds_import.id)
+
+        assert loaded_import is not None
+        assert loaded_import.processed == 3
+        assert loaded_import.failed == 0
+
+
+class TestGetOrphanedFeeds:
     @pytest_asyncio.fixture(autouse=True)  # type: ignore
     async def cleanup_orphaned_feeds(self) -> None:
         orphanes = await f_domain.get_orphaned_feeds(limit=10000, loaded_before=utils.now())
 
-        for orphane_id in orphanes:
-            await f_domain.tech_remove_feed(orphane_id)
+        await f_domain.tech_remove_feeds(orphanes)
 
     @pytest.mark.asyncio
-    async def test_chunks(self) -> None:
-        feeds = await f_make.n_feeds(10)
+    async def test(self) -> None:
+        feeds = await f_make.n_feeds(5)
 
-        for feed in feeds:
+        for feed in feeds[:3]:
             await f_domain.mark_feed_as_orphaned(feed.id)
 
-        assert await clean_orphaned_feeds(chunk=3) == 3
-        assert await clean_orphaned_feeds(chunk=4) == 4
-        assert await clean_orphaned_feeds(chunk=5) == 3
+        assert await get_orphaned_feeds(limit=100) == sorted(feed.id for feed in feeds[:3])
 
-    @pytest.mark.asyncio
-    async def test_all_logic_called(self, mocker: MockerFixture) -> None:
-        feeds = await f_make.n_feeds(3)
+        orphanes = await get_orphaned_feeds(limit=2)
 
-        feeds.sort(key=lambda feed: feed.id)
+        assert len(orphanes) == 2
+        assert orphanes == sorted(orphanes)
 
-        for feed in feeds:
-            await f_domain.mark_feed_as_orphaned(feed.id)
 
-        unlink_all_mock = mocker.patch("ffun.library.domain.unlink_all")
+# test that everything is connected correctly
+class TestRemoveOrphanedFeeds:
+
+    @pytest.mark.asyncio
+    async def test_no_feeds(self) -> None:
+        assert await remove_orphaned_feeds([]) == 0
+
+    @pytest.mark.asyncio
+    async def test_all_logic_called(self, mocker: MockerFixture, five_saved_feed_ids: list[FeedId]) -> None:
+        feed_ids = five_saved_feed_ids[:3]
+
+        unlink_feeds_mock = mocker.patch("ffun.library.domain.unlink_feeds")
         remove_feed_entries_count_mock = mocker.patch("ffun.library.domain.remove_feed_entries_count")
-        tech_remove_feed_mock = mocker.patch("ffun.feeds.domain.tech_remove_feed")
+        tech_remove_feeds_mock = mocker.patch("ffun.feeds.domain.tech_remove_feeds")
         unlink_feeds_from_all_users = mocker.patch("ffun.feeds_links.domain.unlink_feeds_from_all_users")
 
-        assert await clean_orphaned_feeds(chunk=100) == 3
+        assert await remove_orphaned_feeds(feed_ids) == 3
 
-        assert unlink_all_mock.call_args_list == [mocker.call(feed.id) for feed in feeds]  # type: ignore
+        unlink_feeds_mock.assert_called_once_with(feed_ids)
+        remove_feed_entries_count_mock.assert_called_once_with(feed_ids)
+        tech_remove_feeds_mock.assert_called_once_with(feed_ids)
+        unlink_feeds_from_all_users.assert_called_once_with(feed_ids)
 
-        remove_feed_entries_count_mock.assert_called_once_with([feed.id for feed in feeds])  # type: ignore[misc]
+    @pytest.mark.asyncio
+    async def test_remove(self, loaded_feed: Feed) -> None:
+        entries = await l_make.n_entries_list(loaded_feed, n=3)
 
-        assert tech_remove_feed_mock.call_args_list == [mocker.call(feed.id) for feed in feeds]  # type: ignore
+        assert await remove_orphaned_feeds([loaded_feed.id]) == 1
 
-        assert unlink_feeds_from_all_users.call_args_list == [mocker.call([feed.id for feed in feeds])]  # type: ignore
+        assert await f_domain.get_feeds([loaded_feed.id]) == []
 
+        orphaned_entries = await l_domain.get_orphaned_entries(limit=100500)
 
-# test that everything is connected correctly
-# detailed cases are covered in tests of functions called in clean_orphaned_tags
-class TestCleanOrphanedTags:
+        assert {entry.id for entry in entries} <= orphaned_entries
 
-    @pytest_asyncio.fixture(autouse=True)  # type: ignore
-    async def cleanup_orphaned_tags(self) -> None:
-        while await clean_orphaned_tags(chunk=10000):
-            pass
 
-    @pytest.mark.asyncio
-    async def test_chunks(
-        self, five_tags_ids: tuple[TagId, TagId, TagId, TagId, TagId]
-    ) -> None:  # pylint: disable=W0613
-        assert await clean_orphaned_tags(chunk=2) == 2
-        assert await clean_orphaned_feeds(chunk=1) == 1
-        assert await clean_orphaned_feeds(chunk=5) == 2
+# test that everything is connected correctly
+class TestGetOrphanedTags:
 
     @pytest.mark.asyncio
-    async def test_all_logic_called(self, mocker: MockerFixture) -> None:
-        protected_tags = [1, 3, 5]
+    async def test(self, mocker: MockerFixture, three_tags_ids: tuple[TagId, TagId, TagId]) -> None:
+        protected_tags = {three_tags_ids[0]}
+
+        orphaned_tags = [three_tags_ids[1]]
 
         get_all_tags_in_rules_mock = mocker.patch(
             "ffun.scores.domain.get_all_tags_in_rules", return_value=protected_tags
         )
-        remove_orphaned_tags_mock = mocker.patch("ffun.ontology.domain.remove_orphaned_tags", return_value=7)
+        get_orphaned_tags_mock = mocker.patch("ffun.ontology.domain.get_orphaned_tags", return_value=orphaned_tags)
 
-        assert await clean_orphaned_tags(chunk=100) == 7
+        assert await get_orphaned_tags(limit=100, after_tag_id=three_tags_ids[2]) == [three_tags_ids[1]]
 
         assert get_all_tags_in_rules_mock.call_args_list == [mocker.call()]  # type: ignore
-        assert remove_orphaned_tags_mock.call_args_list == [
-            mocker.call(chunk=100, protected_tags=protected_tags)  # type: ignore
+        assert get_orphaned_tags_mock.call_args_list == [
+            mocker.call(limit=100, protected_tags=[three_tags_ids[0]], after_tag_id=three_tags_ids[2])  # type: ignore
         ]
 
 
@@ -357,233 +486,145 @@ class TestRemoveTags:
 
 
 # test that everything is connected correctly
-class TestApplyRenormalizedTags:
+class TestApplyReplacements:
 
     @pytest.mark.asyncio
-    async def test_no_changes(
-        self, fake_processor_id: ProcessorId, three_tags_ids: tuple[TagId, TagId, TagId]
-    ) -> None:
-        await _apply_renormalized_tags(
-            processor_id=fake_processor_id, old_tag_id=three_tags_ids[0], new_tag_id=three_tags_ids[1]
-        )
+    async def test_no_replacements(self) -> None:
+        await _apply_replacements([])
 
     @pytest.mark.asyncio
     async def test(
-        self, mocker: MockerFixture, fake_processor_id: ProcessorId, three_tags_ids: tuple[TagId, TagId, TagId]
+        self,
+        mocker: MockerFixture,
+        fake_processor_id: ProcessorId,
+        another_fake_processor_id: ProcessorId,
+        three_tags_ids: tuple[TagId, TagId, TagId],
     ) -> None:
-        copy_tag_properties = mocker.patch("ffun.ontology.domain.copy_tag_properties")
-        copy_relations = mocker.patch("ffun.ontology.domain.copy_relations")
-        clone_rules_for_replacements = mocker.patch("ffun.scores.domain.clone_rules_for_replacements")
-
-        await _apply_renormalized_tags(
-            processor_id=fake_processor_id, old_tag_id=three_tags_ids[0], new_tag_id=three_tags_ids[1]
-        )
-
-        assert copy_tag_properties.call_args_list == [
-            mocker.call(  # type: ignore
-                processor_id=fake_processor_id,
-                old_tag_id=three_tags_ids[0],
-                new_tag_id=three_tags_ids[1],
-            )
-        ]
-        assert copy_relations.call_args_list == [
-            mocker.call(  # type: ignore
-                processor_id=fake_processor_id,
-                old_tag_id=three_tags_ids[0],
-                new_tag_id=three_tags_ids[1],
-            )
-        ]
-        assert clone_rules_for_replacements.call_args_list == [
-            mocker.call({three_tags_ids[0]: three_tags_ids[1]})  # type: ignore
+        copy_tags_properties = mocker.patch("ffun.ontology.domain.copy_tags_properties_for_replacements")
+        copy_relations = mocker.patch("ffun.ontology.domain.copy_relations_for_replacements")
+        clone_rules = mocker.patch("ffun.scores.domain.clone_rules_for_replacement_pairs")
+
+        replacements = [
+            TagReplacement(processor_id=fake_processor_id, old_tag_id=three_tags_ids[0], new_tag_id=three_tags_ids[1]),
+            TagReplacement(
+                processor_id=another_fake_processor_id, old_tag_id=three_tags_ids[0], new_tag_id=three_tags_ids[2]
+            ),
         ]
 
+        await _apply_replacements(replacements)
 
-class TestNormalizeTagUid:
-
-    @pytest.mark.asyncio
-    async def test_no_categories(self, fake_processor_id: ProcessorId) -> None:
-        assert await _normalize_tag_uid(
-            old_tag_uid=TagUid("some-test-tag"), categories=set(), processor_id=fake_processor_id
-        ) == (False, [])
+        assert copy_tags_properties.call_args_list == [mocker.call(replacements)]  # type: ignore
+        assert copy_relations.call_args_list == [mocker.call(replacements)]  # type: ignore
 
-    @pytest.mark.asyncio
-    async def test_no_norm_forms(self, mocker: MockerFixture, fake_processor_id: ProcessorId) -> None:
-        normalize = mocker.patch("ffun.tags.domain.normalize", return_value=[])  # type: ignore
+        pairs: list[tuple[TagId, TagId]] = list(clone_rules.call_args_list[0].args[0])  # type: ignore
 
-        categories = {TagCategory.test_raw, TagCategory.test_final}
-
-        old_tag_uid = TagUid("some-test-tag")
+        assert pairs == [
+            (three_tags_ids[0], three_tags_ids[1]),
+            (three_tags_ids[0], three_tags_ids[2]),
+        ]
 
-        assert await _normalize_tag_uid(
-            old_tag_uid=old_tag_uid, categories=categories, processor_id=fake_processor_id
-        ) == (False, [])
 
-        assert normalize.call_args_list == [  # type: ignore
-            mocker.call([RawTag(raw_uid=old_tag_uid, link=None, categories=categories)])  # type: ignore
-        ]
+class TestNormalizeTagUid:
 
     @pytest.mark.asyncio
-    async def test_normalized__no_original_form(self, mocker: MockerFixture, fake_processor_id: ProcessorId) -> None:
-        norm_tag_1 = NormalizedTag(
-            uid=TagUid("norm-tag-1"), link=None, categories={TagCategory.test_final, TagCategory.test_preserve}
-        )
-        norm_tag_2 = NormalizedTag(uid=TagUid("norm-tag-2"), link=None, categories={TagCategory.test_raw})
-
-        old_tag_uid = TagUid("some-test-tag")
+    async def test_no_categories(self) -> None:
+        assert await _normalize_tag_uid(old_tag_uid=TagUid("some-test-tag"), categories=set()) == []
 
-        uids_to_ids = await o_domain.get_ids_by_uids(
-            [old_tag_uid, norm_tag_1.uid, norm_tag_2.uid]  # make sure tags exist in the database
-        )
+    @pytest.mark.asyncio
+    async def test(self, mocker: MockerFixture) -> None:
+        norm_tag = NormalizedTag(uid=TagUid("norm-tag"), link=None, categories={TagCategory.test_raw})
 
-        normalize = mocker.patch("ffun.tags.domain.normalize", return_value=[norm_tag_1, norm_tag_2])  # type: ignore
+        normalize = mocker.patch("ffun.tags.domain.normalize", return_value=[norm_tag])  # type: ignore
 
         categories = {TagCategory.test_raw, TagCategory.test_final}
 
-        (keep_old_tag, new_tags) = await _normalize_tag_uid(
-            old_tag_uid=old_tag_uid, categories=categories, processor_id=fake_processor_id
-        )
+        old_tag_uid = TagUid("some-test-tag")
 
-        assert not keep_old_tag
-        assert set(new_tags) == {uids_to_ids[norm_tag_1.uid], uids_to_ids[norm_tag_2.uid]}
+        assert await _normalize_tag_uid(old_tag_uid=old_tag_uid, categories=categories) == [norm_tag]
 
         assert normalize.call_args_list == [  # type: ignore
             mocker.call([RawTag(raw_uid=old_tag_uid, link=None, categories=categories)])  # type: ignore
         ]
 
-        properties = await o_domain.get_tags_properties([uids_to_ids[norm_tag_1.uid], uids_to_ids[norm_tag_2.uid]])
-        properties = [property for property in properties if property.processor_id == fake_processor_id]
-        assert len(properties) == 2
-        assert all(property.type == TagPropertyType.categories for property in properties)
-
-        tag_1_property = [property for property in properties if property.tag_id == uids_to_ids[norm_tag_1.uid]][0]
-        tag_2_property = [property for property in properties if property.tag_id == uids_to_ids[norm_tag_2.uid]][0]
 
-        assert tag_1_property.value == ",".join(sorted(category.value for category in norm_tag_1.categories))
-        assert tag_2_property.value == ",".join(sorted(category.value for category in norm_tag_2.categories))
+class TestNormalizeProperties:
 
     @pytest.mark.asyncio
-    async def test_normalized__keep_original_form(self, mocker: MockerFixture, fake_processor_id: ProcessorId) -> None:
-        norm_tag_1 = NormalizedTag(uid=TagUid("norm-tag-1"), link=None, categories={TagCategory.test_final})
-        norm_tag_2 = NormalizedTag(
-            uid=TagUid("norm-tag-2"), link=None, categories={TagCategory.test_raw, TagCategory.test_preserve}
-        )
-        norm_tag_3 = NormalizedTag(uid=TagUid("norm-tag-3"), link=None, categories={TagCategory.test_raw})
-
-        uids_to_ids = await o_domain.get_ids_by_uids(
-            [norm_tag_1.uid, norm_tag_2.uid, norm_tag_3.uid]  # make sure tags exist in the database
-        )
+    async def test_no_properties(self) -> None:
+        assert await _normalize_properties([], {}) == ([], [])
 
-        normalize = mocker.patch(
-            "ffun.tags.domain.normalize", return_value=[norm_tag_1, norm_tag_2, norm_tag_3]  # type: ignore
-        )
+    @pytest.mark.asyncio
+    async def test(  # noqa: CFQ001
+        self, mocker: MockerFixture, fake_processor_id: ProcessorId, another_fake_processor_id: ProcessorId
+    ) -> None:
+        old_uid_1 = TagUid(f"old-tag-1-{uuid.uuid4().hex}")
+        old_uid_2 = TagUid(f"old-tag-2-{uuid.uuid4().hex}")
+        norm_uid_1 = TagUid(f"norm-tag-1-{uuid.uuid4().hex}")
+        norm_uid_2 = TagUid(f"norm-tag-2-{uuid.uuid4().hex}")
+
+        uids_to_ids = await o_domain.get_ids_by_uids([old_uid_1, old_uid_2, norm_uid_1, norm_uid_2])
+
+        normalized = {
+            # old tag 1 is replaced by both normalized tags for the first processor
+            (old_uid_1, frozenset({TagCategory.test_raw})): [
+                NormalizedTag(uid=norm_uid_1, link=None, categories={TagCategory.test_final}),
+                NormalizedTag(uid=norm_uid_2, link=None, categories={TagCategory.test_raw}),
+            ],
+            # old tag 1 keeps its form for the second processor, but it is removed anyway
+            (old_uid_1, frozenset({TagCategory.test_final})): [
+                NormalizedTag(uid=old_uid_1, link=None, categories={TagCategory.test_final}),
+            ],
+            # old tag 2 keeps its form and gets a replacement
+            (old_uid_2, frozenset({TagCategory.test_raw})): [
+                NormalizedTag(uid=old_uid_2, link=None, categories={TagCategory.test_raw}),
+                NormalizedTag(uid=norm_uid_1, link=None, categories={TagCategory.test_raw}),
+            ],
+        }
 
-        categories = {TagCategory.test_raw, TagCategory.test_final}
+        async def fake_normalize(raw_tags: list[RawTag]) -> list[NormalizedTag]:
+            return normalized[(TagUid(raw_tags[0].raw_uid), frozenset(raw_tags[0].categories))]
 
-        (keep_old_tag, new_tags) = await _normalize_tag_uid(
-            old_tag_uid=norm_tag_2.uid, categories=categories, processor_id=fake_processor_id
-        )
+        mocker.patch("ffun.tags.domain.normalize", side_effect=fake_normalize)
 
-        assert keep_old_tag
-        assert set(new_tags) == {uids_to_ids[norm_tag_1.uid], uids_to_ids[norm_tag_3.uid]}
+        def make_property(uid: TagUid, category: TagCategory, processor_id: ProcessorId) -> TagProperty:
+            return TagProperty(
+                tag_id=uids_to_ids[uid],
+                type=TagPropertyType.categories,
+                value=category.value,
+                processor_id=processor_id,
+                created_at=utils.now(),
+            )
 
-        assert normalize.call_args_list == [  # type: ignore
-            mocker.call([RawTag(raw_uid=norm_tag_2.uid, link=None, categories=categories)])  # type: ignore
+        properties = [
+            make_property(old_uid_1, TagCategory.test_raw, fake_processor_id),
+            make_property(old_uid_1, TagCategory.test_final, another_fake_processor_id),
+            make_property(old_uid_2, TagCategory.test_raw, fake_processor_id),
         ]
 
-        properties = await o_domain.get_tags_properties(list(uids_to_ids.values()))
-        properties = [property for property in properties if property.processor_id == fake_processor_id]
-        assert len(properties) == 3
-        assert all(property.type == TagPropertyType.categories for property in properties)
-
-        tag_1_property = [property for property in properties if property.tag_id == uids_to_ids[norm_tag_1.uid]][0]
-        tag_2_property = [property for property in properties if property.tag_id == uids_to_ids[norm_tag_2.uid]][0]
-        tag_3_property = [property for property in properties if property.tag_id == uids_to_ids[norm_tag_3.uid]][0]
-
-        assert tag_1_property.value == ",".join(sorted(category.value for category in norm_tag_1.categories))
-        assert tag_2_property.value == ",".join(sorted(category.value for category in norm_tag_2.categories))
-        assert tag_3_property.value == ",".join(sorted(category.value for category in norm_tag_3.categories))
-
-
-# test that everything is connected correctly
-class TestRenormalizeTag:
-
-    @pytest.mark.asyncio
-    async def test_no_removing(
-        self,
-        fake_processor_id: ProcessorId,
-        three_tags_ids: tuple[TagId, TagId, TagId],
-        three_processor_tags: tuple[NormalizedTag, NormalizedTag, NormalizedTag],
-        mocker: MockerFixture,
-    ) -> None:
-
-        normalize_tag_uid = mocker.patch(
-            "ffun.meta.domain._normalize_tag_uid", return_value=(True, [three_tags_ids[1], three_tags_ids[2]])
-        )
-        apply_renormalized_tags = mocker.patch("ffun.meta.domain._apply_renormalized_tags")
-        remove_tags = mocker.patch("ffun.meta.domain.remove_tags")
+        old_uids = {uids_to_ids[old_uid_1]: old_uid_1, uids_to_ids[old_uid_2]: old_uid_2}
 
-        categories = {TagCategory.test_raw, TagCategory.test_final}
-
-        await _renormalize_tag(
-            processor_id=fake_processor_id,
-            old_tag_id=three_tags_ids[0],
-            old_tag_uid=three_processor_tags[0].uid,
-            categories=categories,
-        )
+        replacements, tags_to_remove = await _normalize_properties(properties, old_uids)
 
-        assert normalize_tag_uid.call_args_list == [
-            mocker.call(  # type: ignore
-                old_tag_uid=three_processor_tags[0].uid, categories=categories, processor_id=fake_processor_id
-            )
-        ]
-        assert apply_renormalized_tags.call_args_list == [
-            mocker.call(  # type: ignore
-                processor_id=fake_processor_id, old_tag_id=three_tags_ids[0], new_tag_id=three_tags_ids[1]
+        assert set(replacements) == {
+            TagReplacement(
+                processor_id=fake_processor_id, old_tag_id=uids_to_ids[old_uid_1], new_tag_id=uids_to_ids[norm_uid_1]
             ),
-            mocker.call(  # type: ignore
-                processor_id=fake_processor_id, old_tag_id=three_tags_ids[0], new_tag_id=three_tags_ids[2]
+            TagReplacement(
+                processor_id=fake_processor_id, old_tag_id=uids_to_ids[old_uid_1], new_tag_id=uids_to_ids[norm_uid_2]
             ),
-        ]
-        assert remove_tags.call_args_list == []
-
-    @pytest.mark.asyncio
-    async def test_removing(
-        self,
-        fake_processor_id: ProcessorId,
-        three_tags_ids: tuple[TagId, TagId, TagId],
-        three_processor_tags: tuple[NormalizedTag, NormalizedTag, NormalizedTag],
-        mocker: MockerFixture,
-    ) -> None:
+            TagReplacement(
+                processor_id=fake_processor_id, old_tag_id=uids_to_ids[old_uid_2], new_tag_id=uids_to_ids[norm_uid_1]
+            ),
+        }
 
-        normalize_tag_uid = mocker.patch(
-            "ffun.meta.domain._normalize_tag_uid", return_value=(False, [three_tags_ids[1], three_tags_ids[2]])
-        )
-        apply_renormalized_tags = mocker.patch("ffun.meta.domain._apply_renormalized_tags")
-        remove_tags = mocker.patch("ffun.meta.domain.remove_tags")
+        assert tags_to_remove == [uids_to_ids[old_uid_1]]
 
-        categories = {TagCategory.test_raw, TagCategory.test_final}
+        new_properties = await o_domain.get_tags_properties([uids_to_ids[norm_uid_1], uids_to_ids[norm_uid_2]])
 
-        await _renormalize_tag(
-            processor_id=fake_processor_id,
-            old_tag_id=three_tags_ids[0],
-            old_tag_uid=three_processor_tags[0].uid,
-            categories=categories,
-        )
-
-        assert normalize_tag_uid.call_args_list == [
-            mocker.call(  # type: ignore
-                old_tag_uid=three_processor_tags[0].uid, categories=categories, processor_id=fake_processor_id
-            )
-        ]
-        assert apply_renormalized_tags.call_args_list == [
-            mocker.call(  # type: ignore
-                processor_id=fake_processor_id, old_tag_id=three_tags_ids[0], new_tag_id=three_tags_ids[1]
-            ),
-            mocker.call(  # type: ignore
-                processor_id=fake_processor_id, old_tag_id=three_tags_ids[0], new_tag_id=three_tags_ids[2]
-            ),
-        ]
-        assert remove_tags.call_args_list == [mocker.call([three_tags_ids[0]])]  # type: ignore
+        assert {(property.tag_id, property.processor_id, property.value) for property in new_properties} == {
+            (uids_to_ids[norm_uid_1], fake_processor_id, TagCategory.test_raw.value),
+            (uids_to_ids[norm_uid_2], fake_processor_id, TagCategory.test_raw.value),
+        }
 
 
 # test that everything is connected correctly
@@ -660,29 +701,35 @@ class TestRenormalizeTags:
 
         await o_domain.apply_tags_properties(properties)
 
-        renormalize_tag = mocker.patch("ffun.meta.domain._renormalize_tag")
+        normalize_properties = mocker.patch(
+            "ffun.meta.domain._normalize_properties", return_value=(["replacements"], [tag_ids[1]])
+        )
+        apply_replacements = mocker.patch("ffun.meta.domain._apply_replacements")
+        remove_tags = mocker.patch("ffun.meta.domain.remove_tags")
 
         await renormalize_tags([tag_ids[0], tag_ids[1], tag_ids[2], tag_ids[3]])
 
-        call_list = [  # type: ignore
-            (  # type: ignore
-                call.kwargs["old_tag_id"],  # type: ignore
-                call.kwargs["old_tag_uid"],  # type: ignore
-                call.kwargs["processor_id"],  # type: ignore
-                frozenset(call.kwargs["categories"]),  # type: ignore
-            )
-            for call in renormalize_tag.call_args_list
-        ]
-        call_list.sort()  # type: ignore
-
-        assert call_list == [  # type: ignore
-            (tag_ids[0], tag_uids[0], fake_processor_id, frozenset({TagCategory.test_raw.value})),
-            (
-                tag_ids[1],
-                tag_uids[1],
-                fake_processor_id,
-                frozenset({TagCategory.test_raw.value, TagCategory.test_final.value}),
-            ),
-            (tag_ids[1], tag_uids[1], another_fake_processor_id, frozenset({TagCategory.special.value})),
-            (tag_ids[2], tag_uids[2], another_fake_processor_id, frozenset({TagCategory.test_final.value})),
-        ]
+        assert len(normalize_properties.call_args_list) == 1
+
+        passed_properties: list[TagProperty] = normalize_properties.call_args_list[0].args[0]  # type: ignore
+        passed_uids: dict[TagId, TagUid] = normalize_properties.call_args_list[0].args[1]  # type: ignore
+
+        assert sorted(
+            (property.tag_id, property.processor_id, property.value) for property in passed_properties
+        ) == sorted(
+            [
+                (tag_ids[0], fake_processor_id, TagCategory.test_raw.value),
+                (
+                    tag_ids[1],
+                    fake_processor_id,
+                    ",".join([TagCategory.test_raw.value, TagCategory.test_final.value]),
+                ),
+                (tag_ids[1], another_fake_processor_id, TagCategory.special.value),
+                (tag_ids[2], another_fake_processor_id, TagCategory.test_final.value),
+            ]
+        )
+
+        assert passed_uids == {tag_ids[0]: tag_uids[0], tag_ids[1]: tag_uids[1], tag_ids[2]: tag_uids[2]}
+
+        assert apply_replacements.call_args_list == [mocker.call(["replacements"])]  # type: ignore
+        assert remove_tags.call_args_list == [mocker.call([tag_ids[1]])]  # type: ignore
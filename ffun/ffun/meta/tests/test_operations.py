@@ -0,0 +1,63 @@
+import uuid
+
+import pytest
+
+from ffun.core.postgresql import execute
+from ffun.domain.entities import UserId
+from ffun.meta.entities import FeedsImportId
+from ffun.meta.operations import create_feeds_import, get_feeds_import, register_imported_feeds
+
+
+class TestCreateFeedsImport:
+
+    @pytest.mark.asyncio
+    async def test_create(self, internal_user_id: UserId) -> None:
+        feeds_import = await create_feeds_import(internal_user_id, total=13)
+
+        assert feeds_import.user_id == internal_user_id
+        assert feeds_import.total == 13
+        assert feeds_import.processed == 0
+        assert feeds_import.failed == 0
+
+        assert await get_feeds_import(feeds_import.id) == feeds_import
+
+
+class TestGetFeedsImport:
+
+    @pytest.mark.asyncio
+    async def test_not_found(self) -> None:
+        assert await get_feeds_import(FeedsImportId(uuid.uuid4())) is None
+
+
+class TestRegisterImportedFeeds:
+
+    @pytest.mark.asyncio
+    async def test_register(self, internal_user_id: UserId) -> None:
+        feeds_import = await create_feeds_import(internal_user_id, total=13)
+        another_import = await create_feeds_import(internal_user_id, total=13)
+
+        await register_imported_feeds(execute, feeds_import.id, processed=5)
+        await register_imported_feeds(execute, feeds_import.id, processed=7)
+
+        loaded_import = await get_feeds_import(feeds_import.id)
+
+        assert loaded_import is not None
+        assert loaded_import.processed == 12
+        assert not loaded_import.finished
+        assert loaded_import.updated_at > feeds_import.updated_at
+
+        assert await get_feeds_import(another_import.id) == another_import
+
+    @pytest.mark.asyncio
+    async def test_register_failed(self, internal_user_id: UserId) -> None:
+        feeds_import = await create_feeds_import(internal_user_id, total=13)
+
+        await register_imported_feeds(execute, feeds_import.id, processed=10)
+        await register_imported_feeds(execute, feeds_import.id, processed=0, failed=3)
+
+        loaded_import = await get_feeds_import(feeds_import.id)
+
+        assert loaded_import is not None
+        assert loaded_import.processed == 10
+        assert loaded_import.failed == 3
+        assert loaded_import.finished
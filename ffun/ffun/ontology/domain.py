@@ -1,10 +1,10 @@
 from collections import Counter
-from typing import Iterable
+from typing import Iterable, Sequence
 
 from ffun.core.postgresql import ExecuteType, execute, run_in_transaction, transaction
 from ffun.domain.entities import EntryId, ProcessorId, TagId, TagUid
 from ffun.ontology import cache, operations
-from ffun.ontology.entities import NormalizedTag, Tag, TagProperty, TagPropertyType
+from ffun.ontology.entities import NormalizedTag, Tag, TagProperty, TagPropertyType, TagReplacement
 from ffun.tags import converters
 from ffun.tags.entities import TagCategory
 
@@ -35,6 +35,10 @@ async def copy_tag_properties(processor_id: ProcessorId, old_tag_id: TagId, new_
     await operations.copy_tag_properties(execute, processor_id, old_tag_id, new_tag_id)
 
 
+async def copy_tags_properties_for_replacements(replacements: Sequence[TagReplacement]) -> None:
+    await operations.copy_tags_properties_for_replacements(execute, replacements)
+
+
 # TODO: in the future we could split this function into two separate functions
 #       1. tags & properties normalization
 #       2. saving tags & properties to the database
@@ -139,19 +143,27 @@ async def prepare_tags_for_entries(
     return entry_tag_ids, tag_mapping
 
 
-@run_in_transaction
-async def remove_orphaned_tags(execute: ExecuteType, chunk: int, protected_tags: list[TagId]) -> int:
-    orphaned_tags = await operations.get_orphaned_tags(execute, limit=chunk, protected_tags=protected_tags)
+async def get_orphaned_tags(limit: int, protected_tags: list[TagId], after_tag_id: TagId | None = None) -> list[TagId]:
+    return await operations.get_orphaned_tags(
+        execute, limit=limit, protected_tags=protected_tags, after_tag_id=after_tag_id
+    )
+
+
+async def merge_relations_counts_deltas(limit: int) -> int:
+    return await operations.merge_relations_counts_deltas(execute, limit=limit)
 
-    success = await operations.remove_tags(execute, orphaned_tags)
+
+@run_in_transaction
+async def remove_orphaned_tags(execute: ExecuteType, tag_ids: list[TagId]) -> int:
+    success = await operations.remove_tags(execute, tag_ids)
 
     # Since we run the code in a transaction, we do nothing with relations here
-    # In case some relations will be added during the transaction, we encounter a foreign key violation
+    # In case some relations will be added after tags were found, we encounter a foreign key violation
     # => the transaction will be rolled back
     # We could silence such failures, because cleaning orphaned tags is a periodic task
 
     if success:
-        return len(orphaned_tags)
+        return len(tag_ids)
 
     return 0
 
@@ -168,6 +180,11 @@ async def copy_relations(
     await operations.register_relations_processors(execute, new_relation_ids, processor_id)
 
 
+@run_in_transaction
+async def copy_relations_for_replacements(execute: ExecuteType, replacements: Sequence[TagReplacement]) -> None:
+    await operations.copy_relations_for_replacements(execute, replacements)
+
+
 @run_in_transaction
 async def remove_relations_for_tags(execute: ExecuteType, tag_ids: list[TagId]) -> None:
     relation_ids = await operations.get_relations_for(execute, tag_ids=tag_ids)
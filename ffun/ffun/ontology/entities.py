@@ -66,6 +66,14 @@ class NormalizedTag(pydantic.BaseModel):
         return properties
 
 
+class TagReplacement(BaseEntity):
+    """Replacement of a tag by its renormalized form in the scope of a single processor."""
+
+    processor_id: ProcessorId
+    old_tag_id: TagId
+    new_tag_id: TagId
+
+
 class Tag(pydantic.BaseModel):
     id: int
     name: str | None = None
@@ -0,0 +1,40 @@
+"""
+tags-relations-count
+"""
+
+from typing import Any
+
+from psycopg import Connection
+from yoyo import step
+
+__depends__ = {"20251004_01_p2dLL-restore-missed-tag-categories"}
+
+
+sql_fill_relations_count = """
+UPDATE o_tags AS t
+SET relations_count = c.cnt
+FROM (SELECT tag_id, COUNT(*) AS cnt FROM o_relations GROUP BY tag_id) AS c
+WHERE t.id = c.tag_id
+"""
+
+
+def apply_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute("ALTER TABLE o_tags ADD COLUMN relations_count BIGINT NOT NULL DEFAULT 0")
+
+    cursor.execute(sql_fill_relations_count)
+
+    cursor.execute("CREATE INDEX idx_o_tags_relations_count ON o_tags (relations_count)")
+    cursor.execute("CREATE INDEX idx_o_tags_orphaned ON o_tags (id) WHERE relations_count = 0")
+
+
+def rollback_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute("DROP INDEX idx_o_tags_orphaned")
+    cursor.execute("DROP INDEX idx_o_tags_relations_count")
+    cursor.execute("ALTER TABLE o_tags DROP COLUMN relations_count")
+
+
+steps = [step(apply_step, rollback_step)]
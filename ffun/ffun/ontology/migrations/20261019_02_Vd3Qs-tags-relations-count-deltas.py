@@ -0,0 +1,41 @@
+"""
+tags-relations-count-deltas
+"""
+
+from typing import Any
+
+from psycopg import Connection
+from yoyo import step
+
+__depends__ = {"20261019_01_Rc9tN-tags-relations-count"}
+
+
+sql_create_deltas_table = """
+CREATE TABLE o_tags_relations_counts_deltas (
+    id BIGSERIAL PRIMARY KEY,
+    tag_id BIGINT NOT NULL,
+    delta BIGINT NOT NULL
+)
+"""
+
+
+def apply_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    # indexes on the counter prevent HOT updates of tags
+    cursor.execute("DROP INDEX idx_o_tags_orphaned")
+    cursor.execute("DROP INDEX idx_o_tags_relations_count")
+
+    cursor.execute(sql_create_deltas_table)
+
+
+def rollback_step(conn: Connection[dict[str, Any]]) -> None:
+    cursor = conn.cursor()
+
+    cursor.execute("DROP TABLE o_tags_relations_counts_deltas")
+
+    cursor.execute("CREATE INDEX idx_o_tags_relations_count ON o_tags (relations_count)")
+    cursor.execute("CREATE INDEX idx_o_tags_orphaned ON o_tags (id) WHERE relations_count = 0")
+
+
+steps = [step(apply_step, rollback_step)]
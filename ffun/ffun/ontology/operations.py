@@ -1,5 +1,6 @@
 import datetime
 import uuid
+from collections import Counter
 from typing import Iterable, Sequence
 
 import psycopg
@@ -7,10 +8,10 @@ from bidict import bidict
 from pypika import PostgreSQLQuery, Table
 
 from ffun.core import logging
-from ffun.core.postgresql import ExecuteType, execute
+from ffun.core.postgresql import ExecuteType, execute, pipeline
 from ffun.domain.entities import EntryId, ProcessorId, TagId, TagUid
 from ffun.ontology import errors
-from ffun.ontology.entities import TagProperty, TagPropertyType, TagStatsBucket
+from ffun.ontology.entities import TagProperty, TagPropertyType, TagReplacement, TagStatsBucket
 from ffun.tags.entities import TagCategory
 
 logger = logging.get_module_logger()
@@ -75,18 +76,73 @@ async def get_tags_by_ids(tags_ids: list[TagId]) -> dict[TagId, TagUid]:
     return {row["id"]: row["uid"] for row in rows}
 
 
-async def _save_tags(execute: ExecuteType, entry_id: EntryId, tags_ids: Iterable[TagId]) -> None:
-    if not tags_ids:
+async def _change_relations_counts(execute: ExecuteType, tags_ids: Iterable[TagId], sign: int) -> None:
+    """Register changes of relations counters for tags by `sign` for each occurrence of a tag in `tags_ids`.
+
+    Changes are appended to the deltas table, not applied to tags directly, so popular tags are not locked
+    by every transaction which changes their relations. See `merge_relations_counts_deltas`.
+    """
+    counts = Counter(tags_ids)
+
+    if not counts:
         return
 
+    sql = """
+    INSERT INTO o_tags_relations_counts_deltas (tag_id, delta)
+    SELECT * FROM unnest(%(ids)s::bigint[], %(deltas)s::bigint[])
+    """
+
+    ids = list(counts)
+
+    await execute(sql, {"ids": ids, "deltas": [sign * counts[tag_id] for tag_id in ids]})
+
+
+async def merge_relations_counts_deltas(execute: ExecuteType, limit: int) -> int:
+    """Apply up to `limit` oldest deltas to the relations counters of tags; return the number of applied deltas."""
+    # deltas locked by a concurrent merge are skipped => merges do not wait for each other
+    sql = """
+    WITH merged AS (
+        DELETE FROM o_tags_relations_counts_deltas
+        WHERE id IN (
+            SELECT id FROM o_tags_relations_counts_deltas ORDER BY id LIMIT %(limit)s FOR UPDATE SKIP LOCKED
+        )
+        RETURNING tag_id, delta
+    ),
+    sums AS (
+        SELECT tag_id, SUM(delta) AS delta FROM merged GROUP BY tag_id
+    ),
+    updated AS (
+        UPDATE o_tags AS t
+        SET relations_count = t.relations_count + s.delta
+        FROM sums AS s
+        WHERE t.id = s.tag_id AND s.delta != 0
+    )
+    SELECT COUNT(*) AS merged FROM merged
+    """
+
+    result = await execute(sql, {"limit": limit})
+
+    return result[0]["merged"]  # type: ignore
+
+
+def _save_tags_query(entry_id: EntryId, tags_ids: Iterable[TagId]) -> str:
     query = PostgreSQLQuery.into(o_relations).columns("entry_id", "tag_id")
 
     for tag_id in tags_ids:
         query = query.insert(entry_id, tag_id)
 
-    query = query.on_conflict("entry_id", "tag_id").do_nothing()
+    query = query.on_conflict("entry_id", "tag_id").do_nothing().returning("tag_id")
 
-    await execute(str(query))
+    return str(query)
+
+
+async def _save_tags(execute: ExecuteType, entry_id: EntryId, tags_ids: Iterable[TagId]) -> None:
+    if not tags_ids:
+        return
+
+    result = await execute(_save_tags_query(entry_id, tags_ids))
+
+    await _change_relations_counts(execute, [row["tag_id"] for row in result], sign=1)
 
 
 async def register_relations_processors(
@@ -107,11 +163,28 @@ async def register_relations_processors(
 
 
 async def apply_tags(execute: ExecuteType, entry_id: EntryId, processor_id: ProcessorId, tag_ids: list[TagId]) -> None:
-    await _save_tags(execute, entry_id, tag_ids)
+    if not tag_ids:
+        return
+
+    # processors are registered for relations found by a subquery
+    # => both statements do not depend on each other results and are sent in a single pipeline
+    sql_register_processors = """
+    INSERT INTO o_relations_processors (relation_id, processor_id)
+    SELECT id, %(processor_id)s
+    FROM o_relations
+    WHERE entry_id = %(entry_id)s AND tag_id = ANY(%(tag_ids)s)
+    ON CONFLICT (relation_id, processor_id) DO NOTHING
+    """
 
-    relation_ids = await get_relations_for(execute, entry_ids=[entry_id], tag_ids=tag_ids)
+    result, _ = await pipeline(
+        execute,
+        [
+            (_save_tags_query(entry_id, tag_ids), None),
+            (sql_register_processors, {"processor_id": processor_id, "entry_id": entry_id, "tag_ids": tag_ids}),
+        ],
+    )
 
-    await register_relations_processors(execute, relation_ids, processor_id)
+    await _change_relations_counts(execute, [row["tag_id"] for row in result], sign=1)
 
 
 async def apply_tags_properties(execute: ExecuteType, properties: Sequence[TagProperty]) -> None:
@@ -192,13 +265,15 @@ async def get_tags_properties(tags_ids: Iterable[TagId]) -> list[TagProperty]:
 
 
 async def remove_relations(execute: ExecuteType, relations_ids: list[int]) -> None:
-    sql = "DELETE FROM o_relations_processors WHERE relation_id = ANY(%(relations_ids)s)"
-
-    await execute(sql, {"relations_ids": relations_ids})
-
-    sql = "DELETE FROM o_relations WHERE id = ANY(%(ids)s)"
+    _, result = await pipeline(
+        execute,
+        [
+            ("DELETE FROM o_relations_processors WHERE relation_id = ANY(%(ids)s)", {"ids": relations_ids}),
+            ("DELETE FROM o_relations WHERE id = ANY(%(ids)s) RETURNING tag_id", {"ids": relations_ids}),
+        ],
+    )
 
-    await execute(sql, {"ids": relations_ids})
+    await _change_relations_counts(execute, [row["tag_id"] for row in result], sign=-1)
 
 
 async def count_total_tags() -> int:
@@ -258,6 +333,7 @@ async def count_new_tags_at(date: datetime.date) -> int:
 
 
 async def tag_frequency_statistics(buckets: list[int]) -> list[TagStatsBucket]:
+    # not merged deltas are counted too => statistics do not depend on the merging frequency
     sql = """
 WITH
   borders AS (
@@ -266,22 +342,28 @@ WITH
       LEAD(b) OVER (ORDER BY b) AS upper_bound
     FROM   unnest(%(buckets)s) AS t(b)
   ),
-  tag_counts AS (
-    SELECT
-      tag_id,
-      COUNT(*) AS cnt
-    FROM   o_relations
-    GROUP  BY tag_id
+  deltas AS (
+    SELECT tag_id, SUM(delta) AS delta
+    FROM o_tags_relations_counts_deltas
+    GROUP BY tag_id
+  ),
+  counts AS (
+    SELECT t.relations_count + COALESCE(d.delta, 0) AS relations_count
+    FROM o_tags AS t
+    LEFT JOIN deltas AS d ON d.tag_id = t.id
   )
 SELECT
   b.lower_bound,
   b.upper_bound,
-  COUNT(tc.tag_id) AS tags_count
+  c.tags_count
 FROM borders AS b
-LEFT JOIN tag_counts AS tc
-  ON tc.cnt >= b.lower_bound
- AND (b.upper_bound IS NULL OR tc.cnt < b.upper_bound)
-GROUP BY b.lower_bound, b.upper_bound
+CROSS JOIN LATERAL (
+    SELECT COUNT(*) AS tags_count
+    FROM counts AS t
+    WHERE t.relations_count > 0
+      AND t.relations_count >= b.lower_bound
+      AND (b.upper_bound IS NULL OR t.relations_count < b.upper_bound)
+) AS c
 ORDER BY b.lower_bound;
 """
 
@@ -301,20 +383,34 @@ ORDER BY b.lower_bound;
     return stats
 
 
-async def get_orphaned_tags(execute: ExecuteType, limit: int, protected_tags: list[TagId]) -> list[TagId]:
-    # PostgreSQL planner should recognize the "anti-join" pattern and provide a proper plan
-    # if not, we should think about more complex query
+async def get_orphaned_tags(
+    execute: ExecuteType, limit: int, protected_tags: list[TagId], after_tag_id: TagId | None = None
+) -> list[TagId]:
+    """Return orphaned tags in the order of their ids, starting after `after_tag_id` if it is defined.
+
+    Tags are scanned by the primary key, so a caller can resume the scan from the last returned tag
+    instead of checking all tags on each call.
+    """
+    # counters may lag behind relations till their deltas are merged
+    # => relations are checked directly, by the index on their tags
     sql = """
 SELECT t.id
 FROM o_tags AS t
-LEFT JOIN o_relations AS r
-  ON r.tag_id = t.id
-WHERE r.id IS NULL
+WHERE NOT EXISTS (SELECT 1 FROM o_relations AS r WHERE r.tag_id = t.id)
       AND t.id != ALL(%(protected_tags)s)
+      AND t.id > %(after_tag_id)s
+ORDER BY t.id
 LIMIT %(limit)s
     """
 
-    result = await execute(sql, {"protected_tags": protected_tags, "limit": limit})
+    result = await execute(
+        sql,
+        {
+            "protected_tags": protected_tags,
+            "limit": limit,
+            "after_tag_id": 0 if after_tag_id is None else after_tag_id,
+        },
+    )
 
     return [row["id"] for row in result]
 
@@ -373,17 +469,20 @@ async def copy_relations_to_new_tag(execute: ExecuteType, relation_ids: list[int
         return []
 
     # We use DO UPDATE since we need to return all new relations ids
+    # xmax = 0 only for inserted rows => we can count really created relations
     sql = """
     INSERT INTO o_relations (entry_id, tag_id)
     SELECT entry_id, %(new_tag_id)s
     FROM o_relations
     WHERE id = ANY(%(relation_ids)s)
     ON CONFLICT (entry_id, tag_id) DO UPDATE SET tag_id = EXCLUDED.tag_id
-    RETURNING id
+    RETURNING id, (xmax = 0) AS inserted
     """
 
     results = await execute(sql, {"new_tag_id": new_tag_id, "relation_ids": relation_ids})
 
+    await _change_relations_counts(execute, [new_tag_id for row in results if row["inserted"]], sign=1)
+
     return [row["id"] for row in results]
 
 
@@ -399,3 +498,76 @@ async def copy_tag_properties(
     """
 
     await execute(sql, {"new_tag_id": new_tag_id, "old_tag_id": old_tag_id, "processor_id": processor_id})
+
+
+def _replacements_arguments(replacements: Sequence[TagReplacement]) -> dict[str, list[int]]:
+    # sort replacements to avoid deadlocks
+    replacements = sorted(replacements, key=lambda r: (r.new_tag_id, r.old_tag_id, r.processor_id))
+
+    return {
+        "processor_ids": [replacement.processor_id for replacement in replacements],
+        "old_tag_ids": [replacement.old_tag_id for replacement in replacements],
+        "new_tag_ids": [replacement.new_tag_id for replacement in replacements],
+    }
+
+
+async def copy_tags_properties_for_replacements(execute: ExecuteType, replacements: Sequence[TagReplacement]) -> None:
+    if not replacements:
+        return
+
+    # replacements are passed as arrays and joined as a table => one statement per batch of replacements
+    sql = """
+    INSERT INTO o_tags_properties (tag_id, type, value, processor_id, created_at)
+    SELECT m.new_tag_id, p.type, p.value, p.processor_id, p.created_at
+    FROM o_tags_properties AS p
+    JOIN unnest(%(processor_ids)s::bigint[], %(old_tag_ids)s::bigint[], %(new_tag_ids)s::bigint[])
+        AS m(processor_id, old_tag_id, new_tag_id)
+        ON p.tag_id = m.old_tag_id AND p.processor_id = m.processor_id
+    ORDER BY m.new_tag_id, p.type, p.processor_id
+    ON CONFLICT (tag_id, type, processor_id) DO NOTHING
+    """
+
+    await execute(sql, _replacements_arguments(replacements))
+
+
+async def copy_relations_for_replacements(execute: ExecuteType, replacements: Sequence[TagReplacement]) -> None:
+    """Copy relations of old tags (created by the replacement's processor) to new tags.
+
+    Also registers the replacement's processor for the new relations.
+    """
+    if not replacements:
+        return
+
+    arguments = _replacements_arguments(replacements)
+
+    sql = """
+    INSERT INTO o_relations (entry_id, tag_id)
+    SELECT DISTINCT r.entry_id, m.new_tag_id
+    FROM o_relations AS r
+    JOIN o_relations_processors AS rp ON rp.relation_id = r.id
+    JOIN unnest(%(processor_ids)s::bigint[], %(old_tag_ids)s::bigint[], %(new_tag_ids)s::bigint[])
+        AS m(processor_id, old_tag_id, new_tag_id)
+        ON r.tag_id = m.old_tag_id AND rp.processor_id = m.processor_id
+    ORDER BY r.entry_id, m.new_tag_id
+    ON CONFLICT (entry_id, tag_id) DO NOTHING
+    RETURNING tag_id
+    """
+
+    result = await execute(sql, arguments)
+
+    await _change_relations_counts(execute, [row["tag_id"] for row in result], sign=1)
+
+    sql = """
+    INSERT INTO o_relations_processors (relation_id, processor_id)
+    SELECT DISTINCT nr.id, m.processor_id
+    FROM o_relations AS r
+    JOIN o_relations_processors AS rp ON rp.relation_id = r.id
+    JOIN unnest(%(processor_ids)s::bigint[], %(old_tag_ids)s::bigint[], %(new_tag_ids)s::bigint[])
+        AS m(processor_id, old_tag_id, new_tag_id)
+        ON r.tag_id = m.old_tag_id AND rp.processor_id = m.processor_id
+    JOIN o_relations AS nr ON nr.entry_id = r.entry_id AND nr.tag_id = m.new_tag_id
+    ORDER BY nr.id, m.processor_id
+    ON CONFLICT (relation_id, processor_id) DO NOTHING
+    """
+
+    await execute(sql, arguments)
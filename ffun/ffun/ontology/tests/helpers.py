@@ -35,3 +35,41 @@ async def get_relation_signatures(relation_ids: list[int]) -> list[tuple[EntryId
     result = await execute(sql, {"ids": relation_ids})  # type: ignore
 
     return [(row["entry_id"], row["tag_id"], row["processor_id"]) for row in result]
+
+
+async def get_relations_counts(tag_ids: Iterable[TagId]) -> dict[TagId, int]:
+    # not merged deltas are counted => results do not depend on merges made by other tests
+    sql = """
+    SELECT t.id, t.relations_count + COALESCE(SUM(d.delta), 0) AS relations_count
+    FROM o_tags AS t
+    LEFT JOIN o_tags_relations_counts_deltas AS d ON d.tag_id = t.id
+    WHERE t.id = ANY(%(ids)s)
+    GROUP BY t.id
+    """
+
+    result = await execute(sql, {"ids": list(tag_ids)})  # type: ignore
+
+    return {row["id"]: row["relations_count"] for row in result}
+
+
+async def get_merged_relations_counts(tag_ids: Iterable[TagId]) -> dict[TagId, int]:
+    sql = "SELECT id, relations_count FROM o_tags WHERE id = ANY(%(ids)s)"
+
+    result = await execute(sql, {"ids": list(tag_ids)})  # type: ignore
+
+    return {row["id"]: row["relations_count"] for row in result}
+
+
+async def assert_relations_counts_are_actual(tag_ids: Iterable[TagId]) -> None:
+    tag_ids = list(tag_ids)
+
+    sql = "SELECT tag_id, COUNT(*) AS cnt FROM o_relations WHERE tag_id = ANY(%(ids)s) GROUP BY tag_id"
+
+    result = await execute(sql, {"ids": tag_ids})  # type: ignore
+
+    actual_counts: dict[TagId, int] = {tag_id: 0 for tag_id in tag_ids}
+
+    for row in result:
+        actual_counts[row["tag_id"]] = row["cnt"]
+
+    assert await get_relations_counts(tag_ids) == actual_counts
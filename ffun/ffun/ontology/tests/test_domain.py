@@ -1,7 +1,6 @@
 import copy
 
 import pytest
-from pytest_mock import MockerFixture
 
 from ffun.core.postgresql import execute
 from ffun.core.tests.helpers import TableSizeDelta, TableSizeNotChanged
@@ -344,21 +343,19 @@ class TestPrepareTagsForEntries:
 class TestRemoveOrphanedTags:
 
     @pytest.mark.asyncio
-    async def test_chunk(self, three_tags_ids: tuple[TagId, TagId, TagId]) -> None:  # pylint: disable=W0613
-        async with TableSizeDelta("o_tags", delta=-2):
-            removed = await remove_orphaned_tags(chunk=2, protected_tags=[])
-
-        assert removed == 2
+    async def test_no_tags(self) -> None:
+        assert await remove_orphaned_tags([]) == 0
 
     @pytest.mark.asyncio
-    async def test_protected(self, three_tags_ids: tuple[TagId, TagId, TagId]) -> None:  # pylint: disable=W0613
-        removed = await remove_orphaned_tags(chunk=1000_000, protected_tags=[three_tags_ids[0], three_tags_ids[2]])
+    async def test(self, three_tags_ids: tuple[TagId, TagId, TagId]) -> None:
+        async with TableSizeDelta("o_tags", delta=-2):
+            removed = await remove_orphaned_tags([three_tags_ids[0], three_tags_ids[2]])
 
-        assert removed > 0
+        assert removed == 2
 
         tags = await operations.get_tags_by_ids(list(three_tags_ids))
 
-        assert set(tags.keys()) == {three_tags_ids[0], three_tags_ids[2]}
+        assert set(tags.keys()) == {three_tags_ids[1]}
 
     @pytest.mark.asyncio
     async def test_foreign_key_violation(
@@ -366,16 +363,13 @@ class TestRemoveOrphanedTags:
         fake_processor_id: ProcessorId,
         cataloged_entry: Entry,
         three_tags_ids: tuple[TagId, TagId, TagId],
-        mocker: MockerFixture,
     ) -> None:
 
         await operations.apply_tags(execute, cataloged_entry.id, fake_processor_id, [three_tags_ids[0]])
 
-        mocker.patch("ffun.ontology.operations.get_orphaned_tags", return_value=list(three_tags_ids))  # type: ignore
-
         async with TableSizeNotChanged("o_tags"):
             async with TableSizeNotChanged("o_tags_properties"):
-                assert await remove_orphaned_tags(chunk=1000_000, protected_tags=[]) == 0
+                assert await remove_orphaned_tags(list(three_tags_ids)) == 0
 
 
 class TestCopyRelations:
@@ -11,13 +11,15 @@ from ffun.library.entities import Entry
 from ffun.library.tests import make as l_make
 from ffun.ontology import errors
 from ffun.ontology.domain import apply_tags_to_entry
-from ffun.ontology.entities import NormalizedTag, TagProperty, TagPropertyType
+from ffun.ontology.entities import NormalizedTag, TagProperty, TagPropertyType, TagReplacement
 from ffun.ontology.operations import (
     _save_tags,
     apply_tags,
     apply_tags_properties,
+    copy_relations_for_replacements,
     copy_relations_to_new_tag,
     copy_tag_properties,
+    copy_tags_properties_for_replacements,
     count_new_tags_at,
     count_total_tags,
     count_total_tags_per_category,
@@ -27,13 +29,20 @@ from ffun.ontology.operations import (
     get_relations_for,
     get_tags_by_ids,
     get_tags_properties,
+    merge_relations_counts_deltas,
     register_relations_processors,
     register_tag,
     remove_relations,
     remove_tags,
     tag_frequency_statistics,
 )
-from ffun.ontology.tests.helpers import assert_has_tags, get_relation_signatures
+from ffun.ontology.tests.helpers import (
+    assert_has_tags,
+    assert_relations_counts_are_actual,
+    get_merged_relations_counts,
+    get_relation_signatures,
+    get_relations_counts,
+)
 from ffun.tags.entities import TagCategory
 
 
@@ -75,6 +84,51 @@ class TestSaveTags:
             }
         )
 
+        await assert_relations_counts_are_actual(three_tags_ids)
+
+    @pytest.mark.asyncio
+    async def test_relations_count(self, cataloged_entry: Entry, three_tags_ids: tuple[TagId, TagId, TagId]) -> None:
+        await _save_tags(execute, cataloged_entry.id, three_tags_ids[:2])  # type: ignore
+
+        # existed relations are not counted twice
+        async with TableSizeDelta("o_relations", delta=1):
+            await _save_tags(execute, cataloged_entry.id, three_tags_ids)
+
+        assert await get_relations_counts(three_tags_ids) == {tag_id: 1 for tag_id in three_tags_ids}
+
+
+class TestMergeRelationsCountsDeltas:
+
+    @pytest.mark.asyncio
+    async def test(
+        self, cataloged_entry: Entry, another_cataloged_entry: Entry, three_tags_ids: tuple[TagId, TagId, TagId]
+    ) -> None:
+        await _save_tags(execute, cataloged_entry.id, three_tags_ids)
+        await _save_tags(execute, another_cataloged_entry.id, three_tags_ids[:1])  # type: ignore
+
+        relation_ids = await get_relations_for(execute, tag_ids=[three_tags_ids[2]])
+
+        await remove_relations(execute, relation_ids)
+
+        while await merge_relations_counts_deltas(execute, limit=1000) > 0:
+            pass
+
+        assert await get_merged_relations_counts(three_tags_ids) == {
+            three_tags_ids[0]: 2,
+            three_tags_ids[1]: 1,
+            three_tags_ids[2]: 0,
+        }
+
+        await assert_relations_counts_are_actual(three_tags_ids)
+
+    @pytest.mark.asyncio
+    async def test_limit(self, cataloged_entry: Entry, three_tags_ids: tuple[TagId, TagId, TagId]) -> None:
+        await _save_tags(execute, cataloged_entry.id, three_tags_ids)
+
+        assert await merge_relations_counts_deltas(execute, limit=1) == 1
+
+        await assert_relations_counts_are_actual(three_tags_ids)
+
 
 class TestRegisterRelationsProcessors:
     @pytest.mark.asyncio
@@ -187,6 +241,8 @@ class TestRemoveRelations:
 
         await assert_has_tags({cataloged_entry.id: set(), another_cataloged_entry.id: set(three_tags_ids)})
 
+        await assert_relations_counts_are_actual(three_tags_ids)
+
         await assert_tags_processors(entry_id=cataloged_entry.id, tag_processors={})
 
         await assert_tags_processors(
@@ -406,6 +462,22 @@ class TestTagFrequencyStatistics:
 
 class TestGetOrphanedTags:
 
+    @pytest.mark.asyncio
+    async def test_orphaned_after_relations_removed(
+        self, fake_processor_id: ProcessorId, cataloged_entry: Entry, three_tags_ids: tuple[TagId, TagId, TagId]
+    ) -> None:
+        await apply_tags(
+            execute, entry_id=cataloged_entry.id, processor_id=fake_processor_id, tag_ids=[three_tags_ids[1]]
+        )
+
+        assert three_tags_ids[1] not in await get_orphaned_tags(execute, limit=1000_000, protected_tags=[])
+
+        relation_ids = await get_relations_for(execute, tag_ids=[three_tags_ids[1]])
+
+        await remove_relations(execute, relation_ids)
+
+        assert three_tags_ids[1] in await get_orphaned_tags(execute, limit=1000_000, protected_tags=[])
+
     @pytest.mark.asyncio
     async def test_no_some_orphans(
         self, fake_processor_id: ProcessorId, cataloged_entry: Entry, three_tags_ids: tuple[TagId, TagId, TagId]
@@ -443,6 +515,18 @@ class TestGetOrphanedTags:
         assert three_tags_ids[1] in orphans
         assert three_tags_ids[2] not in orphans
 
+    @pytest.mark.asyncio
+    async def test_cursor(self, three_tags_ids: tuple[TagId, TagId, TagId]) -> None:
+        tag_ids = sorted(three_tags_ids)
+
+        orphans = await get_orphaned_tags(execute, limit=2, protected_tags=[], after_tag_id=tag_ids[0])
+
+        assert orphans == tag_ids[1:]
+
+        assert await get_orphaned_tags(execute, limit=1, protected_tags=[], after_tag_id=tag_ids[0]) == tag_ids[1:2]
+
+        assert await get_orphaned_tags(execute, limit=2, protected_tags=[], after_tag_id=tag_ids[2]) == []
+
 
 class TestRemoveTags:
 
@@ -752,6 +836,8 @@ class TestCopyRelationsToNewTag:
             (another_cataloged_entry.id, tags[2], None),
         }
 
+        await assert_relations_counts_are_actual(tags)
+
 
 class TestCopyTagProperties:
 
@@ -900,3 +986,130 @@ class TestCopyTagProperties:
         assert len(saved_properties) == 1
 
         assert saved_properties[0] == properties[0].replace(tag_id=tag_ids[2])
+
+
+class TestCopyTagsPropertiesForReplacements:
+
+    @pytest.mark.asyncio
+    async def test_no_replacements(self) -> None:
+        async with TableSizeNotChanged("o_tags_properties"):
+            await copy_tags_properties_for_replacements(execute, [])
+
+    @pytest.mark.asyncio
+    async def test(
+        self,
+        fake_processor_id: ProcessorId,
+        another_fake_processor_id: ProcessorId,
+        five_tags_ids: tuple[TagId, TagId, TagId, TagId, TagId],
+    ) -> None:
+        tag_ids = five_tags_ids
+
+        properties = [
+            TagProperty(
+                tag_id=tag_ids[0],
+                type=TagPropertyType.categories,
+                value=TagCategory.test_raw.name,
+                processor_id=fake_processor_id,
+                created_at=utils.now(),
+            ),
+            TagProperty(
+                tag_id=tag_ids[0],
+                type=TagPropertyType.categories,
+                value=TagCategory.test_final.name,
+                processor_id=another_fake_processor_id,
+                created_at=utils.now(),
+            ),
+            TagProperty(
+                tag_id=tag_ids[1],
+                type=TagPropertyType.link,
+                value="https://example.com",
+                processor_id=fake_processor_id,
+                created_at=utils.now(),
+            ),
+            TagProperty(
+                tag_id=tag_ids[3],
+                type=TagPropertyType.categories,
+                value=TagCategory.test_preserve.name,
+                processor_id=fake_processor_id,
+                created_at=utils.now(),
+            ),
+        ]
+
+        await apply_tags_properties(execute, properties)
+
+        replacements = [
+            TagReplacement(processor_id=fake_processor_id, old_tag_id=tag_ids[0], new_tag_id=tag_ids[2]),
+            TagReplacement(processor_id=fake_processor_id, old_tag_id=tag_ids[0], new_tag_id=tag_ids[3]),
+            TagReplacement(processor_id=fake_processor_id, old_tag_id=tag_ids[1], new_tag_id=tag_ids[4]),
+        ]
+
+        # tags[3] already has categories of the processor => they are not rewritten
+        async with TableSizeDelta("o_tags_properties", delta=2):
+            await copy_tags_properties_for_replacements(execute, replacements)
+
+        saved_properties = await get_tags_properties([tag_ids[2], tag_ids[3], tag_ids[4]])
+
+        assert {
+            (property.tag_id, property.type, property.value, property.processor_id) for property in saved_properties
+        } == {
+            (tag_ids[2], TagPropertyType.categories, TagCategory.test_raw.name, fake_processor_id),
+            (tag_ids[3], TagPropertyType.categories, TagCategory.test_preserve.name, fake_processor_id),
+            (tag_ids[4], TagPropertyType.link, "https://example.com", fake_processor_id),
+        }
+
+
+class TestCopyRelationsForReplacements:
+
+    @pytest.mark.asyncio
+    async def test_no_replacements(self) -> None:
+        async with TableSizeNotChanged("o_relations"), TableSizeNotChanged("o_relations_processors"):
+            await copy_relations_for_replacements(execute, [])
+
+    @pytest.mark.asyncio
+    async def test(  # noqa: CFQ002
+        self,
+        cataloged_entry: Entry,
+        another_cataloged_entry: Entry,
+        fake_processor_id: ProcessorId,
+        another_fake_processor_id: ProcessorId,
+        five_tags_ids: tuple[TagId, TagId, TagId, TagId, TagId],
+    ) -> None:
+        tags = five_tags_ids
+
+        await apply_tags(
+            execute, entry_id=cataloged_entry.id, processor_id=fake_processor_id, tag_ids=[tags[0], tags[2]]
+        )
+        await apply_tags(
+            execute, entry_id=cataloged_entry.id, processor_id=another_fake_processor_id, tag_ids=[tags[1]]
+        )
+        await apply_tags(
+            execute, entry_id=another_cataloged_entry.id, processor_id=fake_processor_id, tag_ids=[tags[0], tags[1]]
+        )
+
+        replacements = [
+            TagReplacement(processor_id=fake_processor_id, old_tag_id=tags[0], new_tag_id=tags[2]),
+            TagReplacement(processor_id=fake_processor_id, old_tag_id=tags[0], new_tag_id=tags[3]),
+            TagReplacement(processor_id=fake_processor_id, old_tag_id=tags[1], new_tag_id=tags[4]),
+        ]
+
+        # 1 new relation for cataloged_entry, 3 new relations for another_cataloged_entry;
+        # the relation of cataloged_entry with tags[2] already exists,
+        # the relation of cataloged_entry with tags[1] is created by another processor => it is not copied
+        async with TableSizeDelta("o_relations", delta=4), TableSizeDelta("o_relations_processors", delta=4):
+            await copy_relations_for_replacements(execute, replacements)
+
+        relation_ids = await get_relations_for(execute, entry_ids=[cataloged_entry.id, another_cataloged_entry.id])
+
+        assert set(await get_relation_signatures(relation_ids)) == {
+            (cataloged_entry.id, tags[0], fake_processor_id),
+            (cataloged_entry.id, tags[1], another_fake_processor_id),
+            (cataloged_entry.id, tags[2], fake_processor_id),
+            (cataloged_entry.id, tags[3], fake_processor_id),
+            (another_cataloged_entry.id, tags[0], fake_processor_id),
+            (another_cataloged_entry.id, tags[1], fake_processor_id),
+            (another_cataloged_entry.id, tags[2], fake_processor_id),
+            (another_cataloged_entry.id, tags[3], fake_processor_id),
+            (another_cataloged_entry.id, tags[4], fake_processor_id),
+        }
+
+        await assert_relations_counts_are_actual(tags)
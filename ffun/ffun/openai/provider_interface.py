@@ -1,18 +1,26 @@
+import bisect
 import contextlib
 import functools
-from typing import Generator, Sequence
+from typing import TYPE_CHECKING, Callable, Generator, Literal, Mapping, Sequence
 
-import openai
-import tiktoken
+import pydantic
 
 from ffun.core import logging
+from ffun.core.clients_cache import ClientsCache
 from ffun.llms_framework import domain as llmsf_domain
 from ffun.llms_framework import errors as llmsf_errors
-from ffun.llms_framework.entities import KeyStatus, LLMConfiguration, LLMProvider, LLMTokens
+from ffun.llms_framework.entities import KeyStatus, LLMBatchId, LLMConfiguration, LLMProvider, LLMTokens
 from ffun.llms_framework.keys_statuses import Statuses
 from ffun.llms_framework.provider_interface import ChatRequest, ChatResponse, ProviderInterface
 from ffun.openai.settings import settings
 
+# openai and tiktoken are imported on the first usage, since their import takes a noticeable part
+# of the start time of every process, even of ones that never make LLM requests
+if TYPE_CHECKING:
+    import openai
+    import tiktoken
+    from openai.types.responses import Response
+
 logger = logging.get_module_logger()
 
 
@@ -21,8 +29,22 @@ class OpenAIChatRequest(ChatRequest):
     user: str
 
 
-def _client(api_key: str) -> openai.AsyncOpenAI:
-    return openai.AsyncOpenAI(api_key=api_key, base_url=settings.api_entry_point, timeout=settings.api_timeout)
+def _client(api_key: str) -> "openai.AsyncOpenAI":
+    import openai
+
+    return openai.AsyncOpenAI(
+        api_key=api_key,
+        base_url=settings.api_entry_point,
+        timeout=settings.api_timeout,
+        http_client=openai.DefaultAsyncHttpxClient(http2=True),
+    )
+
+
+async def _close_client(client: "openai.AsyncOpenAI") -> None:
+    await client.close()
+
+
+_tool_name = "FEEDS_FUN_TAGS_GRAMMAR"  # TODO: move to configs?
 
 
 class OpenAIChatResponse(ChatResponse):
@@ -41,8 +63,142 @@ class OpenAIChatResponse(ChatResponse):
         return self.completion_tokens
 
 
+_batch_endpoint: Literal["/v1/responses"] = "/v1/responses"
+_batch_completion_window: Literal["24h"] = "24h"
+_batch_statuses_in_progress = frozenset({"validating", "in_progress", "finalizing"})
+# expired batches contain results of the requests that were completed before the expiration
+_batch_statuses_with_results = frozenset({"completed", "expired"})
+
+
+class _BatchInputLine(pydantic.BaseModel):
+    custom_id: str
+    method: Literal["POST"] = "POST"
+    url: str = _batch_endpoint
+    body: dict[str, object]
+
+
+class _BatchOutputResponse(pydantic.BaseModel):
+    status_code: int
+    body: dict[str, object]
+
+
+class _BatchOutputLine(pydantic.BaseModel):
+    custom_id: str
+    response: _BatchOutputResponse | None = None
+
+
+def _request_attributes(config: LLMConfiguration, request: OpenAIChatRequest) -> dict[str, object]:  # noqa: CCR001
+    # TODO: if would be nice to specify for each model which parameters are supported
+    #       but for now it is too much work
+    attributes: dict[str, object] = {
+        "store": False,
+        "model": config.model,
+        "max_output_tokens": config.max_return_tokens,
+        "instructions": request.system,
+        "input": request.user,
+    }
+
+    if config.temperature is not None:
+        attributes["temperature"] = float(config.temperature)
+
+    if config.top_p is not None:
+        attributes["top_p"] = float(config.top_p)
+
+    if config.verbosity is not None:
+        if "text" not in attributes:
+            attributes["text"] = {}
+
+        attributes["text"]["verbosity"] = config.verbosity  # type: ignore
+
+    if config.reasoning_effort is not None:
+        if "reasoning" not in attributes:
+            attributes["reasoning"] = {}
+
+        assert isinstance(attributes["reasoning"], dict)
+
+        attributes["reasoning"]["effort"] = config.reasoning_effort
+
+    if config.lark_grammar is not None:
+        attributes["tool_choice"] = {"type": "custom", "name": _tool_name}
+        attributes["tools"] = [
+            {
+                "type": "custom",
+                "name": _tool_name,
+                "description": config.lark_description or "Register tags into Feeds Fun service.",
+                "format": {"type": "grammar", "syntax": "lark", "definition": config.lark_grammar},
+            },
+        ]
+
+    return attributes
+
+
+def _tool_call_content(answer: "Response") -> str | None:
+    for output in answer.output:
+        if output.type == "custom_tool_call":
+            return output.input
+
+    return None
+
+
+def _chat_response(config: LLMConfiguration, answer: "Response") -> OpenAIChatResponse | None:
+    if config.lark_grammar is not None:
+        content = _tool_call_content(answer)
+    else:
+        content = answer.output_text
+
+    if content is None or answer.usage is None:
+        return None
+
+    return OpenAIChatResponse(
+        content=content,
+        prompt_tokens=LLMTokens(answer.usage.input_tokens),
+        completion_tokens=LLMTokens(answer.usage.output_tokens),
+        total_tokens=LLMTokens(answer.usage.total_tokens),
+    )
+
+
+def _parse_batch_output(config: LLMConfiguration, batch_id: LLMBatchId, output: str) -> dict[str, ChatResponse]:
+    from openai.types.responses import Response
+
+    responses: dict[str, ChatResponse] = {}
+
+    records = [_BatchOutputLine.model_validate_json(line) for line in output.splitlines() if line.strip()]
+
+    for record in records:
+
+        if record.response is None or record.response.status_code != 200:
+            logger.info("openai_batch_request_failed", batch_id=batch_id, custom_id=record.custom_id)
+            continue
+
+        response = _chat_response(config, Response.model_validate(record.response.body))
+
+        if response is None:
+            logger.error("openai_batch_no_output", batch_id=batch_id, custom_id=record.custom_id)
+            continue
+
+        responses[record.custom_id] = response
+
+    return responses
+
+
+@contextlib.contextmanager
+def _translate_errors() -> Generator[None, None, None]:
+    import openai
+
+    try:
+        yield
+    except (openai.AuthenticationError, openai.PermissionDeniedError, openai.RateLimitError) as e:
+        message = str(e)
+        logger.info("openai_request_rejected", message=message)
+        raise llmsf_errors.RequestWasRejected(message=message) from e
+    except openai.APIError as e:
+        message = str(e)
+        logger.info("openai_api_error", message=message)
+        raise llmsf_errors.TemporaryError(message=message) from e
+
+
 @functools.cache  # type: ignore
-def _get_encoding(model: str) -> tiktoken.Encoding:
+def _get_encoding(model: str) -> "tiktoken.Encoding":
     """Get tiktoken encoding for a given model.
 
     If you use custom model that is not recognized by tiktoken,
@@ -51,14 +207,33 @@ def _get_encoding(model: str) -> tiktoken.Encoding:
 
     If tiktoken cannot find encoding for the model, we'll use a default encoding `FFUN_OPENAI_FALLBACK_MODEL_ENCODING`.
     """
+    import tiktoken
+
     try:
         return tiktoken.encoding_for_model(model)
     except KeyError:
         return tiktoken.get_encoding(settings.fallback_model_encoding)
 
 
+@functools.cache  # type: ignore
+def _role_tokens(model: str, role: str) -> int:
+    return len(_get_encoding(model).encode(role))
+
+
+@functools.cache  # type: ignore
+def _system_prompt_tokens(config: LLMConfiguration) -> int:
+    """Count tokens of the system prompt.
+
+    The system prompt is the same for all requests of a processor,
+    so we encode it only once per configuration.
+    """
+    return len(_get_encoding(config.model).encode(config.system))
+
+
 @contextlib.contextmanager
 def track_key_status(key: str, statuses: Statuses) -> Generator[None, None, None]:
+    import openai
+
     try:
         yield
         statuses.set(key, KeyStatus.works)
@@ -80,101 +255,141 @@ def track_key_status(key: str, statuses: Statuses) -> Generator[None, None, None
 class OpenAIInterface(ProviderInterface):
     provider = LLMProvider.openai
 
+    supports_batches = True
+
     additional_tokens_per_message: int = 10
+    additional_tokens_per_border: int = 2
 
-    def estimate_tokens(self, config: LLMConfiguration, text: str) -> int:
-        encoding = _get_encoding(config.model)
+    def __init__(self) -> None:
+        super().__init__()
+        self._clients = ClientsCache(
+            name="openai", max_size=settings.api_clients_cache_size, create=_client, close=_close_client
+        )
+
+    async def close(self) -> None:
+        await self._clients.close()
 
+    def _messages_overhead_tokens(self, config: LLMConfiguration) -> int:
+        """Count all tokens of a request except the tokens of the user text."""
         system_tokens = (
-            self.additional_tokens_per_message + len(encoding.encode("system")) + len(encoding.encode(config.system))
+            self.additional_tokens_per_message + _role_tokens(config.model, "system") + _system_prompt_tokens(config)
         )
 
-        text_tokens = self.additional_tokens_per_message + len(encoding.encode("user")) + len(encoding.encode(text))
+        user_tokens = self.additional_tokens_per_message + _role_tokens(config.model, "user")
+
+        return system_tokens + user_tokens
+
+    def estimate_tokens(self, config: LLMConfiguration, text: str) -> int:
+        encoding = _get_encoding(config.model)
+
+        return self._messages_overhead_tokens(config) + len(encoding.encode(text))
+
+    def text_tokens_counter(self, config: LLMConfiguration, text: str) -> Callable[[int, int], int]:
+        encoding = _get_encoding(config.model)
+
+        overhead_tokens = self._messages_overhead_tokens(config)
+
+        _, offsets = encoding.decode_with_offsets(encoding.encode(text))
+
+        text_length = len(text)
+
+        def count(start: int, end: int) -> int:
+            # count tokens which intersect with [start, end)
+            tokens = bisect.bisect_left(offsets, end) - max(0, bisect.bisect_right(offsets, start) - 1)
+
+            # A token cut by a part border can be encoded into more tokens when the part is encoded separately.
+            if start > 0:
+                tokens += self.additional_tokens_per_border
 
-        return system_tokens + text_tokens
+            if end < text_length:
+                tokens += self.additional_tokens_per_border
 
-    async def chat_request(  # noqa: CCR001
+            return overhead_tokens + tokens
+
+        return count
+
+    def cut_text_to_max_tokens(self, config: LLMConfiguration, text: str, max_tokens: LLMTokens) -> str:
+        text_max_tokens = max_tokens - self._messages_overhead_tokens(config)
+
+        if text_max_tokens <= 0:
+            return ""
+
+        encoding = _get_encoding(config.model)
+
+        tokens = encoding.encode(text)
+
+        if len(tokens) <= text_max_tokens:
+            return text
+
+        # the last kept token may contain only a part of a multibyte character => drop incomplete bytes
+        return encoding.decode_bytes(tokens[:text_max_tokens]).decode("utf-8", errors="ignore")
+
+    async def chat_request(
         self, config: LLMConfiguration, api_key: str, request: OpenAIChatRequest  # type: ignore
     ) -> OpenAIChatResponse:
-        try:
-            tool_used = False
-
-            # TODO: if would be nice to specify for each model which parameters are supported
-            #       but for now it is too much work
-            attributes: dict[str, object] = {
-                "store": False,
-                "model": config.model,
-                "max_output_tokens": config.max_return_tokens,
-                "instructions": request.system,
-                "input": request.user,
-            }
-
-            if config.temperature is not None:
-                attributes["temperature"] = float(config.temperature)
-
-            if config.top_p is not None:
-                attributes["top_p"] = float(config.top_p)
-
-            if config.verbosity is not None:
-                if "text" not in attributes:
-                    attributes["text"] = {}
-
-                attributes["text"]["verbosity"] = config.verbosity  # type: ignore
-
-            if config.reasoning_effort is not None:
-                if "reasoning" not in attributes:
-                    attributes["reasoning"] = {}
-
-                assert isinstance(attributes["reasoning"], dict)
-
-                attributes["reasoning"]["effort"] = config.reasoning_effort
-
-            if config.lark_grammar is not None:
-                tool_used = True
-                tool_name = "FEEDS_FUN_TAGS_GRAMMAR"  # TODO: move to configs?
-                attributes["tool_choice"] = {"type": "custom", "name": tool_name}
-                attributes["tools"] = [
-                    {
-                        "type": "custom",
-                        "name": tool_name,
-                        "description": config.lark_description or "Register tags into Feeds Fun service.",
-                        "format": {"type": "grammar", "syntax": "lark", "definition": config.lark_grammar},
-                    },
-                ]
+        attributes = _request_attributes(config, request)
 
+        with _translate_errors():
             with track_key_status(api_key, self.api_keys_statuses):
-                answer = await _client(api_key=api_key).responses.create(**attributes)  # type: ignore
-        except (openai.AuthenticationError, openai.PermissionDeniedError, openai.RateLimitError) as e:
-            message = str(e)
-            logger.info("openai_request_rejected", message=message)
-            raise llmsf_errors.RequestWasRejected(message=message) from e
-        except openai.APIError as e:
-            message = str(e)
-            logger.info("openai_api_error", message=message)
-            raise llmsf_errors.TemporaryError(message=message) from e
+                async with self._clients.use(api_key) as client:
+                    answer = await client.responses.create(**attributes)  # type: ignore
 
         logger.info("openai_response")
 
-        content = None
-
-        if tool_used:
-            for output in answer.output:  # type: ignore
-                if output.type == "custom_tool_call":  # type: ignore
-                    content = output.input  # type: ignore
-                    break
-        else:
-            content = answer.output_text  # type: ignore
+        response = _chat_response(config, answer)  # type: ignore
 
-        if content is None:  # type: ignore
+        if response is None:
             logger.error("openai_no_output", answer=repr(answer))  # type: ignore
             raise llmsf_errors.TemporaryError(message="Could not get output from OpenAI response")
 
-        return OpenAIChatResponse(
-            content=content,  # type: ignore
-            prompt_tokens=answer.usage.input_tokens,  # type: ignore
-            completion_tokens=answer.usage.output_tokens,  # type: ignore
-            total_tokens=answer.usage.total_tokens,  # type: ignore
-        )
+        return response
+
+    async def submit_batch(  # type: ignore
+        self, config: LLMConfiguration, api_key: str, requests: Mapping[str, OpenAIChatRequest]
+    ) -> LLMBatchId:
+        lines = [
+            _BatchInputLine(custom_id=custom_id, body=_request_attributes(config, request)).model_dump_json()
+            for custom_id, request in requests.items()
+        ]
+
+        content = "\n".join(lines).encode("utf-8")
+
+        with _translate_errors():
+            with track_key_status(api_key, self.api_keys_statuses):
+                async with self._clients.use(api_key) as client:
+                    input_file = await client.files.create(file=("batch.jsonl", content), purpose="batch")
+
+                    batch = await client.batches.create(
+                        input_file_id=input_file.id,
+                        endpoint=_batch_endpoint,
+                        completion_window=_batch_completion_window,
+                    )
+
+        logger.info("openai_batch_created", batch_id=batch.id)
+
+        return LLMBatchId(batch.id)
+
+    async def get_batch_results(
+        self, config: LLMConfiguration, api_key: str, batch_id: LLMBatchId
+    ) -> dict[str, ChatResponse] | None:
+        with _translate_errors():
+            with track_key_status(api_key, self.api_keys_statuses):
+                async with self._clients.use(api_key) as client:
+                    batch = await client.batches.retrieve(batch_id)
+
+                    if batch.status in _batch_statuses_in_progress:
+                        return None
+
+                    if batch.status not in _batch_statuses_with_results:
+                        logger.info("openai_batch_failed", batch_id=batch_id, status=batch.status)
+                        raise llmsf_errors.BatchFailed(message=f"batch {batch_id} has status {batch.status}")
+
+                    if batch.output_file_id is None:
+                        output = ""
+                    else:
+                        output = (await client.files.content(batch.output_file_id)).text
+
+        return _parse_batch_output(config, batch_id, output)
 
     def prepare_requests(
         self, config: LLMConfiguration, text: str, text_parts_intersection: int
@@ -197,9 +412,12 @@ class OpenAIInterface(ProviderInterface):
         return requests
 
     async def check_api_key(self, config: LLMConfiguration, api_key: str) -> KeyStatus:
+        import openai
+
         with track_key_status(api_key, self.api_keys_statuses):
             try:
-                await _client(api_key=api_key).models.list()
+                async with self._clients.use(api_key) as client:
+                    await client.models.list()
             except openai.APIError:
                 pass
 
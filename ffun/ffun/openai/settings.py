@@ -11,6 +11,7 @@ class Settings(BaseSettings):
 
     api_entry_point: str | None = None
     api_timeout: float = 60.0
+    api_clients_cache_size: int = 100
 
     fallback_model_encoding: str = "cl100k_base"
 
@@ -1,3 +1,5 @@
+import json
+from decimal import Decimal
 from typing import Type
 from unittest.mock import MagicMock
 
@@ -6,9 +8,27 @@ import pytest
 from pytest_mock import MockerFixture
 
 from ffun.llms_framework import errors
-from ffun.llms_framework.entities import KeyStatus, LLMConfiguration, LLMTokens
+from ffun.llms_framework.domain import split_text_according_to_tokens
+from ffun.llms_framework.entities import (
+    KeyStatus,
+    LLMBatchId,
+    LLMConfiguration,
+    LLMProvider,
+    LLMTokens,
+    ModelInfo,
+    USDCost,
+)
 from ffun.llms_framework.keys_statuses import Statuses
-from ffun.openai.provider_interface import OpenAIChatRequest, OpenAIInterface, track_key_status
+from ffun.llms_framework.provider_interface import ProviderInterface
+from ffun.openai.provider_interface import (
+    OpenAIChatRequest,
+    OpenAIChatResponse,
+    OpenAIInterface,
+    _get_encoding,
+    _parse_batch_output,
+    _request_attributes,
+    track_key_status,
+)
 
 
 class FakeOpenAIResponses:
@@ -22,6 +42,96 @@ class FakeOpenAIResponses:
 class FakeOpenAIClient:
     def __init__(self, error: Exception) -> None:
         self.responses = FakeOpenAIResponses(error)
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _response_body(text: str) -> dict[str, object]:
+    return {
+        "id": "resp_1",
+        "object": "response",
+        "created_at": 1,
+        "model": "test-model",
+        "output": [
+            {
+                "type": "message",
+                "id": "msg_1",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": 10,
+            "output_tokens": 5,
+            "total_tokens": 15,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens_details": {"reasoning_tokens": 0},
+        },
+    }
+
+
+def _batch_output_line(custom_id: str, status_code: int, body: dict[str, object]) -> str:
+    line: dict[str, object] = {
+        "id": "line",
+        "custom_id": custom_id,
+        "response": {"status_code": status_code, "body": body},
+    }
+    return json.dumps(line)
+
+
+class FakeFile:
+    def __init__(self, id: str, text: str) -> None:
+        self.id = id
+        self.text = text
+
+
+class FakeBatch:
+    def __init__(self, id: str, status: str, output_file_id: str | None) -> None:
+        self.id = id
+        self.status = status
+        self.output_file_id = output_file_id
+
+
+class FakeOpenAIFiles:
+    def __init__(self) -> None:
+        self.files: dict[str, FakeFile] = {}
+
+    async def create(self, file: tuple[str, bytes], purpose: str) -> FakeFile:
+        created = FakeFile(id=f"file-{len(self.files)}", text=file[1].decode("utf-8"))
+        self.files[created.id] = created
+        return created
+
+    async def content(self, file_id: str) -> FakeFile:
+        return self.files[file_id]
+
+
+class FakeOpenAIBatches:
+    def __init__(self, status: str, output_file_id: str | None) -> None:
+        self.status = status
+        self.output_file_id = output_file_id
+        self.created: list[dict[str, object]] = []
+
+    async def create(self, **kwargs: object) -> FakeBatch:
+        self.created.append(kwargs)
+        return FakeBatch(id="batch-1", status="validating", output_file_id=None)
+
+    async def retrieve(self, batch_id: str) -> FakeBatch:
+        return FakeBatch(id=batch_id, status=self.status, output_file_id=self.output_file_id)
+
+
+class FakeOpenAIBatchClient:
+    def __init__(self, status: str = "completed", output_file_id: str | None = None) -> None:
+        self.files = FakeOpenAIFiles()
+        self.batches = FakeOpenAIBatches(status=status, output_file_id=output_file_id)
+
+    async def close(self) -> None:
+        pass
 
 
 class TestTrackKeyStatus:
@@ -77,3 +187,249 @@ class TestOpenAIInterface:
                 api_key="test-key",
                 request=OpenAIChatRequest(system="system prompt", user="user prompt"),
             )
+
+    @pytest.mark.asyncio
+    async def test_clients_are_reused(self, mocker: MockerFixture, llm_config: LLMConfiguration) -> None:
+        rejected_error = openai.RateLimitError(message="test-message", response=MagicMock(), body=MagicMock())
+        client = FakeOpenAIClient(rejected_error)
+        create_client = mocker.patch("ffun.openai.provider_interface._client", return_value=client)
+
+        interface = OpenAIInterface()
+
+        for _ in range(3):
+            with pytest.raises(errors.RequestWasRejected):
+                await interface.chat_request(
+                    config=llm_config,
+                    api_key="test-key",
+                    request=OpenAIChatRequest(system="system prompt", user="user prompt"),
+                )
+
+        create_client.assert_called_once_with("test-key")
+
+        assert not client.closed
+
+        await interface.close()
+
+        assert client.closed
+
+    def test_estimate_tokens(self, llm_config: LLMConfiguration) -> None:
+        interface = OpenAIInterface()
+
+        empty_text_tokens = interface.estimate_tokens(llm_config, text="")
+
+        assert empty_text_tokens == interface._messages_overhead_tokens(llm_config)
+        assert interface.estimate_tokens(llm_config, text="some text") > empty_text_tokens
+
+    def test_cut_text_to_max_tokens__text_fits(self, llm_config: LLMConfiguration) -> None:
+        interface = OpenAIInterface()
+
+        text = "some text " * 10
+
+        max_tokens = LLMTokens(interface.estimate_tokens(llm_config, text=text))
+
+        assert interface.cut_text_to_max_tokens(llm_config, text=text, max_tokens=max_tokens) == text
+
+    def test_cut_text_to_max_tokens__no_space_for_text(self, llm_config: LLMConfiguration) -> None:
+        interface = OpenAIInterface()
+
+        max_tokens = LLMTokens(interface._messages_overhead_tokens(llm_config))
+
+        assert interface.cut_text_to_max_tokens(llm_config, text="some text", max_tokens=max_tokens) == ""
+
+    @pytest.mark.parametrize("text", ["some text " * 1000, "тэкст з некалькімі байтамі 🙂 " * 500])
+    @pytest.mark.parametrize("text_tokens", [1, 7, 100, 1001])
+    def test_cut_text_to_max_tokens(self, llm_config: LLMConfiguration, text: str, text_tokens: int) -> None:
+        interface = OpenAIInterface()
+
+        max_tokens = LLMTokens(interface._messages_overhead_tokens(llm_config) + text_tokens)
+
+        cut_text = interface.cut_text_to_max_tokens(llm_config, text=text, max_tokens=max_tokens)
+
+        assert cut_text
+        assert text.startswith(cut_text)
+        assert interface.estimate_tokens(llm_config, text=cut_text) <= max_tokens
+
+    def test_cut_text_to_max_tokens__same_as_generic_implementation(self, llm_config: LLMConfiguration) -> None:
+        interface = OpenAIInterface()
+
+        text = "some text " * 1000
+
+        max_tokens = LLMTokens(interface._messages_overhead_tokens(llm_config) + 117)
+
+        assert interface.cut_text_to_max_tokens(
+            llm_config, text=text, max_tokens=max_tokens
+        ) == ProviderInterface.cut_text_to_max_tokens(interface, llm_config, text=text, max_tokens=max_tokens)
+
+    def test_text_tokens_counter__whole_text(self, llm_config: LLMConfiguration) -> None:
+        interface = OpenAIInterface()
+
+        text = "some text, тэкст 🙂 " * 100
+
+        count = interface.text_tokens_counter(llm_config, text)
+
+        assert count(0, len(text)) == interface.estimate_tokens(llm_config, text=text)
+
+    def test_text_tokens_counter__parts(self, llm_config: LLMConfiguration) -> None:
+        interface = OpenAIInterface()
+
+        text = "some text, тэкст 🙂 " * 100
+
+        count = interface.text_tokens_counter(llm_config, text)
+
+        for start, end in [(0, 10), (1, 10), (17, 131), (500, len(text)), (3, len(text) - 3)]:
+            assert count(start, end) >= interface.estimate_tokens(llm_config, text=text[start:end])
+
+    def test_split_text_according_to_tokens(self, llm_config: LLMConfiguration, mocker: MockerFixture) -> None:
+        interface = OpenAIInterface()
+
+        model = ModelInfo(
+            provider=LLMProvider.openai,
+            name=llm_config.model,
+            max_context_size=LLMTokens(1000),
+            max_return_tokens=LLMTokens(500),
+            input_1m_tokens_cost=USDCost(Decimal("0.3")),
+            output_1m_tokens_cost=USDCost(Decimal("0.7")),
+        )
+
+        mocker.patch.object(interface, "get_model", return_value=model)
+
+        text = "some text, тэкст 🙂 " * 1000
+
+        interface.estimate_tokens(llm_config, text="")  # warm up caches
+
+        encode_spy = mocker.spy(_get_encoding(llm_config.model), "encode")
+
+        parts = split_text_according_to_tokens(
+            llm=interface, llm_config=llm_config, text=text, text_parts_intersection=100
+        )
+
+        encode_spy.assert_called_once_with(text)
+
+        assert len(parts) > 1
+
+        for part in parts:
+            assert interface.estimate_tokens(llm_config, text=part) + llm_config.max_return_tokens < 1000
+
+
+class TestBatches:
+
+    @pytest.fixture  # type: ignore
+    def llm_config(self) -> LLMConfiguration:
+        return LLMConfiguration(
+            model="test-model",
+            system="system prompt",
+            max_return_tokens=LLMTokens(143),
+            temperature=0,
+        )
+
+    @pytest.mark.asyncio
+    async def test_submit_batch(self, mocker: MockerFixture, llm_config: LLMConfiguration) -> None:
+        client = FakeOpenAIBatchClient()
+        mocker.patch("ffun.openai.provider_interface._client", return_value=client)
+
+        interface = OpenAIInterface()
+
+        requests = {
+            "entry-1-0": OpenAIChatRequest(system="system prompt", user="text 1"),
+            "entry-2-0": OpenAIChatRequest(system="system prompt", user="text 2"),
+        }
+
+        batch_id = await interface.submit_batch(llm_config, "api-key", requests)
+
+        assert batch_id == "batch-1"
+
+        assert client.batches.created == [
+            {"input_file_id": "file-0", "endpoint": "/v1/responses", "completion_window": "24h"}
+        ]
+
+        lines: list[object] = [
+            json.loads(line) for line in client.files.files["file-0"].text.splitlines()  # type: ignore
+        ]
+
+        assert lines == [
+            {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/responses",
+                "body": _request_attributes(llm_config, request),
+            }
+            for custom_id, request in requests.items()
+        ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", ["validating", "in_progress", "finalizing"])
+    async def test_get_batch_results__in_progress(
+        self, mocker: MockerFixture, llm_config: LLMConfiguration, status: str
+    ) -> None:
+        mocker.patch("ffun.openai.provider_interface._client", return_value=FakeOpenAIBatchClient(status=status))
+
+        interface = OpenAIInterface()
+
+        assert await interface.get_batch_results(llm_config, "api-key", LLMBatchId("batch-1")) is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", ["failed", "cancelling", "cancelled"])
+    async def test_get_batch_results__failed(
+        self, mocker: MockerFixture, llm_config: LLMConfiguration, status: str
+    ) -> None:
+        mocker.patch("ffun.openai.provider_interface._client", return_value=FakeOpenAIBatchClient(status=status))
+
+        interface = OpenAIInterface()
+
+        with pytest.raises(errors.BatchFailed):
+            await interface.get_batch_results(llm_config, "api-key", LLMBatchId("batch-1"))
+
+    @pytest.mark.asyncio
+    async def test_get_batch_results__completed(self, mocker: MockerFixture, llm_config: LLMConfiguration) -> None:
+        client = FakeOpenAIBatchClient(status="completed", output_file_id="file-0")
+        await client.files.create(
+            file=("output.jsonl", _batch_output_line("entry-1-0", 200, _response_body("@tag-1")).encode("utf-8")),
+            purpose="batch_output",
+        )
+        mocker.patch("ffun.openai.provider_interface._client", return_value=client)
+
+        interface = OpenAIInterface()
+
+        responses = await interface.get_batch_results(llm_config, "api-key", LLMBatchId("batch-1"))
+
+        assert responses == {
+            "entry-1-0": OpenAIChatResponse(
+                content="@tag-1",
+                prompt_tokens=LLMTokens(10),
+                completion_tokens=LLMTokens(5),
+                total_tokens=LLMTokens(15),
+            )
+        }
+
+    @pytest.mark.asyncio
+    async def test_get_batch_results__expired_without_output(
+        self, mocker: MockerFixture, llm_config: LLMConfiguration
+    ) -> None:
+        mocker.patch("ffun.openai.provider_interface._client", return_value=FakeOpenAIBatchClient(status="expired"))
+
+        interface = OpenAIInterface()
+
+        assert await interface.get_batch_results(llm_config, "api-key", LLMBatchId("batch-1")) == {}
+
+    def test_parse_batch_output__skips_failed_requests(self, llm_config: LLMConfiguration) -> None:
+        failed_line: dict[str, object] = {
+            "id": "line",
+            "custom_id": "entry-2-0",
+            "response": None,
+            "error": {"code": "server_error"},
+        }
+
+        output = "\n".join(
+            [
+                _batch_output_line("entry-1-0", 200, _response_body("@tag-1")),
+                json.dumps(failed_line),
+                _batch_output_line("entry-3-0", 500, {"error": "server error"}),
+                "",
+                _batch_output_line("entry-4-0", 200, _response_body("@tag-4")),
+            ]
+        )
+
+        responses = _parse_batch_output(llm_config, LLMBatchId("batch-1"), output)
+
+        assert set(responses) == {"entry-1-0", "entry-4-0"}
+        assert responses["entry-4-0"].response_content() == "@tag-4"
@@ -1,11 +1,9 @@
 import datetime
+import functools
 import io
 import time
 from typing import Iterable, Mapping, Protocol, cast
 
-import feedparser
-from feedparser.sanitizer import _HTMLSanitizer
-
 from ffun.core import logging, utils
 from ffun.domain import urls
 from ffun.domain.entities import AbsoluteUrl, FeedUrl, SourceUid, UnknownUrl
@@ -18,11 +16,6 @@ from ffun.parsers.entities import EntryInfo, FeedInfo
 logger = logging.get_module_logger()
 
 
-# IMPORTANT: For now we sanitize iframes on the frontend side.
-#            Later we'll move purification to the backend (see https://github.com/Tiendil/feeds.fun/issues/514).
-_HTMLSanitizer.acceptable_elements.add("iframe")  # type: ignore[misc]
-
-
 # Known feedparser issues:
 #
 # - Media groups are ignored: https://github.com/kurtmckee/feedparser/issues/195
@@ -400,7 +393,21 @@ class Channel(Protocol):
     version: str
 
 
+# feedparser is imported on the first parsing, since its import is noticeable on the start of every process
+@functools.cache  # type: ignore
+def _configure_feedparser() -> None:
+    from feedparser.sanitizer import _HTMLSanitizer
+
+    # IMPORTANT: For now we sanitize iframes on the frontend side.
+    #            Later we'll move purification to the backend (see https://github.com/Tiendil/feeds.fun/issues/514).
+    _HTMLSanitizer.acceptable_elements.add("iframe")  # type: ignore[misc]
+
+
 def _parse_stream(input_stream: io.IOBase) -> Channel:
+    import feedparser
+
+    _configure_feedparser()
+
     return feedparser.parse(input_stream)  # type: ignore
 
 
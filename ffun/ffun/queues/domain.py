@@ -3,4 +3,5 @@ from ffun.queues import operations
 push = operations.push
 pull = operations.pull
 acknowledge = operations.acknowledge
+acknowledge_in_transaction = operations.acknowledge_in_transaction
 queues_stats = operations.queues_stats
@@ -14,6 +14,8 @@ DEFAULT_SECONDARY_ID = 1
 class QueueKind(enum.IntEnum):
     entries_to_process = 1
     entries_to_tag = 2
+    feeds_to_import = 3
+    benchmarks = 999_999
     test_queue_1 = 1_000_000
     test_queue_2 = 1_000_001
 
@@ -3,7 +3,7 @@ from collections.abc import Sequence
 
 from psycopg.types.json import Jsonb
 
-from ffun.core.postgresql import execute
+from ffun.core.postgresql import ExecuteType, execute
 from ffun.queues.entities import (
     DEFAULT_SECONDARY_ID,
     BaseQueueItem,
@@ -108,6 +108,10 @@ async def pull(
 
 
 async def acknowledge(record_ids: Sequence[QueueRecordId]) -> int:
+    return await acknowledge_in_transaction(execute, record_ids)
+
+
+async def acknowledge_in_transaction(execute: ExecuteType, record_ids: Sequence[QueueRecordId]) -> int:
     if not record_ids:
         return 0
 
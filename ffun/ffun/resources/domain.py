@@ -5,7 +5,7 @@ from ffun.resources import operations
 from ffun.resources.entities import Resource
 
 load_resources = operations.load_resources
-try_to_reserve = operations.try_to_reserve
+reserve_for_least_used = operations.reserve_for_least_used
 convert_reserved_to_used = operations.convert_reserved_to_used
 load_resource_history = operations.load_resource_history
 count_total_resources_per_user = operations.count_total_resources_per_user
@@ -20,77 +20,86 @@ def row_to_entry(row: dict[str, Any]) -> Resource:
     )
 
 
-async def initialize_resource(user_id: UserId, kind: int, interval_started_at: datetime.datetime) -> Resource:
-    sql = """
-        INSERT INTO r_resources (user_id, kind, interval_started_at)
-        VALUES (%(user_id)s, %(kind)s, %(interval_started_at)s)
-        ON CONFLICT (user_id, kind, interval_started_at) DO NOTHING
-    """
-
-    await execute(sql, {"user_id": user_id, "kind": kind, "interval_started_at": interval_started_at})
-
-    sql = """
-    SELECT * FROM r_resources
-    WHERE user_id = %(user_id)s AND kind = %(kind)s AND interval_started_at = %(interval_started_at)s
-    """
-
-    results = await execute(sql, {"user_id": user_id, "kind": kind, "interval_started_at": interval_started_at})
-
-    return row_to_entry(results[0])
-
-
 async def load_resources(
     user_ids: Iterable[UserId], kind: int, interval_started_at: datetime.datetime
 ) -> dict[UserId, Resource]:
+    ids = list(user_ids)
+
     sql = """
         SELECT * FROM r_resources
         WHERE user_id = ANY(%(user_ids)s) AND kind = %(kind)s AND interval_started_at = %(interval_started_at)s
     """
 
-    results = await execute(
-        sql, {"user_ids": list(user_ids), "kind": kind, "interval_started_at": interval_started_at}
-    )
-
-    resources = {}
+    results = await execute(sql, {"user_ids": ids, "kind": kind, "interval_started_at": interval_started_at})
 
-    for row in results:
-        resources[row["user_id"]] = row_to_entry(row)
+    resources = {row["user_id"]: row_to_entry(row) for row in results}
 
-    for user_id in user_ids:
+    # rows are created by reservations => a resource without a row is not used yet
+    for user_id in ids:
         if user_id not in resources:
-            resources[user_id] = await initialize_resource(user_id, kind, interval_started_at)
+            resources[user_id] = Resource(
+                user_id=user_id, kind=kind, interval_started_at=interval_started_at, used=0, reserved=0
+            )
 
     return resources
 
 
-async def try_to_reserve(
-    user_id: UserId, kind: int, interval_started_at: datetime.datetime, amount: int, limit: int
-) -> bool:
-    await initialize_resource(user_id, kind, interval_started_at)
-
-    sql = """
-        UPDATE r_resources
-        SET reserved = reserved + %(amount)s,
+# Picks the least used user among candidates and reserves the amount for them in a single statement.
+# Rows of resources are initialized on the fly, so no separate initialization is required.
+_sql_reserve_for_least_used = """
+    WITH candidates AS (
+        SELECT c.user_id, c.resource_limit
+        FROM unnest(%(user_ids)s::uuid[], %(limits)s::bigint[]) AS c(user_id, resource_limit)
+        LEFT JOIN r_resources AS r
+               ON r.user_id = c.user_id AND
+                  r.kind = %(kind)s AND
+                  r.interval_started_at = %(interval_started_at)s
+        WHERE COALESCE(r.used + r.reserved, 0) + %(amount)s <= c.resource_limit
+        ORDER BY COALESCE(r.used + r.reserved, 0) ASC, c.user_id ASC
+        LIMIT 1
+    ),
+    reserved AS (
+        INSERT INTO r_resources (user_id, kind, interval_started_at, reserved)
+        SELECT user_id, %(kind)s, %(interval_started_at)s, %(amount)s FROM candidates
+        ON CONFLICT (user_id, kind, interval_started_at) DO UPDATE
+        SET reserved = r_resources.reserved + EXCLUDED.reserved,
             updated_at = NOW()
-        WHERE user_id = %(user_id)s AND
-              kind = %(kind)s AND
-              interval_started_at = %(interval_started_at)s AND
-              used + reserved + %(amount)s <= %(limit)s
+        WHERE r_resources.used + r_resources.reserved + EXCLUDED.reserved <= (SELECT resource_limit FROM candidates)
         RETURNING *
-    """
-
-    results = await execute(
-        sql,
-        {
-            "user_id": user_id,
-            "kind": kind,
-            "interval_started_at": interval_started_at,
-            "amount": amount,
-            "limit": limit,
-        },
     )
+    SELECT candidates.user_id AS candidate_id, reserved.*
+    FROM candidates
+    LEFT JOIN reserved ON TRUE
+"""
+
+
+async def reserve_for_least_used(
+    limits: dict[UserId, int], kind: int, interval_started_at: datetime.datetime, amount: int
+) -> Resource | None:
+    user_ids = list(limits)
+
+    arguments = {
+        "user_ids": user_ids,
+        "limits": [limits[user_id] for user_id in user_ids],
+        "kind": kind,
+        "interval_started_at": interval_started_at,
+        "amount": amount,
+    }
+
+    # the chosen user can be overused by a concurrent reservation between choosing and updating
+    # => choose again, each attempt sees fresh resources
+    for _ in range(len(user_ids)):
+        results = await execute(_sql_reserve_for_least_used, arguments)
+
+        if not results:
+            return None
+
+        if results[0]["user_id"] is not None:
+            return row_to_entry(results[0])
+
+        logger.info("resource_reservation_conflict", user_id=results[0]["candidate_id"], kind=kind)
 
-    return len(results) > 0
+    return None
 
 
 async def convert_reserved_to_used(
@@ -1,6 +1,7 @@
 import datetime
 
 import pytest
+from pytest_mock import MockerFixture
 
 from ffun.core.tests.helpers import TableSizeDelta, TableSizeNotChanged
 from ffun.domain.datetime_intervals import month_interval_start
@@ -10,10 +11,9 @@ from ffun.resources.domain import load_resource
 from ffun.resources.operations import (
     convert_reserved_to_used,
     count_total_resources_per_user,
-    initialize_resource,
     load_resource_history,
     load_resources,
-    try_to_reserve,
+    reserve_for_least_used,
 )
 
 
@@ -26,65 +26,20 @@ _kind = 214
 _another_kind = 215
 
 
-class TestInitializeResource:
-    @pytest.mark.asyncio
-    async def test_new_record(self, internal_user_id: UserId, interval_started_at: datetime.datetime) -> None:
-        async with TableSizeDelta("r_resources", delta=1):
-            resource = await initialize_resource(
-                user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at
-            )
-
-        assert resource.user_id == internal_user_id
-        assert resource.kind == _kind
-        assert resource.interval_started_at == interval_started_at
-        assert resource.used == 0
-        assert resource.reserved == 0
-
-        async with TableSizeNotChanged("r_resources"):
-            loaded_resource = await load_resource(
-                user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at
-            )
-
-        assert loaded_resource == resource
-
-    @pytest.mark.asyncio
-    async def test_do_not_reinitialized_if_exists(
-        self, internal_user_id: UserId, interval_started_at: datetime.datetime
-    ) -> None:
-        await initialize_resource(user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at)
-
-        await try_to_reserve(
-            user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at, amount=1, limit=100
-        )
-
-        async with TableSizeNotChanged("r_resources"):
-            resource = await initialize_resource(
-                user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at
-            )
-
-        assert resource.reserved == 1
-
-        loaded_resource = await load_resource(
-            user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at
-        )
-
-        assert loaded_resource == resource
-
-
 class TestLoadResources:
-    """Most functionality are tested in other classes."""
+    @pytest.mark.asyncio
+    async def test_no_users(self, interval_started_at: datetime.datetime) -> None:
+        assert await load_resources([], kind=_kind, interval_started_at=interval_started_at) == {}
 
     @pytest.mark.asyncio
-    async def test_initialize_if_not_found(
+    async def test_not_existed_resources_are_not_created(
         self, internal_user_id: UserId, another_internal_user_id: UserId, interval_started_at: datetime.datetime
     ) -> None:
-        await initialize_resource(user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at)
-
-        await try_to_reserve(
-            user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at, amount=13, limit=100
+        await reserve_for_least_used(
+            limits={internal_user_id: 100}, kind=_kind, interval_started_at=interval_started_at, amount=13
         )
 
-        async with TableSizeDelta("r_resources", delta=1):
+        async with TableSizeNotChanged("r_resources"):
             resources = await load_resources(
                 user_ids=[internal_user_id, another_internal_user_id],
                 kind=_kind,
@@ -110,49 +65,104 @@ class TestLoadResources:
         assert resource_2.reserved == 0
 
 
-class TestTryToReserve:
-    @pytest.mark.parametrize("amount", [0, 1, 100])
+class TestReserveForLeastUsed:
     @pytest.mark.asyncio
-    async def test_for_not_existed_resource(
-        self, amount: int, internal_user_id: UserId, interval_started_at: datetime.datetime
-    ) -> None:
-        result = await try_to_reserve(
-            user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at, amount=amount, limit=100
-        )
+    async def test_no_candidates(self, interval_started_at: datetime.datetime) -> None:
+        assert await reserve_for_least_used({}, kind=_kind, interval_started_at=interval_started_at, amount=1) is None
 
-        assert result
+    @pytest.mark.asyncio
+    async def test_not_existed_resources(
+        self, five_internal_user_ids: list[UserId], interval_started_at: datetime.datetime
+    ) -> None:
+        limits = {user_id: 100 for user_id in five_internal_user_ids}
 
-        resource = await load_resource(user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at)
+        async with TableSizeDelta("r_resources", delta=1):
+            resource = await reserve_for_least_used(
+                limits, kind=_kind, interval_started_at=interval_started_at, amount=13
+            )
 
+        assert resource is not None
+        assert resource.user_id == min(five_internal_user_ids)
+        assert resource.kind == _kind
+        assert resource.interval_started_at == interval_started_at
         assert resource.used == 0
-        assert resource.reserved == amount
+        assert resource.reserved == 13
 
     @pytest.mark.asyncio
-    async def test_for_existed_resource(
-        self, internal_user_id: UserId, interval_started_at: datetime.datetime
+    async def test_least_used_chosen(
+        self, five_internal_user_ids: list[UserId], interval_started_at: datetime.datetime
     ) -> None:
-        result = await try_to_reserve(
-            user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at, amount=1, limit=100
-        )
+        for i, user_id in enumerate(five_internal_user_ids):
+            await reserve_for_least_used(
+                limits={user_id: 100},
+                kind=_kind,
+                interval_started_at=interval_started_at,
+                amount=10 + i,
+            )
+
+        limits = {user_id: 100 for user_id in five_internal_user_ids[1:]}
+
+        resource = await reserve_for_least_used(limits, kind=_kind, interval_started_at=interval_started_at, amount=5)
 
-        result = await try_to_reserve(
-            user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at, amount=13, limit=100
+        assert resource is not None
+        assert resource.user_id == five_internal_user_ids[1]
+        assert resource.reserved == 16
+
+        resource = await load_resource(
+            user_id=five_internal_user_ids[0], kind=_kind, interval_started_at=interval_started_at
         )
 
-        assert result
+        assert resource.reserved == 10
 
-        resource = await load_resource(user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at)
+    @pytest.mark.asyncio
+    async def test_limits_respected(
+        self, five_internal_user_ids: list[UserId], interval_started_at: datetime.datetime
+    ) -> None:
+        for user_id in five_internal_user_ids[:2]:
+            await reserve_for_least_used(
+                limits={user_id: 100},
+                kind=_kind,
+                interval_started_at=interval_started_at,
+                amount=10,
+            )
 
-        assert resource.used == 0
-        assert resource.reserved == 14
+        limits = {
+            five_internal_user_ids[0]: 14,
+            five_internal_user_ids[1]: 15,
+            five_internal_user_ids[2]: 4,
+        }
+
+        resource = await reserve_for_least_used(limits, kind=_kind, interval_started_at=interval_started_at, amount=5)
+
+        assert resource is not None
+        assert resource.user_id == five_internal_user_ids[1]
+        assert resource.reserved == 15
+
+        assert (
+            await reserve_for_least_used(limits, kind=_kind, interval_started_at=interval_started_at, amount=5) is None
+        )
 
     @pytest.mark.asyncio
-    async def test_not_enough(self, internal_user_id: UserId, interval_started_at: datetime.datetime) -> None:
-        result = await try_to_reserve(
-            user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at, amount=101, limit=100
+    async def test_concurrent_reservation(
+        self, five_internal_user_ids: list[UserId], interval_started_at: datetime.datetime, mocker: MockerFixture
+    ) -> None:
+        from ffun.resources import operations
+
+        user_id = five_internal_user_ids[0]
+
+        rows: list[dict[str, object]] = [{"candidate_id": user_id, "user_id": None}]
+
+        execute = mocker.patch.object(operations, "execute", return_value=rows)
+
+        resource = await reserve_for_least_used(
+            {user_id: 100, five_internal_user_ids[1]: 100},
+            kind=_kind,
+            interval_started_at=interval_started_at,
+            amount=5,
         )
 
-        assert not result
+        assert resource is None
+        assert execute.call_count == 2
 
 
 class TestConvertReservedToUsed:
@@ -171,8 +181,11 @@ class TestConvertReservedToUsed:
         expected_reserved: int,
         expected_used: int,
     ) -> None:
-        await try_to_reserve(
-            user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at, amount=reserved, limit=100
+        await reserve_for_least_used(
+            limits={internal_user_id: 100},
+            kind=_kind,
+            interval_started_at=interval_started_at,
+            amount=reserved,
         )
 
         await convert_reserved_to_used(
@@ -190,8 +203,11 @@ class TestConvertReservedToUsed:
 
     @pytest.mark.asyncio
     async def test_not_enough(self, internal_user_id: UserId, interval_started_at: datetime.datetime) -> None:
-        await try_to_reserve(
-            user_id=internal_user_id, kind=_kind, interval_started_at=interval_started_at, amount=13, limit=100
+        await reserve_for_least_used(
+            limits={internal_user_id: 100},
+            kind=_kind,
+            interval_started_at=interval_started_at,
+            amount=13,
         )
 
         with pytest.raises(errors.CanNotConvertReservedToUsed):
@@ -220,20 +236,32 @@ class TestLoadResourceHistory:
         internal_2 = datetime.datetime(2020, 2, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
         internal_3 = datetime.datetime(2020, 3, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
 
-        await try_to_reserve(
-            user_id=internal_user_id, kind=_kind, interval_started_at=internal_1, amount=13, limit=100
+        await reserve_for_least_used(
+            limits={internal_user_id: 100},
+            kind=_kind,
+            interval_started_at=internal_1,
+            amount=13,
         )
 
-        await try_to_reserve(
-            user_id=internal_user_id, kind=_kind, interval_started_at=internal_3, amount=14, limit=100
+        await reserve_for_least_used(
+            limits={internal_user_id: 100},
+            kind=_kind,
+            interval_started_at=internal_3,
+            amount=14,
         )
 
-        await try_to_reserve(
-            user_id=another_internal_user_id, kind=_kind, interval_started_at=internal_2, amount=15, limit=100
+        await reserve_for_least_used(
+            limits={another_internal_user_id: 100},
+            kind=_kind,
+            interval_started_at=internal_2,
+            amount=15,
         )
 
-        await try_to_reserve(
-            user_id=internal_user_id, kind=_another_kind, interval_started_at=internal_3, amount=16, limit=100
+        await reserve_for_least_used(
+            limits={internal_user_id: 100},
+            kind=_another_kind,
+            interval_started_at=internal_3,
+            amount=16,
         )
 
         history = await load_resource_history(user_id=internal_user_id, kind=_kind)
@@ -261,12 +289,11 @@ class TestCountTotalResourcesPerUser:
 
     @pytest.mark.asyncio
     async def test(self, internal_user_id: UserId, another_internal_user_id: UserId) -> None:
-        await try_to_reserve(
-            user_id=internal_user_id,
+        await reserve_for_least_used(
+            limits={internal_user_id: 100},
             kind=_kind,
             interval_started_at=datetime.datetime(2020, 1, 1, 0, 0, 0, tzinfo=datetime.timezone.utc),
             amount=13,
-            limit=100,
         )
         await convert_reserved_to_used(
             user_id=internal_user_id,
@@ -276,12 +303,11 @@ class TestCountTotalResourcesPerUser:
             used=10,
         )
 
-        await try_to_reserve(
-            user_id=internal_user_id,
+        await reserve_for_least_used(
+            limits={internal_user_id: 100},
             kind=_kind,
             interval_started_at=datetime.datetime(2020, 3, 1, 0, 0, 0, tzinfo=datetime.timezone.utc),
             amount=14,
-            limit=100,
         )
         await convert_reserved_to_used(
             user_id=internal_user_id,
@@ -291,12 +317,11 @@ class TestCountTotalResourcesPerUser:
             used=14,
         )
 
-        await try_to_reserve(
-            user_id=internal_user_id,
+        await reserve_for_least_used(
+            limits={internal_user_id: 100},
             kind=_another_kind,
             interval_started_at=datetime.datetime(2020, 3, 1, 0, 0, 0, tzinfo=datetime.timezone.utc),
             amount=6,
-            limit=100,
         )
         await convert_reserved_to_used(
             user_id=internal_user_id,
@@ -306,12 +331,11 @@ class TestCountTotalResourcesPerUser:
             used=6,
         )
 
-        await try_to_reserve(
-            user_id=another_internal_user_id,
+        await reserve_for_least_used(
+            limits={another_internal_user_id: 100},
             kind=_kind,
             interval_started_at=datetime.datetime(2020, 2, 1, 0, 0, 0, tzinfo=datetime.timezone.utc),
             amount=15,
-            limit=100,
         )
         await convert_reserved_to_used(
             user_id=another_internal_user_id,
@@ -321,12 +345,11 @@ class TestCountTotalResourcesPerUser:
             used=14,
         )
 
-        await try_to_reserve(
-            user_id=another_internal_user_id,
+        await reserve_for_least_used(
+            limits={another_internal_user_id: 100},
             kind=_another_kind,
             interval_started_at=datetime.datetime(2020, 2, 1, 0, 0, 0, tzinfo=datetime.timezone.utc),
             amount=6,
-            limit=100,
         )
         await convert_reserved_to_used(
             user_id=another_internal_user_id,
@@ -63,6 +63,39 @@ async def clone_rules_for_replacements(execute: ExecuteType, replacements: dict[
         )
 
 
+@run_in_transaction
+async def clone_rules_for_replacement_pairs(execute: ExecuteType, pairs: Iterable[tuple[TagId, TagId]]) -> None:
+    """Clone rules for each (old tag, new tag) pair independently.
+
+    Unlike `clone_rules_for_replacements`, an old tag may have multiple new tags,
+    and every pair produces its own copy of each affected rule.
+    Rules are loaded once for all pairs.
+    """
+    unique_pairs = sorted(set(pairs))
+
+    if not unique_pairs:
+        return
+
+    rules = await operations.get_rules_for(execute, tag_ids=list({old_tag_id for old_tag_id, _ in unique_pairs}))
+
+    rules_by_tag: dict[TagId, list[entities.Rule]] = {}
+
+    for rule in rules:
+        for tag_id in rule.required_tags | rule.excluded_tags:
+            rules_by_tag.setdefault(tag_id, []).append(rule)
+
+    for old_tag_id, new_tag_id in unique_pairs:
+        for rule in rules_by_tag.get(old_tag_id, []):
+            new_required_tags, new_excluded_tags = rule.replace_tags({old_tag_id: new_tag_id})
+
+            await operations.create_or_update_rule(
+                user_id=rule.user_id,
+                required_tags=new_required_tags,
+                excluded_tags=new_excluded_tags,
+                score=rule.score,
+            )
+
+
 @run_in_transaction
 async def remove_rules_with_tags(execute: ExecuteType, tag_ids: list[TagId]) -> None:
     if not tag_ids:
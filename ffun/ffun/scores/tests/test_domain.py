@@ -171,6 +171,46 @@ class TestCloneRulesForeReplacements:
         rules_2[3].soft_compare(another_internal_user_id, {tag_3}, {tag_2}, 5)
 
 
+class TestCloneRulesForReplacementPairs:
+
+    @pytest.mark.asyncio
+    async def test_no_pairs(self, internal_user_id: UserId, three_tags_ids: tuple[TagId, TagId, TagId]) -> None:
+        await domain.create_or_update_rule(
+            internal_user_id, required_tags={three_tags_ids[0]}, excluded_tags=set(), score=2
+        )
+
+        async with TableSizeNotChanged("s_rules"):
+            await domain.clone_rules_for_replacement_pairs([])
+
+    @pytest.mark.asyncio
+    async def test_clone_rules(
+        self, internal_user_id: UserId, five_tags_ids: tuple[TagId, TagId, TagId, TagId, TagId]
+    ) -> None:
+        tag_1, tag_2, tag_3, tag_4, tag_5 = five_tags_ids
+
+        await domain.create_or_update_rule(internal_user_id, required_tags={tag_1}, excluded_tags={tag_5}, score=1)
+        await domain.create_or_update_rule(internal_user_id, required_tags={tag_2}, excluded_tags=set(), score=2)
+        await domain.create_or_update_rule(internal_user_id, required_tags={tag_4}, excluded_tags=set(), score=3)
+
+        # each pair is applied independently, duplicated pairs are ignored
+        async with TableSizeDelta("s_rules", delta=4):
+            await domain.clone_rules_for_replacement_pairs(
+                [(tag_1, tag_3), (tag_1, tag_4), (tag_5, tag_3), (tag_2, tag_3), (tag_1, tag_3)]
+            )
+
+        rules = await domain.get_rules_for_user(internal_user_id)
+
+        assert {(frozenset(rule.required_tags), frozenset(rule.excluded_tags), rule.score) for rule in rules} == {
+            (frozenset({tag_1}), frozenset({tag_5}), 1),
+            (frozenset({tag_3}), frozenset({tag_5}), 1),
+            (frozenset({tag_4}), frozenset({tag_5}), 1),
+            (frozenset({tag_1}), frozenset({tag_3}), 1),
+            (frozenset({tag_2}), frozenset(), 2),
+            (frozenset({tag_3}), frozenset(), 2),
+            (frozenset({tag_4}), frozenset(), 3),
+        }
+
+
 class TestRemoveRulesWithTags:
 
     @pytest.mark.asyncio
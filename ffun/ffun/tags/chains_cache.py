@@ -0,0 +1,140 @@
+import collections
+import json
+import os
+import pathlib
+
+from ffun.core import logging, metrics
+from ffun.domain.entities import TagUid
+from ffun.tags.entities import TagCategory
+from ffun.tags.settings import settings
+
+logger = logging.get_module_logger()
+
+
+ChainKey = tuple[TagUid, frozenset[TagCategory]]
+ChainResult = tuple[tuple[TagUid, frozenset[TagCategory]], ...]
+
+# format of a chain's tag in the persisted cache
+RawChainTag = tuple[str, list[str]]
+
+
+def _categories(raw_categories: list[str]) -> frozenset[TagCategory]:
+    return frozenset(TagCategory(category) for category in raw_categories)
+
+
+def _result(raw_result: list[RawChainTag]) -> ChainResult:
+    return tuple((TagUid(uid), _categories(categories)) for uid, categories in raw_result)
+
+
+class ChainsCache:
+    """LRU cache of the whole normalization chains.
+
+    Maps a prepared root tag (uid + categories) to the final tags (uid + categories) produced by the normalizers
+    chain for it. Links are not cached, since normalizers copy links of the source tags.
+
+    The cache is bound to the version of the normalizers configuration:
+    records with a different version are never loaded.
+
+    Hits are measured once per lookup of a chain, not per normalizer of the chain.
+    """
+
+    __slots__ = ("version", "_max_size", "_chains", "metric_hits")
+
+    def __init__(self, version: str, max_size: int) -> None:
+        self.version = version
+        self._max_size = max_size
+        self._chains: collections.OrderedDict[ChainKey, ChainResult] = collections.OrderedDict()
+
+        self.metric_hits = metrics.Accumulator(
+            interval=settings.metric_accumulation_interval, event="tags_chains_cache_hits"
+        )
+
+    def __len__(self) -> int:
+        return len(self._chains)
+
+    def __contains__(self, key: ChainKey) -> bool:
+        return key in self._chains
+
+    def get(self, key: ChainKey) -> ChainResult | None:
+        result = self._chains.get(key)
+
+        if result is not None:
+            self._chains.move_to_end(key)
+
+        self.metric_hits.measure(0 if result is None else 1)
+        self.metric_hits.flush_if_time()
+
+        return result
+
+    def set(self, key: ChainKey, result: ChainResult) -> None:
+        if self._max_size <= 0:
+            return
+
+        self._chains[key] = result
+        self._chains.move_to_end(key)
+
+        while len(self._chains) > self._max_size:
+            self._chains.popitem(last=False)
+
+    def clear(self) -> None:
+        self._chains.clear()
+
+    def dump(self, path: pathlib.Path) -> None:
+        chains = [
+            [
+                uid,
+                sorted(categories),
+                [[result_uid, sorted(result_categories)] for result_uid, result_categories in result],
+            ]
+            for (uid, categories), result in self._chains.items()
+        ]
+
+        data: dict[str, object] = {"version": self.version, "chains": chains}
+
+        # a process may be killed while writing => never leave a partially written file
+        temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+        try:
+            temporary_path.write_text(json.dumps(data))
+            os.replace(temporary_path, path)
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
+        logger.info("tags_chains_cache_dumped", records=len(chains))
+
+    def _load_chains(self, path: pathlib.Path) -> list[tuple[ChainKey, ChainResult]] | None:
+        data = json.loads(path.read_text())  # type: ignore
+
+        if data["version"] != self.version:  # type: ignore
+            logger.info("tags_chains_cache_version_changed")
+            return None
+
+        chains: list[tuple[ChainKey, ChainResult]] = []
+
+        for uid, categories, result in data["chains"]:  # type: ignore
+            chains.append(((TagUid(uid), _categories(categories)), _result(result)))  # type: ignore
+
+        return chains
+
+    def load(self, path: pathlib.Path) -> None:
+        if not path.exists():
+            logger.info("tags_chains_cache_file_not_found")
+            return
+
+        # the cache is only an optimization => start with an empty one instead of failing the process start
+        try:
+            chains = self._load_chains(path)
+        except Exception:
+            logger.exception("tags_chains_cache_file_is_broken")
+            return
+
+        if chains is None:
+            return
+
+        for key, result in chains:
+            self.set(key, result)
+
+        logger.info("tags_chains_cache_loaded", records=len(self._chains))
+
+
+chains_cache = ChainsCache(version=settings.tag_normalizers_version, max_size=settings.chains_cache_size)
@@ -1,9 +1,11 @@
-from typing import Iterable
+from typing import Iterable, Sequence
 
+from ffun.domain.entities import TagUid
 from ffun.ontology.entities import NormalizedTag, RawTag
 from ffun.tags import converters, utils
+from ffun.tags.chains_cache import ChainKey, ChainsCache, chains_cache
 from ffun.tags.entities import NormalizationMode, TagCategory, TagInNormalization
-from ffun.tags.normalizers import NormalizerInfo, normalizers
+from ffun.tags.normalizers import NormalizerInfo, get_normalizers
 
 
 # Here is going some complicated unclear logic:
@@ -80,9 +82,6 @@ def prepare_for_normalization(tag: RawTag) -> TagInNormalization:
     )
 
 
-# TODO: we may want to cache chain of tags, to skip the whole normalizers operations
-#       i.e. remember once that at the end tag @a-b-c produces tags @a-b, @a-c, @b-c and skip the whole
-#       normalizers chain.
 async def apply_normalizers(normalizers_: list[NormalizerInfo], tag: TagInNormalization) -> tuple[bool, list[RawTag]]:
 
     if tag.mode == NormalizationMode.final:
@@ -101,20 +100,13 @@ async def apply_normalizers(normalizers_: list[NormalizerInfo], tag: TagInNormal
     return (True, all_new_tags)
 
 
-# Note: we should keep calls of prepare_for_normalization(...) in a single place, either here or in apply_normalizers
-#       since we control duplicates by comparing normalized uids
-#       we should keep calls to prepare_for_normalization(...) in the normalize(...) function
-async def normalize(  # noqa: CCR001
-    raw_tags: Iterable[RawTag], normalizers_: list[NormalizerInfo] | None = None
-) -> list[NormalizedTag]:
-
-    if normalizers_ is None:
-        normalizers_ = normalizers
-
-    tags_to_process = {tag.uid: tag for tag in [prepare_for_normalization(raw_tag) for raw_tag in raw_tags]}
+async def _normalize_chain(  # noqa: CCR001
+    normalizers_: list[NormalizerInfo], root: TagInNormalization
+) -> list[TagInNormalization]:
+    tags_to_process = {root.uid: root}
 
     processed_tags = set()
-    normalized_tags = []
+    valid_tags = []
 
     tag: TagInNormalization | None
 
@@ -138,15 +130,76 @@ async def normalize(  # noqa: CCR001
             # We protecting against it by running normalization from scratch for each new tag.
             tags_to_process[new_tag.uid] = new_tag
 
-        if not tag_valid:
-            continue
+        if tag_valid:
+            valid_tags.append(tag)
+
+    return valid_tags
+
+
+def _chain_key(root: TagInNormalization) -> ChainKey:
+    return (root.uid, frozenset(root.categories))
+
+
+def _chain_is_cached(cache: ChainsCache | None, root: TagInNormalization) -> bool:
+    return cache is not None and root.mode != NormalizationMode.final and _chain_key(root) in cache
+
+
+async def _warm_up_normalizers(normalizers_: list[NormalizerInfo], roots: Sequence[TagInNormalization]) -> None:
+    # final tags are not processed by normalizers
+    roots_to_process = [root for root in roots if root.mode != NormalizationMode.final]
+
+    if not roots_to_process:
+        return
+
+    for info in normalizers_:
+        await info.warm_up(roots_to_process)
+
+
+# The result of a chain depends only on the root tag uid & categories (normalizers copy links of source tags)
+# => we can remember it once, i.e. that tag @a-b-c produces tags @a-b, @a-c, @b-c, and skip the whole chain later.
+async def _normalize_root(
+    normalizers_: list[NormalizerInfo], cache: ChainsCache | None, root: TagInNormalization
+) -> list[NormalizedTag]:
+
+    if cache is None or root.mode == NormalizationMode.final:
+        return [
+            NormalizedTag(uid=tag.uid, link=tag.link, categories=tag.categories)
+            for tag in await _normalize_chain(normalizers_, root)
+        ]
+
+    key = _chain_key(root)
+
+    result = cache.get(key)
+
+    if result is None:
+        result = tuple((tag.uid, frozenset(tag.categories)) for tag in await _normalize_chain(normalizers_, root))
+        cache.set(key, result)
+
+    return [NormalizedTag(uid=uid, link=root.link, categories=set(categories)) for uid, categories in result]
+
+
+# Note: we should keep calls of prepare_for_normalization(...) in a single place, either here or in apply_normalizers
+#       since we control duplicates by comparing normalized uids
+#       we should keep calls to prepare_for_normalization(...) in the normalize(...) function
+async def normalize(
+    raw_tags: Iterable[RawTag], normalizers_: list[NormalizerInfo] | None = None, cache: ChainsCache | None = None
+) -> list[NormalizedTag]:
+
+    if normalizers_ is None:
+        # the default cache is bound to the default normalizers
+        normalizers_ = get_normalizers()
+        cache = chains_cache if cache is None else cache
+
+    roots = {tag.uid: tag for tag in [prepare_for_normalization(raw_tag) for raw_tag in raw_tags]}
+
+    # all tags of an entry are prepared at once, for example, the form normalizer calculates cosines
+    # of all their words by a single matrix product
+    await _warm_up_normalizers(normalizers_, [root for root in roots.values() if not _chain_is_cached(cache, root)])
 
-        normalized_tag = NormalizedTag(
-            uid=tag.uid,
-            link=tag.link,
-            categories=tag.categories,
-        )
+    normalized_tags: dict[TagUid, NormalizedTag] = {}
 
-        normalized_tags.append(normalized_tag)
+    for root in roots.values():
+        for tag in await _normalize_root(normalizers_, cache, root):
+            normalized_tags.setdefault(tag.uid, tag)
 
-    return normalized_tags
+    return list(normalized_tags.values())
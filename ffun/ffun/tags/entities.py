@@ -1,4 +1,5 @@
 import enum
+import pathlib
 from typing import Annotated, Literal
 
 import pydantic
@@ -90,6 +91,7 @@ class FormNormalizer(BaseNormalizer):
     spacy_model: str
     cos_cache_size: int
     forms_cache_size: int
+    vectors_artifact: pathlib.Path | None = None
 
 
 TagNormalizer = Annotated[
@@ -7,3 +7,11 @@ class Error(errors.Error):
 
 class TagPartIsEmpty(Error):
     pass
+
+
+class VectorsArtifactModelMismatch(Error):
+    pass
+
+
+class VectorsArtifactVersionMismatch(Error):
+    pass
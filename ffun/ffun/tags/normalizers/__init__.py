@@ -1,50 +1,65 @@
+import functools
+
 from ffun.core import logging
-from ffun.tags.entities import NormalizerType
-from ffun.tags.normalizers import form_normalizer, part_blacklist, part_replacer, splitter
+from ffun.tags.entities import NormalizerType, TagNormalizer
+from ffun.tags.normalizers import part_blacklist, part_replacer, splitter
 from ffun.tags.normalizers.base import FakeNormalizer, Normalizer, NormalizerAlwaysError, NormalizerInfo
 from ffun.tags.settings import settings
 
 logger = logging.get_module_logger()
 
 
-normalizers: list[NormalizerInfo] = []
-
+def _create_normalizer(normalizer_config: TagNormalizer) -> Normalizer:
+    if normalizer_config.type == NormalizerType.part_blacklist:
+        return part_blacklist.Normalizer(blacklist=normalizer_config.blacklist)
 
-for normalizer_config in settings.tag_normalizers:
-    if not normalizer_config.enabled:
-        logger.info(
-            "tag_normalizer_is_disabled",
-            normalizer_id=normalizer_config.id,
-            normalizer_name=normalizer_config.name,
-        )
-        continue
+    if normalizer_config.type == NormalizerType.part_replacer:
+        return part_replacer.Normalizer(replacements=normalizer_config.replacements)
 
-    logger.info("add_tag_normalizer", normalizer_id=normalizer_config.id, normalizer_name=normalizer_config.name)
+    if normalizer_config.type == NormalizerType.splitter:
+        return splitter.Normalizer(separators=list(normalizer_config.separators))
 
-    normalizer: Normalizer
+    if normalizer_config.type == NormalizerType.form_normalizer:
+        # SpaCy and lemminflect take most of the import time of the whole application
+        # => we import them only when the normalizer is really used
+        from ffun.tags.normalizers import form_normalizer
 
-    if normalizer_config.type == NormalizerType.part_blacklist:
-        normalizer = part_blacklist.Normalizer(blacklist=normalizer_config.blacklist)
-    elif normalizer_config.type == NormalizerType.part_replacer:
-        normalizer = part_replacer.Normalizer(replacements=normalizer_config.replacements)
-    elif normalizer_config.type == NormalizerType.splitter:
-        normalizer = splitter.Normalizer(separators=list(normalizer_config.separators))
-    elif normalizer_config.type == NormalizerType.form_normalizer:
-        normalizer = form_normalizer.Normalizer(
+        return form_normalizer.Normalizer(
             model=normalizer_config.spacy_model,
             cos_cache_size=normalizer_config.cos_cache_size,
             forms_cache_size=normalizer_config.forms_cache_size,
+            vectors_artifact=normalizer_config.vectors_artifact,
+        )
+
+    raise NotImplementedError(f"Unknown normalizer type: {normalizer_config.type}")
+
+
+# Normalizers are created on the first access, so modules that only import this one
+# (CLI commands, API) do not pay for the heavy normalizers.
+@functools.cache  # type: ignore
+def get_normalizers() -> list[NormalizerInfo]:
+    normalizers: list[NormalizerInfo] = []
+
+    for normalizer_config in settings.tag_normalizers:
+        if not normalizer_config.enabled:
+            logger.info(
+                "tag_normalizer_is_disabled",
+                normalizer_id=normalizer_config.id,
+                normalizer_name=normalizer_config.name,
+            )
+            continue
+
+        logger.info("add_tag_normalizer", normalizer_id=normalizer_config.id, normalizer_name=normalizer_config.name)
+
+        info = NormalizerInfo(
+            id=normalizer_config.id,
+            name=normalizer_config.name,
+            normalizer=_create_normalizer(normalizer_config),
         )
-    else:
-        raise NotImplementedError(f"Unknown normalizer type: {normalizer_config.type}")
 
-    info = NormalizerInfo(
-        id=normalizer_config.id,
-        name=normalizer_config.name,
-        normalizer=normalizer,
-    )
+        normalizers.append(info)
 
-    normalizers.append(info)
+    return normalizers
 
 
-__all__ = ["Normalizer", "NormalizerInfo", "FakeNormalizer", "NormalizerAlwaysError", "normalizers"]
+__all__ = ["Normalizer", "NormalizerInfo", "FakeNormalizer", "NormalizerAlwaysError", "get_normalizers"]
@@ -1,3 +1,5 @@
+from typing import Sequence
+
 from ffun.core import logging, metrics
 from ffun.ontology.entities import RawTag
 from ffun.tags.entities import TagInNormalization
@@ -12,6 +14,9 @@ class Normalizer:
     async def normalize(self, tag: TagInNormalization) -> tuple[bool, list[RawTag]]:
         raise NotImplementedError("Must be implemented in subclasses")
 
+    async def warm_up(self, tags: Sequence[TagInNormalization]) -> None:
+        """Prepare to normalize the tags (for example, all tags of an entry) at once, optional."""
+
 
 class FakeNormalizer(Normalizer):
     slots__ = ("tag_valid", "new_tags")
@@ -35,7 +40,14 @@ class NormalizerAlwaysError(Normalizer):
 
 
 class NormalizerInfo:
-    __slots__ = ("id", "name", "_normalizer", "metric_processed", "metric_consumed", "metric_produced")
+    __slots__ = (
+        "id",
+        "name",
+        "_normalizer",
+        "metric_processed",
+        "metric_consumed",
+        "metric_produced",
+    )
 
     def __init__(self, id: int, name: str, normalizer: Normalizer) -> None:
         self.id = id
@@ -52,6 +64,13 @@ class NormalizerInfo:
             interval=settings.metric_accumulation_interval, event="tag_normalizer_produced", normalizer_id=id
         )
 
+    async def warm_up(self, tags: Sequence[TagInNormalization]) -> None:
+        try:
+            await self._normalizer.warm_up(tags)
+        except Exception:
+            # normalization works without warming up, just slower
+            logger.exception("tag_normalizer_warm_up_failed", normalizer_id=self.id)
+
     async def normalize(self, tag: TagInNormalization) -> tuple[bool, list[RawTag]]:
         try:
             tag_valid, new_tags = await self._normalizer.normalize(tag)
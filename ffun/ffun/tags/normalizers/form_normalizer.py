@@ -1,33 +1,47 @@
 import functools
+import pathlib
+from typing import Iterable, Protocol, Sequence
 
 import numpy as np
-import spacy
 from lemminflect import getAllLemmas, getAllLemmasOOV, getInflection
 
 from ffun.ontology.entities import RawTag
 from ffun.tags.converters import constant_tag_parts
 from ffun.tags.entities import TagInNormalization
 from ffun.tags.normalizers import base
+from ffun.tags.normalizers.vectors import MappedVectors, SpacyVectors
+
+
+class WordsVectors(Protocol):
+    def get_row_index(self, word: str) -> int:
+        pass
+
+    def cos_rows(self, row_a: int, row_b: int) -> np.float32:
+        pass
 
 
 class Cache:
-    __slots__ = ("_spacy_data", "_spacy_normal_cache", "_nlp", "_cached_cos_rows", "_cached_get_word_forms")
+    __slots__ = ("_vectors", "_cached_cos_rows", "_cached_get_word_forms")
 
-    def __init__(self, model: str, cos_cache_size: int, forms_cache_size: int):
-        self._nlp = spacy.load(model, disable=["parser", "ner", "senter", "textcat", "tagger", "lemmatizer"])
-        self._spacy_data = self._nlp.vocab.vectors.data
-        self._spacy_normal_cache = np.linalg.norm(self._spacy_data, axis=1)
+    def __init__(
+        self,
+        model: str,
+        cos_cache_size: int,
+        forms_cache_size: int,
+        vectors_artifact: pathlib.Path | None = None,
+    ) -> None:
+        self._vectors: SpacyVectors | MappedVectors
 
-        # hack to reduce branching (do not check for zero norm each time)
-        self._spacy_normal_cache[self._spacy_normal_cache == 0.0] = 1.0
+        if vectors_artifact is None:
+            self._vectors = SpacyVectors(model)
+        else:
+            self._vectors = MappedVectors(vectors_artifact, model)
 
         self._cached_get_word_forms = functools.lru_cache(maxsize=forms_cache_size)(self._raw_get_word_forms)
         self._cached_cos_rows = functools.lru_cache(maxsize=cos_cache_size)(self._raw_cos_rows)
 
     def get_row_index(self, word: str) -> int:
-        # vocab.strings is a hash table => we may see a memory growth here
-        key = self._nlp.vocab.strings[word]
-        return self._nlp.vocab.vectors.key2row.get(key, -1)  # type: ignore
+        return self._vectors.get_row_index(word)
 
     def _fast_word_return(self, word: str) -> bool:
         if len(word) <= 2:
@@ -90,13 +104,7 @@ class Cache:
 
     # must be called only with existed rows
     def _raw_cos_rows(self, row_a: int, row_b: int) -> np.float32:
-        vector_a = self._spacy_data[row_a]
-        vector_b = self._spacy_data[row_b]
-
-        norm_a = self._spacy_normal_cache[row_a]
-        norm_b = self._spacy_normal_cache[row_b]
-
-        return (vector_a @ vector_b) / (norm_a * norm_b)  # type: ignore
+        return self._vectors.cos_rows(row_a, row_b)
 
     def cos_rows(self, row_a: int, row_b: int, default: np.float32 = np.float32(0.0)) -> np.float32:
         if row_a < 0 or row_b < 0:
@@ -108,19 +116,74 @@ class Cache:
 
         return self._cached_cos_rows(row_a, row_b)
 
+    # must be called only with existed rows
+    def normalized_vectors(self, rows: list[int]) -> np.ndarray:
+        return self._vectors.normalized_vectors(rows)
+
+
+# the table takes words_number^2 * 4 bytes => protect memory from huge entries
+_cos_table_max_words = 2_000
+
+
+class CosTable:
+    """Cosines between all vectors of the fixed set of words.
+
+    All cosines are calculated at once, by a single matrix product of normalized vectors,
+    so there are no per-pair calculations and no churn of the cos cache.
+    Words out of the set are delegated to the cache.
+
+    Cosines of the table may differ from the cache's ones in the last float32 digits
+    (the cache divides a dot product by norms, the table multiplies normalized vectors),
+    so solutions with almost equal scores may be ordered differently.
+    """
+
+    __slots__ = ("_cache", "_rows", "_positions", "_cos")
+
+    def __init__(self, cache: Cache, words: Iterable[str]) -> None:
+        self._cache = cache
+        self._rows = {word: cache.get_row_index(word) for word in words}
+
+        known_rows = sorted({row for row in self._rows.values() if row >= 0})
+
+        self._positions = {row: position for position, row in enumerate(known_rows)}
+
+        vectors = cache.normalized_vectors(known_rows)
+
+        self._cos = vectors @ vectors.T
+
+    def get_row_index(self, word: str) -> int:
+        row = self._rows.get(word)
+
+        if row is None:
+            return self._cache.get_row_index(word)
+
+        return row
+
+    def cos_rows(self, row_a: int, row_b: int, default: np.float32 = np.float32(0.0)) -> np.float32:
+        if row_a < 0 or row_b < 0:
+            return default
+
+        position_a = self._positions.get(row_a)
+        position_b = self._positions.get(row_b)
+
+        if position_a is None or position_b is None:
+            return self._cache.cos_rows(row_a, row_b, default)
+
+        return self._cos[position_a, position_b]  # type: ignore
+
 
 class Solution:
     __slots__ = (
-        "_cache",
+        "_vectors",
         "parts",
         "score",
     )
 
     def __init__(
         self,
-        cache: Cache,
+        vectors: WordsVectors,
     ) -> None:
-        self._cache = cache
+        self._vectors = vectors
         self.parts: tuple[str, ...] = ()
         self.score = 0.0
 
@@ -128,7 +191,7 @@ class Solution:
         return sum(len(part) for part in self.parts)
 
     def grow(self, part: str) -> "Solution":
-        clone = Solution(cache=self._cache)
+        clone = Solution(vectors=self._vectors)
         clone.parts = (part,) + self.parts
 
         len_ = len(clone.parts)
@@ -143,17 +206,17 @@ class Solution:
             # => we may skip it for now
             return clone
 
-        new_index = clone._cache.get_row_index(part)
+        new_index = clone._vectors.get_row_index(part)
 
         if new_index < 0:
             return clone
 
         # compare new part with the nearest part with known vector
         for part_to_check in clone.parts[1:]:
-            next_index = clone._cache.get_row_index(part_to_check)
+            next_index = clone._vectors.get_row_index(part_to_check)
 
             if next_index >= 0:
-                clone.score = self.score + float(clone._cache.cos_rows(new_index, next_index))
+                clone.score = self.score + float(clone._vectors.cos_rows(new_index, next_index))
                 break
 
         return clone
@@ -188,21 +251,38 @@ class Normalizer(base.Normalizer):
                a separate mechanism to provide verbose names for tags (we already have parts of it).
     """
 
-    __slots__ = ("_nlp", "_cache", "_spacy_model", "_cos_cache_size", "_forms_cache_size")
+    __slots__ = (
+        "_nlp",
+        "_cache",
+        "_spacy_model",
+        "_cos_cache_size",
+        "_forms_cache_size",
+        "_vectors_artifact",
+        "_cos_table",
+    )
 
     def __init__(
-        self, model: str = "en_core_web_lg", cos_cache_size: int = 100_000, forms_cache_size: int = 100_000
+        self,
+        model: str = "en_core_web_lg",
+        cos_cache_size: int = 100_000,
+        forms_cache_size: int = 100_000,
+        vectors_artifact: pathlib.Path | None = None,
     ) -> None:
         self._spacy_model = model
         self._cos_cache_size = cos_cache_size
         self._forms_cache_size = forms_cache_size
+        self._vectors_artifact = vectors_artifact
         self._cache: Cache | None = None
+        self._cos_table: CosTable | None = None
 
-    # Cache loads huge Spacy model, so we initialize it lazily
+    # Cache loads huge Spacy model (or maps its vectors), so we initialize it lazily
     def cache(self) -> Cache:
         if self._cache is None:
             self._cache = Cache(
-                model=self._spacy_model, cos_cache_size=self._cos_cache_size, forms_cache_size=self._forms_cache_size
+                model=self._spacy_model,
+                cos_cache_size=self._cos_cache_size,
+                forms_cache_size=self._forms_cache_size,
+                vectors_artifact=self._vectors_artifact,
             )
         return self._cache
 
@@ -228,13 +308,13 @@ class Normalizer(base.Normalizer):
     #       so, if it receives such tag, it will skip normalization.
     #       But remember about potential caching on the upper level on domain.py
     #       it may be more effective and universal on the level of normalizers chain
-    async def normalize(self, tag: TagInNormalization) -> tuple[bool, list[RawTag]]:  # noqa: CCR001
+    def _normalize(self, tag: TagInNormalization, vectors: WordsVectors) -> tuple[bool, list[RawTag]]:  # noqa: CCR001
         if not tag.uid:
             return False, []
 
         canonical_part = tag.parts[-1]
 
-        solutions = [Solution(cache=self.cache()).grow(part) for part in self.cache().get_word_forms(canonical_part)]
+        solutions = [Solution(vectors=vectors).grow(part) for part in self.cache().get_word_forms(canonical_part)]
 
         for part in reversed(tag.parts[:-1]):
             new_solutions = []
@@ -264,3 +344,32 @@ class Normalizer(base.Normalizer):
         )
 
         return False, [new_tag]
+
+    def _vectors(self) -> WordsVectors:
+        if self._cos_table is not None:
+            return self._cos_table
+
+        return self.cache()
+
+    async def normalize(self, tag: TagInNormalization) -> tuple[bool, list[RawTag]]:
+        return self._normalize(tag, self._vectors())
+
+    async def warm_up(self, tags: Sequence[TagInNormalization]) -> None:
+        """Calculate cosines for all word forms of the tags by a single matrix product.
+
+        The table is used by next `normalize` calls; cosines of words out of it are taken from the cache,
+        so results do not depend on the table (up to float rounding), even if another entry replaces it concurrently.
+        """
+        cache = self.cache()
+
+        words = {form for tag in tags for part in tag.parts for form in cache.get_word_forms(part)}
+
+        if not words or len(words) > _cos_table_max_words:
+            self.clear_cos_table()
+            return
+
+        self._cos_table = CosTable(cache=cache, words=words)
+
+    def clear_cos_table(self) -> None:
+        """Drop the table of the last warm up, next `normalize` calls use the cache only."""
+        self._cos_table = None
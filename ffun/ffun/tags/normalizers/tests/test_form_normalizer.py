@@ -243,6 +243,53 @@ class TestNormalizer:
         assert tag_valid == expected_tag_valid
         assert new_tags == expected_new_tags
 
+    @pytest.mark.asyncio
+    async def test_warm_up(self) -> None:
+        input_tags = [
+            TagInNormalization(
+                uid=TagUid(input_uid),
+                parts=utils.uid_to_parts(TagUid(input_uid)),
+                link="http://example.com/tag",
+                categories={TagCategory.test_raw},
+                mode=NormalizationMode.raw,
+            )
+            for input_uid in [
+                "book-reviews",
+                "book-review",
+                "sale-taxes",
+                "gravity-axes",
+                "wooden-axes",
+                "consumers-good-sectors",
+                "new-york-times-article",
+                "unknown-wordzzz-here",
+            ]
+        ]
+
+        normalizer.clear_cos_table()
+
+        expected_results = [await normalizer.normalize(input_tag) for input_tag in input_tags]
+
+        await normalizer.warm_up(input_tags)
+
+        assert normalizer._cos_table is not None
+
+        # including tags out of the table
+        assert [await normalizer.normalize(input_tag) for input_tag in input_tags] == expected_results
+
+        await normalizer.warm_up(input_tags[:1])
+
+        assert [await normalizer.normalize(input_tag) for input_tag in input_tags] == expected_results
+
+        normalizer.clear_cos_table()
+
+        assert normalizer._cos_table is None
+
+    @pytest.mark.asyncio
+    async def test_warm_up__no_tags(self) -> None:
+        await normalizer.warm_up([])
+
+        assert normalizer._cos_table is None
+
     @pytest.mark.skipif(reason="Performance test disabled by default.")
     @pytest.mark.asyncio
     async def test_performance(self) -> None:
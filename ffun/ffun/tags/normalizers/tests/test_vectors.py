@@ -0,0 +1,155 @@
+import json
+import pathlib
+import types
+
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+
+from ffun.core.import_times import measure_import_times
+from ffun.domain.entities import TagUid
+from ffun.ontology.entities import NormalizedTag, RawTag
+from ffun.tags import domain as t_domain
+from ffun.tags import errors, utils
+from ffun.tags.entities import NormalizationMode, TagCategory, TagInNormalization
+from ffun.tags.normalizers import NormalizerInfo, form_normalizer
+from ffun.tags.normalizers.vectors import MappedVectors, build_artifact
+
+_words = ["book", "books", "review", "reviews", "zero"]
+
+_data = np.array(
+    [
+        [1.0, 0.0, 0.0],
+        [1.0, 1.0, 0.0],
+        [0.0, 2.0, 0.0],
+        [0.0, 3.0, 3.0],
+        [0.0, 0.0, 0.0],
+        [5.0, 5.0, 5.0],
+    ],
+    dtype=np.float32,
+)
+
+
+@pytest.fixture
+def artifact(tmp_path: pathlib.Path, mocker: MockerFixture) -> pathlib.Path:
+    # SpaCy keys are opaque for the artifact, the last row has no known word
+    fake_nlp = types.SimpleNamespace(
+        vocab=types.SimpleNamespace(
+            vectors=types.SimpleNamespace(
+                data=_data,
+                key2row={1000 + row: row for row in range(len(_data))},
+            ),
+            strings={1000 + row: word for row, word in enumerate(_words)},
+        )
+    )
+
+    mocker.patch("ffun.tags.normalizers.vectors.load_spacy_model", return_value=fake_nlp)
+
+    path = tmp_path / "artifact"
+
+    build_artifact(model="test-model", path=path, dtype="float32")
+
+    return path
+
+
+class TestMappedVectors:
+
+    def test_get_row_index(self, artifact: pathlib.Path) -> None:
+        vectors = MappedVectors(artifact, "test-model")
+
+        for row, word in enumerate(_words):
+            assert vectors.get_row_index(word) == row
+
+        assert vectors.get_row_index("unknown") == -1
+
+    def test_cos_rows(self, artifact: pathlib.Path) -> None:
+        vectors = MappedVectors(artifact, "test-model")
+
+        assert vectors.cos_rows(0, 0) == pytest.approx(1.0)
+        assert vectors.cos_rows(0, 1) == pytest.approx(1 / np.sqrt(2))
+        assert vectors.cos_rows(0, 2) == pytest.approx(0.0)
+        assert vectors.cos_rows(2, 3) == pytest.approx(1 / np.sqrt(2))
+        assert vectors.cos_rows(0, 4) == pytest.approx(0.0)
+
+    def test_normalized_vectors(self, artifact: pathlib.Path) -> None:
+        vectors = MappedVectors(artifact, "test-model")
+
+        normalized = vectors.normalized_vectors([1, 2, 4])
+
+        assert normalized.dtype == np.float32
+        assert np.allclose(normalized, [[1 / np.sqrt(2), 1 / np.sqrt(2), 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0]])
+
+    def test_float16(self, tmp_path: pathlib.Path, artifact: pathlib.Path) -> None:
+        path = tmp_path / "artifact-float16"
+
+        build_artifact(model="test-model", path=path, dtype="float16")
+
+        vectors = MappedVectors(path, "test-model")
+
+        assert vectors.cos_rows(0, 1) == pytest.approx(1 / np.sqrt(2), abs=1e-3)
+
+    def test_wrong_model(self, artifact: pathlib.Path) -> None:
+        with pytest.raises(errors.VectorsArtifactModelMismatch):
+            MappedVectors(artifact, "another-model")
+
+    def test_wrong_version(self, artifact: pathlib.Path) -> None:
+        # artifacts of the first version were keyed by SpaCy hashes
+        (artifact / "info.json").write_text(json.dumps({"model": "test-model", "dtype": "float32"}))
+
+        with pytest.raises(errors.VectorsArtifactVersionMismatch):
+            MappedVectors(artifact, "test-model")
+
+    def test_spacy_is_not_imported(self) -> None:
+        modules = {time.module for time in measure_import_times("ffun.tags.normalizers.vectors")}
+
+        assert "ffun.tags.normalizers.vectors" in modules
+        assert "spacy" not in modules
+
+
+class TestNormalizerWithArtifact:
+
+    @pytest.mark.asyncio
+    async def test_normalize(self, artifact: pathlib.Path) -> None:
+        normalizer = form_normalizer.Normalizer(model="test-model", vectors_artifact=artifact)
+
+        uid = TagUid("books-reviews")
+
+        tag = TagInNormalization(
+            uid=uid,
+            parts=utils.uid_to_parts(uid),
+            link=None,
+            categories={TagCategory.test_raw},
+            mode=NormalizationMode.raw,
+        )
+
+        expected = await normalizer.normalize(tag)
+
+        await normalizer.warm_up([tag])
+
+        assert await normalizer.normalize(tag) == expected
+
+        tag_valid, new_tags = await normalizer.normalize(tag)
+
+        assert not tag_valid
+        assert [new_tag.raw_uid for new_tag in new_tags] == ["books-review"]
+
+    @pytest.mark.asyncio
+    async def test_domain_normalize_warms_up(self, artifact: pathlib.Path) -> None:
+        normalizer = form_normalizer.Normalizer(model="test-model", vectors_artifact=artifact)
+
+        info = NormalizerInfo(id=1, name="form_normalizer", normalizer=normalizer)
+
+        raw_tags = [
+            RawTag(raw_uid="books-reviews", categories={TagCategory.test_raw}),
+            RawTag(raw_uid="zero-book", categories={TagCategory.test_raw}),
+        ]
+
+        normalized = await t_domain.normalize(raw_tags, [info])
+
+        assert normalizer._cos_table is not None
+        assert normalizer._cos_table.get_row_index("reviews") == 3
+
+        assert sorted(normalized, key=lambda tag: tag.uid) == [
+            NormalizedTag(uid=TagUid("books-review"), link=None, categories={TagCategory.test_raw}),
+            NormalizedTag(uid=TagUid("zero-book"), link=None, categories={TagCategory.test_raw}),
+        ]
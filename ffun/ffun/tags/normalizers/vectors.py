@@ -0,0 +1,147 @@
+"""Sources of word vectors for the form normalizer.
+
+- `SpacyVectors` loads the whole SpaCy model into the process memory.
+- `MappedVectors` memory-maps a precomputed artifact (see `build_artifact`) in the read-only mode,
+  so all processes on a host share a single page-cache copy of vectors and start without loading the model.
+
+SpaCy is imported only to load the model: the artifact keys words by its own hash, so processes that use
+the artifact never import SpaCy.
+"""
+
+import hashlib
+import json
+import pathlib
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ffun.core import logging
+from ffun.tags import errors
+
+if TYPE_CHECKING:
+    import spacy
+
+logger = logging.get_module_logger()
+
+
+_vectors_file = "vectors.npy"
+_keys_file = "keys.npy"
+_rows_file = "rows.npy"
+_info_file = "info.json"
+
+# increase on any change of the artifact format
+_artifact_version = 2
+
+
+def word_key(word: str) -> int:
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def load_spacy_model(model: str) -> "spacy.language.Language":
+    import spacy
+
+    return spacy.load(model, disable=["parser", "ner", "senter", "textcat", "tagger", "lemmatizer"])
+
+
+def _normalize_vectors(data: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(data, axis=1)
+
+    # hack to reduce branching (do not check for zero norm each time)
+    norms[norms == 0.0] = 1.0
+
+    return data / norms[:, np.newaxis]  # type: ignore
+
+
+class SpacyVectors:
+    __slots__ = ("_nlp", "_data", "_norms")
+
+    def __init__(self, model: str) -> None:
+        self._nlp = load_spacy_model(model)
+        self._data = self._nlp.vocab.vectors.data
+        self._norms = np.linalg.norm(self._data, axis=1)
+
+        # hack to reduce branching (do not check for zero norm each time)
+        self._norms[self._norms == 0.0] = 1.0
+
+    def get_row_index(self, word: str) -> int:
+        # vocab.strings is a hash table => we may see a memory growth here
+        key = self._nlp.vocab.strings[word]
+        return self._nlp.vocab.vectors.key2row.get(key, -1)  # type: ignore
+
+    # must be called only with existed rows
+    def cos_rows(self, row_a: int, row_b: int) -> np.float32:
+        return (self._data[row_a] @ self._data[row_b]) / (self._norms[row_a] * self._norms[row_b])  # type: ignore
+
+    # must be called only with existed rows
+    def normalized_vectors(self, rows: list[int]) -> np.ndarray:
+        return self._data[rows] / self._norms[rows][:, np.newaxis]  # type: ignore
+
+
+class MappedVectors:
+    __slots__ = ("_keys", "_rows", "_data")
+
+    def __init__(self, path: pathlib.Path, model: str) -> None:
+        info = json.loads((path / _info_file).read_text())
+
+        if info.get("version") != _artifact_version:
+            raise errors.VectorsArtifactVersionMismatch(
+                artifact_version=info.get("version"), expected_version=_artifact_version
+            )
+
+        if info["model"] != model:
+            raise errors.VectorsArtifactModelMismatch(artifact_model=info["model"], expected_model=model)
+
+        # keys are sorted => we can find rows by binary search without building a dict in each process
+        self._keys = np.load(path / _keys_file, mmap_mode="r")
+        self._rows = np.load(path / _rows_file, mmap_mode="r")
+
+        # vectors are normalized => cos is a dot product
+        self._data = np.load(path / _vectors_file, mmap_mode="r")
+
+        logger.info("vectors_artifact_mapped", model=model, rows=self._data.shape[0], dtype=str(self._data.dtype))
+
+    def get_row_index(self, word: str) -> int:
+        key = word_key(word)
+
+        position = int(np.searchsorted(self._keys, key))
+
+        if position < self._keys.shape[0] and self._keys[position] == key:
+            return int(self._rows[position])
+
+        return -1
+
+    # must be called only with existed rows
+    def cos_rows(self, row_a: int, row_b: int) -> np.float32:
+        return np.float32(self._data[row_a].astype(np.float32) @ self._data[row_b].astype(np.float32))
+
+    # must be called only with existed rows
+    def normalized_vectors(self, rows: list[int]) -> np.ndarray:
+        return self._data[rows].astype(np.float32)  # type: ignore
+
+
+def build_artifact(model: str, path: pathlib.Path, dtype: str) -> None:
+    nlp = load_spacy_model(model)
+
+    vectors = nlp.vocab.vectors
+    strings = nlp.vocab.strings
+
+    # SpaCy keys are hashes of words => rekey rows by words, the vectors without known words can not be found anyway
+    keys_to_rows = sorted((word_key(strings[key]), int(row)) for key, row in vectors.key2row.items() if key in strings)
+
+    path.mkdir(parents=True, exist_ok=True)
+
+    np.save(path / _vectors_file, _normalize_vectors(vectors.data).astype(dtype))
+    np.save(path / _keys_file, np.array([key for key, _ in keys_to_rows], dtype=np.uint64))
+    np.save(path / _rows_file, np.array([row for _, row in keys_to_rows], dtype=np.int32))
+
+    info: dict[str, object] = {"version": _artifact_version, "model": model, "dtype": dtype}
+
+    (path / _info_file).write_text(json.dumps(info))
+
+    logger.info(
+        "vectors_artifact_built",
+        model=model,
+        keys=len(keys_to_rows),
+        skipped_keys=len(vectors.key2row) - len(keys_to_rows),
+        dtype=dtype,
+    )
@@ -1,5 +1,6 @@
 import datetime
 import functools
+import hashlib
 import pathlib
 
 import pydantic
@@ -17,6 +18,9 @@ class Settings(BaseSettings):
 
     metric_accumulation_interval: datetime.timedelta = datetime.timedelta(minutes=10)
 
+    chains_cache_size: int = 100_000
+    chains_cache_file: pathlib.Path | None = None
+
     @pydantic.computed_field  # type: ignore
     @functools.cached_property
     def tag_normalizers(self) -> tuple[TagNormalizer, ...]:
@@ -24,6 +28,11 @@ class Settings(BaseSettings):
 
         return NormalizersConfig(**data).tag_normalizer  # type: ignore
 
+    @pydantic.computed_field  # type: ignore
+    @functools.cached_property
+    def tag_normalizers_version(self) -> str:
+        return hashlib.sha256(self.tag_normalizers_config.read_bytes()).hexdigest()
+
     model_config = pydantic_settings.SettingsConfigDict(env_prefix="FFUN_TAGS_")
 
 
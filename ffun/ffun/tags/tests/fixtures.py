@@ -0,0 +1,13 @@
+from typing import Generator
+
+import pytest
+
+from ffun.tags.chains_cache import chains_cache
+
+
+# normalizers are patched in tests => cached chains must not leak between them
+@pytest.fixture(autouse=True)
+def clear_tags_chains_cache() -> Generator[None, None, None]:
+    chains_cache.clear()
+    yield
+    chains_cache.clear()
@@ -0,0 +1,159 @@
+import pathlib
+
+import pytest
+from pytest_mock import MockerFixture
+from structlog.testing import capture_logs
+
+from ffun.core.tests.helpers import assert_logs
+from ffun.domain.entities import TagUid
+from ffun.tags.chains_cache import ChainKey, ChainResult, ChainsCache
+from ffun.tags.entities import TagCategory
+
+
+def _key(uid: str) -> ChainKey:
+    return (TagUid(uid), frozenset({TagCategory.test_raw}))
+
+
+def _result(*uids: str) -> ChainResult:
+    return tuple((TagUid(uid), frozenset({TagCategory.test_raw, TagCategory.free_form})) for uid in uids)
+
+
+class TestChainsCache:
+
+    def test_get_set(self) -> None:
+        cache = ChainsCache(version="v1", max_size=10)
+
+        assert cache.get(_key("a")) is None
+
+        cache.set(_key("a"), _result("a", "b"))
+
+        assert cache.get(_key("a")) == _result("a", "b")
+        assert cache.get((TagUid("a"), frozenset({TagCategory.test_preserve}))) is None
+
+    def test_evict_least_recently_used(self) -> None:
+        cache = ChainsCache(version="v1", max_size=2)
+
+        cache.set(_key("a"), _result("a"))
+        cache.set(_key("b"), _result("b"))
+
+        assert cache.get(_key("a")) is not None
+
+        cache.set(_key("c"), _result("c"))
+
+        assert len(cache) == 2
+        assert cache.get(_key("a")) is not None
+        assert cache.get(_key("b")) is None
+        assert cache.get(_key("c")) is not None
+
+    def test_disabled(self) -> None:
+        cache = ChainsCache(version="v1", max_size=0)
+
+        cache.set(_key("a"), _result("a"))
+
+        assert len(cache) == 0
+
+    def test_clear(self) -> None:
+        cache = ChainsCache(version="v1", max_size=10)
+
+        cache.set(_key("a"), _result("a"))
+
+        cache.clear()
+
+        assert len(cache) == 0
+
+    def test_get__measures_hits(self) -> None:
+        cache = ChainsCache(version="v1", max_size=10)
+        cache.set(_key("a"), _result("a"))
+
+        cache.get(_key("a"))
+        cache.get(_key("b"))
+        cache.get(_key("a"))
+
+        assert cache.metric_hits.count == 3
+        assert cache.metric_hits.sum == 2
+
+    def test_dump_load(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "chains.json"
+
+        cache = ChainsCache(version="v1", max_size=10)
+        cache.set(_key("a"), _result("a", "b"))
+        cache.set(_key("c"), _result())
+        cache.dump(path)
+
+        loaded_cache = ChainsCache(version="v1", max_size=10)
+        loaded_cache.load(path)
+
+        assert len(loaded_cache) == 2
+        assert loaded_cache.get(_key("a")) == _result("a", "b")
+        assert loaded_cache.get(_key("c")) == _result()
+
+    def test_load__version_changed(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "chains.json"
+
+        cache = ChainsCache(version="v1", max_size=10)
+        cache.set(_key("a"), _result("a"))
+        cache.dump(path)
+
+        loaded_cache = ChainsCache(version="v2", max_size=10)
+        loaded_cache.load(path)
+
+        assert len(loaded_cache) == 0
+
+    def test_load__no_file(self, tmp_path: pathlib.Path) -> None:
+        cache = ChainsCache(version="v1", max_size=10)
+        cache.load(tmp_path / "chains.json")
+
+        assert len(cache) == 0
+
+    def test_dump__replaces_file(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "chains.json"
+        path.write_text("old content")
+
+        cache = ChainsCache(version="v1", max_size=10)
+        cache.set(_key("a"), _result("a"))
+        cache.dump(path)
+
+        assert [file.name for file in tmp_path.iterdir()] == ["chains.json"]
+
+        loaded_cache = ChainsCache(version="v1", max_size=10)
+        loaded_cache.load(path)
+
+        assert len(loaded_cache) == 1
+
+    def test_dump__error_keeps_old_file(self, tmp_path: pathlib.Path, mocker: MockerFixture) -> None:
+        path = tmp_path / "chains.json"
+        path.write_text("old content")
+
+        mocker.patch("os.replace", side_effect=OSError("test error"))
+
+        cache = ChainsCache(version="v1", max_size=10)
+        cache.set(_key("a"), _result("a"))
+
+        with pytest.raises(OSError):
+            cache.dump(path)
+
+        assert [file.name for file in tmp_path.iterdir()] == ["chains.json"]
+        assert path.read_text() == "old content"
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "",
+            '{"version": "v1", "chains": [["a", ["test-raw"], [["a", ["test-',
+            '{"version": "v1"}',
+            '{"version": "v1", "chains": [["a", ["unknown-category"], []]]}',
+        ],
+    )
+    def test_load__broken_file(self, tmp_path: pathlib.Path, content: str) -> None:
+        path = tmp_path / "chains.json"
+        path.write_text(content)
+
+        cache = ChainsCache(version="v1", max_size=10)
+        cache.set(_key("a"), _result("a"))
+
+        with capture_logs() as logs:  # type: ignore
+            cache.load(path)
+
+        assert_logs(logs, tags_chains_cache_file_is_broken=1)  # type: ignore
+
+        assert len(cache) == 1
@@ -1,8 +1,11 @@
+from typing import Sequence
+
 import pytest
 from pytest_mock import MockerFixture
 
 from ffun.domain.entities import TagUid, TagUidPart
 from ffun.ontology.entities import NormalizedTag, RawTag
+from ffun.tags.chains_cache import ChainsCache, chains_cache
 from ffun.tags.domain import apply_normalizers, mode_from_categories, normalize, prepare_for_normalization
 from ffun.tags.entities import NormalizationMode, TagCategory, TagInNormalization
 from ffun.tags.normalizers import FakeNormalizer, NormalizerAlwaysError, NormalizerInfo
@@ -354,6 +357,14 @@ class TestNormalize:
 
         assert resulted == expected
 
+    @pytest.mark.asyncio
+    async def test_default_cache(self) -> None:
+        assert len(chains_cache) == 0
+
+        await normalize([RawTag(raw_uid="aa-bb", categories={TagCategory.test_raw})])
+
+        assert len(chains_cache) == 1
+
     @pytest.mark.asyncio
     async def test_tags_chain(self, mocker: MockerFixture) -> None:  # pylint: disable=R0914
         tag_1 = RawTag(raw_uid="tag-1", link=None, categories={TagCategory.test_preserve})
@@ -414,3 +425,162 @@ class TestNormalize:
         expected.sort(key=lambda t: t.uid)
 
         assert resulted == expected
+
+
+class TestNormalizeWithChainsCache:
+
+    @pytest.fixture  # type: ignore
+    def calls(self) -> list[TagUid]:
+        return []
+
+    @pytest.fixture  # type: ignore
+    def info(self, calls: list[TagUid]) -> NormalizerInfo:
+        class SplittingNormalizer(Normalizer):
+            async def normalize(self, tag: TagInNormalization) -> tuple[bool, list[RawTag]]:
+                calls.append(tag.uid)
+
+                if len(tag.parts) == 1:
+                    return True, []
+
+                return False, [RawTag(raw_uid=part, link=tag.link, categories=tag.categories) for part in tag.parts]
+
+        return NormalizerInfo(id=1, name="splitting", normalizer=SplittingNormalizer())
+
+    @pytest.mark.asyncio
+    async def test_cache_chains(self, info: NormalizerInfo, calls: list[TagUid]) -> None:
+        cache = ChainsCache(version="test", max_size=10)
+
+        raw_tag = RawTag(raw_uid="aa-bb", link="http://example.com/1", categories={TagCategory.test_raw})
+
+        expected = [
+            NormalizedTag(uid=TagUid("aa"), link="http://example.com/1", categories={TagCategory.test_raw}),
+            NormalizedTag(uid=TagUid("bb"), link="http://example.com/1", categories={TagCategory.test_raw}),
+        ]
+
+        resulted = await normalize([raw_tag], [info], cache=cache)
+        resulted.sort(key=lambda t: t.uid)
+
+        assert resulted == expected
+        assert sorted(calls) == ["aa", "aa-bb", "bb"]
+        assert cache.metric_hits.count == 1
+        assert cache.metric_hits.sum == 0
+
+        calls.clear()
+
+        resulted = await normalize([raw_tag.replace(link="http://example.com/2")], [info], cache=cache)
+        resulted.sort(key=lambda t: t.uid)
+
+        assert resulted == [
+            NormalizedTag(uid=TagUid("aa"), link="http://example.com/2", categories={TagCategory.test_raw}),
+            NormalizedTag(uid=TagUid("bb"), link="http://example.com/2", categories={TagCategory.test_raw}),
+        ]
+        assert calls == []
+        assert cache.metric_hits.count == 2
+        assert cache.metric_hits.sum == 1
+
+    @pytest.mark.asyncio
+    async def test_lookup_measured_once_per_chain(self, info: NormalizerInfo) -> None:
+        cache = ChainsCache(version="test", max_size=10)
+
+        another_info = NormalizerInfo(id=2, name="another", normalizer=info._normalizer)
+
+        await normalize(
+            [RawTag(raw_uid="aa-bb", categories={TagCategory.test_raw})], [info, another_info], cache=cache
+        )
+
+        assert cache.metric_hits.count == 1
+
+    @pytest.mark.asyncio
+    async def test_categories_are_part_of_key(self, info: NormalizerInfo, calls: list[TagUid]) -> None:
+        cache = ChainsCache(version="test", max_size=10)
+
+        await normalize([RawTag(raw_uid="aa-bb", categories={TagCategory.test_raw})], [info], cache=cache)
+
+        calls.clear()
+
+        resulted = await normalize(
+            [RawTag(raw_uid="aa-bb", categories={TagCategory.test_preserve})], [info], cache=cache
+        )
+        resulted.sort(key=lambda t: t.uid)
+
+        assert sorted(calls) == ["aa", "aa-bb", "bb"]
+        assert resulted == [
+            NormalizedTag(uid=TagUid("aa"), link=None, categories={TagCategory.test_preserve}),
+            NormalizedTag(uid=TagUid("aa-bb"), link=None, categories={TagCategory.test_preserve}),
+            NormalizedTag(uid=TagUid("bb"), link=None, categories={TagCategory.test_preserve}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_final_tags_are_not_cached(self, info: NormalizerInfo) -> None:
+        cache = ChainsCache(version="test", max_size=10)
+
+        await normalize([RawTag(raw_uid="aa-bb", categories={TagCategory.test_final})], [info], cache=cache)
+
+        assert len(cache) == 0
+        assert cache.metric_hits.count == 0
+
+    @pytest.mark.asyncio
+    async def test_no_cache_for_explicit_normalizers(self, info: NormalizerInfo) -> None:
+        await normalize([RawTag(raw_uid="aa-bb", categories={TagCategory.test_raw})], [info])
+
+        assert len(chains_cache) == 0
+
+
+class TestWarmUpNormalizers:
+
+    @pytest.fixture  # type: ignore
+    def warmed_up(self) -> list[list[TagUid]]:
+        return []
+
+    @pytest.fixture  # type: ignore
+    def info(self, warmed_up: list[list[TagUid]]) -> NormalizerInfo:
+        class WarmingUpNormalizer(Normalizer):
+            async def warm_up(self, tags: Sequence[TagInNormalization]) -> None:
+                warmed_up.append(sorted(tag.uid for tag in tags))
+
+            async def normalize(self, tag: TagInNormalization) -> tuple[bool, list[RawTag]]:
+                return True, []
+
+        return NormalizerInfo(id=1, name="warming-up", normalizer=WarmingUpNormalizer())
+
+    @pytest.mark.asyncio
+    async def test_all_roots_at_once(self, info: NormalizerInfo, warmed_up: list[list[TagUid]]) -> None:
+        cache = ChainsCache(version="test", max_size=10)
+
+        await normalize([RawTag(raw_uid="cached", categories={TagCategory.test_raw})], [info], cache=cache)
+
+        warmed_up.clear()
+
+        await normalize(
+            [
+                RawTag(raw_uid="aa-bb", categories={TagCategory.test_raw}),
+                RawTag(raw_uid="cc", categories={TagCategory.test_preserve}),
+                RawTag(raw_uid="final", categories={TagCategory.test_final}),
+                RawTag(raw_uid="cached", categories={TagCategory.test_raw}),
+            ],
+            [info],
+            cache=cache,
+        )
+
+        assert warmed_up == [["aa-bb", "cc"]]
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_warm_up(self, info: NormalizerInfo, warmed_up: list[list[TagUid]]) -> None:
+        await normalize([RawTag(raw_uid="final", categories={TagCategory.test_final})], [info])
+
+        assert warmed_up == []
+
+    @pytest.mark.asyncio
+    async def test_error(self) -> None:
+        class BrokenNormalizer(Normalizer):
+            async def warm_up(self, tags: Sequence[TagInNormalization]) -> None:
+                raise Exception("test error")
+
+            async def normalize(self, tag: TagInNormalization) -> tuple[bool, list[RawTag]]:
+                return True, []
+
+        info = NormalizerInfo(id=1, name="broken", normalizer=BrokenNormalizer())
+
+        assert await normalize([RawTag(raw_uid="aa", categories={TagCategory.test_raw})], [info]) == [
+            NormalizedTag(uid=TagUid("aa"), link=None, categories={TagCategory.test_raw})
+        ]
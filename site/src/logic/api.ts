@@ -475,7 +475,16 @@ export async function addFeed({url}: {url: string}) {
 }
 
 export async function addOPML({content}: {content: string}) {
-  return await postPrivateResult({url: "/add-opml", data: {content: content}});
+  const result = await postPrivateResult({url: "/add-opml", data: {content: content}});
+
+  // big OPML files are imported in the background
+  return result.map((data) => (data.feedsImport ? t.feedsImportFromJSON(data.feedsImport) : null));
+}
+
+export async function getFeedsImport({importId}: {importId: t.FeedsImportId}) {
+  const response = await postPrivate({url: "/get-feeds-import", data: {importId: importId}});
+
+  return t.feedsImportFromJSON(response.feedsImport);
 }
 
 export async function unsubscribe({feedId}: {feedId: t.FeedId}) {
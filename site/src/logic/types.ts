@@ -24,6 +24,12 @@ export function toCollectionId(id: string): CollectionId {
   return id as CollectionId;
 }
 
+export type FeedsImportId = string & {readonly __brand: unique symbol};
+
+export function toFeedsImportId(id: string): FeedsImportId {
+  return id as FeedsImportId;
+}
+
 export type CollectionSlug = string & {readonly __brand: unique symbol};
 
 export function toCollectionSlug(slug: string): CollectionSlug {
@@ -708,3 +714,27 @@ export class ApiError {
     this.message = message;
   }
 }
+
+export type FeedsImport = {
+  readonly id: FeedsImportId;
+  readonly total: number;
+  readonly processed: number;
+  readonly failed: number;
+  readonly finished: boolean;
+};
+
+export function feedsImportFromJSON({
+  id,
+  total,
+  processed,
+  failed,
+  finished
+}: {
+  id: string;
+  total: number;
+  processed: number;
+  failed: number;
+  finished: boolean;
+}): FeedsImport {
+  return {id: toFeedsImportId(id), total, processed, failed, finished};
+}